@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for FREQ AI system
+Times the RGB-D to G-Code pipeline on synthetic barge scenes
+"""
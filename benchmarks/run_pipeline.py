@@ -0,0 +1,277 @@
+"""
+Pipeline Benchmark - Times every drafting stage and the end-to-end cycle
+Writes machine-readable JSON results and compares them against a baseline run
+
+Usage:
+    python -m benchmarks.run_pipeline --output results.json
+    python -m benchmarks.run_pipeline --resolutions vga --compare baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.interface.api import FreqAPI
+from .scenes import RESOLUTIONS, make_barge_frame
+
+
+NOISE_LEVELS = (0.0, 0.01, 0.03)
+
+# Processing configuration shared by every benchmark case
+BENCHMARK_CONFIG = {
+    'processor': {
+        'max_depth': 20.0,
+        'min_depth': 0.1,
+        'voxel_size': 0.05,
+        'random_seed': 0
+    },
+    'metrics': {'enabled': False}
+}
+
+HULL_DEPTH = 3.66
+FREEBOARD = 1.5
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarize timing samples.
+    
+    Args:
+        samples: Durations in seconds
+        
+    Returns:
+        Dictionary of min, median, mean, p95 and stdev in milliseconds
+    """
+    ms = sorted(s * 1000.0 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    return {
+        'runs': len(ms),
+        'min_ms': ms[0],
+        'median_ms': statistics.median(ms),
+        'mean_ms': statistics.fmean(ms),
+        'p95_ms': p95,
+        'stdev_ms': statistics.stdev(ms) if len(ms) > 1 else 0.0
+    }
+
+
+def _timed(func: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    output = func()
+    return output, time.perf_counter() - start
+
+
+def run_stages(api: FreqAPI, frame: Dict[str, Any]) -> Tuple[Dict[str, float], Dict[str, Any]]:
+    """
+    Run each pipeline stage once, timing it in isolation.
+    
+    Args:
+        api: FreqAPI whose processors and agents are exercised
+        frame: RGB-D frame
+        
+    Returns:
+        Tuple of (stage durations in seconds, stage outputs)
+    """
+    processor = api.point_cloud_processor
+    vector_computer = api.vector_computer
+    timings = {}
+    
+    cloud, timings['process_rgbd_frame'] = _timed(lambda: processor.process_rgbd_frame(
+        frame['rgb'], frame['depth'], frame['camera_intrinsics']))
+    downsampled, timings['downsample'] = _timed(lambda: processor.downsample(cloud))
+    filtered, timings['filter_outliers'] = _timed(lambda: processor.filter_outliers(downsampled))
+    geometry, timings['extract_barge_geometry'] = _timed(
+        lambda: processor.extract_barge_geometry(filtered))
+    
+    def compute_vectors() -> List[Dict[str, float]]:
+        vectors = vector_computer.compute_movement_vectors(geometry)
+        vectors = vector_computer.optimize_path(vectors)
+        return vector_computer.apply_safety_margins(vectors)
+    
+    vectors, timings['compute_vectors'] = _timed(compute_vectors)
+    _, timings['translate_to_gcode'] = _timed(
+        lambda: api.gcode_translator.translate_to_gcode(vectors, geometry))
+    
+    outputs = {
+        'points': len(cloud),
+        'downsampled_points': len(downsampled),
+        'filtered_points': len(filtered),
+        'geometry': geometry
+    }
+    return timings, outputs
+
+
+def benchmark_case(resolution: str, noise: float, repeats: int = 5,
+                   warmup: int = 1) -> Dict[str, Any]:
+    """
+    Benchmark one resolution and noise level.
+    
+    Args:
+        resolution: Key of RESOLUTIONS
+        noise: Depth noise standard deviation (meters)
+        repeats: Timed runs per stage
+        warmup: Untimed runs before measuring (fills caches)
+        
+    Returns:
+        Dictionary describing the case and its per-stage timing summaries
+    """
+    api = FreqAPI(json.loads(json.dumps(BENCHMARK_CONFIG)))
+    frame = make_barge_frame(resolution, noise=noise, freeboard=FREEBOARD)
+    
+    for _ in range(warmup):
+        run_stages(api, frame)
+        api.process_drafting_cycle(frame)
+    
+    samples: Dict[str, List[float]] = {}
+    outputs = {}
+    for _ in range(repeats):
+        timings, outputs = run_stages(api, frame)
+        for name, duration in timings.items():
+            samples.setdefault(name, []).append(duration)
+    
+    cycle_results = []
+    for _ in range(repeats):
+        result, duration = _timed(lambda: api.process_drafting_cycle(frame))
+        samples.setdefault('process_drafting_cycle', []).append(duration)
+        cycle_results.append(result)
+    api.lattice_core.shutdown()
+    
+    draft = outputs['geometry'].get('draft', 0.0)
+    width, height = RESOLUTIONS[resolution]
+    return {
+        'case': f"{resolution}/noise={noise}",
+        'resolution': resolution,
+        'width': width,
+        'height': height,
+        'noise': noise,
+        'points': outputs['points'],
+        'downsampled_points': outputs['downsampled_points'],
+        'filtered_points': outputs['filtered_points'],
+        'draft_error': abs(draft - (HULL_DEPTH - FREEBOARD)),
+        'cycle_success': all(r['success'] for r in cycle_results),
+        'stages': {name: summarize(values) for name, values in samples.items()}
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and revision the benchmark ran on."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def run_benchmarks(resolutions: Sequence[str] = tuple(RESOLUTIONS),
+                   noise_levels: Sequence[float] = NOISE_LEVELS,
+                   repeats: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Benchmark every combination of resolution and noise level.
+    
+    Returns:
+        Dictionary with 'environment' and a list of case 'results'
+    """
+    logger = logging.getLogger(__name__)
+    results = []
+    for resolution in resolutions:
+        for noise in noise_levels:
+            case = benchmark_case(resolution, noise, repeats, warmup)
+            logger.info(f"{case['case']}: cycle median "
+                        f"{case['stages']['process_drafting_cycle']['median_ms']:.1f} ms")
+            results.append(case)
+    return {'environment': environment(), 'results': results}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compare median stage times against a baseline run.
+    
+    Args:
+        current: Output of run_benchmarks
+        baseline: Earlier output of run_benchmarks
+        threshold: Relative slowdown reported as a regression
+        
+    Returns:
+        One entry per stage present in both runs, with 'ratio' and 'regression'
+    """
+    base_cases = {case['case']: case for case in baseline.get('results', [])}
+    rows = []
+    for case in current.get('results', []):
+        base = base_cases.get(case['case'])
+        if base is None:
+            continue
+        for stage, stats in case['stages'].items():
+            base_stats = base['stages'].get(stage)
+            if base_stats is None or base_stats['median_ms'] <= 0:
+                continue
+            ratio = stats['median_ms'] / base_stats['median_ms']
+            rows.append({
+                'case': case['case'],
+                'stage': stage,
+                'baseline_ms': base_stats['median_ms'],
+                'current_ms': stats['median_ms'],
+                'ratio': ratio,
+                'regression': ratio > 1.0 + threshold
+            })
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--resolutions', nargs='+', choices=list(RESOLUTIONS),
+                        default=list(RESOLUTIONS))
+    parser.add_argument('--noise', nargs='+', type=float, default=list(NOISE_LEVELS))
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--output', help="Write JSON results to this file")
+    parser.add_argument('--compare', help="Baseline JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative median slowdown reported as a regression")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger(__name__).setLevel(logging.INFO)
+    
+    report = run_benchmarks(args.resolutions, args.noise, args.repeats, args.warmup)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        for row in rows:
+            flag = '  REGRESSION' if row['regression'] else ''
+            print(f"{row['case']:<24} {row['stage']:<24} {row['baseline_ms']:9.2f} -> "
+                  f"{row['current_ms']:9.2f} ms ({row['ratio']:.2f}x){flag}", file=sys.stderr)
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
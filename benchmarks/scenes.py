@@ -0,0 +1,78 @@
+"""
+Synthetic Scenes - Procedural barge-plus-water RGB-D frames for benchmarking
+Generates depth frames at standard resolutions with controllable sensor noise
+"""
+
+from typing import Dict, Any
+import numpy as np
+
+
+# Standard sensor resolutions as (width, height)
+RESOLUTIONS = {
+    'vga': (640, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080)
+}
+
+# Focal length of a 640-pixel-wide reference sensor, scaled with width
+REFERENCE_FOCAL = 525.0
+
+
+def make_intrinsics(width: int, height: int) -> Dict[str, float]:
+    """
+    Pinhole intrinsics for a sensor with the reference field of view.
+    
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        
+    Returns:
+        Dictionary with fx, fy, cx and cy
+    """
+    focal = REFERENCE_FOCAL * width / 640.0
+    return {'fx': focal, 'fy': focal, 'cx': (width - 1) / 2.0, 'cy': (height - 1) / 2.0}
+
+
+def make_barge_frame(resolution: str = 'vga', noise: float = 0.005,
+                     freeboard: float = 1.5, water_depth: float = 12.0,
+                     dropout: float = 0.0, seed: int = 0) -> Dict[str, Any]:
+    """
+    Render a downward-looking frame of a barge deck floating on flat water.
+    
+    The deck is a rectangle covering the central part of the image,
+    ``freeboard`` meters closer to the camera than the water, and both
+    surfaces carry zero-mean Gaussian depth noise.
+    
+    Args:
+        resolution: Key of RESOLUTIONS
+        noise: Depth noise standard deviation (meters)
+        freeboard: Height of the deck above the water (meters)
+        water_depth: Camera-to-water distance (meters)
+        dropout: Fraction of pixels with no depth return
+        seed: Random seed
+        
+    Returns:
+        RGB-D frame dictionary accepted by FreqAPI.process_drafting_cycle
+    """
+    width, height = RESOLUTIONS[resolution]
+    rng = np.random.default_rng(seed)
+    
+    depth = np.full((height, width), water_depth, dtype=np.float32)
+    rows = slice(int(height * 0.3), int(height * 0.7))
+    cols = slice(int(width * 0.2), int(width * 0.8))
+    depth[rows, cols] = water_depth - freeboard
+    
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    rgb[:] = (30, 60, 90)
+    rgb[rows, cols] = (120, 110, 100)
+    
+    if noise > 0:
+        depth += rng.standard_normal(depth.shape, dtype=np.float32) * np.float32(noise)
+    if dropout > 0:
+        depth[rng.random(depth.shape) < dropout] = 0.0
+    
+    return {
+        'rgb': rgb,
+        'depth': depth,
+        'camera_intrinsics': make_intrinsics(width, height)
+    }
@@ -26,14 +26,23 @@ export class FreqAPIService {
     }
   }
 
-  async startDraftingCycle(rgbdData) {
+  /**
+   * Queue a drafting cycle. Frames whose depth is a Uint16Array are uploaded
+   * in the binary RGB-D format (see encodeRGBDFrame); others are sent as JSON.
+   *
+   * @param {Object} rgbdData - Frame to process
+   * @param {{compress: boolean}} options - Compress binary uploads
+   * @returns {Promise<Object>} Job with job_id and status_url
+   */
+  async startDraftingCycle(rgbdData, { compress = false } = {}) {
     try {
+      const binary = rgbdData.depth instanceof Uint16Array;
       const response = await fetch(`${this.baseURL}/cycle/start`, {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json',
+          'Content-Type': binary ? RGBD_CONTENT_TYPE : 'application/json',
         },
-        body: JSON.stringify(rgbdData),
+        body: binary ? await encodeRGBDFrame(rgbdData, { compress }) : JSON.stringify(rgbdData),
       });
       
       if (!response.ok) {
@@ -47,6 +56,57 @@ export class FreqAPIService {
     }
   }
 
+  /**
+   * Upload a multi-frame capture in one request; one job is queued per frame.
+   *
+   * @param {Array<Object>} frames - Frames with Uint16Array depth
+   * @param {{compress: boolean}} options - Compress each frame
+   * @returns {Promise<{frames: number, jobs: Array<Object>}>}
+   */
+  async startDraftingStream(frames, { compress = false } = {}) {
+    try {
+      const parts = await Promise.all(frames.map((frame) => encodeRGBDFrame(frame, { compress })));
+      const response = await fetch(`${this.baseURL}/cycle/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': RGBD_CONTENT_TYPE,
+        },
+        body: new Blob(parts),
+      });
+
+      if (!response.ok) {
+        throw new Error('Failed to upload drafting frames');
+      }
+
+      return await response.json();
+    } catch (error) {
+      console.error('API Error:', error);
+      throw error;
+    }
+  }
+
+  async getJob(jobId) {
+    try {
+      const response = await fetch(`${this.baseURL}/jobs/${jobId}`);
+      if (!response.ok) {
+        throw new Error(`Failed to fetch job ${jobId}`);
+      }
+      return await response.json();
+    } catch (error) {
+      console.error('API Error:', error);
+      throw error;
+    }
+  }
+
+  async waitForJob(jobId, intervalMs = 500) {
+    let job = await this.getJob(jobId);
+    while (job.status === 'queued' || job.status === 'running') {
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+      job = await this.getJob(jobId);
+    }
+    return job;
+  }
+
   async getHealthCheck() {
     try {
       const response = await fetch(`${this.baseURL}/health`);
@@ -60,3 +120,132 @@ export class FreqAPIService {
     }
   }
 }
+
+const RGBD_CONTENT_TYPE = 'application/x-freq-rgbd';
+const RGBD_HEADER_BYTES = 40;
+
+async function deflate(bytes) {
+  const stream = new Blob([bytes]).stream().pipeThrough(new CompressionStream('deflate'));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+/**
+ * Encode an RGB-D frame for upload.
+ *
+ * Layout (little-endian): 'FQRD', version u8, flags u8 (bit 0: depth is
+ * zlib, bit 1: RGB is zlib), reserved u16, width u16, height u16, fx, fy,
+ * cx, cy and depth scale (meters per unit) as f32, depth bytes u32, RGB
+ * bytes u32, then the depth section (uint16 per pixel) and the optional RGB
+ * section (3 x uint8 per pixel).
+ *
+ * @param {{depth: Uint16Array, rgb: (Uint8Array|undefined), width: number,
+ *   height: number, camera_intrinsics: Object, depthScale: (number|undefined)}} frame
+ * @param {{compress: boolean}} options - zlib-compress the sections
+ * @returns {Promise<Blob>} Frame ready to post
+ */
+export async function encodeRGBDFrame(frame, { compress = false } = {}) {
+  const { depth, rgb, width, height } = frame;
+  const intrinsics = frame.camera_intrinsics;
+  let sections = [new Uint8Array(depth.buffer, depth.byteOffset, depth.byteLength)];
+  if (rgb) {
+    sections.push(new Uint8Array(rgb.buffer, rgb.byteOffset, rgb.byteLength));
+  }
+  if (compress) {
+    sections = await Promise.all(sections.map(deflate));
+  }
+
+  const header = new ArrayBuffer(RGBD_HEADER_BYTES);
+  const view = new DataView(header);
+  new Uint8Array(header, 0, 4).set([0x46, 0x51, 0x52, 0x44]);
+  view.setUint8(4, 1);
+  view.setUint8(5, compress ? (rgb ? 0x03 : 0x01) : 0);
+  view.setUint16(8, width, true);
+  view.setUint16(10, height, true);
+  [intrinsics.fx, intrinsics.fy, intrinsics.cx, intrinsics.cy, frame.depthScale || 0.001]
+    .forEach((value, i) => view.setFloat32(12 + 4 * i, value, true));
+  view.setUint32(32, sections[0].byteLength, true);
+  view.setUint32(36, sections[1] ? sections[1].byteLength : 0, true);
+  return new Blob([header, ...sections]);
+}
+
+const POINT_CLOUD_MAGIC = 'FQPC';
+const POINT_CLOUD_HEADER_BYTES = 40;
+const POINT_CLOUD_RECORD_BYTES = 8;
+
+/**
+ * Decode a binary point cloud frame received over the WebSocket.
+ *
+ * Layout (little-endian): 'FQPC', version u8, flags u8, reserved u16,
+ * sequence u32, total points u32, origin 3 x f32, scale 3 x f32, then one
+ * 8-byte record per point: int16 x, y, z and an RGB565 color. Frames may
+ * be truncated to the client's level of detail.
+ *
+ * @param {ArrayBuffer} buffer - Binary WebSocket message
+ * @returns {{sequence: number, totalPoints: number, positions: Float32Array,
+ *   colors: Uint8Array|null}} Positions in meters and RGB colors, 3 per point
+ */
+export function decodePointCloudFrame(buffer) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== POINT_CLOUD_MAGIC || view.getUint8(4) !== 1) {
+    throw new Error('Unsupported point cloud frame');
+  }
+  const hasColors = (view.getUint8(5) & 0x01) !== 0;
+  const origin = [0, 1, 2].map((axis) => view.getFloat32(16 + 4 * axis, true));
+  const scale = [0, 1, 2].map((axis) => view.getFloat32(28 + 4 * axis, true));
+
+  const count = (buffer.byteLength - POINT_CLOUD_HEADER_BYTES) / POINT_CLOUD_RECORD_BYTES;
+  const records = new Int16Array(buffer, POINT_CLOUD_HEADER_BYTES, count * 4);
+  const packed = new Uint16Array(buffer, POINT_CLOUD_HEADER_BYTES, count * 4);
+  const positions = new Float32Array(count * 3);
+  const colors = hasColors ? new Uint8Array(count * 3) : null;
+
+  for (let i = 0; i < count; i++) {
+    for (let axis = 0; axis < 3; axis++) {
+      positions[3 * i + axis] = records[4 * i + axis] * scale[axis] + origin[axis];
+    }
+    if (colors) {
+      const rgb = packed[4 * i + 3];
+      colors[3 * i] = (rgb >> 11) << 3;
+      colors[3 * i + 1] = ((rgb >> 5) & 0x3f) << 2;
+      colors[3 * i + 2] = (rgb & 0x1f) << 3;
+    }
+  }
+
+  return {
+    sequence: view.getUint32(8, true),
+    totalPoints: view.getUint32(12, true),
+    positions,
+    colors,
+  };
+}
+
+/**
+ * Apply a 'state_patch' message to the client's copy of the system state.
+ *
+ * @param {Object} state - State from the last snapshot, updated in place
+ * @param {{seq: number, set: Object, unset: Array<Array<string>>}} patch
+ * @returns {Object} The updated state
+ */
+export function applyStatePatch(state, patch) {
+  const merge = (target, changes) => {
+    Object.entries(changes).forEach(([key, value]) => {
+      const current = target[key];
+      const isObject = (item) => item !== null && typeof item === 'object' && !Array.isArray(item);
+      if (isObject(value) && isObject(current)) {
+        merge(current, value);
+      } else {
+        target[key] = value;
+      }
+    });
+  };
+
+  merge(state, patch.set || {});
+  (patch.unset || []).forEach((path) => {
+    const parent = path.slice(0, -1).reduce((node, key) => (node ? node[key] : undefined), state);
+    if (parent) {
+      delete parent[path[path.length - 1]];
+    }
+  });
+  return state;
+}
@@ -3,6 +3,8 @@ FREQ AI Main Entry Point
 Starts the Lattice Core system and API server
 """
 
+import argparse
+import asyncio
 import logging
 import sys
 from pathlib import Path
@@ -11,6 +13,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.interface.api import FreqAPI
+from src.interface.server import FreqServer
 from src.core.lattice_core import LatticeCore
 
 
@@ -26,34 +29,18 @@ def setup_logging():
     )
 
 
-def main():
-    """Main entry point for FREQ AI system."""
-    setup_logging()
-    logger = logging.getLogger(__name__)
-    
-    logger.info("=" * 60)
-    logger.info("FREQ AI v4.0 - Autonomous Barge Drafting System")
-    logger.info("=" * 60)
-    
-    # Initialize the API
-    config = {
-        'core': {},
-        'processor': {},
-        'gcode': {},
-        'validator': {},
-        'vector_computer': {},
-        'gcode_translator': {}
-    }
-    
-    api = FreqAPI(config)
-    logger.info("FREQ AI system initialized successfully")
-    
-    # In production, this would start Flask/FastAPI server
-    # For scaffold, just demonstrate the system works
-    logger.info("System ready for drafting cycles")
-    logger.info("API endpoints available at /api/v1/")
-    
-    # Demo: Process a mock drafting cycle
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="FREQ AI API server")
+    parser.add_argument('--host', default='0.0.0.0', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=5000, help="Port to listen on")
+    parser.add_argument('--demo', action='store_true',
+                        help="Run one demo drafting cycle and exit instead of serving")
+    return parser.parse_args(argv)
+
+
+def run_demo(api, logger):
+    """Process a mock drafting cycle and log the result."""
     logger.info("\n--- Running demo drafting cycle ---")
     import numpy as np
     
@@ -78,5 +65,50 @@ def main():
     logger.info("\nFREQ AI system demo complete")
 
 
+def main(argv=None):
+    """Main entry point for FREQ AI system."""
+    args = parse_args(argv)
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    
+    logger.info("=" * 60)
+    logger.info("FREQ AI v4.0 - Autonomous Barge Drafting System")
+    logger.info("=" * 60)
+    
+    # Initialize the API
+    config = {
+        'core': {},
+        'processor': {},
+        'gcode': {},
+        'validator': {},
+        'vector_computer': {},
+        'gcode_translator': {}
+    }
+    
+    api = FreqAPI(config)
+    logger.info("FREQ AI system initialized successfully")
+    
+    if args.demo:
+        run_demo(api, logger)
+        return
+    
+    server = FreqServer(api, {
+        'host': args.host,
+        'port': args.port,
+        'prefix': '/api/v1',
+        'cycle_workers': 1,
+        'max_body_bytes': 64 << 20,
+        'job_history': 100,
+        'state_max_age': 0.5
+    })
+    logger.info("System ready for drafting cycles")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("FREQ AI server shut down")
+    finally:
+        api.shutdown()
+
+
 if __name__ == "__main__":
     main()
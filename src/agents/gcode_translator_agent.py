@@ -4,7 +4,22 @@ Handles crane-specific command syntax and optimization
 """
 
 import logging
-from typing import Dict, Any, List
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Any, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..core.gcode_format import LineFormatter
+from ..core.gcode_program import check_program, optimize_program, parse_program, render_program
+from ..core.gcode_stream import LineTransform, apply_transforms, insert_dwell, write_lines
+
+# Commands understood by the crane controller
+VALID_COMMANDS = frozenset({'G0', 'G1', 'G4', 'G21', 'G28', 'G90', 'G92', 'G94', 'M2'})
+
+# Stream used by translate_delta when the caller does not name one
+DEFAULT_STREAM = 'default'
 
 
 class GCodeTranslatorAgent:
@@ -28,36 +43,150 @@ class GCodeTranslatorAgent:
         self.config = config or {
             'crane_type': 'generic',
             'coordinate_system': 'cartesian',
-            'unit_scale': 1000.0,    # Convert meters to millimeters
-            'add_comments': True
+            'unit_scale': 1000.0,     # Convert meters to millimeters
+            'add_comments': True,
+            'incremental': True,      # Reuse formatted blocks between cycles of a stream
+            'cache_block_size': 256,  # Waypoints per cached block
+            'cache_streams': 64       # Streams whose previous program is kept
         }
         self.logger = logging.getLogger(__name__)
+        self._formatters: Dict[Tuple[bool, bool], Dict[str, Any]] = {}
+        
+        # Previous program's waypoints and formatted blocks, per stream, least
+        # recently used first; each entry carries its own lock
+        self._caches: 'OrderedDict[Hashable, Dict[str, Any]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
         self.logger.info("G-Code Translator Agent initialized")
     
-    def translate_to_gcode(self, vectors: List[Dict[str, float]], 
-                          geometry_data: Dict[str, Any]) -> str:
+    def translate_to_gcode(self, vectors: Union[List[Dict[str, float]], np.ndarray], 
+                          geometry_data: Dict[str, Any],
+                          stream: Optional[Hashable] = None) -> str:
         """
         Translate movement vectors to G-Code.
         
+        When a ``stream`` is given and ``incremental`` is enabled, blocks of
+        waypoints that are unchanged since that stream's previous program
+        reuse their formatted text.
+        Waypoints with a 'feed' (m/s, see VectorComputerAgent.optimize_path)
+        get F words in units per minute on their feed moves.
+        
         Args:
-            vectors: List of movement vectors
+            vectors: List of movement vectors, or an (N, 3) array of positions
             geometry_data: Geometry information for metadata
-            
+            stream: Identifies the barge or session the program is for;
+                programs of different streams never share cached blocks
+                
         Returns:
             Complete G-Code program as string
         """
         self.logger.info("Translating vectors to G-Code")
         
-        gcode_lines = self._generate_header(geometry_data)
-        gcode_lines.extend(self._generate_initialization())
-        gcode_lines.extend(self._translate_vectors(vectors))
-        gcode_lines.extend(self._generate_footer())
-        
-        gcode = "\n".join(gcode_lines)
-        self.logger.info(f"Translation complete: {len(gcode_lines)} lines")
+        if stream is not None and self.config.get('incremental', True):
+            gcode = self._translate_incremental(vectors, geometry_data, stream)['gcode']
+        else:
+            gcode = "\n".join(self._iter_program(vectors, geometry_data))
+        self.logger.info(f"Translation complete: {len(gcode)} bytes")
         
         return gcode
     
+    def translate_delta(self, vectors: Union[List[Dict[str, float]], np.ndarray],
+                        geometry_data: Dict[str, Any],
+                        stream: Hashable = DEFAULT_STREAM) -> Dict[str, Any]:
+        """
+        Translate movement vectors and describe the change since the previous program.
+        
+        Controllers that hold the previous program can apply the patches
+        instead of reloading it: each patch replaces waypoints
+        [start, end) with its command lines, and the program is then
+        truncated or extended to ``waypoints`` waypoints.
+        
+        Args:
+            vectors: List of movement vectors, or an (N, 3) array of positions
+            geometry_data: Geometry information for metadata
+            stream: Identifies the controller the program is for; each
+                stream has its own previous program and version sequence
+                
+        Returns:
+            Dictionary with the full 'gcode', its 'version', the
+            'base_version' the patches apply to, 'full' (True when there
+            is no base and the whole program must be sent), 'waypoints',
+            'patches' and block reuse counts
+        """
+        delta = self._translate_incremental(vectors, geometry_data, stream)
+        self.logger.info(f"Delta {stream} v{delta['version']}: {len(delta['patches'])} patches, "
+                         f"reused {delta['reused_blocks']}/{delta['total_blocks']} blocks")
+        return delta
+    
+    def clear_cache(self, stream: Optional[Hashable] = None) -> None:
+        """
+        Forget previous programs, e.g. when a controller was reset.
+        
+        Args:
+            stream: Stream to forget; all streams when omitted
+        """
+        with self._cache_lock:
+            if stream is None:
+                self._caches.clear()
+            else:
+                self._caches.pop(stream, None)
+    
+    def iter_gcode(self, vectors: Union[Iterable[Dict[str, float]], np.ndarray],
+                   geometry_data: Dict[str, Any],
+                   transforms: Sequence[LineTransform] = ()) -> Iterator[str]:
+        """
+        Lazily generate G-Code lines for the given vectors.
+        
+        Lines are produced one at a time, so ``vectors`` may itself be a
+        generator and memory use does not grow with program length.
+        
+        Args:
+            vectors: Iterable of movement vectors, or an (N, 3) array of positions
+            geometry_data: Geometry information for metadata
+            transforms: Streaming post-processors (e.g. dwell_transform)
+            
+        Yields:
+            G-Code lines without trailing newlines
+        """
+        lines = (line for block in self._iter_program(vectors, geometry_data)
+                 for line in block.split("\n"))
+        return iter(apply_transforms(lines, transforms))
+    
+    def write_gcode(self, vectors: Union[Iterable[Dict[str, float]], np.ndarray],
+                    geometry_data: Dict[str, Any], sink: Any,
+                    transforms: Sequence[LineTransform] = (),
+                    chunk_size: int = 64 * 1024) -> int:
+        """
+        Stream a G-Code program to a file, socket or controller buffer.
+        
+        The bytes written equal ``translate_to_gcode`` output (after
+        transforms) without building the program in memory.
+        
+        Args:
+            vectors: Iterable of movement vectors, or an (N, 3) array of positions
+            geometry_data: Geometry information for metadata
+            sink: Binary or text file, socket, or callable accepting bytes
+            transforms: Streaming post-processors
+            chunk_size: Target size of each write
+            
+        Returns:
+            Number of bytes written
+        """
+        if transforms:
+            lines = self.iter_gcode(vectors, geometry_data, transforms)
+        else:
+            lines = self._iter_program(vectors, geometry_data)
+        written = write_lines(lines, sink, chunk_size)
+        self.logger.info(f"Streamed G-Code program: {written} bytes")
+        return written
+    
+    def _iter_program(self, vectors: Union[Iterable[Dict[str, float]], np.ndarray],
+                      geometry_data: Dict[str, Any]) -> Iterator[str]:
+        """Yield the program as text blocks that join with newlines."""
+        yield from self._generate_header(geometry_data)
+        yield from self._generate_initialization()
+        yield from self._iter_vectors(vectors)
+        yield from self._generate_footer()
+    
     def _generate_header(self, geometry_data: Dict[str, Any]) -> List[str]:
         """Generate G-Code header with metadata."""
         header = [
@@ -83,27 +212,197 @@ class GCodeTranslatorAgent:
         ]
         return init
     
-    def _translate_vectors(self, vectors: List[Dict[str, float]]) -> List[str]:
-        """Translate movement vectors to G-Code commands."""
-        commands = []
-        scale = self.config['unit_scale']
+    def _translate_incremental(self, vectors: Union[List[Dict[str, float]], np.ndarray],
+                               geometry_data: Dict[str, Any],
+                               stream: Hashable) -> Dict[str, Any]:
+        """Translate vectors, reformatting only the stream's cached blocks that changed."""
+        positions = self._positions(vectors)
+        block_size = self.config.get('cache_block_size', 256)
+        settings = (self.config['unit_scale'], bool(self.config['add_comments']), block_size,
+                    positions.shape[1])
+        
+        # The agent lock only guards the stream table; a stream's own lock keeps
+        # its versions in order while other streams format in parallel
+        with self._cache_lock:
+            cache = self._caches.get(stream)
+            if cache is None:
+                cache = self._caches[stream] = {'lock': threading.Lock(), 'settings': None,
+                                                'positions': None, 'blocks': [], 'version': None}
+            self._caches.move_to_end(stream)
+            excess = len(self._caches) - self.config.get('cache_streams', 64)
+            for evicted in list(self._caches)[:-1]:
+                if excess <= 0:
+                    break
+                if not self._caches[evicted]['lock'].locked():
+                    del self._caches[evicted]
+                    excess -= 1
+                    self.logger.debug(f"Dropped cached program of stream {evicted}")
         
-        for i, vector in enumerate(vectors):
-            x = vector.get('x', 0.0) * scale
-            y = vector.get('y', 0.0) * scale
-            z = vector.get('z', 0.0) * scale
+        with cache['lock']:
+            if cache['settings'] != settings:
+                cache.update(positions=np.empty((0, positions.shape[1])), blocks=[],
+                             version=None)
+            previous = cache['positions']
             
-            if self.config['add_comments']:
-                commands.append(f"; Waypoint {i+1}")
+            # Waypoints are compared by index; rows beyond the old program are new
+            common = min(len(positions), len(previous))
+            changed = np.ones(len(positions), dtype=bool)
+            changed[:common] = np.any(positions[:common] != previous[:common], axis=1)
             
-            # Use G0 for rapid positioning or G1 for controlled feed
-            if i == 0:
-                commands.append(f"G0 X{x:.3f} Y{y:.3f} Z{z:.3f}  ; Rapid to start")
-            else:
-                commands.append(f"G1 X{x:.3f} Y{y:.3f} Z{z:.3f}  ; Linear move")
+            blocks = []
+            reused = 0
+            for number, start in enumerate(range(0, len(positions), block_size)):
+                end = min(start + block_size, len(positions))
+                if (number < len(cache['blocks']) and end == min(start + block_size, len(previous))
+                        and not changed[start:end].any()):
+                    blocks.append(cache['blocks'][number])
+                    reused += 1
+                else:
+                    blocks.append(self._format_rows(positions[start:end], start))
+            
+            base_version = cache['version']
+            version = 1 if base_version is None else base_version + 1
+            cache.update(settings=settings, positions=positions.copy(), blocks=blocks,
+                         version=version)
+        
+        patches = []
+        if base_version is not None:
+            edges = np.flatnonzero(np.diff(np.concatenate([[0], changed.view(np.int8), [0]])))
+            for start, end in edges.reshape(-1, 2).tolist():
+                patches.append({
+                    'start': start,
+                    'end': end,
+                    'gcode': self._format_rows(positions[start:end], start)
+                })
+        
+        lines = self._generate_header(geometry_data) + self._generate_initialization()
+        lines += blocks + [""] + self._generate_footer()
+        return {
+            'gcode': "\n".join(lines),
+            'version': version,
+            'base_version': base_version,
+            'full': base_version is None,
+            'waypoints': len(positions),
+            'patches': patches,
+            'reused_blocks': reused,
+            'total_blocks': len(blocks)
+        }
+    
+    def _translate_vectors(self,
+                           vectors: Union[List[Dict[str, float]], np.ndarray]) -> List[str]:
+        """Translate movement vectors to G-Code commands."""
+        return "\n".join(self._iter_vectors(vectors)).split("\n")
+    
+    def _iter_vectors(self, vectors: Union[Iterable[Dict[str, float]], np.ndarray],
+                      block_size: int = 4096) -> Iterator[str]:
+        """
+        Lazily translate movement vectors to G-Code commands.
+        
+        Waypoints are scaled and formatted a block at a time as (N, 3)
+        arrays, or (N, 4) with a feed column; dictionaries are gathered
+        into blocks first.
+        
+        Yields:
+            Text blocks of newline-separated commands
+        """
+        index = 0
+        for positions in self._iter_position_blocks(vectors, block_size):
+            yield self._format_rows(positions, index)
+            index += len(positions)
+        
+        yield ""
+    
+    def _format_rows(self, positions: np.ndarray, start: int) -> str:
+        """Format waypoints numbered from ``start`` as newline-separated commands."""
+        formatters = self._waypoint_formatters(positions.shape[1] == 4)
+        rows = positions * self.config['unit_scale']
+        if formatters['feed']:
+            rows[:, 3] *= 60.0  # Per second to per minute (G94)
+        if formatters['index']:
+            numbers = np.arange(start + 1, start + len(rows) + 1, dtype=np.float64)
+            rows = np.column_stack([rows, numbers])
+        
+        # Use G0 for rapid positioning or G1 for controlled feed
+        text = formatters['move'].format_block(rows[1:] if start == 0 else rows)
+        if start == 0:
+            text = formatters['start'].format_block(rows[:1]) + text
+        return text[:-1]
+    
+    @staticmethod
+    def _positions(vectors: Union[Iterable[Dict[str, float]], np.ndarray],
+                   feed: Optional[bool] = None) -> np.ndarray:
+        """
+        Gather movement vectors into an (N, 3) position array.
+        
+        Vectors carrying a 'feed' (m/s, e.g. from a planned trajectory)
+        give an (N, 4) array whose last column is the feed; (N, 4) arrays
+        are taken as is. Either every vector carries a feed or none does;
+        ``feed`` fixes which, e.g. to match earlier blocks of a stream.
+        
+        Raises:
+            ValueError: If only some of the vectors carry a feed
+        """
+        if isinstance(vectors, np.ndarray):
+            positions = np.asarray(vectors, dtype=np.float64)
+            if positions.ndim == 2 and positions.shape[1] == 4:
+                return positions
+            return positions.reshape(-1, 3)
+        vectors = list(vectors)
+        with_feed = sum('feed' in v for v in vectors)
+        if feed is None:
+            feed = with_feed > 0
+        if with_feed != (len(vectors) if feed else 0):
+            raise ValueError(f"Movement vectors must all carry a 'feed' or none of them: "
+                             f"expected {'all' if feed else 'none'}, "
+                             f"got {with_feed} of {len(vectors)}")
+        if feed:
+            rows = [(v.get('x', 0.0), v.get('y', 0.0), v.get('z', 0.0), v['feed'])
+                    for v in vectors]
+            return np.array(rows, dtype=np.float64).reshape(-1, 4)
+        rows = [(v.get('x', 0.0), v.get('y', 0.0), v.get('z', 0.0)) for v in vectors]
+        return np.array(rows, dtype=np.float64).reshape(-1, 3)
+    
+    def _iter_position_blocks(self, vectors: Union[Iterable[Dict[str, float]], np.ndarray],
+                              block_size: int) -> Iterator[np.ndarray]:
+        """Yield (N, 3) position arrays from an array or an iterable of vectors."""
+        if isinstance(vectors, np.ndarray):
+            positions = self._positions(vectors)
+            for start in range(0, len(positions), block_size):
+                yield positions[start:start + block_size]
+            return
+        
+        # The first block decides whether the whole stream has a feed column
+        vectors = iter(vectors)
+        feed = None
+        while True:
+            positions = self._positions(islice(vectors, block_size), feed)
+            if not len(positions):
+                return
+            feed = positions.shape[1] == 4
+            yield positions
+    
+    def _waypoint_formatters(self, feed: bool = False) -> Dict[str, Any]:
+        """
+        Line formatters for the start and feed moves.
         
-        commands.append("")
-        return commands
+        Cached per comment setting and per presence of a feed column,
+        which adds an F word to every feed move (the rapid start move
+        has none).
+        """
+        add_comments = bool(self.config['add_comments'])
+        formatters = self._formatters.get((add_comments, feed))
+        if formatters is None:
+            prefix = ["; Waypoint ", (4 if feed else 3, 0), "\n"] if add_comments else []
+            coordinates = [" X", (0, 3), " Y", (1, 3), " Z", (2, 3)]
+            feed_word = [" F", (3, 1)] if feed else []
+            formatters = self._formatters[(add_comments, feed)] = {
+                'index': add_comments,
+                'feed': feed,
+                'start': LineFormatter(prefix + ["G0"] + coordinates + ["  ; Rapid to start\n"]),
+                'move': LineFormatter(prefix + ["G1"] + coordinates + feed_word
+                                      + ["  ; Linear move\n"])
+            }
+        return formatters
     
     def _generate_footer(self) -> List[str]:
         """Generate G-Code footer with cleanup commands."""
@@ -130,22 +429,18 @@ class GCodeTranslatorAgent:
         """
         self.logger.debug(f"Adding dwell time: {dwell_ms}ms")
         
-        # Insert dwell commands at strategic points
-        lines = gcode.split('\n')
-        modified_lines = []
-        
-        for line in lines:
-            modified_lines.append(line)
-            if 'G1' in line and 'Z' in line:
-                # Add dwell after Z-axis movements
-                modified_lines.append(f"G4 P{dwell_ms}  ; Dwell for stabilization")
-        
-        return "\n".join(modified_lines)
+        # Add dwell after Z-axis movements; use dwell_transform when streaming
+        return "\n".join(insert_dwell(gcode.split('\n'), dwell_ms))
     
     def optimize_for_crane(self, gcode: str) -> str:
         """
         Optimize G-Code for specific crane controller.
         
+        Removes redundant and zero-length moves, merges collinear segments
+        and strips repeated modal words, shrinking the program the
+        controller has to buffer. Options come from the 'optimizer' config
+        entry, e.g. {'tolerance': 1.0, 'omit_motion_codes': True}.
+        
         Args:
             gcode: Input G-Code
             
@@ -154,13 +449,12 @@ class GCodeTranslatorAgent:
         """
         self.logger.debug(f"Optimizing for crane type: {self.config['crane_type']}")
         
-        # Scaffold - crane-specific optimizations would go here
-        # Could include:
-        # - Command substitution for proprietary syntax
-        # - Axis remapping
-        # - Speed profile optimization
+        commands = parse_program(gcode)
+        optimized = optimize_program(commands, **self.config.get('optimizer', {}))
+        self.logger.info(f"Optimized for crane: {len(commands)} -> {len(optimized)} lines")
         
-        return gcode
+        # Crane-specific command substitution and axis remapping would go here
+        return render_program(optimized)
     
     def validate_syntax(self, gcode: str) -> bool:
         """
@@ -174,18 +468,8 @@ class GCodeTranslatorAgent:
         """
         self.logger.debug("Validating G-Code syntax")
         
-        lines = gcode.split('\n')
-        valid_commands = {'G0', 'G1', 'G4', 'G21', 'G28', 'G90', 'G92', 'G94', 'M2'}
-        
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith(';'):
-                continue
-            
-            # Check if line starts with a valid command
-            command = line.split()[0]
-            if command not in valid_commands:
-                self.logger.warning(f"Unknown command: {command}")
-                return False
+        diagnostics = check_program(gcode, allowed=VALID_COMMANDS)
+        for diagnostic in diagnostics:
+            self.logger.warning(str(diagnostic))
         
-        return True
+        return not diagnostics
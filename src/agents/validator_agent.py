@@ -6,6 +6,14 @@ Ensures data quality and safety constraints before processing
 import logging
 from typing import Dict, Any, List, Tuple
 
+from ..core.gcode_program import check_program
+
+# Commands every crane program must contain, with their descriptions
+SAFETY_REQUIRED = {
+    'G28': 'home command',
+    'M2': 'end program command'
+}
+
 
 class ValidatorAgent:
     """
@@ -103,25 +111,24 @@ class ValidatorAgent:
         """
         Validate safety constraints for crane operations.
         
+        The program is parsed once; text inside comments never counts as
+        a command.
+        
         Args:
-            gcode: G-Code to validate
+            gcode: G-Code program text or an iterable of lines
             
         Returns:
             Tuple of (is_valid, message)
         """
         self.logger.debug("Validating safety constraints")
         
-        # Check for required safety commands
-        if 'G28' not in gcode:
-            message = "Missing home command (G28)"
-            self.logger.warning(message)
-            return False, message
-        
-        # Check for proper program ending
-        if 'M2' not in gcode:
-            message = "Missing end program command (M2)"
-            self.logger.warning(message)
-            return False, message
+        # One pass: syntax, homing before motion, required commands and program end
+        diagnostics = check_program(gcode, required=SAFETY_REQUIRED,
+                                    home_before_motion=True, end_last=True)
+        if diagnostics:
+            for diagnostic in diagnostics:
+                self.logger.warning(str(diagnostic))
+            return False, str(diagnostics[0])
         
         self.logger.info("Safety constraints validated")
         return True, "Safety validation passed"
@@ -4,9 +4,22 @@ Calculates optimal crane movement paths for barge positioning
 """
 
 import logging
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional, Union
 import numpy as np
 
+from ..core.path_planning import PathPlanner
+from ..core.point_cloud import PointCloud, as_point_cloud
+from ..core.trajectory import plan_trajectory
+from ..core.waypoints import (
+    apply_margin, as_positions, compensate, distances, path_length
+)
+
+# Default crane kinematic limits per axis (x, y, z)
+DEFAULT_MAX_VELOCITY = (0.5, 0.5, 0.3)       # m/s
+DEFAULT_MAX_ACCELERATION = (0.25, 0.25, 0.2)  # m/s^2
+DEFAULT_MAX_JERK = (1.0, 1.0, 0.8)           # m/s^3
+
 
 class VectorComputerAgent:
     """
@@ -17,6 +30,8 @@ class VectorComputerAgent:
     - Optimize movement paths
     - Compute compensation for trim and heel
     - Generate waypoints for drafting operations
+    - Plan time-optimal feed rates within crane kinematic limits
+    - Route moves around obstacles in the live point cloud
     """
     
     def __init__(self, config: Dict[str, Any] = None):
@@ -32,6 +47,12 @@ class VectorComputerAgent:
             'safety_margin': 0.2     # Safety margin in meters
         }
         self.logger = logging.getLogger(__name__)
+        
+        # Path planner and the cloud and settings its occupancy grid was built for
+        self._planner: Optional[PathPlanner] = None
+        self._planner_cloud: Optional[PointCloud] = None
+        self._planner_settings = None
+        self._planner_lock = threading.Lock()
         self.logger.info("Vector Computer Agent initialized")
     
     def compute_movement_vectors(self, geometry_data: Dict[str, Any]) -> List[Dict[str, float]]:
@@ -74,6 +95,12 @@ class VectorComputerAgent:
         """
         Optimize movement path for efficiency.
         
+        Time-parameterizes the path with the minimum-time profile allowed
+        by the crane limits (see plan_trajectory). Each waypoint gains
+        'feed', the peak speed of the move into it in m/s (the first
+        waypoint repeats the first move's feed), and 'time', its planned
+        arrival time in seconds.
+        
         Args:
             vectors: Input movement vectors
             
@@ -82,17 +109,102 @@ class VectorComputerAgent:
         """
         self.logger.debug("Optimizing movement path")
         
-        # Scaffold implementation - apply smoothing
-        optimized = vectors.copy()
+        trajectory = self.plan_trajectory(vectors)
+        feed = trajectory['feed']
+        if len(feed):
+            feed = np.concatenate([feed[:1], feed])
+        else:
+            feed = np.full(len(vectors), np.min(self.config.get('max_velocity',
+                                                                DEFAULT_MAX_VELOCITY)))
         
-        # Could apply algorithms like:
-        # - B-spline smoothing
-        # - Minimum jerk trajectory
-        # - Collision avoidance
+        optimized = []
+        for vector, speed, time in zip(vectors, feed.tolist(), trajectory['time'].tolist()):
+            waypoint = vector.copy()
+            waypoint['feed'] = speed
+            waypoint['time'] = time
+            optimized.append(waypoint)
         
-        self.logger.info(f"Path optimized: {len(optimized)} waypoints")
+        self.logger.info(f"Path optimized: {len(optimized)} waypoints, "
+                         f"{trajectory['duration']:.2f}s")
         return optimized
     
+    def plan_trajectory(self, vectors: List[Dict[str, float]]) -> Dict[str, Any]:
+        """
+        Plan a minimum-time speed profile through the waypoints.
+        
+        Limits come from the 'max_velocity', 'max_acceleration' and
+        'max_jerk' config entries (scalars or per-axis triples).
+        'motion_profile' selects 's_curve' (jerk-limited, the default) or
+        'trapezoidal' profiles, and 'blend_tolerance' is the corner
+        deviation allowed when blending through waypoints.
+        
+        Args:
+            vectors: Movement vectors in meters
+            
+        Returns:
+            Trajectory dictionary from plan_trajectory
+        """
+        positions = as_positions(vectors)
+        profile = self.config.get('motion_profile', 's_curve')
+        if profile not in ('s_curve', 'trapezoidal'):
+            raise ValueError(f"Unknown motion profile: {profile}")
+        
+        trajectory = plan_trajectory(
+            positions,
+            self.config.get('max_velocity', DEFAULT_MAX_VELOCITY),
+            self.config.get('max_acceleration', DEFAULT_MAX_ACCELERATION),
+            self.config.get('max_jerk', DEFAULT_MAX_JERK) if profile == 's_curve' else None,
+            self.config.get('blend_tolerance', 0.05)
+        )
+        self.logger.debug(f"Planned {profile} trajectory: {trajectory['duration']:.2f}s")
+        return trajectory
+    
+    def avoid_obstacles(self, vectors: List[Dict[str, float]],
+                        point_cloud: Union[PointCloud, Dict[str, Any]]) -> List[Dict[str, float]]:
+        """
+        Route movement vectors around obstacles in the point cloud.
+        
+        Moves that pass closer than 'clearance' (config, meters) to any
+        cloud point are replaced by detours planned with A* on an
+        occupancy grid of 'grid_resolution' meters (see PathPlanner).
+        The grid and the cloud's KD-tree are cached and reused until the
+        cloud or the settings change. Waypoints themselves are kept, even
+        when they touch the cloud (e.g. the draft measurement position).
+        
+        Args:
+            vectors: Movement vectors in meters, in the cloud's frame
+            point_cloud: Processed point cloud of the deck and obstacles
+            
+        Returns:
+            Movement vectors with detour waypoints inserted
+            
+        Raises:
+            ValueError: If a waypoint cannot be reached with the clearance
+        """
+        cloud = as_point_cloud(point_cloud)
+        positions = as_positions(vectors)
+        settings = (self.config.get('grid_resolution', 0.2), self.config.get('clearance', 0.5),
+                    self.config.get('grid_padding', 1.0))
+        
+        with self._planner_lock:
+            if self._planner_cloud is not cloud or self._planner_settings != settings:
+                resolution, clearance, padding = settings
+                self._planner = PathPlanner(cloud.xyz, resolution, clearance, padding,
+                                            tree=cloud.kdtree())
+                self._planner_cloud = cloud
+                self._planner_settings = settings
+            path, sources = self._planner.plan(positions)
+        
+        routed = []
+        for position, source in zip(path.tolist(), sources.tolist()):
+            if source >= 0:
+                routed.append(vectors[source].copy())
+            else:
+                routed.append({'x': position[0], 'y': position[1], 'z': position[2]})
+        
+        self.logger.info(f"Collision-free path: {len(vectors)} -> {len(routed)} waypoints")
+        return routed
+    
     def compute_compensation_vectors(self, geometry_data: Dict[str, Any]) -> Dict[str, float]:
         """
         Compute compensation vectors for trim and heel.
@@ -117,42 +229,71 @@ class VectorComputerAgent:
         self.logger.info(f"Compensation computed: {compensation}")
         return compensation
     
-    def apply_safety_margins(self, vectors: List[Dict[str, float]]) -> List[Dict[str, float]]:
+    def compensate_positions(self, vectors: Union[List[Dict[str, float]], np.ndarray],
+                             geometry_data: Dict[str, Any]) -> np.ndarray:
+        """
+        Rotate deck-frame waypoints by the barge's heel and trim.
+        
+        Args:
+            vectors: Movement vectors or an (N, 3) array in the level deck frame
+            geometry_data: Barge geometry with 'heel' and 'trim' in degrees
+                and an optional 'pivot' (x, y, z) rotation center
+                
+        Returns:
+            (N, 3) compensated positions
+        """
+        return compensate(vectors, geometry_data.get('heel', 0.0),
+                          geometry_data.get('trim', 0.0), geometry_data.get('pivot'))
+    
+    def apply_safety_margins(self, vectors: Union[List[Dict[str, float]], np.ndarray]
+                             ) -> Union[List[Dict[str, float]], np.ndarray]:
         """
         Apply safety margins to movement vectors.
         
+        The 'safety_margin' config entry is a vertical margin, or an
+        (x, y, z) offset, added to every waypoint in one broadcast.
+        
         Args:
-            vectors: Input movement vectors
+            vectors: Input movement vectors, or an (N, 3) position array
             
         Returns:
-            Vectors with safety margins applied
+            Vectors with safety margins applied, as an array for array input
         """
         self.logger.debug(f"Applying safety margin: {self.config['safety_margin']}m")
         
-        safe_vectors = []
-        for vector in vectors:
-            safe_vector = vector.copy()
-            # Add safety margin to z-axis (vertical)
-            safe_vector['z'] = safe_vector.get('z', 0.0) + self.config['safety_margin']
-            safe_vectors.append(safe_vector)
+        if isinstance(vectors, np.ndarray):
+            return apply_margin(vectors, self.config['safety_margin'])
         
-        return safe_vectors
+        # Converting dicts to an array and back costs more than the offset
+        dx, dy, dz = apply_margin(np.zeros(3), self.config['safety_margin']).ravel().tolist()
+        return [dict(v, x=v.get('x', 0.0) + dx, y=v.get('y', 0.0) + dy, z=v.get('z', 0.0) + dz)
+                for v in vectors]
     
-    def calculate_distance(self, vector1: Dict[str, float], 
-                          vector2: Dict[str, float]) -> float:
+    def calculate_distance(self, vector1: Union[Dict[str, float], np.ndarray],
+                           vector2: Union[Dict[str, float], np.ndarray]) -> Any:
         """
         Calculate Euclidean distance between two vectors.
         
         Args:
-            vector1: First vector
-            vector2: Second vector
+            vector1: First vector, or an (N, 3) position array
+            vector2: Second vector, or an (N, 3) position array
             
         Returns:
-            Distance in meters
+            Distance in meters, or an (N,) array of row-wise distances
         """
-        dx = vector2.get('x', 0.0) - vector1.get('x', 0.0)
-        dy = vector2.get('y', 0.0) - vector1.get('y', 0.0)
-        dz = vector2.get('z', 0.0) - vector1.get('z', 0.0)
-        
-        distance = np.sqrt(dx**2 + dy**2 + dz**2)
+        distance = distances(vector1, vector2)
+        if isinstance(vector1, dict) and isinstance(vector2, dict):
+            return float(distance[0])
         return distance
+    
+    def path_length(self, vectors: Union[List[Dict[str, float]], np.ndarray]) -> float:
+        """
+        Total length of the path through the waypoints.
+        
+        Args:
+            vectors: Movement vectors or an (N, 3) position array
+            
+        Returns:
+            Length in meters
+        """
+        return path_length(vectors)
@@ -4,7 +4,11 @@ Provides foundational functionality for point cloud processing and crane operati
 """
 
 from .lattice_core import LatticeCore
+from .point_cloud import PointCloud
 from .point_cloud_processor import PointCloudProcessor
 from .gcode_generator import GCodeGenerator
+from .tsdf_fusion import TSDFVolume
+from .metrics import MetricsRegistry
 
-__all__ = ['LatticeCore', 'PointCloudProcessor', 'GCodeGenerator']
+__all__ = ['LatticeCore', 'PointCloud', 'PointCloudProcessor', 'GCodeGenerator', 'TSDFVolume',
+           'MetricsRegistry']
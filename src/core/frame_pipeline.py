@@ -0,0 +1,180 @@
+"""
+Frame Pipeline - Pipelined, bounded-queue execution of per-frame processing stages
+Runs each stage on its own pool thread so consecutive frames overlap in time
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+# Marks the end of the stream; forwarded through every stage on stop()
+_STOP = object()
+
+
+class FramePipeline:
+    """
+    Streams items through a chain of stages connected by bounded queues.
+    
+    Every stage runs in its own worker on a shared thread pool and hands its
+    output to the next stage's queue, so while one frame is being translated
+    the next can already be filtered and a third back-projected. NumPy-heavy
+    stages release the GIL, which is what makes the overlap pay off.
+    
+    When a queue is full the ``overflow_policy`` decides what happens:
+    'block' applies backpressure to the producer, 'drop_oldest' discards the
+    stalest queued item (coalescing towards the newest frame) and
+    'drop_newest' discards the incoming item.
+    """
+    
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any]]],
+                 config: Dict[str, Any] = None,
+                 on_result: Optional[Callable[[Any], None]] = None,
+                 on_error: Optional[Callable[[Any, Exception], None]] = None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            stages: Ordered (name, function) pairs; each function maps an item
+                to the item passed to the next stage
+            config: Queue size and overflow policy
+            on_result: Called with each item that leaves the last stage
+            on_error: Called with (item, exception) when a stage raises
+        """
+        self.config = config or {
+            'queue_size': 2,
+            'overflow_policy': 'drop_oldest'
+        }
+        self.logger = logging.getLogger(__name__)
+        
+        policy = self.config.get('overflow_policy', 'drop_oldest')
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if not stages:
+            raise ValueError("Pipeline requires at least one stage")
+        
+        self.stages = list(stages)
+        self.policy = policy
+        self.on_result = on_result
+        self.on_error = on_error
+        
+        size = self.config.get('queue_size', 2)
+        self._queues = [queue.Queue(maxsize=size) for _ in self.stages]
+        self._executor = None
+        self._futures = []
+        self._lock = threading.Lock()
+        self._stats = {
+            name: {'processed': 0, 'dropped': 0, 'errors': 0}
+            for name, _ in self.stages
+        }
+        self.running = False
+    
+    def start(self) -> None:
+        """Start one worker per stage."""
+        if self.running:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=len(self.stages),
+                                            thread_name_prefix='frame-pipeline')
+        self._futures = [self._executor.submit(self._run_stage, index)
+                         for index in range(len(self.stages))]
+        self.running = True
+        self.logger.info(f"Frame pipeline started with {len(self.stages)} stages "
+                         f"({self.policy})")
+    
+    def submit(self, item: Any) -> bool:
+        """
+        Feed an item into the first stage.
+        
+        Args:
+            item: Item to process
+            
+        Returns:
+            False if the item was dropped by the overflow policy
+        """
+        if not self.running:
+            raise RuntimeError("Pipeline is not running")
+        return self._put(0, item)
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Drain queued items and stop all workers.
+        
+        Args:
+            timeout: Maximum seconds to wait for each worker
+        """
+        if not self.running:
+            return
+        self.running = False
+        self._queues[0].put(_STOP)
+        for future in self._futures:
+            future.result(timeout=timeout)
+        self._executor.shutdown(wait=True)
+        self.logger.info("Frame pipeline stopped")
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get per-stage counters.
+        
+        Returns:
+            Dictionary of processed, dropped and error counts per stage
+        """
+        with self._lock:
+            return {name: counters.copy() for name, counters in self._stats.items()}
+    
+    def _count(self, index: int, counter: str) -> None:
+        with self._lock:
+            self._stats[self.stages[index][0]][counter] += 1
+    
+    def _put(self, index: int, item: Any) -> bool:
+        """Enqueue an item for stage ``index`` according to the overflow policy."""
+        target = self._queues[index]
+        if self.policy == 'block' or item is _STOP:
+            target.put(item)
+            return True
+        
+        while True:
+            try:
+                target.put_nowait(item)
+                return True
+            except queue.Full:
+                if self.policy == 'drop_newest':
+                    self._count(index, 'dropped')
+                    return False
+            try:
+                target.get_nowait()
+                self._count(index, 'dropped')
+            except queue.Empty:
+                pass
+    
+    def _run_stage(self, index: int) -> None:
+        """Worker loop for a single stage."""
+        name, func = self.stages[index]
+        source = self._queues[index]
+        last = index == len(self.stages) - 1
+        
+        while True:
+            item = source.get()
+            if item is _STOP:
+                if not last:
+                    self._put(index + 1, _STOP)
+                return
+            
+            try:
+                output = func(item)
+            except Exception as e:
+                self._count(index, 'errors')
+                self.logger.error(f"Stage '{name}' failed: {str(e)}")
+                if self.on_error is not None:
+                    self.on_error(item, e)
+                continue
+            
+            self._count(index, 'processed')
+            if last:
+                if self.on_result is not None:
+                    self.on_result(output)
+            else:
+                self._put(index + 1, output)
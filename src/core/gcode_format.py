@@ -0,0 +1,217 @@
+"""
+G-Code Format - Vectorized fixed-point formatting of coordinate arrays
+Renders blocks of waypoints to G-Code text with NumPy instead of per-value f-strings
+"""
+
+import threading
+from typing import Dict, Iterator, Sequence, Tuple, Union
+import numpy as np
+
+
+# Largest magnitude (exclusive) rendered by the vectorized path; keeps six
+# integer digits even after rounding up
+MAX_VECTORIZED = 999999.0
+MAX_PRECISION = 4
+
+# Scaled values this close to a rounding tie are formatted by Python; covers
+# the double rounding error up to MAX_VECTORIZED * 10^MAX_PRECISION
+TIE_TOLERANCE = 1e-5
+
+# Template items: literal text or (column, precision)
+TemplateItem = Union[str, Tuple[int, int]]
+
+_TABLES: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+
+def _word_table(strings: Sequence[str], shift: int = 0) -> np.ndarray:
+    """Pack short ASCII strings into little-endian uint32 words, zero padded."""
+    data = b''.join((b'\0' * shift + text.encode('ascii')).ljust(4, b'\0') for text in strings)
+    return np.frombuffer(data, dtype='<u4').astype(np.uint32)
+
+
+def _tables(precision: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Digit lookup tables for a precision.
+    
+    Each number is rendered as up to three 4-byte words: the sign byte
+    plus the thousands group (blank when zero), the low integer group plus
+    the decimal point (the second half of the table keeps leading zeros,
+    used when a thousands group precedes it), and the fractional digits.
+    """
+    tables = _TABLES.get(precision)
+    if tables is None:
+        dot = '.' if precision > 0 else ''
+        high = _word_table([str(i) if i else '' for i in range(1000)], shift=1)
+        low = np.concatenate([
+            _word_table([f"{i:>3}{dot}".replace(' ', '\0') for i in range(1000)]),
+            _word_table([f"{i:03d}{dot}" for i in range(1000)])
+        ])
+        frac = _word_table([f"{i:0{precision}d}" if precision else ''
+                            for i in range(10 ** precision)])
+        tables = _TABLES[precision] = (high, low, frac)
+    return tables
+
+
+def _unaligned_column(buffer: np.ndarray, offset: int) -> np.ndarray:
+    """View one uint32 per row of a uint8 matrix, starting at byte ``offset``."""
+    return np.ndarray((buffer.shape[0],), dtype=np.uint32, buffer=buffer,
+                      offset=offset, strides=(buffer.strides[0],))
+
+
+class LineFormatter:
+    """
+    Formats rows of a numeric array into text lines from a fixed template.
+    
+    The template mixes literal text with (column, precision) fields. A
+    block of rows is laid out as a byte matrix holding the literals once;
+    every field is then written as whole 4-byte words taken from small
+    digit lookup tables, and the zero bytes standing in for absent signs
+    and leading digits are deleted in one pass. Output is identical
+    to formatting every field with ``f"{value:.{precision}f}"``; values the
+    fast path cannot reproduce exactly (non-finite, |value| >= 999999,
+    rounding ties within an ulp) are formatted by Python.
+    """
+    
+    def __init__(self, template: Sequence[TemplateItem], block_size: int = 4096):
+        """
+        Initialize the formatter.
+        
+        Args:
+            template: Literal strings and (column, precision) fields of one line
+            block_size: Rows rendered per block
+        """
+        self.template = list(template)
+        self.block_size = block_size
+        
+        # Row layout: literal bytes and 7 + precision bytes per field (sign,
+        # thousands, low group, point, fraction); zeros mark bytes that are
+        # deleted from the output
+        row = bytearray()
+        fields = []
+        for item in self.template:
+            if isinstance(item, str):
+                row += item.encode('ascii')
+            else:
+                column, precision = item
+                if not 0 <= precision <= MAX_PRECISION:
+                    raise ValueError(f"Unsupported precision: {precision}")
+                fields.append((len(row), column, precision))
+                row += bytes(7 + (precision + 1 if precision else 0))
+        
+        # The final word of a field overlaps the bytes after it; carry the
+        # literal bytes found there so that writing the word preserves them,
+        # and pad the row when a field ends it
+        tails = [offset + (8 if precision else 4) for offset, _, precision in fields]
+        row += bytes(max([tail + 4 - len(row) for tail in tails] + [0]))
+        self._row = np.frombuffer(bytes(row), dtype=np.uint8)
+        self._fields = []
+        for (offset, column, precision), tail in zip(fields, tails):
+            used = precision if precision else 3
+            spill = self._row[tail + used:tail + 4].tolist()
+            carry = np.uint32(sum(b << (8 * (used + k)) for k, b in enumerate(spill)))
+            self._fields.append((offset, column, precision, carry))
+        self._columns = [column for _, column, _, _ in self._fields]
+        self._scale = np.array([[10.0 ** precision] for _, _, precision, _ in self._fields])
+        # Each thread renders into its own byte matrix, so a shared formatter
+        # can serve concurrent translations
+        self._local = threading.local()
+    
+    def _row_buffer(self, rows: int) -> np.ndarray:
+        """The calling thread's byte matrix with the literal bytes pre-filled."""
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None or buffer.shape[0] < rows:
+            buffer = self._local.buffer = np.tile(self._row, (max(rows, self.block_size), 1))
+        return buffer[:rows]
+    
+    def format_python(self, values: np.ndarray) -> str:
+        """
+        Reference formatter: one f-string per field.
+        
+        Args:
+            values: (N, columns) array
+            
+        Returns:
+            Lines concatenated without separators
+        """
+        parts = []
+        for row in np.asarray(values, dtype=np.float64).tolist():
+            for item in self.template:
+                if isinstance(item, str):
+                    parts.append(item)
+                else:
+                    parts.append(f"{row[item[0]]:.{item[1]}f}")
+        return ''.join(parts)
+    
+    def format_block(self, values: np.ndarray) -> str:
+        """
+        Format rows into text.
+        
+        Args:
+            values: (N, columns) array
+            
+        Returns:
+            Lines concatenated without separators (end the template with
+            a newline to separate rows)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[0] == 0:
+            return ''
+        
+        # One contiguous row per field; the arithmetic below reuses buffers
+        work = values.T[self._columns]
+        negative = np.signbit(work).view(np.uint8)
+        np.abs(work, out=work)
+        if not work.max() < MAX_VECTORIZED:
+            return self.format_python(values)
+        work *= self._scale
+        units = np.rint(work)
+        
+        # Round-half-even on the double may disagree with exact decimal
+        # rounding when the scaled value sits within an ulp of a tie
+        work -= units
+        np.abs(work, out=work)
+        if work.max() >= 0.5 - TIE_TOLERANCE:
+            for k, i in zip(*np.nonzero(work >= 0.5 - TIE_TOLERANCE)):
+                precision = self._fields[k][2]
+                text = f"{abs(values[i, self._columns[k]]):.{precision}f}"
+                units[k, i] = int(text.replace('.', ''))
+        
+        # Exact in float64: every value is an integer below 2^53 and the
+        # half-unit offsets keep floor() clear of the boundaries
+        integer = np.floor((units + 0.5) / self._scale)
+        units -= integer * self._scale
+        thousands = np.floor((integer + 0.5) * 0.001)
+        # Offset into the zero-padded half of the table after a thousands group
+        integer += (np.minimum(thousands, 1.0) - thousands) * 1000.0
+        fraction = units.astype(np.intp)
+        group = integer.astype(np.intp)
+        thousands = thousands.astype(np.intp)
+        negative *= np.uint8(ord('-'))
+        
+        out = self._row_buffer(values.shape[0])
+        for k, (offset, _, precision, carry) in enumerate(self._fields):
+            high, low, frac = _tables(precision)
+            word = high.take(thousands[k])
+            word |= negative[k]
+            _unaligned_column(out, offset)[:] = word
+            word = low.take(group[k])
+            if precision:
+                _unaligned_column(out, offset + 4)[:] = word
+                word = frac.take(fraction[k])
+            word |= carry
+            _unaligned_column(out, offset + (8 if precision else 4))[:] = word
+        
+        return out.tobytes().translate(None, b'\0').decode('ascii')
+    
+    def iter_blocks(self, values: np.ndarray) -> Iterator[str]:
+        """
+        Format rows block by block.
+        
+        Args:
+            values: (N, columns) array
+            
+        Yields:
+            Text of up to ``block_size`` rows
+        """
+        for start in range(0, values.shape[0], self.block_size):
+            yield self.format_block(values[start:start + self.block_size])
@@ -4,7 +4,10 @@ Produces optimized G-Code for automated crane operations
 """
 
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, Sequence
+
+from .gcode_program import check_program, optimize_program, parse_program, render_program
+from .gcode_stream import LineTransform, apply_transforms, write_lines
 
 
 class GCodeGenerator:
@@ -44,7 +47,48 @@ class GCodeGenerator:
         """
         self.logger.info("Generating G-Code")
         
-        gcode_lines = [
+        gcode_lines = list(self.iter_gcode(geometry_data, vectors))
+        
+        gcode = "\n".join(gcode_lines)
+        self.logger.info(f"Generated {len(gcode_lines)} lines of G-Code")
+        
+        return gcode
+    
+    def iter_gcode(self, geometry_data: Dict[str, Any], vectors: Iterable[Dict[str, float]],
+                   transforms: Sequence[LineTransform] = ()) -> Iterator[str]:
+        """
+        Lazily generate G-Code lines from geometry and vector data.
+        
+        Args:
+            geometry_data: Barge geometry information
+            vectors: Iterable of movement vectors (may be a generator)
+            transforms: Streaming post-processors applied to the lines
+            
+        Yields:
+            G-Code lines without trailing newlines
+        """
+        return iter(apply_transforms(self._iter_lines(geometry_data, vectors), transforms))
+    
+    def write_gcode(self, geometry_data: Dict[str, Any], vectors: Iterable[Dict[str, float]],
+                    sink: Any, transforms: Sequence[LineTransform] = ()) -> int:
+        """
+        Stream a G-Code program to a file, socket or controller buffer.
+        
+        Args:
+            geometry_data: Barge geometry information
+            vectors: Iterable of movement vectors
+            sink: Binary or text file, socket, or callable accepting bytes
+            transforms: Streaming post-processors applied to the lines
+            
+        Returns:
+            Number of bytes written
+        """
+        return write_lines(self.iter_gcode(geometry_data, vectors, transforms), sink)
+    
+    def _iter_lines(self, geometry_data: Dict[str, Any],
+                    vectors: Iterable[Dict[str, float]]) -> Iterator[str]:
+        """Yield header, movement and footer lines."""
+        yield from [
             "; FREQ AI - Autonomous Barge Drafting G-Code",
             "; Generated by G-Code Generator",
             f"; Draft: {geometry_data.get('draft', 0.0)}m",
@@ -64,23 +108,18 @@ class GCodeGenerator:
             y = vector.get('y', 0.0)
             z = vector.get('z', 0.0)
             
-            gcode_lines.append(f"; Movement {i+1}")
-            gcode_lines.append(f"G1 X{x:.{self.config['precision']}f} "
-                             f"Y{y:.{self.config['precision']}f} "
-                             f"Z{z:.{self.config['precision']}f}")
+            yield f"; Movement {i+1}"
+            yield (f"G1 X{x:.{self.config['precision']}f} "
+                   f"Y{y:.{self.config['precision']}f} "
+                   f"Z{z:.{self.config['precision']}f}")
         
         # Add ending sequence
-        gcode_lines.extend([
+        yield from [
             "",
             f"G0 Z{self.config['safe_height']} ; Return to safe height",
             "G28  ; Return to home",
             "M2   ; End program"
-        ])
-        
-        gcode = "\n".join(gcode_lines)
-        self.logger.info(f"Generated {len(gcode_lines)} lines of G-Code")
-        
-        return gcode
+        ]
     
     def validate_gcode(self, gcode: str) -> bool:
         """
@@ -94,19 +133,24 @@ class GCodeGenerator:
         """
         self.logger.debug("Validating G-Code")
         
-        # Basic validation checks
-        required_commands = ['G21', 'G90', 'M2']
-        for cmd in required_commands:
-            if cmd not in gcode:
-                self.logger.warning(f"Missing required command: {cmd}")
-                return False
+        diagnostics = check_program(gcode, required={
+            'G21': 'units command',
+            'G90': 'absolute positioning command',
+            'M2': 'end program command'
+        })
+        for diagnostic in diagnostics:
+            self.logger.warning(str(diagnostic))
         
-        return True
+        return not diagnostics
     
     def optimize_gcode(self, gcode: str) -> str:
         """
         Optimize G-Code for efficiency.
         
+        Drops zero-length and duplicate moves, merges collinear feed moves
+        and strips words that repeat the modal state. Options come from
+        the 'optimizer' config entry (see optimize_program).
+        
         Args:
             gcode: Input G-Code string
             
@@ -114,5 +158,7 @@ class GCodeGenerator:
             Optimized G-Code string
         """
         self.logger.debug("Optimizing G-Code")
-        # Scaffold implementation - to be expanded with actual optimization
-        return gcode
+        commands = parse_program(gcode)
+        optimized = optimize_program(commands, **self.config.get('optimizer', {}))
+        self.logger.info(f"Optimized G-Code: {len(commands)} -> {len(optimized)} lines")
+        return render_program(optimized)
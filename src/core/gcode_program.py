@@ -0,0 +1,539 @@
+"""
+G-Code Program - Compact command representation of G-Code programs
+Parses, validates and optimizes programs in single passes over their lines
+"""
+
+import math
+import re
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# One address word: a letter followed by a number, e.g. "X1200.000" or "G01"
+_WORD = re.compile(r'\s*([A-Za-z])\s*([-+]?(?:\d+\.?\d*|\.\d+))')
+_PAREN_COMMENT = re.compile(r'\([^)]*\)')
+
+# Digits map to '#', so lines with the same word layout share one analysis
+_SHAPE = bytes.maketrans(b'0123456789', b'#' * 10)
+
+AXES = ('X', 'Y', 'Z')
+MOTION_CODES = frozenset({'G0', 'G1'})
+
+# Modal groups whose codes stay in effect until another code of the group
+MODAL_GROUPS = {
+    'G17': 'plane', 'G18': 'plane', 'G19': 'plane',
+    'G20': 'units', 'G21': 'units',
+    'G90': 'distance', 'G91': 'distance',
+    'G93': 'feed_mode', 'G94': 'feed_mode'
+}
+
+
+class Command:
+    """
+    One parsed G-Code line.
+    
+    ``codes`` holds the normalized G/M codes ('G1', 'M2'), ``words`` the
+    remaining address values by letter and ``tokens`` the original text of
+    every word in line order, so unchanged lines are re-emitted exactly.
+    Comment-only and blank lines are commands without codes or words.
+    """
+    
+    __slots__ = ('line', 'codes', 'words', 'tokens', 'comment', 'raw', 'valid')
+    
+    def __init__(self, line: int, codes: Tuple[str, ...], words: Dict[str, float],
+                 tokens: Tuple[str, ...], comment: str, raw: str, valid: bool = True):
+        self.line = line
+        self.codes = codes
+        self.words = words
+        self.tokens = tokens
+        self.comment = comment
+        self.raw = raw
+        self.valid = valid
+    
+    @property
+    def is_empty(self) -> bool:
+        """True for comment-only and blank lines."""
+        return not self.codes and not self.words and self.valid
+    
+    @property
+    def motion(self) -> Optional[str]:
+        """The G0/G1 code of the line, if any."""
+        for code in self.codes:
+            if code in MOTION_CODES:
+                return code
+        return None
+    
+    def __repr__(self) -> str:
+        return f"Command(line={self.line}, {self.raw!r})"
+
+
+def _normalize_code(letter: str, number: str) -> str:
+    """Normalize a G/M word, e.g. 'g01' -> 'G1'."""
+    value = float(number)
+    return f"{letter}{int(value)}" if value.is_integer() else f"{letter}{value:g}"
+
+
+def parse_line(text: str, line: int = 0) -> Command:
+    """
+    Parse one G-Code line.
+    
+    Args:
+        text: Line without its newline
+        line: 1-based line number
+        
+    Returns:
+        Parsed command; ``valid`` is False when the code part has text that
+        is not an address word
+    """
+    code_part, semicolon, _ = text.partition(';')
+    comment = text[len(code_part.rstrip()):] if semicolon else ''
+    
+    # Parenthesized comments are kept with the line comment
+    notes = _PAREN_COMMENT.findall(code_part)
+    if notes:
+        code_part = _PAREN_COMMENT.sub(' ', code_part)
+        comment = ' ' + ' '.join(notes) + comment
+    
+    codes = []
+    words = {}
+    tokens = []
+    position = 0
+    for match in _WORD.finditer(code_part):
+        if match.start() != position:
+            break
+        position = match.end()
+        letter = match.group(1).upper()
+        tokens.append(match.group(0).strip())
+        if letter in 'GM':
+            codes.append(_normalize_code(letter, match.group(2)))
+        else:
+            words[letter] = float(match.group(2))
+    valid = not code_part[position:].strip()
+    
+    return Command(line, tuple(codes), words, tuple(tokens), comment, text, valid)
+
+
+def scan_program(source: Union[str, Iterable[str]]) -> Iterator[Command]:
+    """
+    Lazily parse a program or a stream of lines.
+    
+    Args:
+        source: Program text, or an iterable of lines (e.g. a file)
+        
+    Yields:
+        One command per line, numbered from 1
+    """
+    lines = source.split('\n') if isinstance(source, str) else source
+    for number, line in enumerate(lines, 1):
+        yield parse_line(line.rstrip('\r\n'), number)
+
+
+def parse_program(text: Union[str, Iterable[str]]) -> List[Command]:
+    """
+    Parse a G-Code program into commands, one per line.
+    
+    Args:
+        text: Program text, or an iterable of lines
+        
+    Returns:
+        List of commands in program order
+    """
+    return list(scan_program(text))
+
+
+class Diagnostic:
+    """A validation finding, tied to a line unless it concerns the whole program."""
+    
+    __slots__ = ('line', 'message')
+    
+    def __init__(self, line: Optional[int], message: str):
+        self.line = line
+        self.message = message
+    
+    def __str__(self) -> str:
+        return f"Line {self.line}: {self.message}" if self.line else self.message
+    
+    def __repr__(self) -> str:
+        return f"Diagnostic({self.line}, {self.message!r})"
+
+
+def check_program(source: Union[str, Iterable[str]], required: Dict[str, str] = None,
+                  allowed: Optional[Collection[str]] = None, home_before_motion: bool = False,
+                  end_last: bool = False) -> List[Diagnostic]:
+    """
+    Validate a program in one pass over its lines.
+    
+    Lines are tokenized once per distinct layout (digits aside), so long
+    programs of similar moves cost little more than reading them.
+    Comments never satisfy or trip a rule. Syntax rules: every line must
+    consist of address words, codes must be in ``allowed`` (when given)
+    and axis words need an active G0/G1 motion mode.
+    
+    Args:
+        source: Program text, or an iterable of lines
+        required: Codes that must appear, mapped to their description,
+            e.g. {'G28': 'home command'}
+        allowed: Codes accepted by the controller
+        home_before_motion: Report motion before the first G28
+        end_last: Report commands after M2
+        
+    Returns:
+        Diagnostics in line order, followed by missing required codes
+    """
+    required = required or {}
+    diagnostics = []
+    seen = set()
+    motion = None
+    homed = False
+    ended = None
+    layouts: Dict[bytes, Tuple[bool, Tuple[Tuple[int, int], ...], bool, bool]] = {}
+    names: Dict[str, str] = {}
+    
+    for number, (line, shape) in enumerate(_shaped_lines(source), 1):
+        code = line
+        layout = layouts.get(shape)
+        if layout is None:
+            code = line.partition(';')[0]
+            if '(' in code:
+                # Removing comments shifts word positions; analyze every time
+                code = _PAREN_COMMENT.sub(' ', code)
+                layout = _layout(code)
+            else:
+                layout = layouts[shape] = _layout(code)
+                code = line
+        valid, spans, has_axes, has_words = layout
+        
+        if not valid:
+            diagnostics.append(Diagnostic(number, f"Invalid syntax: {line.strip()}"))
+            continue
+        if not has_words:
+            continue
+        if ended is not None and end_last:
+            diagnostics.append(Diagnostic(number, f"Command after program end (M2, line {ended})"))
+            end_last = False
+        
+        line_motion = None
+        for start, end in spans:
+            text = code[start:end]
+            name = names.get(text)
+            if name is None:
+                word = text.strip()
+                name = names[text] = _normalize_code(word[0].upper(), word[1:].strip())
+            if allowed is not None and name not in allowed:
+                diagnostics.append(Diagnostic(number, f"Unknown command: {name}"))
+            if name in MOTION_CODES:
+                line_motion = name
+            elif name == 'G28':
+                homed = True
+            elif name == 'M2' and ended is None:
+                ended = number
+            seen.add(name)
+        
+        # Axis words move the crane under a G0/G1 on the line or the active mode
+        motion = line_motion or motion
+        if has_axes and (line_motion is not None or not spans):
+            if motion is None:
+                diagnostics.append(Diagnostic(number, "Axis words without a motion command"))
+            elif not homed and home_before_motion:
+                diagnostics.append(Diagnostic(number, "Motion before home command (G28)"))
+                home_before_motion = False
+    
+    for code, description in required.items():
+        if code not in seen:
+            diagnostics.append(Diagnostic(None, f"Missing {description} ({code})"))
+    return diagnostics
+
+
+def _shaped_lines(source: Union[str, Iterable[str]]) -> Iterator[Tuple[str, bytes]]:
+    """Pair every line with its shape."""
+    if isinstance(source, str):
+        return zip(source.split('\n'), source.encode().translate(_SHAPE).split(b'\n'))
+    return ((line, line.encode().translate(_SHAPE)) for line in source)
+
+
+def _layout(code: str) -> Tuple[bool, Tuple[Tuple[int, int], ...], bool, bool]:
+    """Validity, G/M word spans, and presence of axis and any words in a code part."""
+    spans = []
+    has_axes = False
+    position = 0
+    for match in _WORD.finditer(code):
+        if match.start() != position:
+            break
+        position = match.end()
+        letter = match.group(1).upper()
+        if letter in 'GM':
+            spans.append(match.span())
+        elif letter in AXES:
+            has_axes = True
+    return not code[position:].strip(), tuple(spans), has_axes, position > 0
+
+
+def render_program(commands: Iterable[Command]) -> str:
+    """Join commands back into program text."""
+    return '\n'.join(command.raw for command in commands)
+
+
+def _segment_position(point: Sequence[float], start: Sequence[float],
+                      end: Sequence[float]) -> Tuple[float, float]:
+    """Projection parameter along a segment and distance from it."""
+    direction = [e - s for s, e in zip(start, end)]
+    offset = [p - s for s, p in zip(start, point)]
+    length_sq = sum(d * d for d in direction)
+    if length_sq == 0.0:
+        return 0.0, math.sqrt(sum(o * o for o in offset))
+    t = sum(o * d for o, d in zip(offset, direction)) / length_sq
+    return t, math.sqrt(sum((o - t * d) ** 2 for o, d in zip(offset, direction)))
+
+
+def _on_segment(points: Sequence[Sequence[float]], start: Sequence[float],
+                end: Sequence[float], tolerance: float) -> bool:
+    """True when the points lie on the segment, in order, within tolerance."""
+    previous = 0.0
+    for point in points:
+        t, distance = _segment_position(point, start, end)
+        if distance > tolerance or t < previous or t > 1.0:
+            return False
+        previous = t
+    return True
+
+
+class _Move:
+    """Simulated state of one motion command."""
+    
+    __slots__ = ('motion', 'before', 'after', 'feed_changed', 'axis_tokens')
+    
+    def __init__(self, motion, before, after, feed_changed, axis_tokens):
+        self.motion = motion
+        self.before = before
+        self.after = after
+        self.feed_changed = feed_changed
+        self.axis_tokens = axis_tokens
+
+
+def optimize_program(commands: Sequence[Command], tolerance: float = 0.01,
+                     merge_collinear: bool = True, omit_motion_codes: bool = False,
+                     strip_comments: bool = False) -> List[Command]:
+    """
+    Optimize a parsed program into an equivalent, shorter one.
+    
+    The pass tracks modal state (motion mode, distance mode, feed and
+    position) and
+    
+    - drops moves that do not change the position (zero-length and
+      duplicate moves),
+    - drops G1 waypoints that lie within ``tolerance`` of the straight
+      segment joining their neighbours at the same feed,
+    - strips axis and F words that repeat the current state, and modal
+      codes (G90, G21, ...) that are already in effect.
+      
+    Comment lines directly above a dropped move are dropped with it.
+    Optimization only applies in absolute mode with known positions;
+    unparseable lines are kept and act as barriers.
+    
+    Args:
+        commands: Parsed program
+        tolerance: Position tolerance in program units
+        merge_collinear: Merge collinear G1 segments
+        omit_motion_codes: Omit G0/G1 codes repeating the active motion mode
+        strip_comments: Remove comments and blank lines
+        
+    Returns:
+        Optimized commands
+    """
+    moves, dropped = _simulate(commands, tolerance)
+    if merge_collinear:
+        dropped |= _collinear_moves(moves, commands, tolerance)
+    
+    # Comment lines directly above a dropped move describe it
+    for index in sorted(dropped):
+        above = index - 1
+        while above >= 0 and commands[above].is_empty and commands[above].raw.strip():
+            dropped.add(above)
+            above -= 1
+    
+    return _render(commands, moves, dropped, omit_motion_codes, strip_comments)
+
+
+def _simulate(commands: Sequence[Command],
+              tolerance: float) -> Tuple[Dict[int, _Move], set]:
+    """Track modal state; return the motion commands and redundant lines."""
+    position: Dict[str, Optional[float]] = dict.fromkeys(AXES)
+    motion = None
+    absolute = True
+    feed = None
+    modal: Dict[str, str] = {}
+    tokens: Dict[str, str] = {}
+    moves = {}
+    dropped = set()
+    
+    for index, command in enumerate(commands):
+        if not command.valid:
+            position = dict.fromkeys(AXES)
+            continue
+        
+        repeated = True
+        for code in command.codes:
+            group = MODAL_GROUPS.get(code)
+            if group is None or modal.get(group) != code:
+                repeated = False
+            if group is not None:
+                modal[group] = code
+        absolute = modal.get('distance', 'G90') == 'G90'
+        if command.codes and repeated and not command.words:
+            dropped.add(index)
+            continue
+        
+        codes = set(command.codes)
+        if 'G28' in codes or 'G92' in codes:
+            # Homing moves to an unknown work position; G92 redefines it
+            position = dict.fromkeys(AXES)
+            if 'G92' in codes:
+                for axis in AXES:
+                    if axis in command.words:
+                        position[axis] = command.words[axis]
+                        tokens[axis] = None
+            continue
+        
+        new_motion = command.motion or (motion if any(a in command.words for a in AXES) else None)
+        if 'F' in command.words:
+            feed_changed = command.words['F'] != feed
+            feed = command.words['F']
+        else:
+            feed_changed = False
+        if new_motion is None:
+            continue
+        motion = new_motion
+        
+        before = dict(position)
+        for axis in AXES:
+            if axis in command.words:
+                if absolute:
+                    position[axis] = command.words[axis]
+                    token = next(t for t in command.tokens if t[0].upper() == axis)
+                    tokens[axis] = token
+                else:
+                    position[axis] = None
+        
+        moves[index] = _Move(motion, before, dict(position), feed_changed, dict(tokens))
+        
+        # Zero-length and duplicate moves
+        known = all(before[a] is not None for a in AXES if a in command.words)
+        if (absolute and known and not feed_changed
+                and set(command.codes) <= MOTION_CODES
+                and set(command.words) <= set(AXES) | {'F'}
+                and all(abs(command.words[a] - before[a]) <= tolerance
+                        for a in AXES if a in command.words)):
+            position = dict(before)
+            dropped.add(index)
+    
+    return moves, dropped
+
+
+def _collinear_moves(moves: Dict[int, _Move], commands: Sequence[Command],
+                     tolerance: float) -> set:
+    """Find G1 waypoints that lie on the segment joining their neighbours."""
+    merged = set()
+    anchor = None
+    last = None
+    inner: List[Tuple[float, ...]] = []
+    
+    for index, command in enumerate(commands):
+        move = moves.get(index)
+        if move is None:
+            if not command.is_empty:
+                last = None
+            continue
+        
+        complete = all(move.before[a] is not None and move.after[a] is not None for a in AXES)
+        plain = set(command.codes) <= {'G1'} and set(command.words) <= set(AXES) | {'F'}
+        if move.motion != 'G1' or not complete or not plain:
+            last = None
+            continue
+        if move.before == move.after and not move.feed_changed:
+            continue
+        
+        end = tuple(move.after[a] for a in AXES)
+        if last is not None and not move.feed_changed and not moves[last].feed_changed:
+            candidate = inner + [tuple(moves[last].after[a] for a in AXES)]
+            if _on_segment(candidate, anchor, end, tolerance):
+                merged.add(last)
+                inner = candidate
+                last = index
+                continue
+        
+        anchor = tuple(move.before[a] for a in AXES)
+        inner = []
+        last = index
+    
+    return merged
+
+
+def _render(commands: Sequence[Command], moves: Dict[int, _Move], dropped: set,
+            omit_motion_codes: bool, strip_comments: bool) -> List[Command]:
+    """Re-emit kept commands, stripping words that repeat the current state."""
+    result = []
+    position: Dict[str, Optional[float]] = dict.fromkeys(AXES)
+    motion = None
+    feed = None
+    
+    for index, command in enumerate(commands):
+        if index in dropped:
+            continue
+        if strip_comments and command.is_empty:
+            continue
+        move = moves.get(index)
+        comment = '' if strip_comments else command.comment
+        
+        if move is None:
+            if 'G28' in command.codes or 'G92' in command.codes or not command.valid:
+                position = dict.fromkeys(AXES)
+                for axis in AXES:
+                    if 'G92' in command.codes and axis in command.words:
+                        position[axis] = command.words[axis]
+            if 'F' in command.words:
+                feed = command.words['F']
+            if strip_comments and command.comment:
+                command = _rebuilt(command, command.tokens, '')
+            result.append(command)
+            continue
+        
+        tokens = []
+        for token in command.tokens:
+            letter = token[0].upper()
+            if letter in AXES or letter == 'F':
+                continue
+            if (omit_motion_codes and letter == 'G' and motion == move.motion
+                    and _normalize_code(letter, token[1:].strip()) == motion):
+                continue
+            tokens.append(token)
+        if command.motion is None and motion != move.motion:
+            # The motion mode this line relied on was set by a dropped move
+            tokens.insert(0, move.motion)
+        
+        for token in command.tokens:
+            axis = token[0].upper()
+            if axis in AXES and move.after[axis] is None:
+                tokens.append(token)
+        for axis in AXES:
+            value = move.after[axis]
+            token = move.axis_tokens.get(axis)
+            if value is not None and token is not None and value != position[axis]:
+                tokens.append(token)
+        if 'F' in command.words and command.words['F'] != feed:
+            tokens.append(next(t for t in command.tokens if t[0].upper() == 'F'))
+            feed = command.words['F']
+        
+        motion = move.motion
+        position = dict(move.after)
+        if tuple(tokens) == command.tokens and comment == command.comment:
+            result.append(command)
+        else:
+            result.append(_rebuilt(command, tuple(tokens), comment))
+    
+    return result
+
+
+def _rebuilt(command: Command, tokens: Tuple[str, ...], comment: str) -> Command:
+    """Copy of a command with new word tokens and comment."""
+    raw = ' '.join(tokens) + comment
+    if not tokens:
+        raw = comment.lstrip()
+    return parse_line(raw, command.line)
@@ -0,0 +1,148 @@
+"""
+G-Code Stream - Line-streaming utilities for generating and delivering G-Code
+Composes streaming transforms and writes encoded chunks to files, sockets or buffers
+"""
+
+import io
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+# A streaming transform maps an iterable of lines to an iterable of lines
+LineTransform = Callable[[Iterable[str]], Iterable[str]]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def apply_transforms(lines: Iterable[str],
+                     transforms: Sequence[LineTransform] = ()) -> Iterable[str]:
+    """
+    Chain streaming transforms over a line iterator.
+    
+    Args:
+        lines: G-Code lines (without newlines)
+        transforms: Transforms applied in order
+        
+    Returns:
+        Lazily transformed lines
+    """
+    for transform in transforms:
+        lines = transform(lines)
+    return lines
+
+
+def insert_dwell(lines: Iterable[str], dwell_ms: int) -> Iterator[str]:
+    """
+    Insert a dwell after every feed move that involves the Z axis.
+    
+    Args:
+        lines: G-Code lines
+        dwell_ms: Dwell time in milliseconds
+        
+    Yields:
+        Input lines with dwell commands inserted
+    """
+    dwell = f"G4 P{dwell_ms}  ; Dwell for stabilization"
+    for line in lines:
+        yield line
+        if 'G1' in line and 'Z' in line:
+            yield dwell
+
+
+def dwell_transform(dwell_ms: int) -> LineTransform:
+    """
+    Build a streaming transform that inserts dwells after Z feed moves.
+    
+    Args:
+        dwell_ms: Dwell time in milliseconds
+        
+    Returns:
+        Transform usable with apply_transforms
+    """
+    return lambda lines: insert_dwell(lines, dwell_ms)
+
+
+def iter_text_chunks(lines: Iterable[str],
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Group lines into newline-separated text chunks of roughly ``chunk_size``.
+    
+    The concatenated chunks equal ``"\\n".join(lines)``, but only one chunk
+    is held in memory at a time.
+    
+    Args:
+        lines: G-Code lines
+        chunk_size: Target chunk size in characters
+        
+    Yields:
+        Text chunks
+    """
+    buffer = []
+    size = 0
+    first = True
+    for line in lines:
+        if not first:
+            buffer.append('\n')
+            size += 1
+        first = False
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def iter_chunks(lines: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                encoding: str = 'utf-8') -> Iterator[bytes]:
+    """
+    Encode lines into newline-separated byte chunks of roughly ``chunk_size``.
+    
+    Args:
+        lines: G-Code lines
+        chunk_size: Target chunk size
+        encoding: Text encoding
+        
+    Yields:
+        Encoded chunks
+    """
+    for chunk in iter_text_chunks(lines, chunk_size):
+        yield chunk.encode(encoding)
+
+
+def write_lines(lines: Iterable[str], sink: Any, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                encoding: str = 'utf-8') -> int:
+    """
+    Stream lines to a sink in encoded chunks.
+    
+    Args:
+        lines: G-Code lines
+        sink: Binary file, text file, socket (``sendall``) or callable
+            accepting bytes, e.g. a crane controller buffer
+        chunk_size: Target chunk size in bytes
+        encoding: Text encoding
+        
+    Returns:
+        Number of bytes written
+    """
+    if isinstance(sink, io.TextIOBase):
+        total = 0
+        for text in iter_text_chunks(lines, chunk_size):
+            sink.write(text)
+            total += len(text)
+        return total
+    
+    if hasattr(sink, 'sendall'):
+        send = sink.sendall
+    elif hasattr(sink, 'write'):
+        send = sink.write
+    elif callable(sink):
+        send = sink
+    else:
+        raise TypeError(f"Unsupported G-Code sink: {type(sink).__name__}")
+    
+    total = 0
+    for chunk in iter_chunks(lines, chunk_size, encoding):
+        send(chunk)
+        total += len(chunk)
+    return total
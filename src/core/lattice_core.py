@@ -3,10 +3,16 @@ Lattice Core - Central orchestration system for FREQ AI
 Coordinates all agents and manages the autonomous drafting workflow
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Sequence
 from datetime import datetime
 
+from .session_scheduler import DraftingSession, SessionScheduler
+
 
 class LatticeCore:
     """
@@ -17,6 +23,7 @@ class LatticeCore:
     - Data flow between components
     - System state management
     - Error handling and recovery
+    - Concurrent drafting sessions, one per barge/crane pair
     """
     
     def __init__(self, config: Dict[str, Any] = None):
@@ -29,12 +36,19 @@ class LatticeCore:
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
         self.agents = {}
+        self.tasks = {}
         self.state = {
             'status': 'initialized',
             'start_time': datetime.now().isoformat(),
             'cycles_completed': 0
         }
         
+        # Guards state across concurrent cycles and executor threads
+        self._state_lock = threading.Lock()
+        self._active_cycles = 0
+        self._executor = None
+        self._scheduler: Optional[SessionScheduler] = None
+        
         self.logger.info("Lattice Core initialized")
     
     def register_agent(self, name: str, agent: Any) -> None:
@@ -48,6 +62,236 @@ class LatticeCore:
         self.agents[name] = agent
         self.logger.info(f"Agent registered: {name}")
     
+    def register_task(self, name: str, func: Callable[[Dict[str, Any]], Any],
+                      depends_on: Sequence[str] = (), blocking: bool = True) -> None:
+        """
+        Register a cycle task in the dependency graph executed by run_cycle.
+        
+        Args:
+            name: Unique task name; its result is stored under this key
+            func: Callable (or coroutine function) taking the cycle context,
+                which holds the input data and the results of completed tasks
+            depends_on: Names of tasks whose results this task needs
+            blocking: Run a plain callable on the executor (CPU-bound work)
+                rather than inline on the event loop
+        """
+        self.tasks[name] = {
+            'func': func,
+            'depends_on': tuple(depends_on),
+            'blocking': blocking
+        }
+        self.logger.info(f"Task registered: {name} (depends on: {list(depends_on)})")
+    
+    def task_order(self) -> List[str]:
+        """
+        Topologically sort the registered tasks.
+        
+        Returns:
+            Task names, each after all of its dependencies
+            
+        Raises:
+            ValueError: If a dependency is unknown or the graph has a cycle
+        """
+        order = []
+        visiting = set()
+        visited = set()
+        
+        def visit(name: str, path: List[str]) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Task dependency cycle: {' -> '.join(path + [name])}")
+            if name not in self.tasks:
+                raise ValueError(f"Unknown task dependency: {name} (required by {path[-1]})")
+            visiting.add(name)
+            for dependency in self.tasks[name]['depends_on']:
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+        
+        for name in self.tasks:
+            visit(name, [])
+        return order
+    
+    async def run_cycle(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one drafting cycle through the registered task graph.
+        
+        Every task starts as soon as its dependencies have finished, so
+        independent tasks (e.g. confidence assessment and vector computation)
+        run concurrently. Blocking tasks run on a thread pool, keeping the
+        event loop free; several cycles (one per barge) may run at once.
+        
+        Args:
+            input_data: Initial cycle context (e.g. RGB-D sensor data)
+            
+        Returns:
+            Dictionary containing cycle metadata and every task's result
+        """
+        order = self.task_order()
+        loop = asyncio.get_running_loop()
+        context = dict(input_data)
+        pending = {name: set(self.tasks[name]['depends_on']) for name in order}
+        running = {}
+        
+        with self._state_lock:
+            self._active_cycles += 1
+            self.state['status'] = 'processing'
+        self.logger.info("Starting drafting cycle (async)")
+        
+        try:
+            while pending or running:
+                ready = [name for name, deps in pending.items() if not deps]
+                for name in ready:
+                    del pending[name]
+                    task = asyncio.ensure_future(self._run_task(name, context, loop))
+                    running[task] = name
+                
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    name = running.pop(task)
+                    context[name] = task.result()
+                    for deps in pending.values():
+                        deps.discard(name)
+            
+            with self._state_lock:
+                self.state['cycles_completed'] += 1
+                cycle_id = self.state['cycles_completed']
+                self._active_cycles -= 1
+                if self._active_cycles == 0:
+                    self.state['status'] = 'ready'
+            
+            return {
+                'cycle_id': cycle_id,
+                'status': 'success',
+                'timestamp': datetime.now().isoformat(),
+                'results': context
+            }
+            
+        except BaseException as e:
+            for task in running:
+                task.cancel()
+            with self._state_lock:
+                self._active_cycles -= 1
+                self.state['status'] = 'error'
+            self.logger.error(f"Error in drafting cycle: {str(e)}")
+            raise
+    
+    async def _run_task(self, name: str, context: Dict[str, Any],
+                        loop: asyncio.AbstractEventLoop) -> Any:
+        """Run a single task inline, as a coroutine or on the executor."""
+        task = self.tasks[name]
+        func = task['func']
+        if asyncio.iscoroutinefunction(func):
+            return await func(context)
+        if task['blocking']:
+            return await loop.run_in_executor(self._get_executor(), func, context)
+        return func(context)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the executor used for blocking tasks."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.get('max_workers', os.cpu_count() or 1),
+                thread_name_prefix='lattice-core'
+            )
+        return self._executor
+    
+    def _get_scheduler(self) -> SessionScheduler:
+        """Lazily create the session scheduler."""
+        with self._state_lock:
+            if self._scheduler is None:
+                self._scheduler = SessionScheduler(
+                    self._run_session_cycle,
+                    max_workers=self.config.get('session_workers', os.cpu_count() or 1),
+                    history_size=self.config.get('session_history', 100),
+                    on_complete=self._session_cycle_completed
+                )
+            return self._scheduler
+    
+    def create_session(self, session_id: str, priority: float = 1.0,
+                       agents: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Create a drafting session for one barge/crane pair.
+        
+        Sessions share a worker pool sized to the CPU cores (config
+        'session_workers'); each runs its cycles in order, and busy
+        sessions get pool time in proportion to their priority.
+        
+        Args:
+            session_id: Unique session identifier
+            priority: Relative share of the worker pool
+            agents: Agents for this session, defaulting to the registered ones
+            
+        Returns:
+            Initial session state
+        """
+        session = self._get_scheduler().create_session(
+            session_id, priority, self.agents if agents is None else agents
+        )
+        return session.snapshot()
+    
+    def submit_cycle(self, session_id: str, input_data: Dict[str, Any],
+                     func: Optional[Callable[[DraftingSession, Dict[str, Any]], Any]] = None
+                     ) -> Future:
+        """
+        Queue a drafting cycle for a session.
+        
+        By default the cycle runs the registered task graph on a worker,
+        with the session under 'session' and its agents under 'agents'
+        in the cycle context.
+        
+        Args:
+            session_id: Target session
+            input_data: Cycle input (e.g. RGB-D sensor data)
+            func: Optional cycle function called with (session, input_data)
+            
+        Returns:
+            Future resolving to the cycle record ('cycle_id', 'status',
+            'session_id', 'results', ...)
+        """
+        return self._get_scheduler().submit(session_id, input_data, func)
+    
+    def set_session_priority(self, session_id: str, priority: float) -> None:
+        """Change a session's share of the worker pool."""
+        self._get_scheduler().set_priority(session_id, priority)
+    
+    def close_session(self, session_id: str) -> None:
+        """Close a session, cancelling its queued cycles."""
+        self._get_scheduler().close_session(session_id)
+    
+    def get_session_state(self, session_id: str) -> Dict[str, Any]:
+        """
+        Get one session's state and recent cycle history.
+        
+        Raises:
+            KeyError: If the session does not exist
+        """
+        return self._get_scheduler().get_session(session_id).snapshot()
+    
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """Get the state of every session."""
+        return self._get_scheduler().list_sessions()
+    
+    def _run_session_cycle(self, session: DraftingSession,
+                           input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the task graph for a session cycle on the current worker."""
+        context = dict(input_data, session=session, agents=session.agents)
+        for name in self.task_order():
+            func = self.tasks[name]['func']
+            if asyncio.iscoroutinefunction(func):
+                context[name] = asyncio.run(func(context))
+            else:
+                context[name] = func(context)
+        return context
+    
+    def _session_cycle_completed(self, session: DraftingSession,
+                                 record: Dict[str, Any]) -> None:
+        """Count session cycles in the core state."""
+        with self._state_lock:
+            self.state['cycles_completed'] += 1
+    
     def start_drafting_cycle(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Start an autonomous drafting cycle.
@@ -62,16 +306,18 @@ class LatticeCore:
         self.state['status'] = 'processing'
         
         try:
-            # This is a scaffold - actual implementation will be done by agents
-            result = {
-                'cycle_id': self.state['cycles_completed'] + 1,
-                'status': 'success',
-                'timestamp': datetime.now().isoformat(),
-                'gcode': None
-            }
-            
-            self.state['cycles_completed'] += 1
-            self.state['status'] = 'ready'
+            # Records a cycle whose stages were run by the caller
+            with self._state_lock:
+                result = {
+                    'cycle_id': self.state['cycles_completed'] + 1,
+                    'status': 'success',
+                    'timestamp': datetime.now().isoformat(),
+                    'gcode': None
+                }
+                
+                self.state['cycles_completed'] += 1
+                if self._active_cycles == 0:
+                    self.state['status'] = 'ready'
             
             return result
             
@@ -92,4 +338,10 @@ class LatticeCore:
     def shutdown(self) -> None:
         """Gracefully shutdown the Lattice Core system."""
         self.logger.info("Shutting down Lattice Core")
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=True)
+            self._scheduler = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         self.state['status'] = 'shutdown'
@@ -0,0 +1,237 @@
+"""
+Metrics - Lightweight latency and counter instrumentation for the drafting cycle
+Records monotonic-clock spans into HDR-style histograms with percentile summaries
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, List
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram in the style of HdrHistogram.
+    
+    Values (nanoseconds) below 2^significant_bits are counted exactly; above
+    that every power-of-two range is split into 2^(significant_bits - 1)
+    equal buckets, so any recorded value is reproduced within a relative
+    error of 2^-(significant_bits - 1) while memory stays a few KB no matter
+    how many samples are recorded.
+    """
+    
+    def __init__(self, significant_bits: int = 7):
+        """
+        Initialize the histogram.
+        
+        Args:
+            significant_bits: Bits of precision kept per value
+        """
+        self.significant_bits = significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self._counts: List[int] = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+    
+    def _bucket(self, value: int) -> int:
+        """Bucket index for a non-negative integer value."""
+        shift = value.bit_length() - self.significant_bits
+        if shift <= 0:
+            return value
+        return shift * self._half + (value >> shift)
+    
+    def _bucket_value(self, index: int) -> int:
+        """Highest value that falls into a bucket."""
+        if index < 2 * self._half:
+            return index
+        shift = index // self._half - 1
+        return ((index - shift * self._half + 1) << shift) - 1
+    
+    def record(self, value: int) -> None:
+        """
+        Record one value.
+        
+        Args:
+            value: Duration in nanoseconds
+        """
+        value = max(int(value), 0)
+        index = self._bucket(value)
+        if index >= len(self._counts):
+            self._counts.extend([0] * (index + 1 - len(self._counts)))
+        self._counts[index] += 1
+        
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+    
+    def percentile(self, percent: float) -> int:
+        """
+        Value at or below which ``percent`` of the recorded values fall.
+        
+        Args:
+            percent: Percentile in [0, 100]
+            
+        Returns:
+            Value in nanoseconds (0 if nothing was recorded)
+        """
+        if self.count == 0:
+            return 0
+        target = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self._bucket_value(index), self.max)
+        return self.max
+    
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize the histogram in milliseconds.
+        
+        Returns:
+            Dictionary with count, mean, min, max, p50, p95 and p99
+        """
+        scale = 1e-6
+        return {
+            'count': self.count,
+            'mean_ms': (self.total / self.count) * scale if self.count else 0.0,
+            'min_ms': self.min * scale,
+            'max_ms': self.max * scale,
+            'p50_ms': self.percentile(50) * scale,
+            'p95_ms': self.percentile(95) * scale,
+            'p99_ms': self.percentile(99) * scale
+        }
+
+
+class _Span:
+    """Context manager timing one block with the monotonic clock."""
+    
+    __slots__ = ('registry', 'name', 'start')
+    
+    def __init__(self, registry: 'MetricsRegistry', name: str):
+        self.registry = registry
+        self.name = name
+        self.start = 0
+    
+    def __enter__(self) -> '_Span':
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *exc_info) -> bool:
+        self.registry.record(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span handed out while metrics are disabled."""
+    
+    __slots__ = ()
+    
+    def __enter__(self) -> '_NullSpan':
+        return self
+    
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of named latency histograms and counters.
+    
+    Spans cost two clock reads and a short locked histogram update. When
+    disabled, span() returns a shared no-op object and record()/count()
+    return immediately, so instrumented code pays only a method call.
+    """
+    
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize the metrics registry.
+        
+        Args:
+            config: Configuration for enabling metrics and histogram precision
+        """
+        self.config = config or {
+            'enabled': True,
+            'significant_bits': 7
+        }
+        self.logger = logging.getLogger(__name__)
+        
+        self.enabled = bool(self.config.get('enabled', True))
+        self.significant_bits = int(self.config.get('significant_bits', 7))
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, int] = {}
+        
+        self.logger.info(f"Metrics Registry initialized (enabled: {self.enabled})")
+    
+    def span(self, name: str):
+        """
+        Time a block of code into the histogram ``name``.
+        
+        Args:
+            name: Metric name, e.g. 'processor.downsample'
+            
+        Returns:
+            Context manager recording the elapsed time on exit
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+    
+    def record(self, name: str, duration_ns: int) -> None:
+        """
+        Record a duration measured elsewhere.
+        
+        Args:
+            name: Metric name
+            duration_ns: Duration in nanoseconds
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self.significant_bits)
+            histogram.record(duration_ns)
+    
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Add to a counter.
+        
+        Args:
+            name: Counter name, e.g. 'downsample.points_in'
+            value: Amount to add
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + int(value)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a summary of all metrics.
+        
+        Returns:
+            Dictionary with per-name latency summaries and counter values
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'latency': {name: histogram.summary()
+                            for name, histogram in sorted(self._histograms.items())},
+                'counters': dict(sorted(self._counters.items()))
+            }
+    
+    def reset(self) -> None:
+        """Discard all recorded metrics."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
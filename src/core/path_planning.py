@@ -0,0 +1,357 @@
+"""
+Path Planning - Collision-aware crane paths through the live point cloud
+Plans clearance-respecting paths with A* on a cached, inflated occupancy grid
+"""
+
+import heapq
+import logging
+import math
+from typing import Any, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from scipy import ndimage
+from scipy.spatial import cKDTree
+
+
+# Grids are coarsened beyond this many cells to bound memory and build time
+MAX_GRID_CELLS = 4_000_000
+
+# 26-connected neighbourhood: (di, dj, dk, step length in cells)
+_NEIGHBOURS = [(di, dj, dk, math.sqrt(di * di + dj * dj + dk * dk))
+               for di in (-1, 0, 1) for dj in (-1, 0, 1) for dk in (-1, 0, 1)
+               if di or dj or dk]
+
+
+class OccupancyGrid:
+    """
+    Voxel occupancy grid inflated by a clearance radius.
+    
+    Cells are marked occupied from the points that fall in them; a
+    Euclidean distance transform then blocks every cell whose center is
+    closer than ``clearance`` to an occupied cell (allowing for the
+    half-diagonal offset of points inside that cell), so paths through
+    free cell centers keep the clearance. The grid carries a blocked
+    one-cell border, letting the search step to neighbours without
+    bounds checks.
+    """
+    
+    def __init__(self, points: np.ndarray, resolution: float, clearance: float,
+                 lower: np.ndarray, upper: np.ndarray):
+        """
+        Initialize the grid.
+        
+        Args:
+            points: (N, 3) obstacle points in meters
+            resolution: Cell edge length in meters
+            clearance: Required distance from obstacles in meters
+            lower: Lower corner of the planning volume
+            upper: Upper corner of the planning volume
+        """
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        extent = np.maximum(upper - lower, resolution)
+        cells = np.prod(np.ceil(extent / resolution) + 3)
+        if cells > MAX_GRID_CELLS:
+            resolution *= (cells / MAX_GRID_CELLS) ** (1.0 / 3.0)
+        self.resolution = float(resolution)
+        self.clearance = float(clearance)
+        
+        # Cell 0 and the last cell on every axis form the blocked border
+        self.origin = lower - self.resolution
+        self.shape = tuple((np.ceil(extent / self.resolution) + 3).astype(int).tolist())
+        self.lower = self.origin + self.resolution
+        self.upper = self.origin + (np.array(self.shape) - 1) * self.resolution
+        
+        occupied = np.zeros(self.shape, dtype=bool)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(points):
+            index = np.floor((points - self.origin) / self.resolution).astype(np.intp)
+            inside = np.all((index >= 1) & (index < np.array(self.shape) - 1), axis=1)
+            occupied[tuple(index[inside].T)] = True
+        
+        if occupied.any():
+            distance = ndimage.distance_transform_edt(~occupied) * self.resolution
+            blocked = distance < self.clearance + self.resolution * math.sqrt(3.0) / 2.0
+        else:
+            blocked = np.zeros(self.shape, dtype=bool)
+        blocked[[0, -1], :, :] = True
+        blocked[:, [0, -1], :] = True
+        blocked[:, :, [0, -1]] = True
+        self.occupied = occupied
+        self.blocked = blocked
+        self._blocked = bytearray(blocked.ravel().view(np.uint8))
+        
+        ny, nz = self.shape[1], self.shape[2]
+        self._neighbours = [((di * ny + dj) * nz + dk, cost) for di, dj, dk, cost in _NEIGHBOURS]
+    
+    @property
+    def num_cells(self) -> int:
+        """Number of cells, including the border."""
+        return self.blocked.size
+    
+    def covers(self, lower: np.ndarray, upper: np.ndarray) -> bool:
+        """True if the planning volume contains the box [lower, upper]."""
+        return bool(np.all(self.lower <= lower) and np.all(upper <= self.upper))
+    
+    def cell_index(self, points: np.ndarray) -> np.ndarray:
+        """Integer (i, j, k) cells of (N, 3) points."""
+        return np.floor((np.asarray(points) - self.origin) / self.resolution).astype(np.intp)
+    
+    def is_free(self, points: np.ndarray) -> np.ndarray:
+        """
+        Check points against the inflated grid.
+        
+        Args:
+            points: (N, 3) positions in meters
+            
+        Returns:
+            Boolean array, False for points in blocked cells or outside the grid
+        """
+        index = self.cell_index(np.asarray(points, dtype=np.float64).reshape(-1, 3))
+        inside = np.all((index >= 0) & (index < np.array(self.shape)), axis=1)
+        free = np.zeros(len(index), dtype=bool)
+        free[inside] = ~self.blocked[tuple(index[inside].T)]
+        return free
+    
+    def search(self, start: np.ndarray, goal: np.ndarray,
+               approach: Union[float, Sequence[float]] = 0.0,
+               weight: float = 1.0) -> Optional[np.ndarray]:
+        """
+        Find a 26-connected path of free cells with A*.
+        
+        Inflated cells within ``approach`` meters of the start or goal are
+        treated as free, so endpoints that touch obstacles (such as a
+        measurement position on the hull) can still be reached. Occupied
+        cells stay blocked, apart from the endpoint cells themselves.
+        
+        Args:
+            start: Start position, inside the planning volume
+            goal: Goal position, inside the planning volume
+            approach: Radius around the endpoints exempt from clearance, or
+                a (start, goal) pair of radii
+            weight: Heuristic inflation; above 1 trades path length (at
+                most ``weight`` times the shortest) for fewer expansions
+                
+        Returns:
+            (M, 3) cell-center path from start to goal with the exact
+            endpoints, or None if the goal is unreachable
+        """
+        shape = np.array(self.shape)
+        cells = self.cell_index(np.array([start, goal], dtype=np.float64))
+        if np.any(cells < 1) or np.any(cells >= shape - 1):
+            return None
+        blocked = bytearray(self._blocked)
+        for cell, distance in zip(cells, np.broadcast_to(approach, 2).tolist()):
+            radius = int(math.ceil(distance / self.resolution))
+            low = np.maximum(cell - radius, 1)
+            high = np.minimum(cell + radius + 1, shape - 1)
+            zone = np.mgrid[low[0]:high[0], low[1]:high[1], low[2]:high[2]].reshape(3, -1)
+            zone = zone[:, np.sum((zone - cell[:, None]) ** 2, axis=0) <= radius * radius]
+            zone = zone[:, ~self.occupied[tuple(zone)]]
+            for flat in np.ravel_multi_index(zone, self.shape).tolist():
+                blocked[flat] = 0
+            blocked[np.ravel_multi_index(cell, self.shape)] = 0
+        
+        ny, nz = self.shape[1], self.shape[2]
+        source, target = np.ravel_multi_index(cells.T, self.shape).tolist()
+        ti, tj, tk = cells[1].tolist()
+        
+        def heuristic(flat):
+            i, rest = divmod(flat, ny * nz)
+            j, k = divmod(rest, nz)
+            return weight * math.sqrt((i - ti) ** 2 + (j - tj) ** 2 + (k - tk) ** 2)
+        
+        cost = [math.inf] * len(blocked)
+        cost[source] = 0.0
+        parent = {source: source}
+        frontier = [(heuristic(source), 0.0, source)]
+        neighbours = self._neighbours
+        while frontier:
+            _, travelled, current = heapq.heappop(frontier)
+            if current == target:
+                break
+            if travelled > cost[current]:
+                continue
+            for offset, step in neighbours:
+                following = current + offset
+                candidate = travelled + step
+                if candidate < cost[following] and not blocked[following]:
+                    cost[following] = candidate
+                    parent[following] = current
+                    heapq.heappush(frontier,
+                                   (candidate + heuristic(following), candidate, following))
+        else:
+            return None
+        
+        flats = [target]
+        while flats[-1] != source:
+            flats.append(parent[flats[-1]])
+        flats.reverse()
+        centers = (np.array(np.unravel_index(flats, self.shape)).T + 0.5) * self.resolution
+        centers += self.origin
+        centers[0] = start
+        centers[-1] = goal
+        return centers
+
+
+class PathPlanner:
+    """
+    Plans clearance-respecting paths between waypoints around a point cloud.
+    
+    Direct moves are kept when they clear every obstacle point by the
+    clearance; blocked moves are routed with A* on an occupancy grid and
+    shortened by skipping every intermediate point the line of sight
+    allows. Line-of-sight checks query the cloud's cached KD-tree; the
+    grid is built once and reused for every waypoint until a path leaves
+    its volume.
+    """
+    
+    def __init__(self, points: Any, resolution: float = 0.2, clearance: float = 0.5,
+                 padding: float = 1.0, heuristic_weight: float = 1.5,
+                 tree: Optional[cKDTree] = None):
+        """
+        Initialize the planner.
+        
+        Args:
+            points: (N, 3) obstacle points in meters
+            resolution: Grid cell edge length in meters
+            clearance: Required distance from obstacle points in meters
+            padding: Free space around the cloud and waypoints searched for detours
+            heuristic_weight: A* heuristic inflation (see OccupancyGrid.search)
+            tree: Optional prebuilt KD-tree over ``points`` (e.g. PointCloud.kdtree())
+        """
+        if resolution <= 0 or clearance < 0:
+            raise ValueError(f"Invalid planner settings: resolution={resolution}, "
+                             f"clearance={clearance}")
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.resolution = resolution
+        self.clearance = clearance
+        self.padding = padding
+        self.heuristic_weight = heuristic_weight
+        self.tree = tree if tree is not None else cKDTree(self.points)
+        self.grid: Optional[OccupancyGrid] = None
+        self.logger = logging.getLogger(__name__)
+    
+    def segment_clear(self, start: np.ndarray, end: np.ndarray,
+                      exempt: Sequence[Tuple[np.ndarray, float]] = ()) -> bool:
+        """
+        Check that a straight move keeps the clearance from every point.
+        
+        The segment is sampled at half the grid resolution; samples within
+        the radius of an ``exempt`` position are not checked.
+        
+        Args:
+            start: Segment start
+            end: Segment end
+            exempt: (position, radius) pairs whose surroundings are not checked
+            
+        Returns:
+            True if the move is clear
+        """
+        if not len(self.points) or self.clearance == 0:
+            return True
+        start = np.asarray(start, dtype=np.float64)
+        end = np.asarray(end, dtype=np.float64)
+        steps = max(int(math.ceil(np.linalg.norm(end - start) / (self.resolution / 2.0))), 1)
+        samples = start + np.linspace(0.0, 1.0, steps + 1)[:, None] * (end - start)
+        for position, radius in exempt:
+            samples = samples[np.linalg.norm(samples - position, axis=1) > radius]
+        if not len(samples):
+            return True
+        distance, _ = self.tree.query(samples, distance_upper_bound=self.clearance)
+        return bool(np.all(np.isinf(distance)))
+    
+    def _grid_for(self, lower: np.ndarray, upper: np.ndarray) -> OccupancyGrid:
+        """Return the cached grid, rebuilding it when the box lies outside it."""
+        if self.grid is None or not self.grid.covers(lower, upper):
+            if len(self.points):
+                lower = np.minimum(lower, self.points.min(axis=0))
+                upper = np.maximum(upper, self.points.max(axis=0))
+            margin = self.clearance + self.padding
+            self.grid = OccupancyGrid(self.points, self.resolution, self.clearance,
+                                      lower - margin, upper + margin)
+            self.logger.debug(f"Built occupancy grid {self.grid.shape} "
+                              f"at {self.grid.resolution:.3f}m")
+        return self.grid
+    
+    def approach_radius(self, position: np.ndarray) -> float:
+        """
+        Radius around a waypoint within which the clearance cannot be kept.
+        
+        A waypoint ``d`` meters from the nearest point can only be reached
+        through positions closer than the clearance within
+        ``clearance - d`` of it; waypoints that already keep the clearance
+        get no exemption.
+        
+        Args:
+            position: Waypoint in meters
+            
+        Returns:
+            Exempt radius in meters
+        """
+        distance, _ = self.tree.query(position, distance_upper_bound=self.clearance)
+        return max(self.clearance - distance, 0.0) if np.isfinite(distance) else 0.0
+    
+    def plan_segment(self, start: np.ndarray, goal: np.ndarray) -> np.ndarray:
+        """
+        Plan a clear path between two positions.
+        
+        Away from the endpoints the path keeps the clearance from every
+        point; within an endpoint's approach_radius it may come closer,
+        but never passes through occupied grid cells.
+        
+        Args:
+            start: Start position in meters
+            goal: Goal position in meters
+            
+        Returns:
+            (M, 3) path from start to goal, M >= 2
+            
+        Raises:
+            ValueError: If no collision-free path exists
+        """
+        start = np.asarray(start, dtype=np.float64)
+        goal = np.asarray(goal, dtype=np.float64)
+        radii = (self.approach_radius(start), self.approach_radius(goal))
+        endpoints = ((start, radii[0]), (goal, radii[1]))
+        if self.segment_clear(start, goal, endpoints):
+            return np.array([start, goal])
+        
+        grid = self._grid_for(np.minimum(start, goal), np.maximum(start, goal))
+        path = grid.search(start, goal, approach=[r + grid.resolution for r in radii],
+                           weight=self.heuristic_weight)
+        if path is None:
+            raise ValueError(f"No collision-free path from {start.tolist()} to {goal.tolist()}")
+        
+        # Shortcut: from each kept point advance while the line of sight holds
+        kept = [0]
+        while kept[-1] < len(path) - 1:
+            current = kept[-1]
+            following = current + 1
+            while (following + 1 < len(path)
+                   and self.segment_clear(path[current], path[following + 1], endpoints)):
+                following += 1
+            kept.append(following)
+        return path[kept]
+    
+    def plan(self, waypoints: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Plan clear moves through a sequence of waypoints.
+        
+        Args:
+            waypoints: (N, 3) positions in meters
+            
+        Returns:
+            Tuple of the (M, 3) path and, for each path point, the index of
+            the waypoint it reaches or -1 for inserted detour points
+        """
+        waypoints = np.asarray(waypoints, dtype=np.float64).reshape(-1, 3)
+        if not len(waypoints):
+            return waypoints, np.empty(0, dtype=np.intp)
+        
+        positions: List[np.ndarray] = [waypoints[:1]]
+        sources: List[int] = [0]
+        for i in range(1, len(waypoints)):
+            segment = self.plan_segment(waypoints[i - 1], waypoints[i])
+            positions.append(segment[1:])
+            sources.extend([-1] * (len(segment) - 2) + [i])
+        return np.concatenate(positions), np.array(sources, dtype=np.intp)
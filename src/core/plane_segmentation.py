@@ -0,0 +1,151 @@
+"""
+Plane Segmentation - Batched RANSAC plane fitting for point clouds
+Finds dominant planes (water surface, deck, hull sides) in processed clouds
+"""
+
+import math
+from typing import List, Optional, Tuple
+import numpy as np
+
+
+def fit_plane_lstsq(xyz: np.ndarray) -> np.ndarray:
+    """
+    Least-squares plane through a set of points.
+    
+    Args:
+        xyz: (N, 3) points, N >= 3
+        
+    Returns:
+        Plane coefficients (a, b, c, d) with unit normal, ax + by + cz + d = 0
+    """
+    centroid = xyz.mean(axis=0, dtype=np.float64)
+    # The normal is the direction of least variance
+    _, _, vt = np.linalg.svd(xyz - centroid, full_matrices=False)
+    normal = vt[2]
+    return np.append(normal, -normal @ centroid)
+
+
+def fit_plane_ransac(xyz: np.ndarray, distance_threshold: float = 0.03,
+                     max_iterations: int = 500, batch_size: int = 64,
+                     confidence: float = 0.999,
+                     rng: Optional[np.random.Generator] = None
+                     ) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    """
+    Fit the dominant plane with batched RANSAC.
+    
+    Each iteration samples ``batch_size`` minimal triplets, builds all
+    candidate planes at once and scores them against every point with a
+    single (N, 3) x (3, B) matrix product. Sampling stops early once the
+    adaptive iteration bound for the requested confidence is reached. The
+    best candidate is refined by least squares over its inliers.
+    
+    Args:
+        xyz: (N, 3) points
+        distance_threshold: Maximum point-to-plane distance for inliers
+        max_iterations: Upper bound on candidate planes evaluated
+        batch_size: Candidate planes scored per batch
+        confidence: Probability of sampling at least one all-inlier triplet
+        rng: Random generator for reproducible sampling
+        
+    Returns:
+        Tuple of (plane, inlier_indices); plane is None if no plane was found
+    """
+    n = xyz.shape[0]
+    if n < 3:
+        return None, np.empty(0, dtype=np.intp)
+    
+    rng = rng or np.random.default_rng()
+    points = np.asarray(xyz, dtype=np.float32)
+    best_plane = None
+    best_count = 0
+    required = max_iterations
+    evaluated = 0
+    
+    while evaluated < min(required, max_iterations):
+        samples = rng.integers(0, n, size=(batch_size, 3))
+        p0 = points[samples[:, 0]]
+        normals = np.cross(points[samples[:, 1]] - p0, points[samples[:, 2]] - p0)
+        norms = np.linalg.norm(normals, axis=1)
+        valid = norms > 1e-9
+        evaluated += batch_size
+        if not valid.any():
+            continue
+        
+        normals = normals[valid] / norms[valid, None]
+        offsets = -np.einsum('ij,ij->i', normals, p0[valid])
+        
+        # Score every candidate against every point in one matrix product
+        distances = np.abs(points @ normals.T + offsets)
+        counts = np.count_nonzero(distances <= distance_threshold, axis=0)
+        best = int(np.argmax(counts))
+        
+        if counts[best] > best_count:
+            best_count = int(counts[best])
+            best_plane = np.append(normals[best], offsets[best]).astype(np.float64)
+            
+            # Adaptive bound: iterations needed to see one clean triplet
+            inlier_ratio = best_count / n
+            if inlier_ratio >= 1.0:
+                break
+            miss = 1.0 - inlier_ratio ** 3
+            if miss > 0.0:
+                required = int(math.ceil(math.log(1.0 - confidence) / math.log(miss)))
+    
+    if best_plane is None:
+        return None, np.empty(0, dtype=np.intp)
+    
+    inliers = np.flatnonzero(np.abs(points @ best_plane[:3] + best_plane[3])
+                             <= distance_threshold)
+    if inliers.size >= 3:
+        refined = fit_plane_lstsq(points[inliers])
+        refined_inliers = np.flatnonzero(np.abs(points @ refined[:3] + refined[3])
+                                         <= distance_threshold)
+        if refined_inliers.size >= inliers.size:
+            best_plane, inliers = refined, refined_inliers
+    
+    return best_plane, inliers
+
+
+def segment_planes(xyz: np.ndarray, max_planes: int = 3, min_inliers: int = 100,
+                   distance_threshold: float = 0.03, max_iterations: int = 500,
+                   batch_size: int = 64, confidence: float = 0.999,
+                   rng: Optional[np.random.Generator] = None
+                   ) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Extract planes one after another, removing each plane's inliers.
+    
+    Args:
+        xyz: (N, 3) points
+        max_planes: Maximum number of planes to extract
+        min_inliers: Stop when the best remaining plane has fewer inliers
+        distance_threshold: Maximum point-to-plane distance for inliers
+        max_iterations: RANSAC iteration bound per plane
+        batch_size: Candidate planes scored per batch
+        confidence: RANSAC early-termination confidence
+        rng: Random generator for reproducible sampling
+        
+    Returns:
+        List of (plane, inlier_indices) into ``xyz``, largest plane first
+    """
+    rng = rng or np.random.default_rng()
+    remaining = np.arange(xyz.shape[0])
+    planes = []
+    
+    while len(planes) < max_planes and remaining.size >= max(min_inliers, 3):
+        plane, inliers = fit_plane_ransac(
+            xyz[remaining],
+            distance_threshold=distance_threshold,
+            max_iterations=max_iterations,
+            batch_size=batch_size,
+            confidence=confidence,
+            rng=rng
+        )
+        if plane is None or inliers.size < min_inliers:
+            break
+        
+        planes.append((plane, remaining[inliers]))
+        keep = np.ones(remaining.size, dtype=bool)
+        keep[inliers] = False
+        remaining = remaining[keep]
+    
+    return planes
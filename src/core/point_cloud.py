@@ -0,0 +1,247 @@
+"""
+Point Cloud - Columnar, array-backed point cloud container
+Stores per-point attributes as contiguous NumPy arrays shared between stages
+"""
+
+from typing import Dict, Any, Optional, Tuple, Union
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class PointCloud:
+    """
+    Columnar point cloud backed by contiguous NumPy arrays.
+    
+    Attributes are stored column-wise:
+    - xyz: (N, 3) float32 coordinates in meters
+    - rgb: (N, 3) uint8 colors
+    - normals: optional (N, 3) float32 unit normals
+    - labels: optional (N,) int32 segment labels
+    
+    Slicing with a ``slice`` returns zero-copy views; boolean masks and
+    index arrays return compact copies. A KD-tree over ``xyz`` is built on
+    first use by ``kdtree()`` and cached for later stages. For compatibility with stages that
+    still expect the legacy dict layout, string keys ('points', 'colors',
+    'num_points', ...) are supported through ``__getitem__``, ``get`` and
+    ``in``.
+    """
+    
+    __slots__ = ('xyz', 'rgb', 'normals', 'labels', 'frame_shape', 'timestamp', '_kdtree')
+    
+    # Legacy dict keys mapped onto the columnar attributes
+    _DICT_KEYS = ('points', 'colors', 'normals', 'labels',
+                  'frame_shape', 'num_points', 'timestamp')
+    
+    def __init__(self, xyz: Any = None, rgb: Any = None,
+                 normals: Optional[Any] = None, labels: Optional[Any] = None,
+                 frame_shape: Optional[Tuple[int, int]] = None,
+                 timestamp: Optional[str] = None):
+        """
+        Initialize the point cloud.
+        
+        Args:
+            xyz: Point coordinates, anything convertible to (N, 3) float32
+            rgb: Point colors, anything convertible to (N, 3) uint8
+            normals: Optional point normals (N, 3)
+            labels: Optional integer labels (N,)
+            frame_shape: Shape (height, width) of the source depth frame
+            timestamp: ISO timestamp of the source frame
+        """
+        if xyz is None:
+            xyz = np.empty((0, 3), dtype=np.float32)
+        self.xyz = np.ascontiguousarray(xyz, dtype=np.float32).reshape(-1, 3)
+        n = self.xyz.shape[0]
+        
+        if rgb is None or len(rgb) == 0:
+            self.rgb = np.zeros((n, 3), dtype=np.uint8)
+        else:
+            self.rgb = np.ascontiguousarray(rgb, dtype=np.uint8).reshape(-1, 3)
+        
+        self.normals = None
+        if normals is not None:
+            self.normals = np.ascontiguousarray(normals, dtype=np.float32).reshape(-1, 3)
+        
+        self.labels = None
+        if labels is not None:
+            self.labels = np.ascontiguousarray(labels, dtype=np.int32).reshape(-1)
+        
+        self.frame_shape = tuple(frame_shape) if frame_shape is not None else None
+        self.timestamp = timestamp
+        self._kdtree = None
+        
+        for name in ('rgb', 'normals', 'labels'):
+            column = getattr(self, name)
+            if column is not None and column.shape[0] != n:
+                raise ValueError(f"Column '{name}' has {column.shape[0]} rows, expected {n}")
+    
+    @classmethod
+    def _wrap(cls, xyz: np.ndarray, rgb: np.ndarray, normals: Optional[np.ndarray],
+              labels: Optional[np.ndarray], frame_shape: Optional[Tuple[int, int]],
+              timestamp: Optional[str]) -> 'PointCloud':
+        """Build a cloud around existing arrays without validation or copies."""
+        cloud = cls.__new__(cls)
+        cloud.xyz = xyz
+        cloud.rgb = rgb
+        cloud.normals = normals
+        cloud.labels = labels
+        cloud.frame_shape = frame_shape
+        cloud.timestamp = timestamp
+        cloud._kdtree = None
+        return cloud
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PointCloud':
+        """
+        Build a point cloud from the legacy dict layout.
+        
+        Args:
+            data: Dictionary with 'points', 'colors' and optional metadata
+            
+        Returns:
+            PointCloud sharing the dict's arrays where dtypes already match
+        """
+        return cls(
+            data.get('points'),
+            data.get('colors'),
+            normals=data.get('normals'),
+            labels=data.get('labels'),
+            frame_shape=data.get('frame_shape'),
+            timestamp=data.get('timestamp')
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the legacy dict view of this cloud.
+        
+        Returns:
+            Dictionary referencing (not copying) the underlying arrays
+        """
+        return {key: self[key] for key in self._DICT_KEYS}
+    
+    @property
+    def num_points(self) -> int:
+        """Number of points in the cloud."""
+        return self.xyz.shape[0]
+    
+    def __len__(self) -> int:
+        return self.xyz.shape[0]
+    
+    def __repr__(self) -> str:
+        return f"PointCloud(num_points={self.num_points}, frame_shape={self.frame_shape})"
+    
+    def __getitem__(self, key: Union[str, slice, np.ndarray]) -> Any:
+        """
+        Index the cloud.
+        
+        String keys return legacy dict fields. Slices return zero-copy
+        views; boolean masks and integer index arrays return copies.
+        """
+        if isinstance(key, str):
+            if key == 'points':
+                return self.xyz
+            if key == 'colors':
+                return self.rgb
+            if key == 'num_points':
+                return self.num_points
+            if key in ('normals', 'labels', 'frame_shape', 'timestamp'):
+                return getattr(self, key)
+            raise KeyError(key)
+        
+        return PointCloud._wrap(
+            self.xyz[key],
+            self.rgb[key],
+            self.normals[key] if self.normals is not None else None,
+            self.labels[key] if self.labels is not None else None,
+            self.frame_shape,
+            self.timestamp
+        )
+    
+    def kdtree(self) -> cKDTree:
+        """
+        Return a KD-tree over the point coordinates, building it on first use.
+        
+        The tree is cached on the cloud so that outlier filtering, geometry
+        extraction and path planning can share one build. Callers must not
+        mutate ``xyz`` in place after the tree has been built.
+        
+        Returns:
+            scipy.spatial.cKDTree over ``xyz``
+        """
+        if self._kdtree is None:
+            self._kdtree = cKDTree(self.xyz)
+        return self._kdtree
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._DICT_KEYS
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access for legacy consumers."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def keys(self) -> Tuple[str, ...]:
+        """Legacy dict keys supported by this cloud."""
+        return self._DICT_KEYS
+    
+    def filter(self, mask: np.ndarray) -> 'PointCloud':
+        """
+        Keep the points selected by a boolean mask.
+        
+        Args:
+            mask: Boolean array of length N
+            
+        Returns:
+            New point cloud containing only the selected points
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (self.num_points,):
+            raise ValueError(f"Mask shape {mask.shape} does not match {self.num_points} points")
+        return self.select(np.flatnonzero(mask))
+    
+    def select(self, indices: np.ndarray) -> 'PointCloud':
+        """
+        Gather the points at the given indices.
+        
+        Args:
+            indices: Integer index array
+            
+        Returns:
+            New point cloud with the gathered rows
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        return PointCloud._wrap(
+            np.take(self.xyz, indices, axis=0),
+            np.take(self.rgb, indices, axis=0),
+            np.take(self.normals, indices, axis=0) if self.normals is not None else None,
+            np.take(self.labels, indices) if self.labels is not None else None,
+            self.frame_shape,
+            self.timestamp
+        )
+    
+    def copy(self) -> 'PointCloud':
+        """Return a deep copy of the cloud."""
+        return PointCloud._wrap(
+            self.xyz.copy(),
+            self.rgb.copy(),
+            self.normals.copy() if self.normals is not None else None,
+            self.labels.copy() if self.labels is not None else None,
+            self.frame_shape,
+            self.timestamp
+        )
+
+
+def as_point_cloud(point_cloud: Union[PointCloud, Dict[str, Any]]) -> PointCloud:
+    """
+    Coerce a legacy dict cloud into a PointCloud.
+    
+    Args:
+        point_cloud: PointCloud or legacy dict
+        
+    Returns:
+        PointCloud instance (the input itself if already a PointCloud)
+    """
+    if isinstance(point_cloud, PointCloud):
+        return point_cloud
+    return PointCloud.from_dict(point_cloud)
@@ -4,9 +4,20 @@ Converts raw RGB-D data into structured point clouds for analysis
 """
 
 import logging
-from typing import Dict, Any, List, Tuple
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 
+from .point_cloud import PointCloud, as_point_cloud
+from .plane_segmentation import segment_planes
+
+
+# Voxel coordinates are packed into a single int64 key, 21 bits per axis
+VOXEL_KEY_BITS = 21
+VOXEL_KEY_LIMIT = 1 << VOXEL_KEY_BITS
+VOXEL_MODES = ('centroid', 'first', 'nearest')
+OUTLIER_METHODS = ('statistical', 'radius', 'both', 'none')
+
 
 class PointCloudProcessor:
     """
@@ -29,74 +40,307 @@ class PointCloudProcessor:
         self.config = config or {
             'max_depth': 10.0,  # meters
             'min_depth': 0.1,   # meters
-            'voxel_size': 0.01  # meters
+            'voxel_size': 0.05,  # meters
+            'voxel_mode': 'centroid',  # centroid, first or nearest
+            'depth_scale': 0.001,  # meters per unit for integer depth maps
+            'outlier_method': 'statistical',  # statistical, radius, both or none
+            'outlier_neighbors': 20,      # k for statistical outlier removal
+            'outlier_std_ratio': 2.0,     # Std-devs above mean k-NN distance to reject
+            'outlier_radius': 0.05,       # meters, radius outlier removal
+            'outlier_min_neighbors': 5,   # Minimum neighbors within radius
+            'workers': -1,                # KD-tree query workers (-1 = all cores)
+            'ransac_distance_threshold': 0.03,  # meters
+            'ransac_max_iterations': 500,
+            'max_planes': 4,              # Water, deck and hull sides
+            'hull_depth': 3.66            # Moulded depth in meters (12 ft hopper barge)
         }
         self.logger = logging.getLogger(__name__)
+        
+        # Per-resolution ray grids, keyed by (height, width, fx, fy, cx, cy)
+        self._ray_grids = {}
         self.logger.info("Point Cloud Processor initialized")
     
     def process_rgbd_frame(self, rgb_data: np.ndarray, depth_data: np.ndarray, 
-                          camera_intrinsics: Dict[str, float]) -> Dict[str, Any]:
+                          camera_intrinsics: Dict[str, float]) -> PointCloud:
         """
         Process a single RGB-D frame into a point cloud.
         
         Args:
             rgb_data: RGB image data (H x W x 3)
             depth_data: Depth map (H x W)
-            camera_intrinsics: Camera calibration parameters (fx, fy, cx, cy)
+            camera_intrinsics: Camera calibration parameters (fx, fy, cx, cy and
+                optionally depth_scale for integer depth maps)
             
         Returns:
-            Dictionary containing point cloud data and metadata
+            PointCloud with (N, 3) float32 points and (N, 3) uint8 colors
         """
         self.logger.debug("Processing RGB-D frame")
         
-        # Scaffold implementation - to be expanded
-        height, width = depth_data.shape
+        depth = np.asarray(depth_data)
+        if depth.ndim != 2:
+            raise ValueError(f"Depth map must be 2-D, got shape {depth.shape}")
+        height, width = depth.shape
         
-        point_cloud = {
-            'points': [],  # Will contain 3D coordinates
-            'colors': [],  # Will contain RGB values
-            'frame_shape': (height, width),
-            'num_points': 0,
-            'timestamp': None
-        }
+        # Integer depth maps (e.g. uint16 millimeters) are scaled to meters in one
+        # pass; a scale sent with the frame's intrinsics overrides the configured one
+        if np.issubdtype(depth.dtype, np.integer):
+            scale = camera_intrinsics.get('depth_scale', self.config.get('depth_scale', 0.001))
+            depth = np.multiply(depth, np.float32(scale), dtype=np.float32)
+        z = depth.astype(np.float32, copy=False).reshape(-1)
+        
+        # Single pass range mask; NaN depths fail both comparisons
+        mask = (z >= self.config.get('min_depth', 0.1)) & (z <= self.config.get('max_depth', 10.0))
+        valid = np.flatnonzero(mask)
+        z = np.take(z, valid)
+        
+        x_rays, y_rays = self._get_ray_grid(height, width, camera_intrinsics)
+        points = np.empty((valid.size, 3), dtype=np.float32)
+        np.multiply(np.take(x_rays, valid), z, out=points[:, 0])
+        np.multiply(np.take(y_rays, valid), z, out=points[:, 1])
+        points[:, 2] = z
         
-        self.logger.info(f"Generated point cloud with {point_cloud['num_points']} points")
+        rgb = np.asarray(rgb_data)
+        if rgb.shape[:2] == (height, width) and rgb.ndim == 3:
+            colors = np.take(rgb.reshape(-1, rgb.shape[2])[:, :3], valid, axis=0)
+            colors = colors.astype(np.uint8, copy=False)
+        else:
+            colors = np.zeros((valid.size, 3), dtype=np.uint8)
+        
+        # Arrays are already contiguous with the right dtypes, so wrap them as-is
+        point_cloud = PointCloud(
+            points,
+            colors,
+            frame_shape=(height, width),
+            timestamp=datetime.now().isoformat()
+        )
+        
+        self.logger.info(f"Generated point cloud with {point_cloud.num_points} points")
         return point_cloud
     
-    def filter_outliers(self, point_cloud: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_ray_grid(self, height: int, width: int,
+                      camera_intrinsics: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return cached flattened per-pixel ray slopes (x/z, y/z) for a resolution."""
+        fx = float(camera_intrinsics['fx'])
+        fy = float(camera_intrinsics['fy'])
+        cx = float(camera_intrinsics['cx'])
+        cy = float(camera_intrinsics['cy'])
+        key = (height, width, fx, fy, cx, cy)
+        
+        grid = self._ray_grids.get(key)
+        if grid is None:
+            u = (np.arange(width, dtype=np.float32) - np.float32(cx)) / np.float32(fx)
+            v = (np.arange(height, dtype=np.float32) - np.float32(cy)) / np.float32(fy)
+            x_rays = np.tile(u, height)
+            y_rays = np.repeat(v, width)
+            grid = (x_rays, y_rays)
+            
+            # Keep the cache small; cameras rarely change resolution
+            if len(self._ray_grids) >= 8:
+                self._ray_grids.pop(next(iter(self._ray_grids)))
+            self._ray_grids[key] = grid
+        
+        return grid
+    
+    def filter_outliers(self, point_cloud: PointCloud) -> PointCloud:
         """
         Remove outlier points from the point cloud.
         
+        Uses the cloud's cached KD-tree for neighbor queries, run across
+        ``workers`` threads. 'statistical' rejects points whose mean k-NN
+        distance exceeds the cloud mean by ``outlier_std_ratio`` standard
+        deviations; 'radius' rejects points with fewer than
+        ``outlier_min_neighbors`` neighbors within ``outlier_radius``.
+        
         Args:
-            point_cloud: Input point cloud data
+            point_cloud: Input PointCloud (legacy dicts are accepted)
             
         Returns:
             Filtered point cloud
         """
-        self.logger.debug("Filtering outliers from point cloud")
-        # Scaffold implementation
-        return point_cloud
+        method = self.config.get('outlier_method', 'statistical')
+        self.logger.debug(f"Filtering outliers from point cloud ({method})")
+        
+        cloud = as_point_cloud(point_cloud)
+        if method not in OUTLIER_METHODS:
+            raise ValueError(f"Unknown outlier method: {method}")
+        if method == 'none' or cloud.num_points == 0:
+            return cloud
+        
+        keep = np.ones(cloud.num_points, dtype=bool)
+        if method in ('statistical', 'both'):
+            keep &= self._statistical_inliers(cloud)
+        if method in ('radius', 'both'):
+            keep &= self._radius_inliers(cloud)
+        
+        # Keep the original cloud (and its KD-tree) when nothing was rejected
+        if keep.all():
+            return cloud
+        
+        filtered = cloud.filter(keep)
+        self.logger.info(f"Removed {cloud.num_points - filtered.num_points} outliers "
+                         f"({filtered.num_points} points remain)")
+        return filtered
     
-    def downsample(self, point_cloud: Dict[str, Any]) -> Dict[str, Any]:
+    def _statistical_inliers(self, cloud: PointCloud) -> np.ndarray:
+        """Return a mask of points whose mean k-NN distance is not anomalous."""
+        k = min(self.config.get('outlier_neighbors', 20), cloud.num_points - 1)
+        if k < 1:
+            return np.ones(cloud.num_points, dtype=bool)
+        
+        # The nearest neighbor of every point is itself, so query k + 1
+        distances, _ = cloud.kdtree().query(cloud.xyz, k=k + 1,
+                                            workers=self.config.get('workers', -1))
+        mean_distances = distances[:, 1:].mean(axis=1)
+        threshold = (mean_distances.mean()
+                     + self.config.get('outlier_std_ratio', 2.0) * mean_distances.std())
+        return mean_distances <= threshold
+    
+    def _radius_inliers(self, cloud: PointCloud) -> np.ndarray:
+        """Return a mask of points with enough neighbors inside the search radius."""
+        counts = cloud.kdtree().query_ball_point(
+            cloud.xyz,
+            r=self.config.get('outlier_radius', 0.05),
+            workers=self.config.get('workers', -1),
+            return_length=True
+        )
+        # Counts include the query point itself
+        return counts - 1 >= self.config.get('outlier_min_neighbors', 5)
+    
+    def downsample(self, point_cloud: PointCloud) -> PointCloud:
         """
         Downsample point cloud using voxel grid filtering.
         
+        Points are bucketed into voxels of ``voxel_size`` by packing their
+        integer voxel coordinates into 64-bit keys, which are sorted once and
+        reduced per voxel. ``voxel_mode`` selects the representative point:
+        'centroid' (mean position and color), 'first' (first point in input
+        order, fastest) or 'nearest' (point closest to the voxel center).
+        
         Args:
-            point_cloud: Input point cloud data
+            point_cloud: Input PointCloud (legacy dicts are accepted)
             
         Returns:
             Downsampled point cloud
         """
-        self.logger.debug(f"Downsampling with voxel size: {self.config['voxel_size']}")
-        # Scaffold implementation
-        return point_cloud
+        voxel_size = self.config.get('voxel_size', 0.05)
+        mode = self.config.get('voxel_mode', 'centroid')
+        self.logger.debug(f"Downsampling with voxel size: {voxel_size} ({mode})")
+        
+        cloud = as_point_cloud(point_cloud)
+        if cloud.num_points == 0 or voxel_size <= 0:
+            return cloud
+        if mode not in VOXEL_MODES:
+            raise ValueError(f"Unknown voxel mode: {mode}")
+        
+        keys, voxel_origin = self._voxel_keys(cloud.xyz, voxel_size)
+        
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        boundaries = np.empty(sorted_keys.size, dtype=bool)
+        boundaries[0] = True
+        np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=boundaries[1:])
+        starts = np.flatnonzero(boundaries)
+        
+        if mode == 'first':
+            # The sort is unstable, so take the smallest original index per voxel
+            downsampled = cloud.select(np.minimum.reduceat(order, starts))
+        elif mode == 'nearest':
+            downsampled = cloud.select(self._nearest_to_center(cloud.xyz, voxel_size, voxel_origin,
+                                                               order, boundaries, starts))
+        else:
+            # Map every point to its voxel and reduce with weighted bincounts
+            inverse = np.empty(order.size, dtype=np.intp)
+            inverse[order] = np.cumsum(boundaries) - 1
+            num_voxels = starts.size
+            counts = np.bincount(inverse, minlength=num_voxels)
+            
+            xyz = np.empty((num_voxels, 3), dtype=np.float32)
+            rgb = np.empty((num_voxels, 3), dtype=np.uint8)
+            for axis in range(3):
+                xyz[:, axis] = np.bincount(inverse, weights=cloud.xyz[:, axis],
+                                           minlength=num_voxels) / counts
+                rgb[:, axis] = np.rint(np.bincount(inverse, weights=cloud.rgb[:, axis],
+                                                   minlength=num_voxels) / counts)
+            
+            representatives = order[starts]
+            downsampled = PointCloud._wrap(
+                xyz,
+                rgb,
+                None,
+                cloud.labels[representatives] if cloud.labels is not None else None,
+                cloud.frame_shape,
+                cloud.timestamp
+            )
+        
+        self.logger.info(f"Downsampled {cloud.num_points} -> {downsampled.num_points} points")
+        return downsampled
+    
+    @staticmethod
+    def _nearest_to_center(xyz: np.ndarray, voxel_size: float, voxel_origin: np.ndarray,
+                           order: np.ndarray, boundaries: np.ndarray,
+                           starts: np.ndarray) -> np.ndarray:
+        """Return, per voxel run of a key sort, the index of the point nearest its center."""
+        sorted_xyz = np.take(xyz, order, axis=0)
+        dist_sq = np.zeros(order.size, dtype=np.float32)
+        inv_size = np.float32(1.0 / voxel_size)
+        for axis in range(3):
+            # Offset from the voxel center in voxel units, using the same scaling as the keys
+            scaled = (sorted_xyz[:, axis] - np.float32(voxel_origin[axis])) * inv_size
+            offset = scaled - np.floor(scaled) - np.float32(0.5)
+            dist_sq += offset * offset
+        
+        # Candidates match their voxel's minimum distance; keep the first per voxel
+        counts = np.diff(np.append(starts, order.size))
+        voxel_min = np.repeat(np.minimum.reduceat(dist_sq, starts), counts)
+        candidates = np.flatnonzero(dist_sq == voxel_min)
+        voxel_ids = (np.cumsum(boundaries) - 1)[candidates]
+        first = np.empty(candidates.size, dtype=bool)
+        first[0] = True
+        np.not_equal(voxel_ids[1:], voxel_ids[:-1], out=first[1:])
+        return order[candidates[first]]
+    
+    @staticmethod
+    def _voxel_keys(xyz: np.ndarray, voxel_size: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pack integer voxel coordinates of each point into int64 keys.
+        
+        Args:
+            xyz: (N, 3) point coordinates
+            voxel_size: Voxel edge length in meters
+            
+        Returns:
+            Tuple of (keys, origin) where origin is the grid's minimum corner
+        """
+        # Column-wise passes are much faster than strided reductions over (N, 3)
+        origin = np.array([xyz[:, axis].min() for axis in range(3)], dtype=np.float64)
+        inv_size = 1.0 / voxel_size
+        keys = np.zeros(xyz.shape[0], dtype=np.int64)
+        for axis in range(3):
+            scaled = (xyz[:, axis] - np.float32(origin[axis])) * np.float32(inv_size)
+            index = scaled.astype(np.int64)
+            if index.size and index.max() >= VOXEL_KEY_LIMIT:
+                raise ValueError(f"Point cloud extent too large for voxel size {voxel_size}")
+            keys <<= VOXEL_KEY_BITS
+            keys |= index
+        return keys, origin
     
-    def extract_barge_geometry(self, point_cloud: Dict[str, Any]) -> Dict[str, Any]:
+    def extract_barge_geometry(self, point_cloud: PointCloud,
+                               viewpoint: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Extract barge geometry from point cloud.
         
+        Dominant planes are segmented with batched RANSAC and oriented to
+        face the camera. Among the planes parallel to the largest one, the
+        farthest from the camera is taken as the water surface and the
+        largest remaining one as the deck. Freeboard is the deck's height
+        above the water; draft is ``hull_depth`` minus freeboard. Trim and
+        heel are the deck's tilt relative to the water along the barge's
+        principal (length) and transverse (width) axes, positive when the
+        deck rises toward the positive end of the axis.
+        
         Args:
-            point_cloud: Processed point cloud data
+            point_cloud: Processed PointCloud (legacy dicts are accepted)
+            viewpoint: Camera position in the cloud's frame (origin if omitted)
             
         Returns:
             Dictionary containing barge geometric parameters
@@ -114,4 +358,70 @@ class PointCloudProcessor:
             }
         }
         
+        cloud = as_point_cloud(point_cloud)
+        seed = self.config.get('random_seed')
+        planes = segment_planes(
+            cloud.xyz,
+            max_planes=self.config.get('max_planes', 4),
+            min_inliers=self.config.get('min_plane_inliers', 100),
+            distance_threshold=self.config.get('ransac_distance_threshold', 0.03),
+            max_iterations=self.config.get('ransac_max_iterations', 500),
+            batch_size=self.config.get('ransac_batch_size', 64),
+            confidence=self.config.get('ransac_confidence', 0.999),
+            rng=np.random.default_rng(seed)
+        )
+        
+        # Orient normals toward the camera; the signed offset is then the camera distance
+        viewpoint = np.zeros(3) if viewpoint is None else np.asarray(viewpoint, dtype=np.float64)
+        planes = [(plane if plane[:3] @ viewpoint + plane[3] >= 0 else -plane, inliers)
+                  for plane, inliers in planes]
+        if planes:
+            reference = planes[0][0][:3]
+            tolerance = np.cos(np.radians(self.config.get('plane_parallel_tolerance', 15.0)))
+            planes = [(plane, inliers) for plane, inliers in planes
+                      if abs(plane[:3] @ reference) >= tolerance]
+        
+        if len(planes) < 2:
+            self.logger.warning("Could not find both water and deck planes")
+            return geometry
+        
+        water_plane, _ = max(planes, key=lambda item: item[0][:3] @ viewpoint + item[0][3])
+        deck_plane, deck_inliers = max(
+            (item for item in planes if item[0] is not water_plane),
+            key=lambda item: item[1].size
+        )
+        deck_points = cloud.xyz[deck_inliers].astype(np.float64)
+        water_normal = water_plane[:3]
+        
+        # Deck height above the water surface (camera side is positive)
+        freeboard = float(np.mean(deck_points @ water_normal + water_plane[3]))
+        hull_depth = self.config.get('hull_depth', 3.66)
+        
+        # Principal axes of the deck projected onto the water plane
+        centered = deck_points - deck_points.mean(axis=0)
+        centered -= np.outer(centered @ water_normal, water_normal)
+        _, _, vt = np.linalg.svd(centered, full_matrices=False)
+        length_axis = vt[0] if vt[0][0] >= 0 else -vt[0]
+        width_axis = np.cross(water_normal, length_axis)
+        along_length = centered @ length_axis
+        along_width = centered @ width_axis
+        
+        deck_normal = deck_plane[:3]
+        vertical = deck_normal @ water_normal
+        geometry.update({
+            'draft': float(max(hull_depth - freeboard, 0.0)),
+            'trim': float(np.degrees(np.arctan2(-(deck_normal @ length_axis), vertical))),
+            'heel': float(np.degrees(np.arctan2(-(deck_normal @ width_axis), vertical))),
+            'freeboard': freeboard,
+            'dimensions': {
+                'length': float(along_length.max() - along_length.min()),
+                'width': float(along_width.max() - along_width.min()),
+                'depth': float(hull_depth)
+            },
+            'water_plane': water_plane.tolist(),
+            'deck_plane': deck_plane.tolist()
+        })
+        
+        self.logger.info(f"Geometry extracted: draft={geometry['draft']:.3f}m, "
+                         f"trim={geometry['trim']:.2f}°, heel={geometry['heel']:.2f}°")
         return geometry
@@ -0,0 +1,358 @@
+"""
+Point Cloud Workers - Process-pool point cloud processing over shared memory
+Moves RGB-D frames and point cloud results between processes through slot rings
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+
+from .point_cloud import PointCloud
+from .point_cloud_processor import PointCloudProcessor
+
+
+# Array placement inside a slot: (dtype string, shape, byte offset)
+ArraySpec = Tuple[str, Tuple[int, ...], int]
+
+# Slot regions start on cache-line boundaries
+ALIGNMENT = 64
+
+# Bytes per point in a result slot: float32 xyz and uint8 rgb
+RESULT_POINT_BYTES = 15
+
+# Per-process state of a worker (see _init_worker)
+_WORKER: Dict[str, Any] = {}
+
+
+def _aligned(size: int) -> int:
+    """Round a byte count up to the slot alignment."""
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+class SharedRing:
+    """
+    Fixed-size slots in one shared memory block.
+    
+    The creating process owns the block and unlinks it on close; other
+    processes attach by name. Arrays are read and written through
+    views, so nothing is copied or pickled on the way between processes.
+    """
+    
+    def __init__(self, slots: int, slot_bytes: int, name: Optional[str] = None):
+        """
+        Initialize the ring.
+        
+        Args:
+            slots: Number of slots
+            slot_bytes: Size of each slot in bytes (rounded up to the alignment)
+            name: Existing block to attach to; a new block is created if None
+        """
+        self.slots = slots
+        self.slot_bytes = _aligned(slot_bytes)
+        self.owner = name is None
+        if self.owner:
+            self.shm = SharedMemory(create=True, size=slots * self.slot_bytes)
+        else:
+            self.shm = SharedMemory(name=name)
+    
+    @property
+    def name(self) -> str:
+        """Name other processes attach with."""
+        return self.shm.name
+    
+    def view(self, slot: int, spec: ArraySpec) -> np.ndarray:
+        """
+        Array view of a region of a slot.
+        
+        Args:
+            slot: Slot index
+            spec: (dtype, shape, offset) of the array within the slot
+            
+        Returns:
+            Array backed by the shared block
+        """
+        dtype, shape, offset = spec
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape)) * dtype.itemsize
+        if not 0 <= slot < self.slots or offset + size > self.slot_bytes:
+            raise ValueError(f"Region {spec} does not fit slot {slot} "
+                             f"of {self.slot_bytes} bytes")
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf,
+                          offset=slot * self.slot_bytes + offset)
+    
+    def close(self) -> None:
+        """Detach from the block, removing it if this process created it."""
+        try:
+            self.shm.close()
+        except BufferError:
+            # Views handed out are still alive; the mapping goes with them
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+def _init_worker(frames_name: str, results_name: str, slots: int, frame_bytes: int,
+                 result_bytes: int, config: Optional[Dict[str, Any]],
+                 stages: Sequence[str]) -> None:
+    """Attach a worker process to the rings and build its processor."""
+    _WORKER['frames'] = SharedRing(slots, frame_bytes, frames_name)
+    _WORKER['results'] = SharedRing(slots, result_bytes, results_name)
+    _WORKER['processor'] = PointCloudProcessor(config)
+    _WORKER['stages'] = tuple(stages)
+
+
+def _process_slot(slot: int, depth_spec: ArraySpec, rgb_spec: Optional[ArraySpec],
+                  camera_intrinsics: Dict[str, float]) -> Tuple[int, Tuple[int, int], str]:
+    """
+    Process the frame in a slot and write its point cloud to the result slot.
+    
+    Returns:
+        Tuple of the point count, frame shape and timestamp
+    """
+    frames = _WORKER['frames']
+    processor = _WORKER['processor']
+    depth = frames.view(slot, depth_spec)
+    rgb = frames.view(slot, rgb_spec) if rgb_spec is not None else np.empty((0, 3), np.uint8)
+    
+    cloud = processor.process_rgbd_frame(rgb, depth, camera_intrinsics)
+    for stage in _WORKER['stages']:
+        cloud = getattr(processor, stage)(cloud)
+    
+    count = cloud.num_points
+    results = _WORKER['results']
+    results.view(slot, _xyz_spec(count))[:] = cloud.xyz
+    results.view(slot, _rgb_spec(count))[:] = cloud.rgb
+    return count, cloud.frame_shape, cloud.timestamp
+
+
+def _xyz_spec(count: int) -> ArraySpec:
+    """Placement of a result's coordinates."""
+    return ('<f4', (count, 3), 0)
+
+
+def _rgb_spec(count: int) -> ArraySpec:
+    """Placement of a result's colors, after the coordinates."""
+    return ('|u1', (count, 3), _aligned(count * 12))
+
+
+class SharedPointCloud:
+    """
+    Handle to a point cloud result held in shared memory.
+    
+    ``point_cloud()`` wraps the shared arrays without copying. The slot
+    returns to the pool on ``release()`` (or leaving a ``with`` block),
+    after which views taken from it may be overwritten by later frames.
+    """
+    
+    __slots__ = ('_pool', 'slot', 'num_points', 'frame_shape', 'timestamp', '_released')
+    
+    def __init__(self, pool: 'PointCloudWorkerPool', slot: int, num_points: int,
+                 frame_shape: Tuple[int, int], timestamp: str):
+        self._pool = pool
+        self.slot = slot
+        self.num_points = num_points
+        self.frame_shape = frame_shape
+        self.timestamp = timestamp
+        self._released = False
+    
+    def point_cloud(self, copy: bool = False) -> PointCloud:
+        """
+        The result as a PointCloud.
+        
+        Args:
+            copy: Copy the arrays out of shared memory, so that the cloud
+                stays valid after release
+                
+        Returns:
+            PointCloud over the shared (or copied) arrays
+        """
+        if self._released:
+            raise RuntimeError(f"Result slot {self.slot} was released")
+        results = self._pool._results
+        xyz = results.view(self.slot, _xyz_spec(self.num_points))
+        rgb = results.view(self.slot, _rgb_spec(self.num_points))
+        if copy:
+            xyz, rgb = xyz.copy(), rgb.copy()
+        return PointCloud._wrap(xyz, rgb, None, None, self.frame_shape, self.timestamp)
+    
+    def release(self) -> None:
+        """Return the slot to the pool."""
+        if not self._released:
+            self._released = True
+            self._pool._release(self.slot)
+    
+    def __enter__(self) -> 'SharedPointCloud':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class PointCloudWorkerPool:
+    """
+    Processes RGB-D frames on a pool of worker processes.
+    
+    Each frame in flight owns one slot of two shared memory rings: the
+    depth map and image are copied once into the frame slot, a worker
+    back-projects them and runs the configured processor stages (by
+    default downsampling and outlier filtering), and writes the cloud
+    into the matching result slot. Only slot indices and array shapes
+    cross the process boundary. When every slot is taken, ``submit``
+    blocks until a result is released, bounding memory and applying
+    backpressure to the cameras.
+    """
+    
+    def __init__(self, processor_config: Optional[Dict[str, Any]] = None,
+                 workers: Optional[int] = None, slots: Optional[int] = None,
+                 max_pixels: int = 1280 * 720,
+                 stages: Sequence[str] = ('downsample', 'filter_outliers'),
+                 start_method: str = 'spawn'):
+        """
+        Initialize the pool.
+        
+        Args:
+            processor_config: PointCloudProcessor config used by the workers
+            workers: Worker processes, defaults to the number of CPU cores
+            slots: Frames in flight or held as results, defaults to twice
+                the workers
+            max_pixels: Largest frame (height x width) accepted
+            stages: PointCloudProcessor methods applied after back-projection
+            start_method: multiprocessing start method for the workers
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.slots = slots or 2 * self.workers
+        self.max_pixels = max_pixels
+        self.logger = logging.getLogger(__name__)
+        for stage in stages:
+            if not callable(getattr(PointCloudProcessor, stage, None)):
+                raise ValueError(f"Unknown processor stage: {stage}")
+        
+        # Frame slot: float32 (or narrower) depth, then 3-channel uint8 image
+        frame_bytes = _aligned(max_pixels * 4) + _aligned(max_pixels * 3)
+        result_bytes = _aligned(max_pixels * 12) + _aligned(max_pixels * 3)
+        self._frames = SharedRing(self.slots, frame_bytes)
+        self._results = SharedRing(self.slots, result_bytes)
+        self._free: queue.Queue = queue.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(self._frames.name, self._results.name, self.slots,
+                      self._frames.slot_bytes, self._results.slot_bytes,
+                      processor_config, tuple(stages))
+        )
+        self._lock = threading.Lock()
+        self._closed = False
+        self.logger.info(f"Point cloud worker pool started: {self.workers} workers, "
+                         f"{self.slots} slots of {self._frames.slot_bytes} bytes")
+    
+    def submit(self, rgb_data: np.ndarray, depth_data: np.ndarray,
+               camera_intrinsics: Dict[str, float],
+               timeout: Optional[float] = None) -> Future:
+        """
+        Queue a frame for processing.
+        
+        Args:
+            rgb_data: RGB image (H x W x 3), or empty for an uncolored cloud
+            depth_data: Depth map (H x W), uint16 units or float meters
+            camera_intrinsics: Camera calibration parameters (fx, fy, cx, cy)
+            timeout: Seconds to wait for a free slot, None to wait indefinitely
+            
+        Returns:
+            Future resolving to a SharedPointCloud
+            
+        Raises:
+            TimeoutError: If no slot became free within the timeout
+            ValueError: If the frame is larger than max_pixels
+        """
+        depth = np.asarray(depth_data)
+        if depth.ndim != 2:
+            raise ValueError(f"Depth map must be 2-D, got shape {depth.shape}")
+        if depth.size > self.max_pixels:
+            raise ValueError(f"Frame of {depth.size} pixels exceeds {self.max_pixels}")
+        if depth.dtype.itemsize > 4 or depth.dtype.kind not in 'uif':
+            depth = depth.astype(np.float32)
+        rgb = np.asarray(rgb_data)
+        has_rgb = rgb.shape[:2] == depth.shape and rgb.ndim == 3
+        
+        try:
+            slot = self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free frame slot within {timeout}s") from None
+        
+        try:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Worker pool is shut down")
+                depth_spec = (depth.dtype.str, depth.shape, 0)
+                self._frames.view(slot, depth_spec)[:] = depth
+                rgb_spec = None
+                if has_rgb:
+                    rgb_spec = ('|u1', depth.shape + (3,), _aligned(self.max_pixels * 4))
+                    self._frames.view(slot, rgb_spec)[:] = rgb[:, :, :3]
+                task = self._executor.submit(_process_slot, slot, depth_spec, rgb_spec,
+                                             {k: float(v) for k, v in camera_intrinsics.items()})
+        except BaseException:
+            self._free.put(slot)
+            raise
+        
+        result: Future = Future()
+        task.add_done_callback(lambda done: self._complete(slot, done, result))
+        return result
+    
+    def process(self, rgb_data: np.ndarray, depth_data: np.ndarray,
+                camera_intrinsics: Dict[str, float]) -> PointCloud:
+        """
+        Process one frame and return a private copy of its point cloud.
+        
+        Args:
+            rgb_data: RGB image (H x W x 3)
+            depth_data: Depth map (H x W)
+            camera_intrinsics: Camera calibration parameters
+            
+        Returns:
+            PointCloud independent of the shared memory
+        """
+        with self.submit(rgb_data, depth_data, camera_intrinsics).result() as shared:
+            return shared.point_cloud(copy=True)
+    
+    def _complete(self, slot: int, task: Future, result: Future) -> None:
+        """Resolve a frame's future once its worker has finished."""
+        try:
+            count, frame_shape, timestamp = task.result()
+        except BaseException as e:
+            self._free.put(slot)
+            result.set_exception(e)
+        else:
+            result.set_result(SharedPointCloud(self, slot, count, tuple(frame_shape),
+                                               timestamp))
+    
+    def _release(self, slot: int) -> None:
+        """Make a result slot available for new frames."""
+        self._free.put(slot)
+    
+    def shutdown(self) -> None:
+        """Stop the workers and free the shared memory."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown(wait=True)
+        self._frames.close()
+        self._results.close()
+        self.logger.info("Point cloud worker pool shut down")
+    
+    def __enter__(self) -> 'PointCloudWorkerPool':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
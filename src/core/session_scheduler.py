@@ -0,0 +1,264 @@
+"""
+Session Scheduler - Fair, prioritized drafting cycles for many barge/crane sessions
+Runs each session's cycles in order on a shared worker pool sized to the machine
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class DraftingSession:
+    """
+    One barge/crane pair served by the scheduler.
+    
+    Holds the session's own agents, state and a bounded history of
+    recent cycles, plus the queue of cycles waiting to run.
+    """
+    
+    __slots__ = ('session_id', 'priority', 'agents', 'state', 'history',
+                 'queue', 'running', 'virtual_time', 'lock')
+    
+    def __init__(self, session_id: str, priority: float = 1.0,
+                 agents: Optional[Dict[str, Any]] = None, history_size: int = 100):
+        """
+        Initialize the session.
+        
+        Args:
+            session_id: Unique session identifier (e.g. barge or crane name)
+            priority: Share of the worker pool relative to other sessions
+            agents: Agents used by this session's cycles
+            history_size: Number of completed cycles kept in the history
+        """
+        if priority <= 0:
+            raise ValueError(f"Session priority must be positive: {priority}")
+        self.session_id = session_id
+        self.priority = float(priority)
+        self.agents = dict(agents or {})
+        self.state = {
+            'status': 'ready',
+            'start_time': datetime.now().isoformat(),
+            'cycles_completed': 0,
+            'cycles_failed': 0
+        }
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.queue: Deque[Tuple[Callable[..., Any], Dict[str, Any], Future]] = deque()
+        self.running = False
+        self.virtual_time = 0.0
+        self.lock = threading.Lock()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the session state with queue and history details."""
+        with self.lock:
+            state = dict(self.state)
+            state['history'] = list(self.history)
+        state.update(session_id=self.session_id, priority=self.priority,
+                     queued=len(self.queue), running=self.running)
+        return state
+
+
+class SessionScheduler:
+    """
+    Schedules drafting cycles of many sessions onto a bounded worker pool.
+    
+    A session runs at most one cycle at a time, so each crane's cycles
+    execute in submission order while different cranes run in parallel.
+    Free workers go to the waiting session with the smallest virtual
+    time, which advances by 1 / priority per dispatched cycle (stride
+    scheduling): busy sessions share the pool in proportion to their
+    priorities and none is starved. A session that was idle restarts at
+    the current virtual time instead of spending banked credit.
+    """
+    
+    def __init__(self, runner: Callable[[DraftingSession, Dict[str, Any]], Any],
+                 max_workers: Optional[int] = None, history_size: int = 100,
+                 on_complete: Optional[Callable[[DraftingSession, Dict[str, Any]], None]] = None):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            runner: Default cycle function called with (session, input_data)
+            max_workers: Worker threads, defaults to the number of CPU cores
+            history_size: Completed cycles kept per session
+            on_complete: Called on the worker with (session, cycle record)
+                after each successful cycle; its exceptions are logged
+        """
+        self.runner = runner
+        self.on_complete = on_complete
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.history_size = history_size
+        self.sessions: Dict[str, DraftingSession] = {}
+        self.logger = logging.getLogger(__name__)
+        
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._busy = 0
+        self._virtual_time = 0.0
+        self._closed = False
+    
+    def create_session(self, session_id: str, priority: float = 1.0,
+                       agents: Optional[Dict[str, Any]] = None) -> DraftingSession:
+        """
+        Create a session.
+        
+        Raises:
+            ValueError: If the session already exists
+        """
+        with self._lock:
+            if session_id in self.sessions:
+                raise ValueError(f"Session already exists: {session_id}")
+            session = DraftingSession(session_id, priority, agents, self.history_size)
+            session.virtual_time = self._virtual_time
+            self.sessions[session_id] = session
+        self.logger.info(f"Session created: {session_id} (priority {priority})")
+        return session
+    
+    def set_priority(self, session_id: str, priority: float) -> None:
+        """Change a session's share of the pool for its next cycles."""
+        if priority <= 0:
+            raise ValueError(f"Session priority must be positive: {priority}")
+        with self._lock:
+            self._session(session_id).priority = float(priority)
+    
+    def close_session(self, session_id: str) -> None:
+        """Remove a session, cancelling its queued cycles; a running cycle finishes."""
+        with self._lock:
+            session = self._session(session_id)
+            del self.sessions[session_id]
+            queued = list(session.queue)
+            session.queue.clear()
+        for _, _, future in queued:
+            future.cancel()
+        self.logger.info(f"Session closed: {session_id} ({len(queued)} queued cycles cancelled)")
+    
+    def submit(self, session_id: str, input_data: Dict[str, Any],
+               func: Optional[Callable[[DraftingSession, Dict[str, Any]], Any]] = None
+               ) -> Future:
+        """
+        Queue a cycle for a session.
+        
+        Args:
+            session_id: Target session
+            input_data: Cycle input (e.g. RGB-D sensor data)
+            func: Cycle function, defaults to the scheduler's runner
+            
+        Returns:
+            Future resolving to the cycle record, with the runner's output
+            under 'results'
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            session = self._session(session_id)
+            if not session.running and not session.queue:
+                session.virtual_time = max(session.virtual_time, self._virtual_time)
+            session.queue.append((func or self.runner, input_data, future))
+        self._dispatch()
+        return future
+    
+    def get_session(self, session_id: str) -> DraftingSession:
+        """
+        Look up a session.
+        
+        Raises:
+            KeyError: If the session does not exist
+        """
+        with self._lock:
+            return self._session(session_id)
+    
+    def _session(self, session_id: str) -> DraftingSession:
+        """Look up a session; the caller holds the lock."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown session: {session_id}")
+        return session
+    
+    def _dispatch(self) -> None:
+        """Hand queued cycles to free workers, smallest virtual time first."""
+        with self._lock:
+            while self._busy < self.max_workers:
+                waiting = [s for s in self.sessions.values() if s.queue and not s.running]
+                if not waiting:
+                    return
+                session = min(waiting, key=lambda s: s.virtual_time)
+                func, input_data, future = session.queue.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._virtual_time = session.virtual_time
+                session.virtual_time += 1.0 / session.priority
+                session.running = True
+                self._busy += 1
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='lattice-session')
+                self._executor.submit(self._run, session, func, input_data, future)
+    
+    def _run(self, session: DraftingSession, func: Callable[..., Any],
+             input_data: Dict[str, Any], future: Future) -> None:
+        """Run one cycle on a worker and record it in the session."""
+        started = time.perf_counter()
+        with session.lock:
+            session.state['status'] = 'processing'
+        try:
+            results = func(session, input_data)
+        except BaseException as e:
+            with session.lock:
+                session.state['cycles_failed'] += 1
+                session.state['status'] = 'error'
+                session.history.append({
+                    'status': 'error',
+                    'error': str(e),
+                    'timestamp': datetime.now().isoformat(),
+                    'duration_ms': (time.perf_counter() - started) * 1000.0
+                })
+            self.logger.error(f"Cycle failed in session {session.session_id}: {str(e)}")
+            future.set_exception(e)
+        else:
+            with session.lock:
+                session.state['cycles_completed'] += 1
+                session.state['status'] = 'ready'
+                record = {
+                    'cycle_id': session.state['cycles_completed'],
+                    'status': 'success',
+                    'timestamp': datetime.now().isoformat(),
+                    'duration_ms': (time.perf_counter() - started) * 1000.0
+                }
+                session.history.append(record)
+            if self.on_complete is not None:
+                # The cycle itself succeeded; a failing hook must not leave the caller waiting
+                try:
+                    self.on_complete(session, record)
+                except Exception as e:
+                    self.logger.error(f"Completion hook failed in session "
+                                      f"{session.session_id}: {str(e)}")
+            future.set_result(dict(record, session_id=session.session_id, results=results))
+        finally:
+            with self._lock:
+                session.running = False
+                self._busy -= 1
+            self._dispatch()
+    
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """Snapshots of every session."""
+        with self._lock:
+            sessions = list(self.sessions.values())
+        return [session.snapshot() for session in sessions]
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel queued cycles and stop the workers."""
+        with self._lock:
+            self._closed = True
+            queued = [job for session in self.sessions.values() for job in session.queue]
+            for session in self.sessions.values():
+                session.queue.clear()
+            executor, self._executor = self._executor, None
+        for _, _, future in queued:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=wait)
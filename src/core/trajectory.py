@@ -0,0 +1,252 @@
+"""
+Trajectory - Time-optimal speed planning along waypoint paths
+Computes acceleration- or jerk-limited velocity profiles with blended corners
+"""
+
+import math
+from typing import Any, Dict, Optional, Sequence, Union
+import numpy as np
+
+
+# A scalar limit applies to every axis; a sequence gives (x, y, z) limits
+Limits = Union[float, Sequence[float]]
+
+# Segments shorter than this (meters) are treated as zero-length
+MIN_SEGMENT_LENGTH = 1e-9
+
+# Bisection steps for the jerk-limited peak velocity (interval shrinks 2^-n)
+PEAK_ITERATIONS = 48
+
+
+def _axis_limits(limits: Limits, name: str) -> np.ndarray:
+    """Broadcast a scalar or per-axis limit to three positive values."""
+    values = np.broadcast_to(np.asarray(limits, dtype=np.float64), (3,))
+    if not np.all(values > 0):
+        raise ValueError(f"{name} limits must be positive: {limits}")
+    return values
+
+
+def _path_limits(directions: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """Largest path rate per segment that keeps every axis within its limit."""
+    with np.errstate(divide='ignore'):
+        return np.min(limits / np.abs(directions), axis=1)
+
+
+def ramp_time(dv: Any, acceleration: Any, jerk: Optional[Any] = None) -> Any:
+    """
+    Time to change speed by ``dv`` from rest of acceleration to rest.
+    
+    A trapezoidal profile (``jerk`` None) switches acceleration
+    instantly; an S-curve ramps it linearly and reaches full
+    acceleration only when ``dv`` exceeds acceleration^2 / jerk. Both
+    ramps are point-symmetric in time, so the distance covered is the
+    mean of the end speeds times this duration.
+    
+    Args:
+        dv: Speed change (m/s)
+        acceleration: Path acceleration limit (m/s^2)
+        jerk: Path jerk limit (m/s^3), None for a trapezoidal profile
+        
+    Returns:
+        Ramp duration in seconds
+    """
+    dv = np.abs(dv)
+    if jerk is None:
+        return dv / acceleration
+    return np.where(dv >= acceleration ** 2 / jerk,
+                    dv / acceleration + acceleration / jerk,
+                    2.0 * np.sqrt(dv / jerk))
+
+
+def _reachable(v0: float, length: float, acceleration: float,
+               jerk: Optional[float]) -> float:
+    """Highest speed reachable from ``v0`` within ``length`` meters."""
+    if jerk is None:
+        return math.sqrt(v0 * v0 + 2.0 * acceleration * length)
+    
+    threshold = acceleration * acceleration / jerk
+    if (v0 + 0.5 * threshold) * (2.0 * acceleration / jerk) <= length:
+        # Full acceleration is reached: (2 v0 + dv)(dv / a + a / j) = 2 L
+        b = acceleration / jerk + 2.0 * v0 / acceleration
+        c = 2.0 * v0 * acceleration / jerk - 2.0 * length
+        dv = (math.sqrt(b * b - 4.0 * c / acceleration) - b) * acceleration / 2.0
+    else:
+        # Pure jerk ramp: with s = sqrt(dv / j), s^3 + (2 v0 / j) s - L / j = 0
+        p = 2.0 * v0 / jerk
+        q = length / jerk
+        root = math.sqrt(q * q / 4.0 + p ** 3 / 27.0)
+        s = float(np.cbrt(q / 2.0 + root) + np.cbrt(q / 2.0 - root))
+        dv = jerk * s * s
+    return v0 + max(dv, 0.0)
+
+
+def _junction_velocities(directions: np.ndarray, velocity: np.ndarray,
+                         acceleration: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Corner speed limits from the junction deviation model.
+    
+    The controller rounds each corner with an arc that stays within
+    ``tolerance`` of the waypoint; the speed is the one whose centripetal
+    acceleration on that arc matches the path acceleration limit.
+    Straight continuations are limited only by the segment speeds and
+    reversals stop.
+    """
+    count = len(directions) + 1
+    limits = np.zeros(count)
+    if count < 3:
+        return limits
+    
+    cosine = np.clip(np.sum(directions[:-1] * directions[1:], axis=1), -1.0, 1.0)
+    sin_half = np.sqrt((1.0 + cosine) / 2.0)
+    corner_acceleration = np.minimum(acceleration[:-1], acceleration[1:])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        blended = np.sqrt(corner_acceleration * tolerance * sin_half / (1.0 - sin_half))
+    blended = np.where(sin_half < 1.0, blended, np.inf)
+    limits[1:-1] = np.minimum(blended, np.minimum(velocity[:-1], velocity[1:]))
+    return limits
+
+
+def _limit_junctions(junction: np.ndarray, lengths: np.ndarray, acceleration: np.ndarray,
+                     jerk: Optional[np.ndarray]) -> np.ndarray:
+    """
+    Lower junction speeds to what the segments allow braking into and out of.
+    
+    A backward pass makes every junction reachable from the next one while
+    braking, then a forward pass makes it reachable from the previous one
+    while accelerating.
+    """
+    segments = len(lengths)
+    if jerk is not None:
+        # The S-curve reach has no additive form, so each junction's limit
+        # depends on its already lowered neighbour and the passes stay sequential
+        junction = junction.copy()
+        for i in range(segments - 1, -1, -1):
+            reachable = _reachable(junction[i + 1], lengths[i], acceleration[i], jerk[i])
+            junction[i] = min(junction[i], reachable)
+        for i in range(segments):
+            reachable = _reachable(junction[i], lengths[i], acceleration[i], jerk[i])
+            junction[i + 1] = min(junction[i + 1], reachable)
+        return junction
+    
+    # Squared speed grows by 2 a L per segment, so each pass is a running
+    # minimum of the limits offset by the growth between junctions; growth is
+    # measured from the binding junction so its limit (a stop) stays exact
+    squared = junction * junction
+    growth = np.concatenate([[0.0], np.cumsum(2.0 * acceleration * lengths)])
+    order = np.arange(segments + 1)
+    
+    # Backward: v_i^2 = min over k >= i of v_k^2 + growth_k - growth_i
+    offset = squared + growth
+    lowest = np.minimum.accumulate(offset[::-1])[::-1]
+    binding = np.minimum.accumulate(np.where(offset == lowest, order, segments)[::-1])[::-1]
+    squared = squared[binding] + (growth[binding] - growth)
+    
+    # Forward: v_j^2 = min over k <= j of v_k^2 + growth_j - growth_k
+    offset = squared - growth
+    lowest = np.minimum.accumulate(offset)
+    binding = np.maximum.accumulate(np.where(offset == lowest, order, 0))
+    squared = squared[binding] + (growth - growth[binding])
+    return np.sqrt(squared)
+
+
+def _peak_velocities(lengths: np.ndarray, entry: np.ndarray, exit: np.ndarray,
+                     velocity: np.ndarray, acceleration: np.ndarray,
+                     jerk: Optional[np.ndarray]) -> np.ndarray:
+    """Highest speed per segment that still leaves room to reach the exit speed."""
+    if jerk is None:
+        peak = np.sqrt(acceleration * lengths + (entry ** 2 + exit ** 2) / 2.0)
+        return np.maximum(np.minimum(peak, velocity), np.maximum(entry, exit))
+    
+    def distance(peak):
+        return ((entry + peak) * ramp_time(peak - entry, acceleration, jerk)
+                + (peak + exit) * ramp_time(peak - exit, acceleration, jerk)) / 2.0
+    
+    # Distance grows with the peak; bisect all segments at once
+    low = np.maximum(entry, exit)
+    high = velocity.copy()
+    done = distance(high) <= lengths
+    for _ in range(PEAK_ITERATIONS):
+        middle = (low + high) / 2.0
+        fits = distance(middle) <= lengths
+        low = np.where(fits, middle, low)
+        high = np.where(fits, high, middle)
+    return np.where(done, velocity, np.maximum(low, np.maximum(entry, exit)))
+
+
+def plan_trajectory(positions: np.ndarray, max_velocity: Limits, max_acceleration: Limits,
+                    max_jerk: Optional[Limits] = None,
+                    blend_tolerance: float = 0.05) -> Dict[str, Any]:
+    """
+    Plan a minimum-time speed profile through a sequence of waypoints.
+    
+    Each segment's speed, acceleration and jerk limits are the largest
+    path rates that keep every axis within its own limit. Corner speeds
+    come from the junction deviation model; a backward and a forward pass
+    then cap them to what the neighbouring segments can accelerate or
+    brake to, and every segment gets the highest peak speed that fits.
+    The path starts and ends at rest.
+    
+    Args:
+        positions: (N, 3) waypoint positions in meters
+        max_velocity: Per-axis velocity limits (m/s)
+        max_acceleration: Per-axis acceleration limits (m/s^2)
+        max_jerk: Per-axis jerk limits (m/s^3) for S-curve profiles, None
+            for trapezoidal profiles
+        blend_tolerance: Allowed corner deviation from the waypoint (meters)
+        
+    Returns:
+        Dictionary with per-segment 'feed' (peak speed, m/s) and
+        'segment_time', per-waypoint 'velocity' (speed passing the
+        waypoint) and 'time' (arrival time), and the total 'duration'
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    velocity_limits = _axis_limits(max_velocity, 'Velocity')
+    acceleration_limits = _axis_limits(max_acceleration, 'Acceleration')
+    jerk_limits = None if max_jerk is None else _axis_limits(max_jerk, 'Jerk')
+    if blend_tolerance < 0:
+        raise ValueError(f"Blend tolerance must not be negative: {blend_tolerance}")
+    
+    count = len(positions)
+    deltas = np.diff(positions, axis=0)
+    lengths = np.linalg.norm(deltas, axis=1)
+    
+    # Plan on the path without zero-length segments, then map back
+    keep = np.concatenate([[True], lengths > MIN_SEGMENT_LENGTH])[:count]
+    path = positions[keep]
+    index = np.cumsum(keep) - 1
+    
+    segment_deltas = np.diff(path, axis=0)
+    segment_lengths = np.linalg.norm(segment_deltas, axis=1)
+    directions = segment_deltas / segment_lengths[:, None] if len(path) > 1 else segment_deltas
+    velocity = _path_limits(directions, velocity_limits)
+    acceleration = _path_limits(directions, acceleration_limits)
+    jerk = None if jerk_limits is None else _path_limits(directions, jerk_limits)
+    
+    junction = _junction_velocities(directions, velocity, acceleration, blend_tolerance)
+    junction = _limit_junctions(junction, segment_lengths, acceleration, jerk)
+    segments = len(segment_lengths)
+    
+    entry, exit = junction[:-1], junction[1:]
+    peak = _peak_velocities(segment_lengths, entry, exit, velocity, acceleration, jerk)
+    accelerating = ramp_time(peak - entry, acceleration, jerk)
+    braking = ramp_time(peak - exit, acceleration, jerk)
+    ramps = ((entry + peak) * accelerating + (peak + exit) * braking) / 2.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cruise = np.where(peak > 0, np.maximum(segment_lengths - ramps, 0.0) / peak, 0.0)
+    segment_time = accelerating + braking + cruise
+    path_time = np.concatenate([[0.0], np.cumsum(segment_time)])
+    
+    # Zero-length segments take no time and keep the previous segment's feed
+    if segments:
+        feed = peak[np.clip(index[1:] - 1, 0, segments - 1)]
+    else:
+        feed = np.full(count - 1 if count else 0, velocity_limits.min())
+    time = path_time[index]
+    
+    return {
+        'feed': feed,
+        'segment_time': np.diff(time),
+        'velocity': junction[index],
+        'time': time,
+        'duration': float(time[-1]) if count else 0.0
+    }
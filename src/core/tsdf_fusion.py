@@ -0,0 +1,270 @@
+"""
+TSDF Fusion - Multi-frame fusion of RGB-D point clouds into a sparse voxel map
+Averages noisy frames into a truncated signed distance volume for stable geometry
+"""
+
+import logging
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+
+from .point_cloud import PointCloud, as_point_cloud
+
+
+# Block coordinates are biased and packed into one int64 key, 21 bits per axis
+BLOCK_KEY_BITS = 21
+BLOCK_KEY_BIAS = 1 << (BLOCK_KEY_BITS - 1)
+BLOCK_KEY_MASK = (1 << BLOCK_KEY_BITS) - 1
+
+
+class TSDFVolume:
+    """
+    Sparse, block-hashed truncated signed distance volume.
+    
+    Space is divided into blocks of ``block_size``^3 voxels. Blocks are only
+    allocated where surfaces have been observed, so memory scales with
+    surface area rather than with the bounding box. Each integration samples
+    the truncation band along every point's viewing ray and touches only
+    the blocks those samples fall in, so a frame costs O(frame points)
+    regardless of how large the map has grown. The slots of those blocks
+    are kept in ``last_blocks`` so the surface the frame observed can be
+    extracted at the same cost.
+    """
+    
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize the TSDF volume.
+        
+        Args:
+            config: Configuration for voxel size, truncation and weighting
+        """
+        self.config = config or {
+            'voxel_size': 0.05,    # meters
+            'truncation': 0.15,    # meters, half-width of the signed distance band
+            'block_size': 8,       # voxels per block edge
+            'max_weight': 64.0,    # Cap on per-voxel weight to follow slow changes
+            'initial_blocks': 1024
+        }
+        self.logger = logging.getLogger(__name__)
+        
+        self.voxel_size = float(self.config.get('voxel_size', 0.05))
+        self.truncation = float(self.config.get('truncation', 3 * self.voxel_size))
+        self.block_size = int(self.config.get('block_size', 8))
+        self.max_weight = float(self.config.get('max_weight', 64.0))
+        self.block_volume = self.block_size ** 3
+        
+        # Hash from packed block key to its slot in the voxel pools
+        self._slots = {}
+        self._block_keys = np.empty(0, dtype=np.int64)
+        self._allocate_pools(int(self.config.get('initial_blocks', 1024)))
+        self.last_blocks = np.empty(0, dtype=np.intp)
+        self.frames_integrated = 0
+        
+        self.logger.info("TSDF Volume initialized")
+    
+    def _allocate_pools(self, capacity: int) -> None:
+        """Allocate empty voxel pools for ``capacity`` blocks."""
+        self._tsdf = np.ones((capacity, self.block_volume), dtype=np.float32)
+        self._weight = np.zeros((capacity, self.block_volume), dtype=np.float32)
+        self._color = np.zeros((capacity, self.block_volume, 3), dtype=np.float32)
+        self._block_keys = np.empty(capacity, dtype=np.int64)
+    
+    def _grow_pools(self, required: int) -> None:
+        """Grow the voxel pools geometrically to hold ``required`` blocks."""
+        capacity = self._tsdf.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2)
+        tsdf, weight, color, keys = self._tsdf, self._weight, self._color, self._block_keys
+        self._allocate_pools(new_capacity)
+        self._tsdf[:capacity] = tsdf
+        self._weight[:capacity] = weight
+        self._color[:capacity] = color
+        self._block_keys[:capacity] = keys
+    
+    @property
+    def num_blocks(self) -> int:
+        """Number of allocated blocks."""
+        return len(self._slots)
+    
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the voxel pools."""
+        return self._tsdf.nbytes + self._weight.nbytes + self._color.nbytes
+    
+    def reset(self) -> None:
+        """Discard all fused data."""
+        self._slots.clear()
+        self._allocate_pools(int(self.config.get('initial_blocks', 1024)))
+        self.last_blocks = np.empty(0, dtype=np.intp)
+        self.frames_integrated = 0
+    
+    def _voxel_index(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Split world positions into packed block keys and in-block voxel offsets.
+        
+        Args:
+            positions: (N, 3) world coordinates
+            
+        Returns:
+            Tuple of (block_keys, local_indices)
+        """
+        voxels = np.floor(positions / self.voxel_size).astype(np.int64)
+        blocks = np.floor_divide(voxels, self.block_size)
+        local = voxels - blocks * self.block_size
+        local_index = (local[:, 0] * self.block_size + local[:, 1]) * self.block_size + local[:, 2]
+        
+        biased = blocks + BLOCK_KEY_BIAS
+        keys = ((biased[:, 0] << (2 * BLOCK_KEY_BITS))
+                | (biased[:, 1] << BLOCK_KEY_BITS)
+                | biased[:, 2])
+        return keys, local_index
+    
+    def _lookup_slots(self, block_keys: np.ndarray, allocate: bool) -> np.ndarray:
+        """Map unique block keys to pool slots, allocating new blocks if requested."""
+        slots = np.empty(block_keys.size, dtype=np.intp)
+        for i, key in enumerate(block_keys.tolist()):
+            slot = self._slots.get(key)
+            if slot is None:
+                if not allocate:
+                    slot = -1
+                else:
+                    slot = len(self._slots)
+                    self._grow_pools(slot + 1)
+                    self._slots[key] = slot
+                    self._block_keys[slot] = key
+            slots[i] = slot
+        return slots
+    
+    def integrate(self, point_cloud: PointCloud, pose: Optional[np.ndarray] = None) -> int:
+        """
+        Fuse one frame's point cloud into the volume.
+        
+        Args:
+            point_cloud: Camera-frame PointCloud (legacy dicts are accepted)
+            pose: Optional 4x4 camera-to-world transform (identity if omitted)
+            
+        Returns:
+            Number of voxels updated
+        """
+        cloud = as_point_cloud(point_cloud)
+        self.last_blocks = np.empty(0, dtype=np.intp)
+        if cloud.num_points == 0:
+            return 0
+        
+        xyz = cloud.xyz.astype(np.float64)
+        origin = np.zeros(3)
+        if pose is not None:
+            pose = np.asarray(pose, dtype=np.float64)
+            xyz = xyz @ pose[:3, :3].T + pose[:3, 3]
+            origin = pose[:3, 3]
+        
+        rays = xyz - origin
+        ranges = np.linalg.norm(rays, axis=1)
+        valid = ranges > self.truncation
+        xyz, rays, ranges = xyz[valid], rays[valid], ranges[valid]
+        colors = cloud.rgb[valid].astype(np.float32)
+        directions = rays / ranges[:, None]
+        
+        # Sample the truncation band at voxel spacing; positive in front of the surface
+        offsets = np.arange(-self.truncation, self.truncation + 1e-9, self.voxel_size)
+        samples = (xyz[:, None, :] + offsets[None, :, None] * directions[:, None, :]).reshape(-1, 3)
+        sdf = np.tile(np.clip(-offsets / self.truncation, -1.0, 1.0), xyz.shape[0])
+        sample_colors = np.repeat(colors, offsets.size, axis=0)
+        
+        block_keys, local_index = self._voxel_index(samples)
+        unique_keys, block_inverse = np.unique(block_keys, return_inverse=True)
+        slots = self._lookup_slots(unique_keys, allocate=True)
+        self.last_blocks = slots
+        
+        # Aggregate samples per voxel within this frame, indexed compactly
+        frame_index = block_inverse.reshape(-1) * self.block_volume + local_index
+        size = unique_keys.size * self.block_volume
+        counts = np.bincount(frame_index, minlength=size)
+        touched = np.flatnonzero(counts)
+        counts = counts[touched].astype(np.float32)
+        sdf_sum = np.bincount(frame_index, weights=sdf, minlength=size)[touched]
+        color_sum = np.column_stack([
+            np.bincount(frame_index, weights=sample_colors[:, c], minlength=size)[touched]
+            for c in range(3)
+        ])
+        
+        slot = slots[touched // self.block_volume]
+        voxel = touched % self.block_volume
+        weight = self._weight[slot, voxel]
+        total = weight + counts
+        self._tsdf[slot, voxel] = (self._tsdf[slot, voxel] * weight + sdf_sum) / total
+        self._color[slot, voxel] = ((self._color[slot, voxel] * weight[:, None] + color_sum)
+                                    / total[:, None])
+        self._weight[slot, voxel] = np.minimum(total, self.max_weight)
+        
+        self.frames_integrated += 1
+        self.logger.debug(f"Integrated frame {self.frames_integrated}: {touched.size} voxels, "
+                          f"{self.num_blocks} blocks allocated")
+        return int(touched.size)
+    
+    def query(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Look up the fused signed distance at world positions.
+        
+        Args:
+            points: (N, 3) world coordinates
+            
+        Returns:
+            Tuple of (sdf in meters, weight); unobserved voxels return NaN and 0
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        sdf = np.full(points.shape[0], np.nan, dtype=np.float32)
+        weight = np.zeros(points.shape[0], dtype=np.float32)
+        if points.shape[0] == 0 or not self._slots:
+            return sdf, weight
+        
+        block_keys, local_index = self._voxel_index(points)
+        unique_keys, block_inverse = np.unique(block_keys, return_inverse=True)
+        slot = self._lookup_slots(unique_keys, allocate=False)[block_inverse.reshape(-1)]
+        
+        known = slot >= 0
+        weight[known] = self._weight[slot[known], local_index[known]]
+        observed = weight > 0
+        sdf[observed] = (self._tsdf[slot[observed], local_index[observed]]
+                         * np.float32(self.truncation))
+        return sdf, weight
+    
+    def extract_point_cloud(self, min_weight: float = 1.0,
+                            blocks: Optional[np.ndarray] = None) -> PointCloud:
+        """
+        Extract surface voxels as a point cloud.
+        
+        Args:
+            min_weight: Minimum fused weight for a voxel to be trusted
+            blocks: Block slots to scan (e.g. ``last_blocks``), None for the
+                whole map; scanning only the blocks a frame touched keeps
+                the cost proportional to the frame rather than the map
+            
+        Returns:
+            World-frame PointCloud of voxel centers near the zero crossing
+        """
+        if blocks is None:
+            count = self.num_blocks
+            weight, tsdf = self._weight[:count], self._tsdf[:count]
+        else:
+            blocks = np.asarray(blocks, dtype=np.intp)
+            weight, tsdf = self._weight[blocks], self._tsdf[blocks]
+        band = 0.5 * self.voxel_size / self.truncation
+        surface = (weight >= min_weight) & (np.abs(tsdf) <= band)
+        row, voxel = np.nonzero(surface)
+        slot = row if blocks is None else blocks[row]
+        
+        keys = self._block_keys[slot]
+        blocks = np.column_stack([
+            (keys >> (2 * BLOCK_KEY_BITS)) & BLOCK_KEY_MASK,
+            (keys >> BLOCK_KEY_BITS) & BLOCK_KEY_MASK,
+            keys & BLOCK_KEY_MASK
+        ]) - BLOCK_KEY_BIAS
+        local = np.column_stack([
+            voxel // (self.block_size * self.block_size),
+            (voxel // self.block_size) % self.block_size,
+            voxel % self.block_size
+        ])
+        centers = (blocks * self.block_size + local + 0.5) * self.voxel_size
+        
+        return PointCloud(centers, np.rint(self._color[slot, voxel]))
@@ -0,0 +1,155 @@
+"""
+Waypoints - Array-native math on (N, 3) waypoint positions
+Distances, heel/trim compensation and safety margins as batched NumPy operations
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+import numpy as np
+from scipy.spatial.distance import cdist
+
+
+Waypoints = Union[np.ndarray, Iterable[Dict[str, float]]]
+
+
+def as_positions(vectors: Waypoints) -> np.ndarray:
+    """
+    Gather waypoints into an (N, 3) float64 array.
+    
+    Args:
+        vectors: Movement vectors as dicts (missing axes are 0.0), a single
+            dict, or anything convertible to an (N, 3) array
+            
+    Returns:
+        (N, 3) position array; arrays are returned without copying when
+        already float64
+    """
+    if isinstance(vectors, dict):
+        vectors = [vectors]
+    if isinstance(vectors, np.ndarray):
+        return np.asarray(vectors, dtype=np.float64).reshape(-1, 3)
+    rows = [(v.get('x', 0.0), v.get('y', 0.0), v.get('z', 0.0)) for v in vectors]
+    return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+
+def to_vectors(positions: np.ndarray,
+               template: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Convert positions back to movement vector dicts.
+    
+    Args:
+        positions: (N, 3) position array
+        template: Optional vectors whose other keys (feed, time, ...) are
+            carried over row by row
+            
+    Returns:
+        List of dicts with x, y and z
+    """
+    rows = np.asarray(positions, dtype=np.float64).reshape(-1, 3).tolist()
+    if template is None:
+        return [{'x': x, 'y': y, 'z': z} for x, y, z in rows]
+    return [dict(vector, x=x, y=y, z=z) for vector, (x, y, z) in zip(template, rows)]
+
+
+def distances(a: Waypoints, b: Waypoints) -> np.ndarray:
+    """
+    Row-wise Euclidean distances between matching waypoints.
+    
+    Args:
+        a: (N, 3) positions
+        b: (N, 3) positions, or a single position broadcast against ``a``
+        
+    Returns:
+        (N,) distances in meters
+    """
+    return np.linalg.norm(as_positions(b) - as_positions(a), axis=1)
+
+
+def pairwise_distances(a: Waypoints, b: Optional[Waypoints] = None) -> np.ndarray:
+    """
+    Distances between every pair of waypoints.
+    
+    Args:
+        a: (N, 3) positions
+        b: (M, 3) positions, defaults to ``a``
+        
+    Returns:
+        (N, M) distance matrix in meters
+    """
+    a = as_positions(a)
+    return cdist(a, a if b is None else as_positions(b))
+
+
+def segment_lengths(positions: Waypoints) -> np.ndarray:
+    """Lengths of the N - 1 moves between consecutive waypoints."""
+    return np.linalg.norm(np.diff(as_positions(positions), axis=0), axis=1)
+
+
+def path_length(positions: Waypoints) -> float:
+    """Total length in meters of the path through the waypoints."""
+    return float(segment_lengths(positions).sum())
+
+
+def attitude_rotation(heel: float, trim: float) -> np.ndarray:
+    """
+    Rotation from the level deck frame into the heeled and trimmed frame.
+    
+    Heel rolls about the longitudinal x axis and trim pitches about the
+    transverse y axis, both in degrees and positive by the right-hand
+    rule; heel is applied first.
+    
+    Args:
+        heel: Heel angle in degrees
+        trim: Trim angle in degrees
+        
+    Returns:
+        (3, 3) rotation matrix
+    """
+    roll, pitch = np.radians(heel), np.radians(trim)
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    roll_matrix = np.array([[1.0, 0.0, 0.0], [0.0, cr, -sr], [0.0, sr, cr]])
+    pitch_matrix = np.array([[cp, 0.0, sp], [0.0, 1.0, 0.0], [-sp, 0.0, cp]])
+    return pitch_matrix @ roll_matrix
+
+
+def compensate(positions: Waypoints, heel: float, trim: float,
+               pivot: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Move deck-frame waypoints with the barge's heel and trim.
+    
+    All waypoints are rotated in one matrix product about ``pivot``
+    (the point the barge rotates about, default the origin).
+    
+    Args:
+        positions: (N, 3) positions in the level deck frame
+        heel: Heel angle in degrees
+        trim: Trim angle in degrees
+        pivot: Rotation center in meters
+        
+    Returns:
+        (N, 3) compensated positions
+    """
+    positions = as_positions(positions)
+    rotation = attitude_rotation(heel, trim)
+    if pivot is None:
+        return positions @ rotation.T
+    pivot = np.asarray(pivot, dtype=np.float64)
+    return (positions - pivot) @ rotation.T + pivot
+
+
+def apply_margin(positions: Waypoints, margin: Union[float, Iterable[float]]) -> np.ndarray:
+    """
+    Offset waypoints by a safety margin.
+    
+    Args:
+        positions: (N, 3) positions
+        margin: Scalar vertical margin, or an (x, y, z) offset; (N, 3)
+            arrays give per-waypoint offsets
+            
+    Returns:
+        (N, 3) offset positions
+    """
+    margin = np.asarray(margin, dtype=np.float64)
+    if margin.ndim == 0:
+        margin = np.array([0.0, 0.0, float(margin)])
+    return as_positions(positions) + margin
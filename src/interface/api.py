@@ -4,15 +4,48 @@ Provides HTTP endpoints for the Digital Shadow dashboard
 """
 
 import logging
-from typing import Dict, Any
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
 from datetime import datetime
+import numpy as np
 
 from ..core.lattice_core import LatticeCore
+from ..core.point_cloud import PointCloud
 from ..core.point_cloud_processor import PointCloudProcessor
+from ..core.point_cloud_workers import PointCloudWorkerPool
 from ..core.gcode_generator import GCodeGenerator
+from ..core.tsdf_fusion import TSDFVolume
+from ..core.frame_pipeline import FramePipeline
+from ..core.metrics import MetricsRegistry
 from ..agents.validator_agent import ValidatorAgent
 from ..agents.vector_computer_agent import VectorComputerAgent
-from ..agents.gcode_translator_agent import GCodeTranslatorAgent
+from ..agents.gcode_translator_agent import DEFAULT_STREAM, GCodeTranslatorAgent
+
+
+# Drafting cycle task graph: (task name, method, dependencies)
+CYCLE_TASKS = (
+    ('point_cloud', '_task_point_cloud', ()),
+    ('processed_cloud', '_task_processed_cloud', ('point_cloud',)),
+    ('geometry', '_task_geometry', ('processed_cloud',)),
+    ('vectors', '_task_vectors', ('geometry', 'processed_cloud')),
+    ('confidence', '_task_confidence', ('geometry',)),
+    ('gcode', '_task_gcode', ('vectors',))
+)
+
+# Streaming pipeline stages and the cycle tasks each one runs
+STREAMING_STAGES = (
+    ('back_projection', ('point_cloud',)),
+    ('filtering', ('processed_cloud',)),
+    ('geometry', ('geometry',)),
+    ('vectors', ('vectors', 'confidence')),
+    ('translation', ('gcode',))
+)
+
+
+class CycleRejected(Exception):
+    """Raised by a drafting cycle stage when validation rejects its input."""
 
 
 class FreqAPI:
@@ -36,6 +69,10 @@ class FreqAPI:
         self.config = config or {}
         self.logger = logging.getLogger(__name__)
         
+        # Per-stage latency and point-count instrumentation
+        self.metrics = MetricsRegistry(config.get('metrics', {'enabled': True}))
+        self.websocket_handler = None
+        
         # Initialize core system
         self.lattice_core = LatticeCore(config.get('core', {}))
         
@@ -43,6 +80,20 @@ class FreqAPI:
         self.point_cloud_processor = PointCloudProcessor(config.get('processor', {}))
         self.gcode_generator = GCodeGenerator(config.get('gcode', {}))
         
+        # Optional worker processes for back-projection, e.g. {'workers': 4, 'slots': 8};
+        # frames then overlap across cycles without contending for the GIL
+        workers_config = config.get('workers')
+        self.worker_pool = None
+        if workers_config:
+            self.worker_pool = PointCloudWorkerPool(config.get('processor', {}), stages=(),
+                                                    **workers_config)
+        
+        # Optional multi-frame fusion; geometry is then read from the fused map.
+        # Session cycles fuse into a map of their own (see _fusion_volume)
+        fusion_config = config.get('fusion')
+        self.tsdf_volume = TSDFVolume(fusion_config) if fusion_config else None
+        self._fusion_lock = threading.Lock()
+        
         # Initialize agents
         self.validator = ValidatorAgent(config.get('validator', {}))
         self.vector_computer = VectorComputerAgent(config.get('vector_computer', {}))
@@ -53,6 +104,16 @@ class FreqAPI:
         self.lattice_core.register_agent('vector_computer', self.vector_computer)
         self.lattice_core.register_agent('gcode_translator', self.gcode_translator)
         
+        # Register the cycle task graph for async execution
+        for name, method, depends_on in CYCLE_TASKS:
+            self.lattice_core.register_task(name, getattr(self, method), depends_on)
+        
+        # Streaming pipeline state (see start_streaming)
+        self._pipeline = None
+        self._frame_counter = 0
+        self._capture_thread = None
+        self._capture_stop = threading.Event()
+        
         self.logger.info("FREQ API initialized")
     
     def process_drafting_cycle(self, rgbd_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -67,74 +128,331 @@ class FreqAPI:
         """
         self.logger.info("Processing drafting cycle")
         
+        cycle = {'rgbd_data': rgbd_data, 'started': time.perf_counter_ns()}
         try:
-            # Step 1: Process RGB-D data into point cloud
-            point_cloud = self.point_cloud_processor.process_rgbd_frame(
-                rgbd_data.get('rgb', []),
-                rgbd_data.get('depth', []),
-                rgbd_data.get('camera_intrinsics', {})
-            )
+            for name, method, _ in CYCLE_TASKS:
+                cycle[name] = getattr(self, method)(cycle)
+            return self._finish_cycle(cycle)
             
-            # Step 2: Validate point cloud
-            is_valid, message = self.validator.validate_point_cloud(point_cloud)
-            if not is_valid:
-                return {
-                    'success': False,
-                    'error': message,
-                    'timestamp': datetime.now().isoformat()
-                }
-            
-            # Step 3: Extract geometry
-            geometry_data = self.point_cloud_processor.extract_barge_geometry(point_cloud)
-            
-            # Step 4: Validate geometry
-            is_valid, message = self.validator.validate_geometry(geometry_data)
-            if not is_valid:
-                return {
-                    'success': False,
-                    'error': message,
-                    'timestamp': datetime.now().isoformat()
-                }
-            
-            # Step 5: Compute movement vectors
-            vectors = self.vector_computer.compute_movement_vectors(geometry_data)
-            vectors = self.vector_computer.optimize_path(vectors)
-            vectors = self.vector_computer.apply_safety_margins(vectors)
-            
-            # Step 6: Translate to G-Code
-            gcode = self.gcode_translator.translate_to_gcode(vectors, geometry_data)
-            
-            # Step 7: Validate G-Code
-            is_valid, message = self.validator.validate_safety_constraints(gcode)
-            if not is_valid:
-                return {
-                    'success': False,
-                    'error': message,
-                    'timestamp': datetime.now().isoformat()
-                }
-            
-            # Step 8: Update core state
-            result = self.lattice_core.start_drafting_cycle({
-                'geometry': geometry_data,
-                'vectors': vectors,
-                'gcode': gcode
-            })
-            
-            return {
-                'success': True,
-                'cycle_id': result['cycle_id'],
-                'geometry': geometry_data,
-                'gcode': gcode,
-                'timestamp': datetime.now().isoformat()
-            }
+        except CycleRejected as e:
+            return self._failure(str(e))
+        except Exception as e:
+            self.logger.error(f"Error processing drafting cycle: {str(e)}")
+            return self._failure(str(e))
+    
+    async def process_drafting_cycle_async(self, rgbd_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a complete drafting cycle on the Lattice Core task graph.
+        
+        Independent tasks run concurrently and CPU-bound work is offloaded to
+        the core's executor, so the event loop stays responsive and cycles for
+        several barges can be awaited together.
+        
+        Args:
+            rgbd_data: RGB-D sensor data
             
+        Returns:
+            Dictionary containing results and generated G-Code
+        """
+        started = time.perf_counter_ns()
+        try:
+            cycle = await self.lattice_core.run_cycle({'rgbd_data': rgbd_data})
+        except CycleRejected as e:
+            return self._failure(str(e))
         except Exception as e:
             self.logger.error(f"Error processing drafting cycle: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+            return self._failure(str(e))
+        
+        self._record_cycle(started)
+        return self._cycle_result(cycle['cycle_id'], cycle['results'])
+    
+    def start_streaming(self, on_result: Callable[[Dict[str, Any]], None],
+                        frame_source: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        """
+        Start pipelined processing of a stream of RGB-D frames.
+        
+        Back-projection, filtering, geometry, vector computation and G-Code
+        translation run as concurrent stages connected by bounded queues.
+        When a stage falls behind, frames are dropped according to the
+        streaming ``overflow_policy`` instead of queueing without bound.
+        
+        Args:
+            on_result: Called with each cycle result (success or failure),
+                tagged with its 'frame_id'
+            frame_source: Optional iterable of RGB-D frames (e.g. a camera
+                reader) consumed by a capture thread; frames can also be fed
+                with submit_frame()
+        """
+        if self._pipeline is not None:
+            raise RuntimeError("Streaming already started")
+        
+        def deliver(cycle: Dict[str, Any]) -> None:
+            on_result(dict(cycle['result'], frame_id=cycle['frame_id']))
+        
+        def reject(cycle: Dict[str, Any], error: Exception) -> None:
+            on_result(dict(self._failure(str(error)), frame_id=cycle['frame_id']))
+        
+        self._pipeline = FramePipeline(
+            self._cycle_stages(),
+            self.config.get('streaming', {'queue_size': 2, 'overflow_policy': 'drop_oldest'}),
+            on_result=deliver,
+            on_error=reject
+        )
+        self._pipeline.start()
+        
+        if frame_source is not None:
+            self._capture_stop.clear()
+            self._capture_thread = threading.Thread(
+                target=self._capture_loop, args=(frame_source,),
+                name='frame-capture', daemon=True
+            )
+            self._capture_thread.start()
+        
+        self.logger.info("Streaming drafting pipeline started")
+    
+    def submit_frame(self, rgbd_data: Dict[str, Any]) -> bool:
+        """
+        Feed one RGB-D frame into the streaming pipeline.
+        
+        Args:
+            rgbd_data: RGB-D sensor data
+            
+        Returns:
+            False if the frame was dropped because the pipeline is behind
+        """
+        if self._pipeline is None:
+            raise RuntimeError("Streaming not started")
+        self._frame_counter += 1
+        return self._pipeline.submit({
+            'rgbd_data': rgbd_data,
+            'frame_id': self._frame_counter,
+            'started': time.perf_counter_ns()
+        })
+    
+    def stop_streaming(self) -> Dict[str, Dict[str, int]]:
+        """
+        Stop capture, drain in-flight frames and stop the pipeline.
+        
+        Returns:
+            Per-stage processed, dropped and error counters
+        """
+        if self._pipeline is None:
+            return {}
+        
+        if self._capture_thread is not None:
+            self._capture_stop.set()
+            self._capture_thread.join()
+            self._capture_thread = None
+        
+        self._pipeline.stop()
+        stats = self._pipeline.get_stats()
+        self._pipeline = None
+        self.logger.info(f"Streaming drafting pipeline stopped: {stats}")
+        return stats
+    
+    def _capture_loop(self, frame_source: Iterable[Dict[str, Any]]) -> None:
+        """Pull frames from a source and submit them until stopped or exhausted."""
+        for rgbd_data in frame_source:
+            if self._capture_stop.is_set():
+                break
+            self.submit_frame(rgbd_data)
+    
+    def _cycle_stages(self) -> List[Tuple[str, Callable[[Dict[str, Any]], Dict[str, Any]]]]:
+        """Group the cycle tasks into pipeline stages for streaming mode."""
+        methods = {name: getattr(self, method) for name, method, _ in CYCLE_TASKS}
+        stages = []
+        for stage_name, task_names in STREAMING_STAGES:
+            def run_stage(cycle: Dict[str, Any], task_names=task_names) -> Dict[str, Any]:
+                for name in task_names:
+                    cycle[name] = methods[name](cycle)
+                return cycle
+            stages.append((stage_name, run_stage))
+        
+        def finish(cycle: Dict[str, Any]) -> Dict[str, Any]:
+            cycle['result'] = self._finish_cycle(cycle)
+            return cycle
+        
+        # Record the cycle as part of the final stage
+        last_name, last_stage = stages[-1]
+        stages[-1] = (last_name, lambda cycle: finish(last_stage(cycle)))
+        return stages
+    
+    def _task_point_cloud(self, cycle: Dict[str, Any]) -> PointCloud:
+        """Back-project the RGB-D frame and validate the resulting cloud."""
+        rgbd_data = cycle['rgbd_data']
+        
+        # Step 1: Process RGB-D data into point cloud
+        process_rgbd_frame = self.point_cloud_processor.process_rgbd_frame
+        if self.worker_pool is not None:
+            process_rgbd_frame = self.worker_pool.process
+        with self.metrics.span('processor.back_projection'):
+            point_cloud = process_rgbd_frame(
+                rgbd_data.get('rgb', []),
+                rgbd_data.get('depth', []),
+                rgbd_data.get('camera_intrinsics', {})
+            )
+        self.metrics.count('back_projection.points_out', len(point_cloud))
+        
+        # Step 2: Validate point cloud
+        with self.metrics.span('validator.point_cloud'):
+            self._check(self._agent(cycle, 'validator').validate_point_cloud(point_cloud))
+        return point_cloud
+    
+    def _task_processed_cloud(self, cycle: Dict[str, Any]) -> PointCloud:
+        """Downsample and filter the cloud, fusing it into the map if enabled."""
+        # Step 3: Prepare the downsampled, filtered cloud for geometry extraction
+        point_cloud = cycle['point_cloud']
+        with self.metrics.span('processor.downsample'):
+            downsampled = self.point_cloud_processor.downsample(point_cloud)
+        self.metrics.count('downsample.points_in', len(point_cloud))
+        self.metrics.count('downsample.points_out', len(downsampled))
+        
+        with self.metrics.span('processor.filter_outliers'):
+            processed_cloud = self.point_cloud_processor.filter_outliers(downsampled)
+        self.metrics.count('filter_outliers.points_in', len(downsampled))
+        self.metrics.count('filter_outliers.points_out', len(processed_cloud))
+        
+        volume = self._fusion_volume(cycle)
+        if volume is not None:
+            # A session's cycles run one at a time; only the shared map needs the lock
+            lock = self._fusion_lock if volume is self.tsdf_volume else nullcontext()
+            with self.metrics.span('fusion.integrate'), lock:
+                volume.integrate(processed_cloud, cycle['rgbd_data'].get('camera_pose'))
+                # Only the blocks in view are scanned, so cost does not grow with the map
+                processed_cloud = volume.extract_point_cloud(blocks=volume.last_blocks)
+            self.metrics.count('fusion.points_out', len(processed_cloud))
+        return processed_cloud
+    
+    def _task_geometry(self, cycle: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract and validate barge geometry."""
+        viewpoint = None
+        pose = cycle['rgbd_data'].get('camera_pose')
+        if self.tsdf_volume is not None and pose is not None:
+            viewpoint = np.asarray(pose)[:3, 3]
+        with self.metrics.span('processor.extract_geometry'):
+            geometry_data = self.point_cloud_processor.extract_barge_geometry(
+                cycle['processed_cloud'], viewpoint
+            )
+        
+        # Step 4: Validate geometry
+        with self.metrics.span('validator.geometry'):
+            self._check(self._agent(cycle, 'validator').validate_geometry(geometry_data))
+        return geometry_data
+    
+    def _task_vectors(self, cycle: Dict[str, Any]) -> List[Dict[str, float]]:
+        """Compute crane movement vectors."""
+        # Step 5: Compute movement vectors
+        vector_computer = self._agent(cycle, 'vector_computer')
+        with self.metrics.span('vector_computer.compute'):
+            vectors = vector_computer.compute_movement_vectors(cycle['geometry'])
+            if vector_computer.config.get('collision_avoidance', False):
+                vectors = vector_computer.avoid_obstacles(vectors, cycle['processed_cloud'])
+            vectors = vector_computer.optimize_path(vectors)
+            return vector_computer.apply_safety_margins(vectors)
+    
+    def _task_confidence(self, cycle: Dict[str, Any]) -> float:
+        """Assess confidence in the extracted geometry."""
+        with self.metrics.span('validator.confidence'):
+            return self._agent(cycle, 'validator').assess_confidence(cycle['geometry'])
+    
+    def _task_gcode(self, cycle: Dict[str, Any]) -> str:
+        """Translate vectors to G-Code and validate it."""
+        # Step 6: Translate to G-Code, optionally as a patch of the previous program
+        translator = self._agent(cycle, 'gcode_translator')
+        stream = self._stream_id(cycle)
+        with self.metrics.span('gcode_translator.translate'):
+            if self.config.get('gcode_delta', False):
+                delta = translator.translate_delta(cycle['vectors'], cycle['geometry'],
+                                                   stream or DEFAULT_STREAM)
+                gcode = delta.pop('gcode')
+                cycle['gcode_delta'] = delta
+            else:
+                gcode = translator.translate_to_gcode(cycle['vectors'], cycle['geometry'], stream)
+        
+        # Step 7: Validate G-Code
+        with self.metrics.span('validator.safety_constraints'):
+            self._check(self._agent(cycle, 'validator').validate_safety_constraints(gcode))
+        return gcode
+    
+    def _finish_cycle(self, cycle: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a cycle whose tasks have all run and build its response."""
+        # Step 8: Update core state
+        result = self.lattice_core.start_drafting_cycle({
+            'geometry': cycle['geometry'],
+            'vectors': cycle['vectors'],
+            'gcode': cycle['gcode']
+        })
+        self._record_cycle(cycle['started'])
+        return self._cycle_result(result['cycle_id'], cycle)
+    
+    def _record_cycle(self, started: int) -> None:
+        """Record end-to-end cycle latency and publish metrics if due."""
+        self.metrics.record('cycle.total', time.perf_counter_ns() - started)
+        
+        publish_every = self.config.get('metrics', {}).get('publish_every', 10)
+        cycles = self.lattice_core.state['cycles_completed']
+        if self.websocket_handler is not None and cycles % publish_every == 0:
+            self.websocket_handler.send_metrics_update(self.get_metrics())
+    
+    def _agent(self, cycle: Dict[str, Any], name: str) -> Any:
+        """Agent for a cycle: its session's own, else the API's."""
+        agent = cycle.get('agents', {}).get(name)
+        return agent if agent is not None else getattr(self, name)
+    
+    def _fusion_volume(self, cycle: Dict[str, Any]) -> Optional[TSDFVolume]:
+        """
+        Fusion map for a cycle, or None when fusion is disabled.
+        
+        Each session fuses into its own map, kept with its agents under
+        'tsdf_volume' and created on its first cycle; other cycles share
+        the API's map.
+        """
+        session = cycle.get('session')
+        if self.tsdf_volume is None or session is None:
+            return self.tsdf_volume
+        volume = session.agents.get('tsdf_volume')
+        if volume is None:
+            volume = session.agents['tsdf_volume'] = TSDFVolume(self.config['fusion'])
+        return volume
+    
+    @staticmethod
+    def _stream_id(cycle: Dict[str, Any]) -> Optional[str]:
+        """Barge the cycle belongs to: its session, or the frame's 'barge_id'."""
+        session = cycle.get('session')
+        if session is not None:
+            return session.session_id
+        return cycle['rgbd_data'].get('barge_id')
+    
+    @staticmethod
+    def _cycle_result(cycle_id: int, cycle: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the success response for a completed drafting cycle."""
+        result = {
+            'success': True,
+            'cycle_id': cycle_id,
+            'geometry': cycle['geometry'],
+            'gcode': cycle['gcode'],
+            'confidence': cycle['confidence'],
+            'timestamp': datetime.now().isoformat()
+        }
+        if 'gcode_delta' in cycle:
+            result['gcode_delta'] = cycle['gcode_delta']
+        return result
+    
+    @staticmethod
+    def _check(validation: Tuple[bool, str]) -> None:
+        """Raise CycleRejected for a failed (is_valid, message) validation result."""
+        is_valid, message = validation
+        if not is_valid:
+            raise CycleRejected(message)
+    
+    @staticmethod
+    def _failure(message: str) -> Dict[str, Any]:
+        """Build the failure response for a drafting cycle."""
+        return {
+            'success': False,
+            'error': message,
+            'timestamp': datetime.now().isoformat()
+        }
     
     def get_system_state(self) -> Dict[str, Any]:
         """
@@ -143,7 +461,34 @@ class FreqAPI:
         Returns:
             Dictionary containing system state
         """
-        return self.lattice_core.get_state()
+        state = self.lattice_core.get_state()
+        state['metrics'] = self.get_metrics()
+        return state
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get per-stage latency percentiles and point counters.
+        
+        Returns:
+            Dictionary of latency summaries (ms) and counters
+        """
+        return self.metrics.snapshot()
+    
+    def attach_websocket_handler(self, handler: Any) -> None:
+        """
+        Push metrics to dashboard clients every ``publish_every`` cycles.
+        
+        Args:
+            handler: WebSocketHandler used to broadcast metrics messages
+        """
+        self.websocket_handler = handler
+    
+    def shutdown(self) -> None:
+        """Stop streaming, the worker processes and the Lattice Core."""
+        self.stop_streaming()
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+        self.lattice_core.shutdown()
     
     def health_check(self) -> Dict[str, Any]:
         """
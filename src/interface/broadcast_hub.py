@@ -0,0 +1,379 @@
+"""
+Broadcast Hub - Encode-once fan-out to WebSocket clients
+Gives every client a bounded send queue drained on an event loop, evicting slow consumers
+"""
+
+import asyncio
+import inspect
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from .point_cloud_stream import PointCloudFrame
+
+
+QUEUE_POLICIES = ('drop_oldest', 'coalesce')
+
+
+class ClientChannel:
+    """
+    Send queue and counters of one connected client.
+    
+    Pending messages are kept in an OrderedDict keyed by coalescing key,
+    so replacing a queued message and dropping the oldest are both O(1).
+    """
+    
+    __slots__ = ('connection', 'max_points', 'pending', 'behind_since', 'sent',
+                 'dropped', 'wake', 'idle', 'task')
+    
+    def __init__(self, connection: Any, max_points: Optional[int] = None):
+        self.connection = connection
+        self.max_points = max_points
+        self.pending: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.behind_since: Optional[float] = None
+        self.sent = 0
+        self.dropped = 0
+        self.wake: Optional[asyncio.Event] = None
+        self.idle: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class BroadcastHub:
+    """
+    Fans messages out to clients without blocking the publisher.
+    
+    ``publish`` takes an already encoded message (text, bytes or a
+    PointCloudFrame, resolved to the client's level of detail when sent)
+    and only appends a reference to each client's queue; the bytes are
+    shared by all clients. Each client is drained by its own task on the
+    hub's event loop, so a stalled socket delays nobody else.
+    
+    Queues hold at most ``queue_size`` messages. When full the oldest is
+    dropped; with the 'coalesce' policy a message also replaces a queued
+    one with the same key (e.g. an older point cloud frame), keeping its
+    place in the queue. A client whose queue stays full for longer than
+    ``evict_after`` seconds, or whose send takes longer than
+    ``send_timeout``, is disconnected.
+    """
+    
+    def __init__(self, queue_size: int = 16, policy: str = 'coalesce',
+                 evict_after: float = 5.0, send_timeout: float = 10.0):
+        """
+        Initialize the hub.
+        
+        Args:
+            queue_size: Messages queued per client before dropping
+            policy: 'drop_oldest' or 'coalesce'
+            evict_after: Seconds a client may stay behind before eviction
+            send_timeout: Seconds a single send may take before eviction
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy} (expected one of {QUEUE_POLICIES})")
+        self.queue_size = queue_size
+        self.policy = policy
+        self.evict_after = evict_after
+        self.send_timeout = send_timeout
+        self.logger = logging.getLogger(__name__)
+        
+        self.channels: Dict[Any, ClientChannel] = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.evicted = 0
+    
+    def __len__(self) -> int:
+        return len(self.channels)
+    
+    def __contains__(self, connection: Any) -> bool:
+        return connection in self.channels
+    
+    @property
+    def connections(self) -> List[Any]:
+        """Connected clients in registration order."""
+        with self._lock:
+            return list(self.channels)
+    
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Start draining queues on an event loop.
+        
+        Args:
+            loop: Running loop to use (e.g. the server's); by default the
+                hub runs its own loop on a daemon thread
+        """
+        with self._lock:
+            if self._loop is not None:
+                return
+            if loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever,
+                                                name='broadcast-hub', daemon=True)
+                self._thread.start()
+            self._loop = loop
+            channels = list(self.channels.values())
+        for channel in channels:
+            self._call(self._open, channel)
+    
+    def add(self, connection: Any, max_points: Optional[int] = None) -> ClientChannel:
+        """
+        Register a client, starting the hub if needed.
+        
+        Args:
+            connection: Object with a ``send(data)`` method or coroutine
+            max_points: Level of detail for point cloud frames
+            
+        Returns:
+            The client's channel
+        """
+        channel = ClientChannel(connection, max_points)
+        with self._lock:
+            self.channels[connection] = channel
+            started = self._loop is not None
+        if started:
+            self._call(self._open, channel)
+        else:
+            self.start()
+        return channel
+    
+    def remove(self, connection: Any) -> bool:
+        """
+        Unregister a client in O(1) and stop its sender.
+        
+        Returns:
+            Whether the client was registered
+        """
+        with self._lock:
+            channel = self.channels.pop(connection, None)
+        if channel is None:
+            return False
+        self._call(self._cancel, channel)
+        return True
+    
+    def set_max_points(self, connection: Any, max_points: Optional[int]) -> None:
+        """Change a client's point cloud level of detail."""
+        channel = self.channels.get(connection)
+        if channel is not None:
+            channel.max_points = max_points
+    
+    def publish(self, message: Any, key: Optional[Hashable] = None) -> None:
+        """
+        Queue an encoded message for every client.
+        
+        Never blocks on the network: the call costs one dict insertion
+        per client plus a single wake-up of the hub loop.
+        
+        Args:
+            message: str, bytes-like or PointCloudFrame
+            key: Coalescing key; with the 'coalesce' policy a queued
+                message with the same key is replaced
+        """
+        now = time.monotonic()
+        evict = []
+        if key is None or self.policy != 'coalesce':
+            key = next(self._sequence)
+        with self._lock:
+            for channel in self.channels.values():
+                pending = channel.pending
+                if key in pending:
+                    # Coalesce: the newer message takes the queued one's place
+                    pending[key] = message
+                    continue
+                pending[key] = message
+                if len(pending) > self.queue_size:
+                    pending.popitem(last=False)
+                    channel.dropped += 1
+                    if channel.behind_since is None:
+                        channel.behind_since = now
+                    elif now - channel.behind_since > self.evict_after:
+                        evict.append(channel)
+            for channel in evict:
+                del self.channels[channel.connection]
+        for channel in evict:
+            self._evict(channel, f"behind for over {self.evict_after}s")
+        if self._loop is not None:
+            self._call(self._wake_all)
+    
+    def send_to(self, connection: Any, message: Any) -> None:
+        """
+        Queue a message for one client (e.g. a state snapshot).
+        
+        Args:
+            connection: Registered client
+            message: str, bytes-like or PointCloudFrame
+        """
+        with self._lock:
+            channel = self.channels.get(connection)
+            if channel is None:
+                return
+            channel.pending[next(self._sequence)] = message
+        if self._loop is not None:
+            self._call(self._wake_all)
+    
+    def call_later(self, delay: float, callback: Any) -> bool:
+        """
+        Run a callback on the hub loop after a delay.
+        
+        Args:
+            delay: Seconds to wait
+            callback: Callable without arguments
+            
+        Returns:
+            Whether the callback was scheduled (False before the hub starts)
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return False
+        self._call(loop.call_later, delay, callback)
+        return True
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until every queued message has been sent.
+        
+        Args:
+            timeout: Seconds to wait, None to wait indefinitely
+        """
+        if self._loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._drained(), self._loop)
+        future.result(timeout)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-client queue depth and counters."""
+        with self._lock:
+            channels = list(self.channels.values())
+        return {
+            'clients': len(channels),
+            'evicted': self.evicted,
+            'queued': sum(len(channel.pending) for channel in channels),
+            'sent': sum(channel.sent for channel in channels),
+            'dropped': sum(channel.dropped for channel in channels)
+        }
+    
+    def shutdown(self) -> None:
+        """Stop all senders, and the hub's own loop if it started one."""
+        with self._lock:
+            channels = list(self.channels.values())
+            self.channels.clear()
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None or loop.is_closed():
+            return
+        if thread is None:
+            for channel in channels:
+                self._call(self._cancel, channel, loop=loop)
+            return
+        asyncio.run_coroutine_threadsafe(self._stop_senders(channels), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+    
+    async def _stop_senders(self, channels: List[ClientChannel]) -> None:
+        """Cancel sender tasks and wait for them to finish."""
+        tasks = [channel.task for channel in channels if channel.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _call(self, callback: Any, *args: Any,
+              loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Run a callback on the hub loop from any thread."""
+        loop = loop or self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+    
+    def _open(self, channel: ClientChannel) -> None:
+        """Create a client's events and sender task; runs on the loop."""
+        if channel.task is not None or self.channels.get(channel.connection) is not channel:
+            return
+        channel.wake = asyncio.Event()
+        channel.idle = asyncio.Event()
+        channel.idle.set()
+        channel.task = asyncio.ensure_future(self._drain(channel))
+        if channel.pending:
+            channel.idle.clear()
+            channel.wake.set()
+    
+    def _cancel(self, channel: ClientChannel) -> None:
+        """Stop a client's sender; runs on the loop."""
+        if channel.task is not None:
+            channel.task.cancel()
+        if channel.idle is not None:
+            channel.idle.set()
+    
+    def _wake_all(self) -> None:
+        """Wake the senders of clients with queued messages; runs on the loop."""
+        for channel in list(self.channels.values()):
+            if channel.pending and channel.wake is not None:
+                channel.idle.clear()
+                channel.wake.set()
+    
+    async def _drained(self) -> None:
+        """Wait for every client's queue to empty."""
+        for channel in list(self.channels.values()):
+            if channel.idle is not None:
+                await channel.idle.wait()
+    
+    async def _drain(self, channel: ClientChannel) -> None:
+        """Send a client's queued messages in order."""
+        while True:
+            await channel.wake.wait()
+            channel.wake.clear()
+            while True:
+                with self._lock:
+                    if not channel.pending:
+                        channel.behind_since = None
+                        break
+                    _, message = channel.pending.popitem(last=False)
+                if isinstance(message, PointCloudFrame):
+                    message = message.payload(channel.max_points)
+                try:
+                    await asyncio.wait_for(self._send(channel.connection, message),
+                                           self.send_timeout)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    with self._lock:
+                        removed = self.channels.pop(channel.connection, None) is channel
+                    if removed:
+                        self._evict(channel, f"send failed ({type(e).__name__}: {e})")
+                    channel.idle.set()
+                    return
+                channel.sent += 1
+            channel.idle.set()
+    
+    @staticmethod
+    async def _send(connection: Any, message: Any) -> None:
+        """Send through an async connection, or a blocking one on a thread."""
+        send = connection.send
+        if inspect.iscoroutinefunction(send):
+            await send(message)
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, send, message)
+    
+    def _evict(self, channel: ClientChannel, reason: str) -> None:
+        """Disconnect a client that was already unregistered."""
+        self.evicted += 1
+        self.logger.warning(f"Evicting slow client: {reason}")
+        self._call(self._cancel, channel)
+        close = getattr(channel.connection, 'close', None)
+        if close is None:
+            return
+        try:
+            result = close()
+            if inspect.isawaitable(result) and self._loop is not None:
+                asyncio.run_coroutine_threadsafe(result, self._loop)
+        except Exception as e:
+            self.logger.debug(f"Closing evicted client failed: {str(e)}")
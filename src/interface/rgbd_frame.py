@@ -0,0 +1,230 @@
+"""
+RGB-D Frame - Binary RGB-D upload frames
+Packs uint16 depth and uint8 RGB behind a small intrinsics header for ingestion
+"""
+
+import struct
+import zlib
+from typing import Any, Dict, Iterator, Optional, Union
+import numpy as np
+
+
+# Header: magic, version, flags, reserved, width, height, fx, fy, cx, cy,
+# depth scale (meters per unit) as little-endian float32, then the byte
+# lengths of the depth and RGB sections that follow
+HEADER = struct.Struct('<4sBBHHH5fII')
+MAGIC = b'FQRD'
+VERSION = 1
+
+# Flag bits
+FLAG_DEPTH_ZLIB = 0x01
+FLAG_RGB_ZLIB = 0x02
+
+# Media type of one frame, or of several frames back to back
+CONTENT_TYPE = 'application/x-freq-rgbd'
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class RGBDFrameHeader:
+    """Parsed header of one binary RGB-D frame."""
+    
+    __slots__ = ('flags', 'width', 'height', 'fx', 'fy', 'cx', 'cy', 'depth_scale',
+                 'depth_bytes', 'rgb_bytes')
+    
+    def __init__(self, flags: int, width: int, height: int, fx: float, fy: float,
+                 cx: float, cy: float, depth_scale: float, depth_bytes: int, rgb_bytes: int):
+        self.flags = flags
+        self.width = width
+        self.height = height
+        self.fx = fx
+        self.fy = fy
+        self.cx = cx
+        self.cy = cy
+        self.depth_scale = depth_scale
+        self.depth_bytes = depth_bytes
+        self.rgb_bytes = rgb_bytes
+    
+    @property
+    def payload_bytes(self) -> int:
+        """Bytes of depth and RGB data following the header."""
+        return self.depth_bytes + self.rgb_bytes
+    
+    @property
+    def camera_intrinsics(self) -> Dict[str, float]:
+        """Intrinsics in the form process_drafting_cycle expects."""
+        return {'fx': self.fx, 'fy': self.fy, 'cx': self.cx, 'cy': self.cy,
+                'depth_scale': self.depth_scale}
+
+
+def parse_rgbd_header(data: Buffer) -> RGBDFrameHeader:
+    """
+    Parse and check a frame header.
+    
+    Args:
+        data: At least the first HEADER.size bytes of a frame
+        
+    Returns:
+        RGBDFrameHeader
+        
+    Raises:
+        ValueError: If the header is malformed or its sizes are inconsistent
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("RGB-D frame is shorter than its header")
+    magic, version, flags, _, width, height, *values = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported RGB-D frame: {magic!r} v{version}")
+    header = RGBDFrameHeader(flags, width, height, *values)
+    
+    pixels = width * height
+    if not pixels:
+        raise ValueError("RGB-D frame has no pixels")
+    if not header.fx or not header.fy or not header.depth_scale > 0:
+        raise ValueError("RGB-D frame needs non-zero focal lengths and a positive depth scale")
+    if not flags & FLAG_DEPTH_ZLIB and header.depth_bytes != pixels * 2:
+        raise ValueError(f"Raw depth must be {pixels * 2} bytes, got {header.depth_bytes}")
+    if not flags & FLAG_RGB_ZLIB and header.rgb_bytes not in (0, pixels * 3):
+        raise ValueError(f"Raw RGB must be {pixels * 3} bytes, got {header.rgb_bytes}")
+    return header
+
+
+def _inflate(data: Buffer, size: int, name: str) -> bytes:
+    """Decompress a zlib section that must expand to exactly ``size`` bytes."""
+    inflater = zlib.decompressobj()
+    try:
+        # Output is capped at the expected size, so a bad stream cannot balloon
+        output = inflater.decompress(data, size)
+    except zlib.error as e:
+        raise ValueError(f"Corrupt compressed {name}: {e}")
+    if len(output) != size or inflater.unconsumed_tail or not inflater.eof:
+        raise ValueError(f"Compressed {name} does not expand to {size} bytes")
+    return output
+
+
+def decode_rgbd_payload(header: RGBDFrameHeader, payload: Buffer) -> Dict[str, Any]:
+    """
+    Decode the data sections of a frame into NumPy arrays.
+    
+    Raw sections are wrapped in place with ``np.frombuffer``, so the
+    arrays are read-only views of ``payload``; compressed sections are
+    inflated once and wrapped the same way.
+    
+    Args:
+        header: Parsed frame header
+        payload: The header.payload_bytes bytes following the header
+        
+    Returns:
+        Frame with 'depth' ((H, W) uint16), 'rgb' ((H, W, 3) uint8, only
+        when the frame carries color) and 'camera_intrinsics'
+        
+    Raises:
+        ValueError: If the payload does not match the header
+    """
+    if len(payload) != header.payload_bytes:
+        raise ValueError(f"RGB-D payload must be {header.payload_bytes} bytes, "
+                         f"got {len(payload)}")
+    shape = (header.height, header.width)
+    pixels = header.width * header.height
+    payload = memoryview(payload)
+    
+    depth = payload[:header.depth_bytes]
+    if header.flags & FLAG_DEPTH_ZLIB:
+        depth = _inflate(depth, pixels * 2, 'depth')
+    frame = {
+        'depth': np.frombuffer(depth, dtype='<u2', count=pixels).reshape(shape),
+        'camera_intrinsics': header.camera_intrinsics
+    }
+    
+    if header.rgb_bytes:
+        rgb = payload[header.depth_bytes:]
+        if header.flags & FLAG_RGB_ZLIB:
+            rgb = _inflate(rgb, pixels * 3, 'RGB')
+        frame['rgb'] = np.frombuffer(rgb, dtype=np.uint8, count=pixels * 3).reshape(shape + (3,))
+    return frame
+
+
+def decode_rgbd_frame(data: Buffer) -> Dict[str, Any]:
+    """
+    Decode one complete frame.
+    
+    Args:
+        data: Header and payload of exactly one frame
+        
+    Returns:
+        Frame dictionary (see decode_rgbd_payload)
+        
+    Raises:
+        ValueError: If the data is not a single well-formed frame
+    """
+    header = parse_rgbd_header(data)
+    return decode_rgbd_payload(header, memoryview(data)[HEADER.size:])
+
+
+def iter_rgbd_frames(data: Buffer) -> Iterator[Dict[str, Any]]:
+    """
+    Decode frames stored back to back, as in a multi-frame upload.
+    
+    Args:
+        data: Concatenated frames
+        
+    Yields:
+        Frame dictionaries, each viewing its part of ``data``
+        
+    Raises:
+        ValueError: If a frame is malformed or truncated
+    """
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        header = parse_rgbd_header(view[offset:])
+        start = offset + HEADER.size
+        offset = start + header.payload_bytes
+        if offset > len(view):
+            raise ValueError("Truncated RGB-D frame")
+        yield decode_rgbd_payload(header, view[start:offset])
+
+
+def encode_rgbd_frame(depth: np.ndarray, camera_intrinsics: Dict[str, float],
+                      rgb: Optional[np.ndarray] = None, depth_scale: float = 0.001,
+                      compress: bool = False, level: int = 1) -> bytes:
+    """
+    Encode an RGB-D frame for upload.
+    
+    Args:
+        depth: (H, W) uint16 depth in units of ``depth_scale``, or float
+            depth in meters (quantized to ``depth_scale``; NaN becomes 0)
+        camera_intrinsics: fx, fy, cx, cy
+        rgb: Optional (H, W, 3) uint8 image
+        depth_scale: Meters per depth unit
+        compress: zlib-compress the depth and RGB sections
+        level: zlib compression level
+        
+    Returns:
+        Frame bytes
+    """
+    depth = np.asarray(depth)
+    if depth.ndim != 2:
+        raise ValueError(f"Depth map must be 2-D, got shape {depth.shape}")
+    if depth.dtype != np.uint16:
+        meters = np.nan_to_num(depth.astype(np.float32), nan=0.0, posinf=0.0, neginf=0.0)
+        depth = np.clip(np.rint(meters / np.float32(depth_scale)), 0, 65535).astype(np.uint16)
+    height, width = depth.shape
+    sections = [np.ascontiguousarray(depth, dtype='<u2').tobytes()]
+    if rgb is not None:
+        rgb = np.asarray(rgb, dtype=np.uint8)
+        if rgb.shape != (height, width, 3):
+            raise ValueError(f"RGB image must be {(height, width, 3)}, got {rgb.shape}")
+        sections.append(np.ascontiguousarray(rgb).tobytes())
+    
+    flags = 0
+    if compress:
+        sections = [zlib.compress(section, level) for section in sections]
+        flags = FLAG_DEPTH_ZLIB | (FLAG_RGB_ZLIB if rgb is not None else 0)
+    header = HEADER.pack(
+        MAGIC, VERSION, flags, 0, width, height,
+        float(camera_intrinsics['fx']), float(camera_intrinsics['fy']),
+        float(camera_intrinsics['cx']), float(camera_intrinsics['cy']), float(depth_scale),
+        len(sections[0]), len(sections[1]) if len(sections) > 1 else 0
+    )
+    return b''.join([header] + sections)
@@ -0,0 +1,721 @@
+"""
+FREQ Server - Asyncio HTTP and WebSocket server for the FREQ API
+Serves the REST endpoints and dashboard stream while cycles run on an executor
+"""
+
+import asyncio
+import base64
+import functools
+import hashlib
+import itertools
+import json
+import logging
+import re
+import struct
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+
+from .rgbd_frame import CONTENT_TYPE as RGBD_CONTENT_TYPE
+from .rgbd_frame import HEADER as RGBD_HEADER
+from .rgbd_frame import RGBDFrameHeader, decode_rgbd_payload, parse_rgbd_header
+from .websocket_handler import WebSocketHandler
+
+
+# RFC 6455 handshake GUID
+WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC11B85'
+
+# WebSocket opcodes
+OP_CONTINUATION, OP_TEXT, OP_BINARY = 0x0, 0x1, 0x2
+OP_CLOSE, OP_PING, OP_PONG = 0x8, 0x9, 0xA
+
+Response = Tuple[int, Union[bytes, Dict[str, Any], str], str]
+
+
+class HTTPError(Exception):
+    """Raised by a route to answer with an HTTP error status."""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class HTTPRequest:
+    """One parsed HTTP request."""
+    
+    __slots__ = ('method', 'path', 'query', 'headers', 'body', 'params', 'stream')
+    
+    def __init__(self, method: str, path: str, query: Dict[str, List[str]],
+                 headers: Dict[str, str], body: bytes = b''):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.params: Tuple[str, ...] = ()
+        self.stream: Optional['BodyStream'] = None
+
+
+class BodyStream:
+    """
+    Incremental reader for a request body, sized or chunked.
+    
+    Binary uploads are read a frame at a time, so a multi-frame capture
+    never has to be held in memory as a whole. A read that falls inside
+    one chunk is a single ``readexactly``; only reads spanning chunk
+    boundaries join pieces.
+    """
+    
+    __slots__ = ('reader', 'chunked', 'remaining', 'limit', 'received', 'done')
+    
+    def __init__(self, reader: asyncio.StreamReader, length: int = 0, chunked: bool = False,
+                 limit: Optional[int] = None):
+        self.reader = reader
+        self.chunked = chunked
+        self.remaining = 0 if chunked else length
+        self.limit = limit
+        self.received = 0
+        self.done = not chunked and length == 0
+    
+    @property
+    def exhausted(self) -> bool:
+        """Whether the whole body, including any chunked trailer, has been read."""
+        return self.done and self.remaining == 0
+    
+    async def read(self, size: int) -> bytes:
+        """
+        Read exactly ``size`` bytes.
+        
+        Returns:
+            The bytes, or b'' if the body ended before this read
+            
+        Raises:
+            HTTPError: If the body ends part way through, is malformed or
+                exceeds the limit
+        """
+        parts: List[bytes] = []
+        wanted = size
+        while wanted:
+            if not self.remaining:
+                if self.done:
+                    break
+                await self._next_chunk()
+                continue
+            take = min(wanted, self.remaining)
+            self.received += take
+            if self.limit is not None and self.received > self.limit:
+                raise HTTPError(413, f"Request body exceeds {self.limit} bytes")
+            try:
+                parts.append(await self.reader.readexactly(take))
+                self.remaining -= take
+                if not self.remaining:
+                    if self.chunked:
+                        await self.reader.readexactly(2)
+                    else:
+                        self.done = True
+            except asyncio.IncompleteReadError:
+                raise HTTPError(400, "Request body ended early")
+            wanted -= take
+        if wanted and wanted != size:
+            raise HTTPError(400, "Request body ended part way through a read")
+        return parts[0] if len(parts) == 1 else b''.join(parts)
+    
+    async def read_all(self) -> bytes:
+        """Read the rest of the body."""
+        if not self.chunked:
+            return await self.read(self.remaining)
+        parts = []
+        while not self.exhausted:
+            if not self.remaining:
+                await self._next_chunk()
+            if self.remaining:
+                parts.append(await self.read(self.remaining))
+        return b''.join(parts)
+    
+    async def _next_chunk(self) -> None:
+        """Read the next chunk size line, and the trailer after the last chunk."""
+        try:
+            line = await self.reader.readuntil(b'\r\n')
+            size = int(line.split(b';', 1)[0], 16)
+            if size == 0:
+                while await self.reader.readuntil(b'\r\n') != b'\r\n':
+                    pass
+                self.done = True
+        except (ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            raise HTTPError(400, "Malformed chunked request body")
+        self.remaining = size
+
+
+def _json_default(value: Any) -> Any:
+    """Convert NumPy values in responses to JSON types."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def to_json(value: Any) -> bytes:
+    """Encode a response body as compact JSON."""
+    return json.dumps(value, default=_json_default, separators=(',', ':')).encode()
+
+
+class WebSocketConnection:
+    """
+    Server side of an RFC 6455 WebSocket over asyncio streams.
+    
+    ``send`` is a coroutine, so the BroadcastHub awaits it on the server
+    loop; text goes out as text frames and bytes-like objects (including
+    point cloud memoryviews) as binary frames without copying.
+    """
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 max_message_bytes: int = 1 << 20):
+        self.reader = reader
+        self.writer = writer
+        self.max_message_bytes = max_message_bytes
+        self.closed = False
+    
+    async def send(self, data: Union[str, bytes, memoryview]) -> None:
+        """Send one message as a single frame."""
+        if isinstance(data, str):
+            self._write_frame(OP_TEXT, data.encode())
+        else:
+            self._write_frame(OP_BINARY, data)
+        await self.writer.drain()
+    
+    def _write_frame(self, opcode: int, payload: Union[bytes, memoryview]) -> None:
+        """Write a complete, unmasked frame."""
+        if self.closed and opcode != OP_CLOSE:
+            raise ConnectionError("WebSocket is closed")
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+        # Header and payload are written without yielding, so frames never interleave
+        self.writer.write(header)
+        if length:
+            self.writer.write(payload)
+    
+    async def receive(self) -> Optional[Union[str, bytes]]:
+        """
+        Receive the next data message, answering pings on the way.
+        
+        Returns:
+            Text or bytes, or None once the connection is closed
+        """
+        fragments: List[bytes] = []
+        message_opcode = None
+        while not self.closed:
+            try:
+                head = await self.reader.readexactly(2)
+                opcode = head[0] & 0x0F
+                length = head[1] & 0x7F
+                if length == 126:
+                    length, = struct.unpack('!H', await self.reader.readexactly(2))
+                elif length == 127:
+                    length, = struct.unpack('!Q', await self.reader.readexactly(8))
+                if length + sum(map(len, fragments)) > self.max_message_bytes:
+                    await self.close(1009)
+                    return None
+                mask = await self.reader.readexactly(4) if head[1] & 0x80 else None
+                payload = await self.reader.readexactly(length)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = True
+                return None
+            if mask is not None:
+                payload = _unmask(payload, mask)
+            
+            if opcode == OP_PING:
+                self._write_frame(OP_PONG, payload)
+            elif opcode == OP_CLOSE:
+                await self.close()
+                return None
+            elif opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                if opcode != OP_CONTINUATION:
+                    message_opcode = opcode
+                fragments.append(payload)
+                if head[0] & 0x80:
+                    data = b''.join(fragments)
+                    return data.decode() if message_opcode == OP_TEXT else data
+        return None
+    
+    async def close(self, code: int = 1000) -> None:
+        """Send a close frame and shut the stream."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._write_frame(OP_CLOSE, struct.pack('!H', code))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
+
+
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    """Apply a client's XOR mask with NumPy."""
+    data = np.frombuffer(payload, dtype=np.uint8)
+    key = np.frombuffer(mask * (len(payload) // 4 + 1), dtype=np.uint8)[:len(payload)]
+    return (data ^ key).tobytes()
+
+
+class FreqServer:
+    """
+    Asyncio HTTP/1.1 and WebSocket server wrapping FreqAPI.
+    
+    Endpoints (under ``/api/v1``):
+    - GET /health, GET /state
+    - POST /cycle/start: queues a cycle and answers 202 with a job id
+    - GET /jobs/<job_id>: job status and, once finished, the cycle result
+    - GET /cycle/<cycle_id>/gcode: G-Code of a finished cycle
+    - GET /ws: dashboard WebSocket (see WebSocketHandler)
+    
+    Cycles and request decoding run on a thread pool; the event loop only
+    parses headers and answers from cached state, so health and state
+    requests are not queued behind drafting cycles. Finished jobs are
+    pushed to WebSocket clients as 'job_update' messages together with a
+    state patch.
+    """
+    
+    def __init__(self, api: Any, config: Dict[str, Any] = None,
+                 websocket_handler: Optional[WebSocketHandler] = None):
+        """
+        Initialize the server.
+        
+        Args:
+            api: FreqAPI instance
+            config: Server configuration
+            websocket_handler: Handler for dashboard clients, created if None
+        """
+        self.config = config or {
+            'host': '0.0.0.0',
+            'port': 5000,
+            'prefix': '/api/v1',
+            'cycle_workers': 1,          # Concurrent drafting cycles
+            'max_body_bytes': 64 << 20,  # Largest accepted request body
+            'job_history': 100,          # Finished jobs kept for polling
+            'state_max_age': 0.5,        # seconds a cached /state response is served
+            'stream_max_pending': 2      # Unfinished jobs per multi-frame upload
+        }
+        self.logger = logging.getLogger(__name__)
+        self.api = api
+        self.websocket_handler = websocket_handler or WebSocketHandler()
+        self.api.attach_websocket_handler(self.websocket_handler)
+        
+        self.prefix = self.config.get('prefix', '/api/v1').rstrip('/')
+        self.jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._job_ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=self.config.get('cycle_workers', 1),
+                                            thread_name_prefix='freq-server')
+        self._state_cache: Optional[Tuple[float, bytes]] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # (method, path pattern below the prefix, handler)
+        self.routes: List[Tuple[str, Any, Callable[[HTTPRequest], Awaitable[Response]]]] = [
+            ('GET', re.compile(r'/health'), self._get_health),
+            ('GET', re.compile(r'/state'), self._get_state),
+            ('POST', re.compile(r'/cycle/start'), self._post_cycle),
+            ('POST', re.compile(r'/cycle/stream'), self._post_cycle_stream),
+            ('GET', re.compile(r'/jobs/([\w-]+)'), self._get_job),
+            ('GET', re.compile(r'/cycle/(\d+)/gcode'), self._get_gcode)
+        ]
+        self.logger.info("FREQ Server initialized")
+    
+    async def start(self) -> Tuple[str, int]:
+        """
+        Start listening.
+        
+        Returns:
+            The bound (host, port); port 0 in the config picks a free port
+        """
+        self._loop = asyncio.get_running_loop()
+        self.websocket_handler.start(self._loop)
+        self._server = await asyncio.start_server(
+            self._serve_connection, self.config.get('host', '0.0.0.0'),
+            self.config.get('port', 5000), limit=64 * 1024
+        )
+        host, port = self._server.sockets[0].getsockname()[:2]
+        self.logger.info(f"FREQ Server listening on http://{host}:{port}{self.prefix}")
+        return host, port
+    
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+    
+    async def stop(self) -> None:
+        """Stop accepting requests, disconnect clients and wait for running cycles."""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for connection in self.websocket_handler.connections:
+            await connection.close(1001)
+        self.websocket_handler.shutdown()
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self._executor.shutdown(wait=True))
+        self.logger.info("FREQ Server stopped")
+    
+    def submit_cycle(self, rgbd_data: Any,
+                     decode: Optional[Callable[[Any], Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Queue a drafting cycle and return its job record at once.
+        
+        Must be called on the server loop.
+        
+        Args:
+            rgbd_data: RGB-D frame, or a raw request body when ``decode`` is given
+            decode: Run on the executor to turn ``rgbd_data`` into a frame
+            
+        Returns:
+            Job record with 'job_id' and 'status' ('queued')
+        """
+        return self._submit(rgbd_data, decode)[0]
+    
+    def _submit(self, rgbd_data: Any, decode: Optional[Callable[[Any], Dict[str, Any]]]
+                ) -> Tuple[Dict[str, Any], 'asyncio.Future[Any]']:
+        """Queue a cycle; returns its job record and the executor future."""
+        job_id = str(next(self._job_ids))
+        job = {
+            'job_id': job_id,
+            'status': 'queued',
+            'submitted': datetime.now().isoformat()
+        }
+        self.jobs[job_id] = job
+        self._trim_jobs()
+        record = dict(job)
+        
+        def run() -> Dict[str, Any]:
+            job['status'] = 'running'
+            frame = decode(rgbd_data) if decode is not None else rgbd_data
+            return self.api.process_drafting_cycle(frame)
+        
+        future = self._loop.run_in_executor(self._executor, run)
+        future.add_done_callback(lambda done: self._finish_job(job, done))
+        return record, future
+    
+    def _finish_job(self, job: Dict[str, Any], future: 'asyncio.Future[Any]') -> None:
+        """Store a job's result and push it to dashboard clients; runs on the loop."""
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        job['result'] = result
+        job['status'] = 'done' if result.get('success') else 'failed'
+        job['finished'] = datetime.now().isoformat()
+        self._state_cache = None
+        
+        self.websocket_handler.broadcast_message({
+            'type': 'job_update',
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'cycle_id': result.get('cycle_id'),
+            'error': result.get('error')
+        })
+        self.websocket_handler.send_state_update(
+            json.loads(to_json(self.api.get_system_state())))
+    
+    def _trim_jobs(self) -> None:
+        """Forget the oldest finished jobs beyond the history size."""
+        excess = len(self.jobs) - self.config.get('job_history', 100)
+        for job_id in list(self.jobs):
+            if excess <= 0:
+                break
+            if self.jobs[job_id]['status'] in ('done', 'failed'):
+                del self.jobs[job_id]
+                excess -= 1
+    
+    async def _serve_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Serve keep-alive HTTP requests, or upgrade to a WebSocket."""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader, writer)
+                except HTTPError as e:
+                    await self._respond(writer, e.status, {'error': str(e)}, close=True)
+                    return
+                if request is None:
+                    return
+                
+                if request.path == '/ws' or request.path == f'{self.prefix}/ws':
+                    await self._serve_websocket(request, reader, writer)
+                    return
+                
+                started = time.perf_counter()
+                status, body, content_type = await self._dispatch(request)
+                close = request.headers.get('connection', '').lower() == 'close'
+                # A body the route did not read to the end leaves the stream unusable
+                close = close or not request.stream.exhausted
+                await self._respond(writer, status, body, content_type, close)
+                self.logger.debug(f"{request.method} {request.path} {status} "
+                                  f"{(time.perf_counter() - started) * 1000.0:.2f} ms")
+                if close:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if not writer.is_closing():
+                writer.close()
+    
+    async def _read_request(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> Optional[HTTPRequest]:
+        """
+        Read one request; None when the client closed the connection.
+        
+        Binary RGB-D bodies are left on ``request.stream`` for the route to
+        read frame by frame; any other body is read into ``request.body``.
+        """
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "Request header too large")
+        
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        request = HTTPRequest(method.upper(), url.path, parse_qs(url.query), headers)
+        
+        chunked = 'chunked' in headers.get('transfer-encoding', '').lower()
+        try:
+            length = 0 if chunked else int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "Malformed Content-Length")
+        max_body = self.config.get('max_body_bytes', 64 << 20)
+        binary = headers.get('content-type', '').split(';')[0].strip() == RGBD_CONTENT_TYPE
+        
+        # Binary uploads are limited per frame by the route instead
+        if binary:
+            request.stream = BodyStream(reader, length, chunked)
+        else:
+            if length > max_body:
+                raise HTTPError(413, f"Request body of {length} bytes is too large")
+            request.stream = BodyStream(reader, length, chunked, limit=max_body)
+        if headers.get('expect', '').lower() == '100-continue' and not request.stream.exhausted:
+            writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+        if not binary:
+            request.body = await request.stream.read_all()
+        return request
+    
+    async def _dispatch(self, request: HTTPRequest) -> Response:
+        """Route a request and turn errors into JSON responses."""
+        if not request.path.startswith(self.prefix + '/'):
+            return 404, {'error': f"Not found: {request.path}"}, 'application/json'
+        path = request.path[len(self.prefix):]
+        allowed = []
+        for method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            request.params = match.groups()
+            try:
+                return await handler(request)
+            except HTTPError as e:
+                return e.status, {'error': str(e)}, 'application/json'
+            except Exception as e:
+                self.logger.error(f"Error handling {request.method} {request.path}: {str(e)}")
+                return 500, {'error': str(e)}, 'application/json'
+        if allowed:
+            return 405, {'error': f"Method not allowed: {request.method}"}, 'application/json'
+        return 404, {'error': f"Not found: {request.path}"}, 'application/json'
+    
+    async def _respond(self, writer: asyncio.StreamWriter, status: int,
+                       body: Union[bytes, Dict[str, Any], str],
+                       content_type: str = 'application/json', close: bool = False) -> None:
+        """Write a complete response."""
+        if isinstance(body, str):
+            body = body.encode()
+        elif not isinstance(body, (bytes, bytearray)):
+            body = to_json(body)
+        head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+        writer.write(head.encode('latin-1'))
+        writer.write(body)
+        await writer.drain()
+    
+    async def _serve_websocket(self, request: HTTPRequest, reader: asyncio.StreamReader,
+                               writer: asyncio.StreamWriter) -> None:
+        """Complete the WebSocket handshake and relay client messages."""
+        key = request.headers.get('sec-websocket-key')
+        if request.headers.get('upgrade', '').lower() != 'websocket' or not key:
+            await self._respond(writer, 426, {'error': "WebSocket upgrade required"}, close=True)
+            return
+        accept = base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest()).decode()
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode('latin-1'))
+        await writer.drain()
+        
+        connection = WebSocketConnection(reader, writer)
+        max_points = request.query.get('max_points')
+        self.websocket_handler.register_connection(
+            connection, int(max_points[0]) if max_points else None)
+        try:
+            while True:
+                message = await connection.receive()
+                if message is None:
+                    break
+                if isinstance(message, str):
+                    self.websocket_handler.handle_client_message(connection, message)
+        finally:
+            self.websocket_handler.remove_connection(connection)
+            await connection.close()
+    
+    async def _get_health(self, request: HTTPRequest) -> Response:
+        """GET /health"""
+        return 200, self.api.health_check(), 'application/json'
+    
+    async def _get_state(self, request: HTTPRequest) -> Response:
+        """GET /state, served from a short-lived cache of the encoded state."""
+        now = time.monotonic()
+        cached = self._state_cache
+        if cached is None or now - cached[0] > self.config.get('state_max_age', 0.5):
+            state = self.api.get_system_state()
+            state['jobs'] = {
+                'queued': sum(job['status'] == 'queued' for job in self.jobs.values()),
+                'running': sum(job['status'] == 'running' for job in self.jobs.values())
+            }
+            cached = self._state_cache = (now, to_json(state))
+        return 200, cached[1], 'application/json'
+    
+    async def _post_cycle(self, request: HTTPRequest) -> Response:
+        """POST /cycle/start with a JSON or binary frame; answers 202 with the job."""
+        if request.body:
+            # Parsed off the loop but before queueing, so a malformed frame gets a 400
+            try:
+                frame = await self._loop.run_in_executor(None, decode_json_frame, request.body)
+            except ValueError as e:
+                raise HTTPError(400, f"Invalid frame: {e}")
+            job = self.submit_cycle(frame)
+        else:
+            frame = await self._read_rgbd_frame(request)
+            if frame is None:
+                raise HTTPError(400, "Request body with an RGB-D frame is required")
+            if await request.stream.read(1):
+                raise HTTPError(400, "Send multi-frame uploads to /cycle/stream")
+            job = self.submit_cycle(frame[1], functools.partial(decode_rgbd_payload, frame[0]))
+        job['status_url'] = f"{self.prefix}/jobs/{job['job_id']}"
+        return 202, job, 'application/json'
+    
+    async def _post_cycle_stream(self, request: HTTPRequest) -> Response:
+        """
+        POST /cycle/stream with binary frames back to back, usually chunked.
+        
+        Each frame is queued as soon as it has arrived. While
+        ``stream_max_pending`` of this upload's jobs are unfinished, the
+        next frame is not read, so a fast sender is held back by TCP flow
+        control rather than buffered.
+        """
+        if request.headers.get('content-type', '').split(';')[0].strip() != RGBD_CONTENT_TYPE:
+            raise HTTPError(415, f"Multi-frame uploads must be {RGBD_CONTENT_TYPE}")
+        max_pending = self.config.get('stream_max_pending', 2)
+        jobs: List[Dict[str, Any]] = []
+        pending = set()
+        try:
+            while True:
+                while len(pending) >= max_pending:
+                    _, pending = await asyncio.wait(pending,
+                                                    return_when=asyncio.FIRST_COMPLETED)
+                frame = await self._read_rgbd_frame(request)
+                if frame is None:
+                    break
+                job, future = self._submit(frame[1],
+                                           functools.partial(decode_rgbd_payload, frame[0]))
+                job['status_url'] = f"{self.prefix}/jobs/{job['job_id']}"
+                jobs.append(job)
+                pending.add(future)
+        except HTTPError as e:
+            # Frames already queued keep running; report them with the error
+            return e.status, {'error': str(e), 'frames': len(jobs), 'jobs': jobs}, \
+                'application/json'
+        if not jobs:
+            raise HTTPError(400, "Request body with an RGB-D frame is required")
+        return 202, {'frames': len(jobs), 'jobs': jobs}, 'application/json'
+    
+    async def _read_rgbd_frame(self, request: HTTPRequest
+                               ) -> Optional[Tuple[RGBDFrameHeader, bytes]]:
+        """Read the next binary frame's header and payload; None at the end of the body."""
+        head = await request.stream.read(RGBD_HEADER.size)
+        if not head:
+            return None
+        try:
+            header = parse_rgbd_header(head)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        max_body = self.config.get('max_body_bytes', 64 << 20)
+        if header.payload_bytes > max_body:
+            raise HTTPError(413, f"RGB-D frame of {header.payload_bytes} bytes is too large")
+        payload = await request.stream.read(header.payload_bytes)
+        if len(payload) != header.payload_bytes:
+            raise HTTPError(400, "Truncated RGB-D frame")
+        return header, payload
+    
+    async def _get_job(self, request: HTTPRequest) -> Response:
+        """GET /jobs/<job_id>"""
+        job = self.jobs.get(request.params[0])
+        if job is None:
+            raise HTTPError(404, f"Unknown job: {request.params[0]}")
+        return 200, job, 'application/json'
+    
+    async def _get_gcode(self, request: HTTPRequest) -> Response:
+        """GET /cycle/<cycle_id>/gcode"""
+        cycle_id = int(request.params[0])
+        for job in reversed(self.jobs.values()):
+            result = job.get('result') or {}
+            if result.get('cycle_id') == cycle_id and result.get('gcode'):
+                return 200, result['gcode'], 'text/plain; charset=utf-8'
+        raise HTTPError(404, f"No G-Code for cycle {cycle_id}")
+
+
+def decode_json_frame(body: bytes) -> Dict[str, Any]:
+    """
+    Decode a JSON RGB-D frame into the arrays process_drafting_cycle expects.
+    
+    Raises:
+        ValueError: If the body is not a frame with a 2-D numeric 'depth' map
+            and a 'camera_intrinsics' object
+    """
+    frame = json.loads(body)
+    if not isinstance(frame, dict) or 'depth' not in frame or 'camera_intrinsics' not in frame:
+        raise ValueError("Frame must contain 'depth' and 'camera_intrinsics'")
+    if not isinstance(frame['camera_intrinsics'], dict):
+        raise ValueError("'camera_intrinsics' must be an object")
+    try:
+        frame['depth'] = np.asarray(frame['depth'], dtype=np.float32)
+        frame['rgb'] = np.asarray(frame.get('rgb', []), dtype=np.uint8)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Frame arrays must be numeric and rectangular: {e}")
+    if frame['depth'].ndim != 2:
+        raise ValueError(f"'depth' must be a 2-D array, got shape {frame['depth'].shape}")
+    return frame
@@ -0,0 +1,135 @@
+"""
+State Store - Versioned dashboard state with delta patches
+Tracks the state sent to clients and emits only the keys that changed
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+Path = List[Any]
+
+
+def _copy(value: Any) -> Any:
+    """Private copy of a JSON-like value, so later caller edits are detected."""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy(item) for item in value]
+    return value
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any],
+               prune: bool = True) -> Tuple[Dict[str, Any], Dict[str, Any], List[Path]]:
+    """
+    Compare two nested state dicts.
+    
+    Nested dicts present in both are compared key by key; any other
+    value is compared with ``==`` and sent whole when it differs.
+    
+    Args:
+        old: Previous state (never modified)
+        new: Current state
+        prune: Report keys missing from ``new`` as removed; False merges
+            ``new`` into ``old`` instead
+            
+    Returns:
+        Tuple of (merged state, changed values as a nested dict of the
+        changed keys only, paths of removed keys). Unchanged subtrees of
+        the merged state are shared with ``old``.
+    """
+    merged = dict(old)
+    changed: Dict[str, Any] = {}
+    removed: List[Path] = []
+    for key, value in new.items():
+        if isinstance(value, tuple):
+            value = _copy(value)
+        if key in old:
+            previous = old[key]
+            if isinstance(previous, tuple):
+                previous = _copy(previous)
+            if isinstance(value, dict) and isinstance(previous, dict):
+                sub_merged, sub_changed, sub_removed = diff_state(previous, value, prune)
+                merged[key] = sub_merged
+                if sub_changed:
+                    changed[key] = sub_changed
+                removed.extend([key] + path for path in sub_removed)
+                continue
+            if type(previous) is type(value) and previous == value:
+                continue
+        merged[key] = changed[key] = _copy(value)
+    if prune:
+        for key in old:
+            if key not in new:
+                del merged[key]
+                removed.append([key])
+    if not changed and not removed:
+        return old, changed, removed
+    return merged, changed, removed
+
+
+def apply_patch(state: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a state patch (as sent in 'state_patch' messages) in place.
+    
+    Args:
+        state: Client copy of the state
+        patch: Patch with 'set' (nested changed values) and 'unset' (paths)
+        
+    Returns:
+        The updated state
+    """
+    def merge(target: Dict[str, Any], changes: Dict[str, Any]) -> None:
+        for key, value in changes.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                merge(target[key], value)
+            else:
+                target[key] = value
+    
+    merge(state, patch.get('set', {}))
+    for path in patch.get('unset', []):
+        parent = state
+        for key in path[:-1]:
+            parent = parent.get(key, {})
+        parent.pop(path[-1], None)
+    return state
+
+
+class StateStore:
+    """
+    Versioned copy of the state last sent to dashboard clients.
+    
+    Each update that changes anything bumps the version and yields a
+    patch of just the changed keys; clients apply patches in sequence
+    and ask for a snapshot when they see a gap. The stored state is
+    copy-on-write, so snapshots can be taken without copying.
+    """
+    
+    def __init__(self):
+        self.state: Dict[str, Any] = {}
+        self.version = 0
+        self.lock = threading.RLock()
+    
+    def update(self, state: Dict[str, Any], partial: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Record a new state.
+        
+        Args:
+            state: Full state, or the changed subset when ``partial``
+            partial: Merge into the stored state instead of replacing it
+            
+        Returns:
+            Patch with 'seq', 'set' and 'unset', or None if nothing changed
+        """
+        with self.lock:
+            merged, changed, removed = diff_state(self.state, state, prune=not partial)
+            if not changed and not removed:
+                return None
+            self.state = merged
+            self.version += 1
+            return {'seq': self.version, 'set': changed, 'unset': removed}
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current version and state."""
+        with self.lock:
+            return {'seq': self.version, 'data': self.state}
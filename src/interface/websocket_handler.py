@@ -3,21 +3,29 @@ WebSocket Handler for real-time communication
 Provides real-time updates to the Digital Shadow dashboard
 """
 
+import asyncio
 import logging
 import json
-from typing import Dict, Any, Callable
+import threading
+import time
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from .broadcast_hub import BroadcastHub
+from .point_cloud_stream import encode_point_cloud_frame
+from .state_store import StateStore
+
 
 class WebSocketHandler:
     """
     Handles WebSocket connections for real-time updates.
     
     Provides:
-    - Real-time point cloud streaming
-    - Live system state updates
-    - Progress notifications
+    - Real-time binary point cloud streaming with per-client level of detail
+    - Live system state updates as versioned delta patches
+    - Rate-limited progress notifications
     - Alert broadcasting
+    - Per-client bounded send queues with slow-consumer eviction
     """
     
     def __init__(self, config: Dict[str, Any] = None):
@@ -29,25 +37,64 @@ class WebSocketHandler:
         """
         self.config = config or {
             'max_connections': 100,
-            'heartbeat_interval': 30  # seconds
+            'heartbeat_interval': 30,  # seconds
+            'point_cloud_max_points': None,  # Default level of detail (None = full)
+            'send_queue_size': 16,     # Messages queued per client
+            'queue_policy': 'coalesce',  # coalesce or drop_oldest
+            'evict_after': 5.0,        # seconds a client may stay behind
+            'send_timeout': 10.0,      # seconds
+            'progress_max_rate': 10.0  # Progress updates per second per cycle
         }
         self.logger = logging.getLogger(__name__)
-        self.connections = []
+        self.hub = BroadcastHub(
+            queue_size=self.config.get('send_queue_size', 16),
+            policy=self.config.get('queue_policy', 'coalesce'),
+            evict_after=self.config.get('evict_after', 5.0),
+            send_timeout=self.config.get('send_timeout', 10.0)
+        )
+        self._point_cloud_sequence = 0
+        self.state_store = StateStore()
+        
+        # Per-cycle progress throttling: cycle_id -> [last sent, pending progress]
+        self._progress: Dict[int, List[Any]] = {}
+        self._progress_lock = threading.Lock()
         self.logger.info("WebSocket Handler initialized")
     
-    def register_connection(self, connection: Any) -> None:
+    @property
+    def connections(self) -> List[Any]:
+        """Registered connections in registration order."""
+        return self.hub.connections
+    
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Send on the given event loop (e.g. the server's) instead of a
+        background thread. Call before registering connections.
+        
+        Args:
+            loop: Running event loop
+        """
+        self.hub.start(loop)
+    
+    def register_connection(self, connection: Any, max_points: Optional[int] = None) -> None:
         """
         Register a new WebSocket connection.
         
         Args:
             connection: WebSocket connection object
+            max_points: Most points per point cloud frame for this client,
+                defaulting to config 'point_cloud_max_points'
         """
-        if len(self.connections) >= self.config['max_connections']:
+        if len(self.hub) >= self.config['max_connections']:
             self.logger.warning("Maximum connections reached")
             return
         
-        self.connections.append(connection)
-        self.logger.info(f"Connection registered: {len(self.connections)} active")
+        if max_points is None:
+            max_points = self.config.get('point_cloud_max_points')
+        # Under the store lock no patch can slip in between snapshot and registration
+        with self.state_store.lock:
+            self.hub.add(connection, max_points)
+            self.resync(connection)
+        self.logger.info(f"Connection registered: {len(self.hub)} active")
     
     def remove_connection(self, connection: Any) -> None:
         """
@@ -56,56 +103,149 @@ class WebSocketHandler:
         Args:
             connection: WebSocket connection object
         """
-        if connection in self.connections:
-            self.connections.remove(connection)
-            self.logger.info(f"Connection removed: {len(self.connections)} active")
+        if self.hub.remove(connection):
+            self.logger.info(f"Connection removed: {len(self.hub)} active")
     
-    def broadcast_message(self, message: Dict[str, Any]) -> None:
+    def resync(self, connection: Any) -> None:
+        """
+        Send a client the full state snapshot.
+        
+        Clients receive one on connect and request another (see
+        handle_client_message) when a patch sequence number is skipped.
+        
+        Args:
+            connection: Registered WebSocket connection
+        """
+        snapshot = self.state_store.snapshot()
+        message = {
+            'type': 'state_snapshot',
+            'seq': snapshot['seq'],
+            'data': snapshot['data'],
+            'timestamp': datetime.now().isoformat()
+        }
+        self.hub.send_to(connection, json.dumps(message))
+    
+    def handle_client_message(self, connection: Any, message: str) -> None:
+        """
+        Handle a control message from a client.
+        
+        Supported messages are ``{"type": "resync"}`` and
+        ``{"type": "level_of_detail", "max_points": N}``.
+        
+        Args:
+            connection: Registered WebSocket connection
+            message: JSON text received from the client
+        """
+        try:
+            request = json.loads(message)
+            kind = request['type']
+        except (ValueError, TypeError, KeyError):
+            self.logger.warning("Ignoring malformed client message")
+            return
+        if kind == 'resync':
+            self.resync(connection)
+        elif kind == 'level_of_detail':
+            self.set_level_of_detail(connection, request.get('max_points'))
+        else:
+            self.logger.warning(f"Ignoring unknown client message type: {kind}")
+    
+    def set_level_of_detail(self, connection: Any, max_points: Optional[int]) -> None:
+        """
+        Limit the point cloud frames sent to one client.
+        
+        Args:
+            connection: Registered WebSocket connection
+            max_points: Most points per frame, None for full resolution
+        """
+        self.hub.set_max_points(connection, max_points)
+    
+    def broadcast_message(self, message: Dict[str, Any], key: Optional[str] = None) -> None:
         """
         Broadcast a message to all connected clients.
         
+        The message is serialized once and queued for every client; this
+        never waits on the network (see BroadcastHub).
+        
         Args:
             message: Message to broadcast
+            key: Coalescing key; a queued message with the same key is
+                replaced under the 'coalesce' policy
         """
         message['timestamp'] = datetime.now().isoformat()
         json_message = json.dumps(message)
         
-        self.logger.debug(f"Broadcasting to {len(self.connections)} clients")
+        self.logger.debug(f"Broadcasting to {len(self.hub)} clients")
+        self.hub.publish(json_message, key)
+    
+    def send_point_cloud_update(self, point_cloud: Any) -> None:
+        """
+        Stream a point cloud to connected clients as a binary frame.
+        
+        The cloud is encoded once (see point_cloud_stream): int16 positions
+        against a per-frame origin and scale, RGB565 colors, 8 bytes per
+        point in progressive order. Each client receives a memoryview of
+        the first ``max_points`` records, an even decimation, so no client
+        costs an extra encode or copy. At full resolution 300k points at
+        10 Hz is 24 MB/s per client. A frame still queued for a client is
+        replaced by the newer one.
+        
+        Args:
+            point_cloud: PointCloud or legacy dict with 'points' and 'colors'
+        """
+        self._point_cloud_sequence += 1
+        frame = encode_point_cloud_frame(point_cloud['points'], point_cloud.get('colors'),
+                                         self._point_cloud_sequence)
         
-        # In production, this would actually send to WebSocket connections
-        # Scaffold implementation
-        for connection in self.connections:
-            # connection.send(json_message)
-            pass
+        self.logger.debug(f"Streaming {frame.num_points} points to {len(self.hub)} clients")
+        self.hub.publish(frame, 'point_cloud')
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until queued messages have been sent to every client."""
+        self.hub.flush(timeout)
+    
+    def shutdown(self) -> None:
+        """Stop sending and forget all connections."""
+        self.hub.shutdown()
     
-    def send_point_cloud_update(self, point_cloud: Dict[str, Any]) -> None:
+    def send_state_update(self, state: Dict[str, Any], partial: bool = False) -> None:
         """
-        Send point cloud update to connected clients.
+        Send the keys of the system state that changed to connected clients.
+        
+        The state is diffed against the last one sent (see StateStore) and
+        only a patch goes out: nested changed values under 'set', removed
+        key paths under 'unset', and a sequence number. Patches are never
+        coalesced; a client that misses one requests a resync. Nothing is
+        sent when the state is unchanged.
         
         Args:
-            point_cloud: Point cloud data
+            state: System state data
+            partial: Merge ``state`` into the current state rather than
+                replacing it (keys not given are kept)
         """
-        message = {
-            'type': 'point_cloud_update',
-            'data': {
-                'num_points': point_cloud.get('num_points', 0),
-                'frame_shape': point_cloud.get('frame_shape', [])
+        with self.state_store.lock:
+            patch = self.state_store.update(state, partial)
+            if patch is None:
+                return
+            message = {
+                'type': 'state_patch',
+                'seq': patch['seq'],
+                'set': patch['set'],
+                'unset': patch['unset']
             }
-        }
-        self.broadcast_message(message)
+            self.broadcast_message(message)
     
-    def send_state_update(self, state: Dict[str, Any]) -> None:
+    def send_metrics_update(self, metrics: Dict[str, Any]) -> None:
         """
-        Send system state update to connected clients.
+        Send per-stage latency and counter metrics to connected clients.
         
         Args:
-            state: System state data
+            metrics: Metrics snapshot (see FreqAPI.get_metrics)
         """
         message = {
-            'type': 'state_update',
-            'data': state
+            'type': 'metrics_update',
+            'data': metrics
         }
-        self.broadcast_message(message)
+        self.broadcast_message(message, 'metrics')
     
     def send_alert(self, alert_type: str, alert_message: str) -> None:
         """
@@ -126,13 +266,56 @@ class WebSocketHandler:
         """
         Send progress update for a drafting cycle.
         
+        At most ``progress_max_rate`` updates per second are sent per
+        cycle. Faster updates are coalesced: the latest value goes out at
+        the end of the interval. Completion (100) is always sent at once.
+        
         Args:
             cycle_id: Cycle identifier
             progress: Progress percentage (0-100)
         """
+        max_rate = self.config.get('progress_max_rate', 10.0)
+        now = time.monotonic()
+        with self._progress_lock:
+            entry = self._progress.get(cycle_id)
+            if progress >= 100 or not max_rate:
+                self._progress.pop(cycle_id, None)
+            elif entry is None or now - entry[0] >= 1.0 / max_rate:
+                if entry is None:
+                    self._prune_progress(now)
+                self._progress[cycle_id] = [now, None]
+            else:
+                scheduled = entry[1] is not None
+                entry[1] = progress
+                if not scheduled and not self.hub.call_later(
+                        entry[0] + 1.0 / max_rate - now,
+                        lambda: self._send_pending_progress(cycle_id)):
+                    entry[1] = None
+                return
+        self._publish_progress(cycle_id, progress)
+    
+    def _send_pending_progress(self, cycle_id: int) -> None:
+        """Send the progress held back for a cycle during its interval."""
+        with self._progress_lock:
+            entry = self._progress.get(cycle_id)
+            if entry is None or entry[1] is None:
+                return
+            progress = entry[1]
+            entry[:] = [time.monotonic(), None]
+        self._publish_progress(cycle_id, progress)
+    
+    def _prune_progress(self, now: float) -> None:
+        """Forget throttling state of cycles that stopped reporting."""
+        stale = [cycle_id for cycle_id, (sent, pending) in self._progress.items()
+                 if pending is None and now - sent > 60.0]
+        for cycle_id in stale:
+            del self._progress[cycle_id]
+    
+    def _publish_progress(self, cycle_id: int, progress: float) -> None:
+        """Broadcast one progress update."""
         message = {
             'type': 'progress_update',
             'cycle_id': cycle_id,
             'progress': progress
         }
-        self.broadcast_message(message)
+        self.broadcast_message(message, f'progress:{cycle_id}')
@@ -0,0 +1,239 @@
+"""
+Tests for FREQ API
+"""
+
+import asyncio
+import threading
+import pytest
+import numpy as np
+from src.interface.api import FreqAPI
+from src.interface.websocket_handler import WebSocketHandler
+
+
+INTRINSICS = {'fx': 525.0, 'fy': 525.0, 'cx': 319.5, 'cy': 239.5}
+
+
+def make_rgbd_frame(freeboard=1.5, seed=0):
+    """Synthetic 480x640 frame: water at 12 m with a barge deck patch above it."""
+    rng = np.random.default_rng(seed)
+    depth = np.full((480, 640), 12.0, dtype=np.float32)
+    depth[140:340, 120:520] = 12.0 - freeboard
+    depth += rng.normal(0.0, 0.005, depth.shape).astype(np.float32)
+    return {
+        'rgb': np.zeros((480, 640, 3), dtype=np.uint8),
+        'depth': depth,
+        'camera_intrinsics': INTRINSICS
+    }
+
+
+def make_api(**overrides):
+    config = {
+        'processor': {
+            'max_depth': 20.0, 'min_depth': 0.1, 'voxel_size': 0.1, 'random_seed': 0
+        }
+    }
+    config.update(overrides)
+    return FreqAPI(config)
+
+
+class TestFreqAPI:
+    def test_process_drafting_cycle(self):
+        """Test a full cycle on a synthetic barge frame."""
+        api = make_api()
+        
+        result = api.process_drafting_cycle(make_rgbd_frame())
+        
+        assert result['success'] is True
+        assert result['cycle_id'] == 1
+        assert result['geometry']['draft'] == pytest.approx(3.66 - 1.5, abs=0.02)
+        assert 'G28' in result['gcode']
+    
+    def test_default_cycle_downsamples_before_outlier_pass(self):
+        """Test that processor defaults shrink the cloud before the outlier pass runs on it."""
+        api = FreqAPI({'processor': {'max_depth': 20.0}})
+        
+        result = api.process_drafting_cycle(make_rgbd_frame())
+        counters = api.get_metrics()['counters']
+        
+        assert result['success'] is True
+        assert counters['downsample.points_out'] < counters['downsample.points_in'] / 4
+        assert 0 < counters['filter_outliers.points_out'] < counters['filter_outliers.points_in']
+    
+    def test_process_drafting_cycle_rejects_empty_frame(self):
+        """Test that a frame without valid depth fails validation."""
+        api = make_api()
+        frame = make_rgbd_frame()
+        frame['depth'] = np.zeros((480, 640), dtype=np.float32)
+        
+        result = api.process_drafting_cycle(frame)
+        
+        assert result['success'] is False
+        assert 'Insufficient points' in result['error']
+    
+    def test_process_drafting_cycle_async(self):
+        """Test concurrent async cycles for several barges."""
+        api = make_api()
+        frames = [make_rgbd_frame(freeboard=f, seed=i) for i, f in enumerate((1.2, 1.8))]
+        
+        async def run_all():
+            return await asyncio.gather(*(api.process_drafting_cycle_async(f) for f in frames))
+        
+        results = asyncio.run(run_all())
+        
+        assert all(r['success'] for r in results)
+        assert sorted(r['cycle_id'] for r in results) == [1, 2]
+        assert results[0]['geometry']['draft'] == pytest.approx(3.66 - 1.2, abs=0.02)
+        assert results[1]['geometry']['draft'] == pytest.approx(3.66 - 1.8, abs=0.02)
+        assert api.lattice_core.state['cycles_completed'] == 2
+    
+    def test_process_drafting_cycle_async_rejects_empty_frame(self):
+        """Test that async validation failures return a failure result."""
+        api = make_api()
+        frame = make_rgbd_frame()
+        frame['depth'] = np.zeros((480, 640), dtype=np.float32)
+        
+        result = asyncio.run(api.process_drafting_cycle_async(frame))
+        
+        assert result['success'] is False
+        assert 'Insufficient points' in result['error']
+    
+    def test_cycle_metrics(self):
+        """Test that stage latencies and point counts reach the system state."""
+        api = make_api()
+        handler = WebSocketHandler()
+        sent = []
+        handler.send_metrics_update = sent.append
+        api.attach_websocket_handler(handler)
+        
+        api.process_drafting_cycle(make_rgbd_frame())
+        metrics = api.get_system_state()['metrics']
+        
+        assert metrics['latency']['cycle.total']['count'] == 1
+        assert metrics['latency']['processor.downsample']['p50_ms'] > 0
+        counters = metrics['counters']
+        assert counters['downsample.points_in'] == counters['back_projection.points_out']
+        assert counters['filter_outliers.points_in'] == counters['downsample.points_out']
+        assert sent == []
+        
+        for _ in range(9):
+            api.process_drafting_cycle(make_rgbd_frame())
+        assert len(sent) == 1
+        assert sent[0]['latency']['cycle.total']['count'] == 10
+    
+    def test_metrics_disabled(self):
+        """Test that disabling metrics leaves the snapshot empty."""
+        api = make_api(metrics={'enabled': False})
+        
+        api.process_drafting_cycle(make_rgbd_frame())
+        
+        assert api.get_system_state()['metrics']['latency'] == {}
+    
+    def test_streaming_pipeline(self):
+        """Test that streamed frames produce tagged results."""
+        api = make_api(streaming={'queue_size': 8, 'overflow_policy': 'block'})
+        results = []
+        done = threading.Event()
+        
+        def collect(result):
+            results.append(result)
+            if len(results) == 3:
+                done.set()
+        
+        api.start_streaming(collect, frame_source=(make_rgbd_frame(seed=i) for i in range(3)))
+        assert done.wait(timeout=30)
+        stats = api.stop_streaming()
+        
+        assert sorted(r['frame_id'] for r in results) == [1, 2, 3]
+        assert all(r['success'] for r in results)
+        assert stats['translation']['processed'] == 3
+    
+    def test_worker_pool_back_projection(self):
+        """Test that configured workers back-project frames for single and streamed cycles."""
+        api = make_api(workers={'workers': 1, 'slots': 2, 'max_pixels': 640 * 480},
+                       streaming={'queue_size': 4, 'overflow_policy': 'block'})
+        try:
+            pooled = api.process_drafting_cycle(make_rgbd_frame())
+            results = []
+            api.start_streaming(results.append)
+            for seed in range(3):
+                api.submit_frame(make_rgbd_frame(seed=seed))
+            api.stop_streaming()
+        finally:
+            api.shutdown()
+        
+        assert api.worker_pool._closed
+        expected = make_api().process_drafting_cycle(make_rgbd_frame())
+        assert pooled['success'] is True
+        assert pooled['geometry']['draft'] == pytest.approx(expected['geometry']['draft'])
+        assert pooled['gcode'] == expected['gcode']
+        assert sorted(r['frame_id'] for r in results if r['success']) == [1, 2, 3]
+    
+    def test_streaming_reports_rejected_frames(self):
+        """Test that validation failures are delivered as failure results."""
+        api = make_api(streaming={'queue_size': 4, 'overflow_policy': 'block'})
+        results = []
+        
+        api.start_streaming(results.append)
+        frame = make_rgbd_frame()
+        frame['depth'] = np.zeros((480, 640), dtype=np.float32)
+        api.submit_frame(frame)
+        api.stop_streaming()
+        
+        assert len(results) == 1
+        assert results[0]['success'] is False
+        assert results[0]['frame_id'] == 1
+    
+    def test_gcode_delta(self):
+        """Test that consecutive identical cycles produce an empty G-Code patch."""
+        api = make_api(gcode_delta=True)
+        frame = make_rgbd_frame()
+        
+        first = api.process_drafting_cycle(frame)
+        second = api.process_drafting_cycle(frame)
+        
+        assert first['gcode_delta']['full'] is True
+        assert second['gcode_delta']['base_version'] == first['gcode_delta']['version']
+        assert second['gcode_delta']['patches'] == []
+        assert second['gcode'] == first['gcode']
+    
+    def test_gcode_delta_per_barge(self):
+        """Test that frames tagged with different barges are patched separately."""
+        api = make_api(gcode_delta=True)
+        frames = {barge: dict(make_rgbd_frame(freeboard, seed), barge_id=barge)
+                  for barge, freeboard, seed in (('a', 1.2, 0), ('b', 1.8, 1))}
+        
+        first = {barge: api.process_drafting_cycle(frame) for barge, frame in frames.items()}
+        second = api.process_drafting_cycle(frames['a'])
+        
+        assert all(r['gcode_delta']['full'] for r in first.values())
+        assert second['gcode_delta']['base_version'] == first['a']['gcode_delta']['version']
+        assert second['gcode_delta']['patches'] == []
+        assert second['gcode'] == first['a']['gcode']
+    
+    def test_sessions_keep_own_fusion_map_and_program(self):
+        """Test that session cycles fuse and patch G-Code per barge."""
+        api = make_api(fusion={'voxel_size': 0.1}, gcode_delta=True)
+        core = api.lattice_core
+        core.create_session('barge-a')
+        core.create_session('barge-b')
+        frames = {'barge-a': make_rgbd_frame(1.2, 0), 'barge-b': make_rgbd_frame(1.8, 1)}
+        
+        def run(session_id):
+            return core.submit_cycle(session_id, {'rgbd_data': frames[session_id]}).result(30)
+        
+        first = {session_id: run(session_id)['results'] for session_id in frames}
+        second = run('barge-a')['results']
+        core.shutdown()
+        
+        assert all(r['gcode_delta']['full'] for r in first.values())
+        assert second['gcode_delta']['base_version'] == first['barge-a']['gcode_delta']['version']
+        assert second['gcode_delta']['patches'] == []
+        
+        # Each session's map holds only its own barge, like a map fused on its own
+        for session_id, frame in frames.items():
+            solo = make_api(fusion={'voxel_size': 0.1})
+            solo.process_drafting_cycle(frame)
+            volume = first[session_id]['agents']['tsdf_volume']
+            assert volume.num_blocks == solo.tsdf_volume.num_blocks > 0
+        assert first['barge-a']['agents']['tsdf_volume'] is second['agents']['tsdf_volume']
+        assert api.tsdf_volume.num_blocks == 0
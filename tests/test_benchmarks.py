@@ -0,0 +1,67 @@
+"""
+Tests for the pipeline benchmark harness
+"""
+
+import json
+import pytest
+import numpy as np
+from benchmarks.scenes import RESOLUTIONS, make_barge_frame
+from benchmarks.run_pipeline import benchmark_case, compare, main
+
+
+class TestScenes:
+    @pytest.mark.parametrize('resolution', list(RESOLUTIONS))
+    def test_frame_shapes(self, resolution):
+        """Test that frames match the requested resolution."""
+        width, height = RESOLUTIONS[resolution]
+        frame = make_barge_frame(resolution)
+        
+        assert frame['depth'].shape == (height, width)
+        assert frame['rgb'].shape == (height, width, 3)
+        assert frame['camera_intrinsics']['cx'] == pytest.approx((width - 1) / 2)
+    
+    def test_noise_and_dropout(self):
+        """Test that noise and dropout are applied as requested."""
+        clean = make_barge_frame('vga', noise=0.0, freeboard=2.0)
+        noisy = make_barge_frame('vga', noise=0.01, dropout=0.1, seed=1)
+        
+        assert set(np.unique(clean['depth'])) == {10.0, 12.0}
+        assert np.mean(noisy['depth'] == 0) == pytest.approx(0.1, abs=0.01)
+
+
+class TestPipelineBenchmark:
+    def test_benchmark_case(self):
+        """Test that every stage is timed and the draft is recovered."""
+        case = benchmark_case('vga', noise=0.0, repeats=1, warmup=0)
+        
+        assert case['cycle_success'] is True
+        assert case['draft_error'] < 0.05
+        assert set(case['stages']) == {
+            'process_rgbd_frame', 'downsample', 'filter_outliers', 'extract_barge_geometry',
+            'compute_vectors', 'translate_to_gcode', 'process_drafting_cycle'
+        }
+        assert case['stages']['process_drafting_cycle']['median_ms'] > 0
+    
+    def test_compare_flags_regressions(self):
+        """Test baseline comparison of median stage times."""
+        def report(median):
+            return {'results': [{'case': 'vga/noise=0.0',
+                                 'stages': {'downsample': {'median_ms': median}}}]}
+        
+        rows = compare(report(12.0), report(10.0), threshold=0.1)
+        
+        assert rows[0]['ratio'] == pytest.approx(1.2)
+        assert rows[0]['regression'] is True
+        assert compare(report(10.5), report(10.0))[0]['regression'] is False
+    
+    def test_main_writes_json(self, tmp_path):
+        """Test the command-line entry point output file."""
+        output = tmp_path / 'results.json'
+        
+        code = main(['--resolutions', 'vga', '--noise', '0', '--repeats', '1',
+                     '--warmup', '0', '--output', str(output)])
+        
+        report = json.loads(output.read_text())
+        assert code == 0
+        assert report['environment']['cpu_count'] >= 1
+        assert report['results'][0]['case'] == 'vga/noise=0.0'
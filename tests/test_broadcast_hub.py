@@ -0,0 +1,181 @@
+"""
+Tests for Broadcast Hub
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from src.interface.broadcast_hub import BroadcastHub
+
+
+class BlockingConnection:
+    """Blocking connection whose sends wait for a gate to open."""
+    
+    def __init__(self, gate: threading.Event = None):
+        self.gate = gate
+        self.messages = []
+        self.closed = False
+    
+    def send(self, data):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.messages.append(data)
+    
+    def close(self):
+        self.closed = True
+
+
+class AsyncConnection:
+    """Asyncio connection with a fixed send delay."""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.messages = []
+    
+    async def send(self, data):
+        await asyncio.sleep(self.delay)
+        self.messages.append(data)
+
+
+@pytest.fixture
+def hub():
+    hub = BroadcastHub(queue_size=2, evict_after=60.0)
+    yield hub
+    hub.shutdown()
+
+
+class TestBroadcastHub:
+    def test_message_shared_by_all_clients(self, hub):
+        """Test that every client is sent the same encoded object."""
+        clients = [BlockingConnection() for _ in range(3)]
+        for client in clients:
+            hub.add(client)
+        
+        message = b'encoded once'
+        hub.publish(message)
+        hub.flush(timeout=5)
+        
+        assert all(client.messages[0] is message for client in clients)
+        assert hub.stats()['sent'] == 3
+    
+    def test_slow_client_does_not_delay_others(self):
+        """Test that a stalled client neither blocks publish nor other clients."""
+        hub = BroadcastHub(queue_size=8)
+        slow = AsyncConnection(delay=2.0)
+        fast = AsyncConnection()
+        hub.add(slow)
+        hub.add(fast)
+        
+        started = time.perf_counter()
+        for i in range(5):
+            hub.publish(f'update {i}')
+        published = time.perf_counter() - started
+        
+        deadline = time.monotonic() + 2.0
+        while len(fast.messages) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert published < 0.05
+        assert fast.messages == [f'update {i}' for i in range(5)]
+        assert slow.messages == []
+        hub.shutdown()
+    
+    def test_drop_oldest_when_queue_full(self):
+        """Test that a full queue drops its oldest message."""
+        hub = BroadcastHub(queue_size=2, policy='drop_oldest', evict_after=60.0)
+        gate = threading.Event()
+        client = BlockingConnection(gate)
+        hub.add(client)
+        
+        hub.publish('first')
+        time.sleep(0.1)
+        for message in ('a', 'b', 'c', 'd'):
+            hub.publish(message, key='same')
+        gate.set()
+        hub.flush(timeout=5)
+        
+        assert client.messages == ['first', 'c', 'd']
+        assert hub.stats()['dropped'] == 2
+        hub.shutdown()
+    
+    def test_coalesce_replaces_queued_message(self, hub):
+        """Test that keyed messages replace queued ones in place."""
+        gate = threading.Event()
+        client = BlockingConnection(gate)
+        hub.add(client)
+        
+        hub.publish('first')
+        time.sleep(0.1)
+        hub.publish('frame 1', key='point_cloud')
+        hub.publish('alert')
+        hub.publish('frame 2', key='point_cloud')
+        gate.set()
+        hub.flush(timeout=5)
+        
+        assert client.messages == ['first', 'frame 2', 'alert']
+        assert hub.stats()['dropped'] == 0
+    
+    def test_client_behind_too_long_is_evicted(self):
+        """Test that a client whose queue stays full is disconnected."""
+        hub = BroadcastHub(queue_size=1, evict_after=0.05)
+        gate = threading.Event()
+        stuck = BlockingConnection(gate)
+        healthy = BlockingConnection()
+        hub.add(stuck)
+        hub.add(healthy)
+        
+        for i in range(4):
+            hub.publish(f'update {i}')
+            time.sleep(0.05)
+        gate.set()
+        hub.flush(timeout=5)
+        
+        assert hub.connections == [healthy]
+        assert stuck.closed
+        assert len(healthy.messages) == 4
+        assert hub.stats()['evicted'] == 1
+        hub.shutdown()
+    
+    def test_send_timeout_evicts(self):
+        """Test that a send exceeding the timeout disconnects the client."""
+        hub = BroadcastHub(send_timeout=0.05)
+        hub.add(AsyncConnection(delay=10.0))
+        
+        hub.publish('update')
+        deadline = time.monotonic() + 2.0
+        while len(hub) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert len(hub) == 0
+        hub.shutdown()
+    
+    def test_remove_and_unknown_policy(self, hub):
+        """Test client removal and policy validation."""
+        client = BlockingConnection()
+        hub.add(client)
+        assert client in hub
+        assert hub.remove(client)
+        assert not hub.remove(client)
+        hub.publish('nobody listening')
+        hub.flush(timeout=5)
+        assert client.messages == []
+        
+        with pytest.raises(ValueError):
+            BroadcastHub(policy='drop_newest')
+    
+    def test_runs_on_external_loop(self):
+        """Test draining on a caller-provided running loop."""
+        hub = BroadcastHub()
+        client = AsyncConnection()
+        
+        async def scenario():
+            hub.start(asyncio.get_running_loop())
+            hub.add(client)
+            hub.publish('hello')
+            await asyncio.sleep(0.05)
+            hub.shutdown()
+            await asyncio.sleep(0)
+        
+        asyncio.run(scenario())
+        assert client.messages == ['hello']
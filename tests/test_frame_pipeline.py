@@ -0,0 +1,114 @@
+"""
+Tests for the streaming frame pipeline
+"""
+
+import threading
+import time
+import pytest
+from src.core.frame_pipeline import FramePipeline
+
+
+class TestFramePipeline:
+    def test_items_flow_through_stages_in_order(self):
+        """Test that every item passes through all stages, in order."""
+        results = []
+        pipeline = FramePipeline(
+            [('double', lambda x: x * 2), ('increment', lambda x: x + 1)],
+            {'queue_size': 4, 'overflow_policy': 'block'},
+            on_result=results.append
+        )
+        pipeline.start()
+        for i in range(10):
+            pipeline.submit(i)
+        pipeline.stop()
+        
+        assert results == [i * 2 + 1 for i in range(10)]
+        assert pipeline.get_stats()['increment']['processed'] == 10
+    
+    def test_drop_oldest_coalesces_when_stage_is_slow(self):
+        """Test that a slow stage causes stale frames to be dropped, not queued."""
+        gate = threading.Event()
+        results = []
+        
+        def slow(x):
+            gate.wait()
+            return x
+        
+        pipeline = FramePipeline(
+            [('slow', slow)],
+            {'queue_size': 1, 'overflow_policy': 'drop_oldest'},
+            on_result=results.append
+        )
+        pipeline.start()
+        pipeline.submit(0)
+        time.sleep(0.05)  # Let the worker pick up frame 0 and block
+        for i in range(1, 6):
+            pipeline.submit(i)
+        gate.set()
+        pipeline.stop()
+        
+        assert results == [0, 5]
+        assert pipeline.get_stats()['slow']['dropped'] == 4
+    
+    def test_drop_newest_rejects_incoming_frames(self):
+        """Test that drop_newest keeps queued frames and reports the drop."""
+        gate = threading.Event()
+        results = []
+        
+        def slow(x):
+            gate.wait()
+            return x
+        
+        pipeline = FramePipeline(
+            [('slow', slow)],
+            {'queue_size': 1, 'overflow_policy': 'drop_newest'},
+            on_result=results.append
+        )
+        pipeline.start()
+        pipeline.submit(0)
+        time.sleep(0.05)
+        assert pipeline.submit(1) is True
+        assert pipeline.submit(2) is False
+        gate.set()
+        pipeline.stop()
+        
+        assert results == [0, 1]
+    
+    def test_stage_errors_are_reported(self):
+        """Test that a failing item is reported and does not stop the stream."""
+        results = []
+        errors = []
+        
+        def reject_odd(x):
+            if x % 2:
+                raise ValueError(f"odd: {x}")
+            return x
+        
+        pipeline = FramePipeline(
+            [('reject_odd', reject_odd)],
+            {'queue_size': 8, 'overflow_policy': 'block'},
+            on_result=results.append,
+            on_error=lambda item, e: errors.append(item)
+        )
+        pipeline.start()
+        for i in range(4):
+            pipeline.submit(i)
+        pipeline.stop()
+        
+        assert results == [0, 2]
+        assert errors == [1, 3]
+        assert pipeline.get_stats()['reject_odd']['errors'] == 2
+    
+    def test_invalid_configuration(self):
+        """Test that unknown policies and empty stage lists are rejected."""
+        with pytest.raises(ValueError):
+            FramePipeline([('noop', lambda x: x)], {'overflow_policy': 'unbounded'})
+        with pytest.raises(ValueError):
+            FramePipeline([])
+    
+    def test_submit_requires_running_pipeline(self):
+        """Test that submitting before start() fails."""
+        pipeline = FramePipeline([('noop', lambda x: x)])
+        
+        with pytest.raises(RuntimeError):
+            pipeline.submit(1)
@@ -0,0 +1,94 @@
+"""
+Tests for vectorized G-Code formatting
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from src.core.gcode_format import LineFormatter
+
+
+def reference(values, template):
+    """Format rows with one f-string per field."""
+    parts = []
+    for row in values.tolist():
+        for item in template:
+            parts.append(item if isinstance(item, str) else f"{row[item[0]]:.{item[1]}f}")
+    return ''.join(parts)
+
+
+class TestLineFormatter:
+    @pytest.mark.parametrize('precision', [0, 1, 2, 3, 4])
+    def test_matches_fstring_formatting(self, precision):
+        """Test that output equals f-string formatting for random values."""
+        rng = np.random.default_rng(precision)
+        values = np.concatenate([
+            rng.uniform(-60000.0, 60000.0, (3000, 3)),
+            rng.uniform(-1.0, 1.0, (1000, 3)),
+            rng.uniform(-999999.0, 999999.0, (1000, 3))
+        ])
+        template = ["G1 X", (0, precision), " Y", (1, precision), " Z", (2, precision), "\n"]
+        
+        assert LineFormatter(template).format_block(values) == reference(values, template)
+    
+    def test_rounding_ties(self):
+        """Test that values on decimal rounding ties match f-string rounding."""
+        rng = np.random.default_rng(1)
+        values = np.round(rng.uniform(-100.0, 100.0, (5000, 2)), 3) + 0.0005
+        template = [(0, 3), ",", (1, 3), "\n"]
+        
+        assert LineFormatter(template).format_block(values) == reference(values, template)
+    
+    def test_edge_values(self):
+        """Test signed zeros, tiny values and the fallback for large or non-finite values."""
+        values = np.array([
+            [0.0, -0.0, -0.0004],
+            [1e-12, 999.9995, -1000.0],
+            [999998.9999, 1e7, -5.5]
+        ])
+        template = ["X", (0, 3), " Y", (1, 3), " Z", (2, 3), "\n"]
+        
+        formatter = LineFormatter(template)
+        assert formatter.format_block(values[:2]) == reference(values[:2], template)
+        assert formatter.format_block(values) == reference(values, template)
+        
+        values[0, 0] = np.nan
+        assert formatter.format_block(values) == reference(values, template)
+    
+    def test_field_at_line_end(self):
+        """Test templates that end with a field rather than literal text."""
+        values = np.array([[1.5, 2.25], [-3.125, 40000.0]])
+        template = ["A", (1, 2), "B", (0, 0)]
+        
+        assert LineFormatter(template).format_block(values) == reference(values, template)
+    
+    def test_iter_blocks(self):
+        """Test that blocks concatenate to the full program."""
+        values = np.random.default_rng(2).uniform(-10.0, 10.0, (1000, 3))
+        template = [(0, 3), " ", (1, 3), " ", (2, 3), "\n"]
+        formatter = LineFormatter(template, block_size=64)
+        
+        blocks = list(formatter.iter_blocks(values))
+        
+        assert len(blocks) == 16
+        assert ''.join(blocks) == reference(values, template)
+        assert formatter.format_block(np.empty((0, 3))) == ''
+    
+    def test_concurrent_formatting(self):
+        """Test that threads sharing a formatter never mix their rows."""
+        template = ["G1 X", (0, 3), " Y", (1, 3), " Z", (2, 3), "\n"]
+        formatter = LineFormatter(template)
+        blocks = [np.random.default_rng(seed).uniform(-5000.0, 5000.0, (20000, 3))
+                  for seed in range(4)]
+        expected = [reference(values, template) for values in blocks]
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            outputs = list(executor.map(formatter.format_block, blocks * 10))
+        
+        assert outputs == expected * 10
+    
+    def test_invalid_precision(self):
+        """Test that unsupported precisions are rejected."""
+        with pytest.raises(ValueError):
+            LineFormatter([(0, 5)])
@@ -0,0 +1,153 @@
+"""
+Tests for G-Code program parsing and optimization
+"""
+
+import io
+import numpy as np
+from src.core.gcode_program import (
+    check_program, parse_line, parse_program, optimize_program, render_program
+)
+from src.agents.gcode_translator_agent import GCodeTranslatorAgent
+
+
+def optimize(text, **options):
+    return render_program(optimize_program(parse_program(text), **options))
+
+
+def positions(text):
+    """Positions visited by the absolute-mode moves of a program."""
+    current = {}
+    visited = []
+    for command in parse_program(text):
+        if 'G92' in command.codes:
+            current = {axis: command.words[axis] for axis in 'XYZ' if axis in command.words}
+        elif any(axis in command.words for axis in 'XYZ'):
+            current.update({axis: command.words[axis] for axis in 'XYZ' if axis in command.words})
+            visited.append(tuple(current.get(axis) for axis in 'XYZ'))
+    return visited
+
+
+class TestParser:
+    def test_parse_line(self):
+        """Test codes, words, tokens and comments of a parsed line."""
+        command = parse_line("g01 X1.500 Y-2 F100  ; Linear move", line=7)
+        
+        assert command.line == 7
+        assert command.codes == ('G1',)
+        assert command.words == {'X': 1.5, 'Y': -2.0, 'F': 100.0}
+        assert command.tokens == ('g01', 'X1.500', 'Y-2', 'F100')
+        assert command.comment == "  ; Linear move"
+        assert command.motion == 'G1'
+        assert command.valid
+    
+    def test_comments_and_invalid_lines(self):
+        """Test comment-only, blank and unparseable lines."""
+        assert parse_line("; G28 in a comment").is_empty
+        assert parse_line("").is_empty
+        assert parse_line("G1 (note) X1").words == {'X': 1.0}
+        assert parse_line("G1 X1 junk").valid is False
+    
+    def test_unchanged_program_round_trips(self):
+        """Test that rendering parsed commands reproduces the text."""
+        gcode = GCodeTranslatorAgent().translate_to_gcode(
+            [{'x': 0.0, 'y': 0.0, 'z': 2.0}, {'x': 1.0, 'y': 0.5, 'z': 1.0}], {'draft': 2.0})
+        
+        assert render_program(parse_program(gcode)) == gcode
+
+
+class TestCheckProgram:
+    def test_diagnostics_carry_line_numbers(self):
+        """Test that findings report the offending line."""
+        gcode = "G21\nG90\n; comment\nG5 X1\nG1 X1 ?\nM2"
+        
+        diagnostics = check_program(gcode, allowed={'G1', 'G21', 'G90', 'M2'})
+        
+        assert [(d.line, d.message) for d in diagnostics] == [
+            (4, "Unknown command: G5"),
+            (5, "Invalid syntax: G1 X1 ?")
+        ]
+        assert str(diagnostics[0]) == "Line 4: Unknown command: G5"
+    
+    def test_comments_do_not_satisfy_rules(self):
+        """Test that codes mentioned in comments are ignored."""
+        gcode = "G21  ; no G28 here\n(M2 later)\nG90"
+        
+        diagnostics = check_program(gcode, required={'G28': 'home command', 'M2': 'end'})
+        
+        assert [str(d) for d in diagnostics] == ["Missing home command (G28)", "Missing end (M2)"]
+    
+    def test_safety_rules(self):
+        """Test homing before motion and commands after the program end."""
+        gcode = "G21\nG1 X1\nG28\nX2\nM2\nG0 Z5"
+        
+        diagnostics = check_program(gcode, home_before_motion=True, end_last=True)
+        
+        assert [(d.line, d.message) for d in diagnostics] == [
+            (2, "Motion before home command (G28)"),
+            (6, "Command after program end (M2, line 5)")
+        ]
+        assert [d.line for d in check_program("X1\nG1 X2\nY3")] == [1]
+    
+    def test_stream_input(self):
+        """Test validation of a line stream such as an open file."""
+        stream = io.StringIO("G21\nG28\nG1 X1 Y1\nM2\n")
+        
+        assert check_program(stream, required={'M2': 'end'}, home_before_motion=True) == []
+
+
+class TestOptimizer:
+    def test_drops_duplicate_and_zero_length_moves(self):
+        """Test removal of moves that do not change the position."""
+        gcode = "G90\nG92 X0 Y0 Z0\nG1 X1 Y1 Z1\n; again\nG1 X1 Y1 Z1\nG1 X1.000\nG1 X2 Y1 Z1\nM2"
+        
+        assert optimize(gcode) == "G90\nG92 X0 Y0 Z0\nG1 X1 Y1 Z1\nG1 X2\nM2"
+    
+    def test_merges_collinear_moves(self):
+        """Test that waypoints on a straight feed segment are merged."""
+        gcode = ("G92 X0 Y0 Z0\nG1 X1 Y1 Z0\nG1 X2 Y2.004 Z0\nG1 X3 Y3 Z0\n"
+                 "G1 X3 Y4 Z0\nM2")
+        
+        assert optimize(gcode) == "G92 X0 Y0 Z0\nG1 X3 Y3\nG1 Y4\nM2"
+        assert optimize(gcode, tolerance=0.001).count('\n') == 5
+        assert optimize(gcode, merge_collinear=False).count('\n') == 5
+    
+    def test_keeps_reversals_and_barriers(self):
+        """Test that backtracking moves, dwells and feed changes are not merged."""
+        reversal = "G92 X0 Y0 Z0\nG1 X2 Y0 Z0\nG1 X1 Y0 Z0\nG1 X3 Y0 Z0"
+        dwell = "G92 X0 Y0 Z0\nG1 X1 Y0 Z0\nG4 P300\nG1 X2 Y0 Z0"
+        feed = "G92 X0 Y0 Z0\nG1 X1 Y0 Z0 F100\nG1 X2 Y0 Z0 F200"
+        
+        assert optimize(reversal) == "G92 X0 Y0 Z0\nG1 X2\nG1 X1\nG1 X3"
+        assert optimize(dwell) == "G92 X0 Y0 Z0\nG1 X1\nG4 P300\nG1 X2"
+        assert optimize(feed) == "G92 X0 Y0 Z0\nG1 X1 F100\nG1 X2 F200"
+    
+    def test_strips_repeated_modal_words(self):
+        """Test removal of modal codes, feeds and motion codes already in effect."""
+        gcode = "G21\nG90\nG21\nG92 X0 Y0 Z0\nG1 X1 F100\nG1 Y1 F100\nG0 Z5\nG0 Z6"
+        
+        assert optimize(gcode) == "G21\nG90\nG92 X0 Y0 Z0\nG1 X1 F100\nG1 Y1\nG0 Z5\nG0 Z6"
+        assert optimize(gcode, omit_motion_codes=True).endswith("G1 X1 F100\nY1\nG0 Z5\nZ6")
+    
+    def test_relative_mode_is_not_optimized(self):
+        """Test that moves in relative mode are kept as written."""
+        gcode = "G91\nG1 X0 Y0 Z0\nG1 X1\nG1 X1"
+        
+        assert optimize(gcode) == gcode
+    
+    def test_translator_program_path_preserved(self):
+        """Test that an optimized translator program visits the same path."""
+        rng = np.random.default_rng(3)
+        points = [(0.0, 0.0, 2.0)] * 3
+        points += [(t, 2.0 * t, 1.0) for t in np.linspace(0.0, 4.0, 9)]
+        points += rng.uniform(0.0, 5.0, (20, 3)).tolist()
+        vectors = [{'x': x, 'y': y, 'z': z} for x, y, z in points]
+        gcode = GCodeTranslatorAgent().translate_to_gcode(vectors, {'draft': 2.0})
+        
+        optimized = optimize(gcode, omit_motion_codes=True, strip_comments=True)
+        
+        assert len(optimized) < len(gcode) / 3
+        before = positions(gcode)
+        after = positions(optimized)
+        assert after[-1] == before[-1]
+        assert set(after) <= set(before)
+        assert len(after) == len(set(before)) - 7
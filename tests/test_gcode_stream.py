@@ -0,0 +1,95 @@
+"""
+Tests for G-Code streaming utilities
+"""
+
+import io
+import socket
+import pytest
+from src.core.gcode_stream import (
+    apply_transforms, dwell_transform, iter_chunks, iter_text_chunks, write_lines
+)
+from src.core.gcode_generator import GCodeGenerator
+
+
+LINES = ["G21", "G1 X1 Z5", "", "G1 X2", "M2"]
+
+
+class TestGCodeStream:
+    def test_chunks_match_join(self):
+        """Test that chunked output equals the joined program."""
+        expected = "\n".join(LINES)
+        
+        for chunk_size in (1, 4, 1024):
+            assert ''.join(iter_text_chunks(LINES, chunk_size)) == expected
+            assert b''.join(iter_chunks(LINES, chunk_size)) == expected.encode()
+    
+    def test_empty_program(self):
+        """Test that no lines produce no chunks."""
+        assert list(iter_chunks([])) == []
+    
+    def test_dwell_transform(self):
+        """Test that the dwell transform matches the string post-processor."""
+        lines = list(apply_transforms(LINES, [dwell_transform(250)]))
+        
+        assert lines[:3] == ["G21", "G1 X1 Z5", "G4 P250  ; Dwell for stabilization"]
+        assert lines.count("G4 P250  ; Dwell for stabilization") == 1
+    
+    def test_transforms_are_lazy(self):
+        """Test that transforms consume the source one line at a time."""
+        consumed = []
+        
+        def source():
+            for line in LINES:
+                consumed.append(line)
+                yield line
+        
+        stream = apply_transforms(source(), [dwell_transform(100)])
+        next(iter(stream))
+        
+        assert consumed == ["G21"]
+    
+    def test_write_to_sinks(self):
+        """Test writing to binary, text, callable and socket sinks."""
+        expected = "\n".join(LINES).encode()
+        
+        binary = io.BytesIO()
+        assert write_lines(LINES, binary, chunk_size=4) == len(expected)
+        assert binary.getvalue() == expected
+        
+        text = io.StringIO()
+        write_lines(LINES, text)
+        assert text.getvalue() == expected.decode()
+        
+        chunks = []
+        write_lines(LINES, chunks.append, chunk_size=4)
+        assert b''.join(chunks) == expected
+        
+        left, right = socket.socketpair()
+        with left, right:
+            write_lines(LINES, left)
+            left.shutdown(socket.SHUT_WR)
+            received = b''
+            while True:
+                data = right.recv(4096)
+                if not data:
+                    break
+                received += data
+        assert received == expected
+    
+    def test_unsupported_sink(self):
+        """Test that an unusable sink is rejected."""
+        with pytest.raises(TypeError):
+            write_lines(LINES, object())
+
+
+class TestGCodeGeneratorStreaming:
+    def test_write_matches_generate(self):
+        """Test that streamed output equals the string program."""
+        generator = GCodeGenerator()
+        vectors = [{'x': i * 0.1, 'y': 0.0, 'z': 1.0} for i in range(100)]
+        geometry = {'draft': 2.5}
+        sink = io.BytesIO()
+        
+        generator.write_gcode(geometry, iter(vectors), sink)
+        
+        assert sink.getvalue().decode() == generator.generate_gcode(geometry, vectors)
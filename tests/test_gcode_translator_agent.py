@@ -2,8 +2,13 @@
 Tests for G-Code Translator Agent
 """
 
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pytest
 from src.agents.gcode_translator_agent import GCodeTranslatorAgent
+from src.core.gcode_stream import dwell_transform
 
 
 class TestGCodeTranslatorAgent:
@@ -46,6 +51,9 @@ class TestGCodeTranslatorAgent:
         
         invalid_gcode = "G21\nG90\nXYZ123\nM2"  # Invalid command
         assert agent.validate_syntax(invalid_gcode) is False
+        
+        assert agent.validate_syntax("G28\nG1 X1\nY2  ; modal G1\nM2") is True
+        assert agent.validate_syntax("G28\nG3 X1  ; arc\nM2") is False
     
     def test_add_dwell_time(self):
         """Test dwell time addition."""
@@ -69,3 +77,198 @@ class TestGCodeTranslatorAgent:
         assert 'G28' in gcode  # Home command
         assert 'M2' in gcode   # Program end
         assert 'G0 Z2000' in gcode or 'safe' in gcode.lower()
+    
+    def test_write_gcode_matches_translation(self):
+        """Test that streamed output is byte-identical to the string program."""
+        agent = GCodeTranslatorAgent()
+        vectors = [{'x': i * 0.01, 'y': 0.5, 'z': 1.0 + (i % 3)} for i in range(1000)]
+        geometry_data = {'draft': 2.0, 'trim': 0.1, 'heel': 0.0}
+        sink = io.BytesIO()
+        
+        written = agent.write_gcode((v for v in vectors), geometry_data, sink, chunk_size=512)
+        
+        expected = agent.translate_to_gcode(vectors, geometry_data).encode()
+        assert sink.getvalue() == expected
+        assert written == len(expected)
+    
+    def test_streaming_dwell_matches_add_dwell_time(self):
+        """Test that the streaming dwell transform matches add_dwell_time."""
+        agent = GCodeTranslatorAgent()
+        vectors = [{'x': 0.0, 'y': 0.0, 'z': 2.0}, {'x': 1.0, 'y': 0.0, 'z': 1.5}]
+        geometry_data = {'draft': 2.0}
+        
+        streamed = "\n".join(agent.iter_gcode(vectors, geometry_data, [dwell_transform(300)]))
+        
+        gcode = agent.translate_to_gcode(vectors, geometry_data)
+        assert streamed == agent.add_dwell_time(gcode, 300)
+    
+    def test_array_input_matches_dict_input(self):
+        """Test that an (N, 3) position array produces the same program as dicts."""
+        rng = np.random.default_rng(0)
+        positions = rng.uniform(-50.0, 50.0, (5000, 3))
+        vectors = [{'x': x, 'y': y, 'z': z} for x, y, z in positions.tolist()]
+        geometry_data = {'draft': 2.0}
+        
+        for add_comments in (True, False):
+            agent = GCodeTranslatorAgent()
+            agent.config['add_comments'] = add_comments
+            
+            gcode = agent.translate_to_gcode(positions, geometry_data)
+            
+            assert gcode == agent.translate_to_gcode(vectors, geometry_data)
+            assert gcode == "\n".join(agent.iter_gcode(iter(vectors), geometry_data))
+    
+    def test_translate_vectors_lines(self):
+        """Test per-waypoint command lines."""
+        agent = GCodeTranslatorAgent()
+        
+        lines = agent._translate_vectors([{'x': 0.001, 'y': -0.5}, {'z': 1.2345678}])
+        
+        assert lines == [
+            "; Waypoint 1",
+            "G0 X1.000 Y-500.000 Z0.000  ; Rapid to start",
+            "; Waypoint 2",
+            "G1 X0.000 Y0.000 Z1234.568  ; Linear move",
+            ""
+        ]
+        assert agent._translate_vectors([]) == [""]
+    
+    def test_incremental_translation_reuses_blocks(self):
+        """Test that unchanged waypoint blocks are reused between calls."""
+        agent = GCodeTranslatorAgent()
+        agent.config['cache_block_size'] = 16
+        positions = np.random.default_rng(1).uniform(-5.0, 5.0, (100, 3))
+        geometry_data = {'draft': 2.0}
+        
+        first = agent.translate_delta(positions, geometry_data)
+        positions[40, 2] += 0.25
+        second = agent.translate_delta(positions, geometry_data)
+        
+        assert first['full'] is True and first['patches'] == []
+        assert second['full'] is False
+        assert second['base_version'] == first['version']
+        assert second['reused_blocks'] == second['total_blocks'] - 1 == 6
+        
+        agent.config['incremental'] = False
+        assert second['gcode'] == agent.translate_to_gcode(positions, geometry_data)
+    
+    def test_delta_patches(self):
+        """Test patches for changed, appended and removed waypoints."""
+        agent = GCodeTranslatorAgent()
+        vectors = [{'x': float(i), 'y': 0.0, 'z': 1.0} for i in range(10)]
+        agent.translate_delta(vectors, {})
+        
+        vectors[3]['z'] = 2.0
+        vectors[4]['z'] = 2.0
+        vectors.append({'x': 10.0, 'y': 0.0, 'z': 1.0})
+        delta = agent.translate_delta(vectors, {})
+        
+        assert [(p['start'], p['end']) for p in delta['patches']] == [(3, 5), (10, 11)]
+        assert delta['patches'][0]['gcode'] == (
+            "; Waypoint 4\nG1 X3000.000 Y0.000 Z2000.000  ; Linear move\n"
+            "; Waypoint 5\nG1 X4000.000 Y0.000 Z2000.000  ; Linear move"
+        )
+        
+        delta = agent.translate_delta(vectors[:6], {})
+        assert delta['waypoints'] == 6
+        assert delta['patches'] == []
+        
+        agent.clear_cache()
+        assert agent.translate_delta(vectors, {})['full'] is True
+    
+    def test_streams_keep_separate_programs(self):
+        """Test that each stream patches against its own previous program."""
+        agent = GCodeTranslatorAgent()
+        agent.config['cache_streams'] = 2
+        barge_a = [{'x': float(i), 'y': 0.0, 'z': 1.0} for i in range(8)]
+        barge_b = [{'x': 0.0, 'y': float(i), 'z': 2.0} for i in range(5)]
+        
+        agent.translate_delta(barge_a, {}, stream='a')
+        assert agent.translate_delta(barge_b, {}, stream='b')['full'] is True
+        delta = agent.translate_delta(barge_a, {}, stream='a')
+        
+        assert delta['base_version'] == 1 and delta['patches'] == []
+        assert delta['gcode'] == agent.translate_to_gcode(barge_a, {})
+        
+        # Without a stream nothing is cached, so other callers cannot disturb a stream
+        agent.translate_to_gcode(barge_b, {})
+        assert agent.translate_delta(barge_a, {}, stream='a')['patches'] == []
+        
+        # The least recently used stream is dropped beyond cache_streams
+        agent.translate_to_gcode(barge_b, {}, stream='c')
+        assert agent.translate_delta(barge_b, {}, stream='b')['full'] is True
+        agent.clear_cache('a')
+        assert agent.translate_delta(barge_a, {}, stream='a')['full'] is True
+    
+    def test_parallel_streams(self):
+        """Test that streams translated in parallel keep correct programs, patches and versions."""
+        agent = GCodeTranslatorAgent()
+        agent.config['cache_block_size'] = 512
+        reference = GCodeTranslatorAgent()
+        
+        def run(stream):
+            rng = np.random.default_rng(len(stream))
+            positions = rng.uniform(-50.0, 50.0, (8000, 3))
+            deltas = []
+            for _ in range(8):
+                positions[rng.integers(0, len(positions), 50)] += 0.5
+                deltas.append((positions.copy(), agent.translate_delta(positions, {}, stream)))
+            return deltas
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(run, ['barge-a', 'barge-b']))
+        
+        for deltas in results:
+            assert [delta['version'] for _, delta in deltas] == list(range(1, 9))
+            for positions, delta in deltas:
+                assert delta['gcode'] == reference.translate_to_gcode(positions, {})
+                for patch in delta['patches']:
+                    rows = positions[patch['start']:patch['end']]
+                    assert patch['gcode'] == reference._format_rows(rows, patch['start'])
+    
+    def test_optimize_for_crane(self):
+        """Test that the optimized program is shorter and keeps required commands."""
+        agent = GCodeTranslatorAgent()
+        agent.config['optimizer'] = {'strip_comments': True}
+        vectors = [{'x': 0.0, 'y': 0.0, 'z': 2.0}, {'x': 0.0, 'y': 0.0, 'z': 2.0},
+                   {'x': 0.0, 'y': 0.0, 'z': 1.0}, {'x': 0.0, 'y': 0.0, 'z': 0.5}]
+        
+        optimized = agent.optimize_for_crane(agent.translate_to_gcode(vectors, {}))
+        
+        assert optimized.split('\n') == [
+            "G21", "G90", "G94", "G28", "G92 X0 Y0 Z0",
+            "G0 Z2000.000", "G1 Z500.000", "G0 Z2000.0", "G28", "M2"
+        ]
+        assert agent.validate_syntax(optimized)
+    
+    def test_feed_words(self):
+        """Test that waypoint feeds become F words on feed moves."""
+        agent = GCodeTranslatorAgent()
+        vectors = [{'x': 0.0, 'y': 0.0, 'z': 2.0, 'feed': 0.5},
+                   {'x': 1.0, 'y': 0.0, 'z': 2.0, 'feed': 0.5},
+                   {'x': 1.0, 'y': 0.0, 'z': 0.5, 'feed': 0.25}]
+        
+        lines = agent._translate_vectors(vectors)
+        
+        assert lines[1] == "G0 X0.000 Y0.000 Z2000.000  ; Rapid to start"
+        assert lines[3] == "G1 X1000.000 Y0.000 Z2000.000 F30000.0  ; Linear move"
+        assert lines[5] == "G1 X1000.000 Y0.000 Z500.000 F15000.0  ; Linear move"
+        
+        positions = np.array([[v['x'], v['y'], v['z'], v['feed']] for v in vectors])
+        gcode = agent.translate_to_gcode(vectors, {})
+        assert gcode == agent.translate_to_gcode(positions, {})
+        assert agent.validate_syntax(gcode)
+    
+    def test_mixed_feed_vectors_rejected(self):
+        """Test that vectors must agree on carrying a feed, across stream blocks too."""
+        agent = GCodeTranslatorAgent()
+        plain = {'x': 0.0, 'y': 0.0, 'z': 1.0}
+        with_feed = {'x': 1.0, 'y': 0.0, 'z': 1.0, 'feed': 0.1}
+        
+        for vectors in ([plain, with_feed], [with_feed, plain]):
+            with pytest.raises(ValueError, match="'feed'"):
+                agent.translate_to_gcode(vectors, {})
+        
+        stream = iter([plain] * 3 + [with_feed] * 3)
+        with pytest.raises(ValueError, match="expected none"):
+            list(agent._iter_position_blocks(stream, block_size=3))
@@ -2,6 +2,8 @@
 Tests for Lattice Core
 """
 
+import asyncio
+import time
 import pytest
 from src.core.lattice_core import LatticeCore
 
@@ -58,3 +60,112 @@ class TestLatticeCore:
         core.shutdown()
         
         assert core.state['status'] == 'shutdown'
+    
+    def test_task_order(self):
+        """Test that tasks are ordered after their dependencies."""
+        core = LatticeCore()
+        core.register_task('gcode', lambda ctx: None, depends_on=['vectors'])
+        core.register_task('vectors', lambda ctx: None, depends_on=['geometry'])
+        core.register_task('geometry', lambda ctx: None)
+        
+        assert core.task_order() == ['geometry', 'vectors', 'gcode']
+    
+    def test_task_order_rejects_invalid_graphs(self):
+        """Test that unknown dependencies and cycles are reported."""
+        core = LatticeCore()
+        core.register_task('a', lambda ctx: None, depends_on=['missing'])
+        with pytest.raises(ValueError, match='Unknown task dependency'):
+            core.task_order()
+        
+        core = LatticeCore()
+        core.register_task('a', lambda ctx: None, depends_on=['b'])
+        core.register_task('b', lambda ctx: None, depends_on=['a'])
+        with pytest.raises(ValueError, match='cycle'):
+            core.task_order()
+    
+    def test_run_cycle_passes_results(self):
+        """Test that each task sees its dependencies' results."""
+        core = LatticeCore()
+        core.register_task('double', lambda ctx: ctx['value'] * 2)
+        core.register_task('total', lambda ctx: ctx['double'] + 1, depends_on=['double'])
+        
+        async def label(ctx):
+            return f"total={ctx['total']}"
+        
+        core.register_task('label', label, depends_on=['total'])
+        
+        result = asyncio.run(core.run_cycle({'value': 4}))
+        
+        assert result['status'] == 'success'
+        assert result['cycle_id'] == 1
+        assert result['results']['label'] == 'total=9'
+        assert core.state['status'] == 'ready'
+        core.shutdown()
+    
+    def test_run_cycle_runs_independent_tasks_concurrently(self):
+        """Test that independent blocking tasks overlap on the executor."""
+        core = LatticeCore({'max_workers': 4})
+        for name in ('a', 'b', 'c'):
+            core.register_task(name, lambda ctx: time.sleep(0.2))
+        
+        start = time.monotonic()
+        asyncio.run(core.run_cycle({}))
+        
+        assert time.monotonic() - start < 0.5
+        core.shutdown()
+    
+    def test_run_cycle_concurrent_cycles(self):
+        """Test several cycles awaited together get distinct ids."""
+        core = LatticeCore({'max_workers': 4})
+        core.register_task('echo', lambda ctx: ctx['barge'])
+        
+        async def run_all():
+            return await asyncio.gather(*(core.run_cycle({'barge': b}) for b in range(3)))
+        
+        results = asyncio.run(run_all())
+        
+        assert sorted(r['cycle_id'] for r in results) == [1, 2, 3]
+        assert [r['results']['echo'] for r in results] == [0, 1, 2]
+        assert core.state['cycles_completed'] == 3
+        core.shutdown()
+    
+    def test_run_cycle_failure(self):
+        """Test that a failing task aborts the cycle and marks an error."""
+        core = LatticeCore()
+        
+        def fail(ctx):
+            raise RuntimeError('sensor offline')
+        
+        core.register_task('capture', fail)
+        core.register_task('process', lambda ctx: None, depends_on=['capture'])
+        
+        with pytest.raises(RuntimeError, match='sensor offline'):
+            asyncio.run(core.run_cycle({}))
+        assert core.state['status'] == 'error'
+        assert core.state['cycles_completed'] == 0
+        core.shutdown()
+    
+    def test_sessions_run_task_graph(self):
+        """Test that session cycles run the task graph with their own agents and state."""
+        core = LatticeCore({'session_workers': 2})
+        core.register_agent('crane', 'shared')
+        core.register_task('crane', lambda ctx: ctx['agents']['crane'])
+        core.register_task('label', lambda ctx: f"{ctx['session'].session_id}:{ctx['crane']}",
+                           depends_on=['crane'])
+        core.create_session('barge-1')
+        core.create_session('barge-2', priority=2.0, agents={'crane': 'crane-2'})
+        
+        first = core.submit_cycle('barge-1', {})
+        second = core.submit_cycle('barge-2', {})
+        
+        assert first.result(5.0)['results']['label'] == 'barge-1:shared'
+        assert second.result(5.0)['results']['label'] == 'barge-2:crane-2'
+        assert core.get_session_state('barge-2')['cycles_completed'] == 1
+        assert core.get_session_state('barge-2')['priority'] == 2.0
+        assert len(core.list_sessions()) == 2
+        assert core.state['cycles_completed'] == 2
+        
+        core.close_session('barge-1')
+        with pytest.raises(KeyError):
+            core.get_session_state('barge-1')
+        core.shutdown()
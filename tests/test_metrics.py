@@ -0,0 +1,95 @@
+"""
+Tests for drafting cycle metrics
+"""
+
+import threading
+import pytest
+from src.core.metrics import LatencyHistogram, MetricsRegistry
+
+
+class TestLatencyHistogram:
+    def test_percentiles_within_precision(self):
+        """Test percentiles of a uniform distribution."""
+        histogram = LatencyHistogram(significant_bits=7)
+        for value in range(1, 100001):
+            histogram.record(value * 1000)
+        
+        assert histogram.count == 100000
+        assert histogram.percentile(50) == pytest.approx(50_000_000, rel=1 / 64)
+        assert histogram.percentile(99) == pytest.approx(99_000_000, rel=1 / 64)
+        assert histogram.percentile(100) == 100_000_000
+    
+    def test_small_values_are_exact(self):
+        """Test that values below the precision threshold are exact."""
+        histogram = LatencyHistogram(significant_bits=7)
+        for value in (3, 3, 7, 100):
+            histogram.record(value)
+        
+        assert histogram.percentile(50) == 3
+        assert histogram.percentile(75) == 7
+        assert histogram.min == 3
+        assert histogram.max == 100
+    
+    def test_empty_summary(self):
+        """Test summary of an empty histogram."""
+        summary = LatencyHistogram().summary()
+        
+        assert summary['count'] == 0
+        assert summary['p99_ms'] == 0.0
+
+
+class TestMetricsRegistry:
+    def test_span_and_counters(self):
+        """Test that spans and counters appear in the snapshot."""
+        metrics = MetricsRegistry()
+        with metrics.span('stage'):
+            pass
+        metrics.record('stage', 2_000_000)
+        metrics.count('points_in', 500)
+        metrics.count('points_in', 250)
+        
+        snapshot = metrics.snapshot()
+        
+        assert snapshot['latency']['stage']['count'] == 2
+        assert snapshot['latency']['stage']['max_ms'] == pytest.approx(2.0)
+        assert snapshot['counters'] == {'points_in': 750}
+    
+    def test_disabled_records_nothing(self):
+        """Test that a disabled registry is a no-op."""
+        metrics = MetricsRegistry({'enabled': False})
+        with metrics.span('stage'):
+            pass
+        metrics.count('points_in', 10)
+        
+        snapshot = metrics.snapshot()
+        
+        assert snapshot['enabled'] is False
+        assert snapshot['latency'] == {}
+        assert snapshot['counters'] == {}
+    
+    def test_thread_safety(self):
+        """Test concurrent recording from several threads."""
+        metrics = MetricsRegistry()
+        
+        def work():
+            for _ in range(1000):
+                metrics.record('stage', 1000)
+                metrics.count('calls')
+        
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        snapshot = metrics.snapshot()
+        assert snapshot['latency']['stage']['count'] == 4000
+        assert snapshot['counters']['calls'] == 4000
+    
+    def test_reset(self):
+        """Test discarding recorded metrics."""
+        metrics = MetricsRegistry()
+        metrics.count('calls')
+        metrics.reset()
+        
+        assert metrics.snapshot()['counters'] == {}
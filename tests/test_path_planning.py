@@ -0,0 +1,120 @@
+"""
+Tests for collision-aware path planning
+"""
+
+import numpy as np
+import pytest
+from src.core.path_planning import OccupancyGrid, PathPlanner
+
+
+def deck_with_block(seed: int = 0) -> np.ndarray:
+    """Flat 20 x 10 m deck with a 2 m tall block (a hatch cover) across it."""
+    rng = np.random.default_rng(seed)
+    deck = np.column_stack([rng.uniform(0.0, 20.0, 20000), rng.uniform(0.0, 10.0, 20000),
+                            np.zeros(20000)])
+    block = np.column_stack([rng.uniform(8.0, 12.0, 10000), rng.uniform(0.0, 10.0, 10000),
+                             rng.uniform(0.0, 2.0, 10000)])
+    return np.vstack([deck, block])
+
+
+class TestOccupancyGrid:
+    def test_inflation(self):
+        """Test that cells within the clearance of a point are blocked."""
+        grid = OccupancyGrid(np.zeros((1, 3)), 0.1, 0.5, [-2.0] * 3, [2.0] * 3)
+        
+        free = grid.is_free([[0.0, 0.0, 0.3], [0.0, 0.0, 1.0], [5.0, 0.0, 0.0]])
+        
+        assert free.tolist() == [False, True, False]
+        assert grid.covers(np.array([-1.0] * 3), np.array([1.0] * 3))
+        assert not grid.covers(np.array([-1.0] * 3), np.array([3.0] * 3))
+    
+    def test_search_walled_off(self):
+        """Test that an enclosed goal is unreachable."""
+        wall = np.array([[x, y, z] for x in np.arange(-1.0, 1.01, 0.1)
+                         for y in np.arange(-1.0, 1.01, 0.1) for z in (-1.0, 1.0)])
+        grid = OccupancyGrid(wall, 0.1, 0.2, [-1.6] * 3, [1.6] * 3)
+        
+        assert grid.search(np.array([0.0, 0.0, 1.45]), np.array([0.0, 0.0, 0.0])) is not None
+        
+        box = np.vstack([wall, wall[:, [2, 0, 1]], wall[:, [1, 2, 0]]])
+        grid = OccupancyGrid(box, 0.1, 0.2, [-1.6] * 3, [1.6] * 3)
+        assert grid.search(np.array([0.0, 0.0, 1.45]), np.array([0.0, 0.0, 0.0])) is None
+
+
+class TestPathPlanner:
+    def test_direct_move_kept(self):
+        """Test that clear moves are not changed."""
+        planner = PathPlanner(deck_with_block())
+        waypoints = np.array([[1.0, 5.0, 1.0], [6.0, 5.0, 1.0]])
+        
+        path, sources = planner.plan(waypoints)
+        
+        assert np.array_equal(path, waypoints)
+        assert sources.tolist() == [0, 1]
+        assert planner.grid is None
+    
+    def test_detour_keeps_clearance(self):
+        """Test that a blocked move is routed over the obstacle with clearance."""
+        points = deck_with_block()
+        planner = PathPlanner(points, resolution=0.2, clearance=0.5)
+        waypoints = np.array([[2.0, 5.0, 1.0], [18.0, 5.0, 1.0]])
+        
+        path, sources = planner.plan(waypoints)
+        
+        assert sources[0] == 0 and sources[-1] == 1
+        assert np.all(sources[1:-1] == -1) and len(path) > 2
+        assert path[:, 2].max() >= 2.5
+        samples = np.concatenate([a + np.linspace(0.0, 1.0, 200)[:, None] * (b - a)
+                                  for a, b in zip(path[:-1], path[1:])])
+        distance, _ = planner.tree.query(samples)
+        assert distance.min() >= 0.5 - 0.05
+        # Shortcutting keeps the detour close to the straight line over the block
+        assert np.linalg.norm(np.diff(path, axis=0), axis=1).sum() < 16.0 + 4.0
+    
+    def test_endpoint_zones_do_not_cross_obstacles(self):
+        """Test that paths near an obstacle go around it, keeping clearance outside the approach."""
+        rng = np.random.default_rng(0)
+        deck = np.column_stack([rng.uniform(-3.0, 4.0, 20000), rng.uniform(-3.0, 3.0, 20000),
+                                np.zeros(20000)])
+        box = np.column_stack([rng.uniform(0.3, 0.7, 20000), rng.uniform(-1.0, 1.0, 20000),
+                               rng.uniform(0.0, 2.5, 20000)])
+        planner = PathPlanner(np.vstack([deck, box]), resolution=0.2, clearance=0.5)
+        
+        for waypoints in ([[0.0, 0.0, 2.0], [1.0, 0.0, 1.5]], [[-0.2, 0.0, 1.0], [1.2, 0.0, 1.0]]):
+            path, _ = planner.plan(waypoints)
+            samples = np.concatenate([a + np.linspace(0.0, 1.0, 200)[:, None] * (b - a)
+                                      for a, b in zip(path[:-1], path[1:])])
+            for endpoint in waypoints:
+                zone = planner.approach_radius(np.array(endpoint)) + planner.resolution
+                outside = np.linalg.norm(samples - endpoint, axis=1) > zone
+                samples = samples[outside]
+            distance, _ = planner.tree.query(samples)
+            assert distance.min() >= 0.5 - 0.05
+        
+        assert planner.approach_radius(np.array([0.0, 0.0, 2.0])) == pytest.approx(0.2, abs=0.02)
+        assert planner.approach_radius(np.array([-0.5, 0.0, 1.0])) == 0.0
+    
+    def test_grid_cached(self):
+        """Test that the grid is reused for waypoints inside its volume."""
+        planner = PathPlanner(deck_with_block())
+        planner.plan([[2.0, 5.0, 1.0], [18.0, 5.0, 1.0]])
+        grid = planner.grid
+        
+        planner.plan([[2.0, 4.0, 1.0], [18.0, 6.0, 1.5]])
+        assert planner.grid is grid
+        
+        planner.plan([[2.0, 4.0, 1.0], [40.0, 6.0, 1.5]])
+        assert planner.grid is not grid
+    
+    def test_endpoint_on_surface(self):
+        """Test that waypoints touching the cloud remain reachable."""
+        planner = PathPlanner(deck_with_block())
+        
+        path, _ = planner.plan([[2.0, 5.0, 1.0], [14.0, 5.0, 0.0]])
+        
+        assert np.array_equal(path[-1], [14.0, 5.0, 0.0])
+    
+    def test_invalid_settings(self):
+        """Test that invalid settings are rejected."""
+        with pytest.raises(ValueError):
+            PathPlanner(np.zeros((1, 3)), resolution=0.0)
@@ -0,0 +1,100 @@
+"""
+Tests for RANSAC plane segmentation and barge geometry extraction
+"""
+
+import pytest
+import numpy as np
+from src.core.plane_segmentation import fit_plane_ransac, segment_planes
+from src.core.point_cloud import PointCloud
+from src.core.point_cloud_processor import PointCloudProcessor
+
+
+def make_barge_scene(trim=0.0, heel=0.0, freeboard=1.5, seed=0):
+    """Camera looking straight down at water 12 m away with a 10 x 4 m deck."""
+    rng = np.random.default_rng(seed)
+    
+    wx = rng.uniform(-10.0, 10.0, 6000)
+    wy = rng.uniform(-6.0, 6.0, 6000)
+    outside = ~((np.abs(wx) < 5.0) & (np.abs(wy) < 2.0))
+    water = np.column_stack([wx[outside], wy[outside], np.full(outside.sum(), 12.0)])
+    
+    dx = rng.uniform(-5.0, 5.0, 4000)
+    dy = rng.uniform(-2.0, 2.0, 4000)
+    dz = (12.0 - freeboard
+          - np.tan(np.radians(trim)) * dx
+          - np.tan(np.radians(heel)) * dy)
+    deck = np.column_stack([dx, dy, dz])
+    
+    points = np.vstack([water, deck])
+    return points + rng.normal(0.0, 0.005, points.shape)
+
+
+class TestPlaneSegmentation:
+    def test_fit_plane_ransac_recovers_plane(self):
+        """Test that RANSAC finds a plane despite heavy clutter."""
+        rng = np.random.default_rng(0)
+        plane = np.column_stack([rng.uniform(-1, 1, 2000), rng.uniform(-1, 1, 2000),
+                                 np.full(2000, 3.0)])
+        clutter = rng.uniform(-1, 4, size=(1000, 3))
+        
+        coefficients, inliers = fit_plane_ransac(np.vstack([plane, clutter]),
+                                                 distance_threshold=0.01,
+                                                 rng=np.random.default_rng(1))
+        
+        assert abs(abs(coefficients[2]) - 1.0) < 1e-3
+        assert abs(abs(coefficients[3]) - 3.0) < 1e-2
+        assert inliers.size >= 2000
+    
+    def test_fit_plane_ransac_too_few_points(self):
+        """Test that degenerate input yields no plane."""
+        plane, inliers = fit_plane_ransac(np.zeros((2, 3)))
+        
+        assert plane is None
+        assert inliers.size == 0
+    
+    def test_segment_planes_finds_water_and_deck(self):
+        """Test sequential extraction of both planes."""
+        planes = segment_planes(make_barge_scene(), max_planes=3,
+                                rng=np.random.default_rng(2))
+        
+        offsets = sorted(abs(plane[3]) for plane, _ in planes)
+        assert len(planes) == 2
+        assert offsets[0] == pytest.approx(10.5, abs=0.02)
+        assert offsets[1] == pytest.approx(12.0, abs=0.02)
+
+
+class TestBargeGeometry:
+    def _processor(self):
+        return PointCloudProcessor({
+            'max_depth': 20.0, 'min_depth': 0.1, 'voxel_size': 0.05, 'random_seed': 3
+        })
+    
+    def test_extract_level_barge(self):
+        """Test draft and dimensions on a level barge."""
+        geometry = self._processor().extract_barge_geometry(PointCloud(make_barge_scene()))
+        
+        assert geometry['freeboard'] == pytest.approx(1.5, abs=0.01)
+        assert geometry['draft'] == pytest.approx(3.66 - 1.5, abs=0.01)
+        assert geometry['trim'] == pytest.approx(0.0, abs=0.1)
+        assert geometry['heel'] == pytest.approx(0.0, abs=0.1)
+        assert geometry['dimensions']['length'] == pytest.approx(10.0, abs=0.2)
+        assert geometry['dimensions']['width'] == pytest.approx(4.0, abs=0.2)
+    
+    def test_extract_trim_and_heel(self):
+        """Test that deck tilt is reported as trim and heel."""
+        cloud = PointCloud(make_barge_scene(trim=2.0, heel=1.0))
+        geometry = self._processor().extract_barge_geometry(cloud)
+        
+        assert abs(geometry['trim']) == pytest.approx(2.0, abs=0.1)
+        assert abs(geometry['heel']) == pytest.approx(1.0, abs=0.1)
+    
+    def test_extract_without_deck_returns_defaults(self):
+        """Test that a water-only scene yields the zeroed geometry."""
+        rng = np.random.default_rng(4)
+        water = np.column_stack([rng.uniform(-5, 5, 3000), rng.uniform(-5, 5, 3000),
+                                 np.full(3000, 12.0)])
+        
+        geometry = self._processor().extract_barge_geometry(PointCloud(water))
+        
+        assert geometry['draft'] == 0.0
+        assert geometry['dimensions']['length'] == 0.0
@@ -0,0 +1,97 @@
+"""
+Tests for PointCloud container
+"""
+
+import pytest
+import numpy as np
+from src.core.point_cloud import PointCloud, as_point_cloud
+from src.agents.validator_agent import ValidatorAgent
+
+
+def make_cloud(n=10):
+    xyz = np.arange(n * 3, dtype=np.float32).reshape(n, 3)
+    rgb = np.full((n, 3), 128, dtype=np.uint8)
+    return PointCloud(xyz, rgb, frame_shape=(480, 640), timestamp='2024-01-01T00:00:00')
+
+
+class TestPointCloud:
+    def test_columns_are_contiguous(self):
+        """Test that columns are stored as contiguous typed arrays."""
+        cloud = make_cloud()
+        
+        assert cloud.num_points == 10
+        assert len(cloud) == 10
+        assert cloud.xyz.dtype == np.float32
+        assert cloud.rgb.dtype == np.uint8
+        assert cloud.xyz.flags['C_CONTIGUOUS']
+    
+    def test_existing_arrays_are_not_copied(self):
+        """Test that arrays with matching dtypes are shared, not copied."""
+        xyz = np.zeros((5, 3), dtype=np.float32)
+        cloud = PointCloud(xyz)
+        
+        assert np.shares_memory(cloud.xyz, xyz)
+        assert cloud.rgb.shape == (5, 3)
+    
+    def test_slice_is_zero_copy_view(self):
+        """Test that slicing returns views over the same buffers."""
+        cloud = make_cloud()
+        head = cloud[:4]
+        
+        assert isinstance(head, PointCloud)
+        assert head.num_points == 4
+        assert np.shares_memory(head.xyz, cloud.xyz)
+        assert np.shares_memory(head.rgb, cloud.rgb)
+    
+    def test_filter_with_mask(self):
+        """Test mask-based filtering."""
+        cloud = make_cloud()
+        cloud.labels = np.arange(10, dtype=np.int32)
+        
+        filtered = cloud.filter(cloud.xyz[:, 2] > 15.0)
+        
+        assert filtered.num_points == 5
+        assert list(filtered.labels) == [5, 6, 7, 8, 9]
+        assert filtered.frame_shape == (480, 640)
+    
+    def test_filter_rejects_wrong_mask_shape(self):
+        """Test that a mask of the wrong length is rejected."""
+        cloud = make_cloud()
+        
+        with pytest.raises(ValueError):
+            cloud.filter(np.ones(3, dtype=bool))
+    
+    def test_mismatched_columns_rejected(self):
+        """Test that column length mismatches are rejected."""
+        with pytest.raises(ValueError):
+            PointCloud(np.zeros((4, 3)), np.zeros((3, 3)))
+    
+    def test_dict_compatibility(self):
+        """Test the legacy dict shim."""
+        cloud = make_cloud()
+        
+        assert cloud['num_points'] == 10
+        assert cloud.get('points') is cloud.xyz
+        assert cloud.get('missing', 'default') == 'default'
+        assert 'timestamp' in cloud
+        assert set(cloud.to_dict()) == set(cloud.keys())
+    
+    def test_as_point_cloud_from_dict(self):
+        """Test coercion of legacy dict clouds."""
+        legacy = {
+            'points': [[0.0, 0.0, 1.0], [1.0, 0.0, 1.0]],
+            'colors': [],
+            'timestamp': None
+        }
+        cloud = as_point_cloud(legacy)
+        
+        assert cloud.num_points == 2
+        assert as_point_cloud(cloud) is cloud
+    
+    def test_validator_accepts_point_cloud(self):
+        """Test that the validator consumes PointCloud through the dict shim."""
+        agent = ValidatorAgent()
+        
+        is_valid, message = agent.validate_point_cloud(make_cloud(2000))
+        
+        assert is_valid
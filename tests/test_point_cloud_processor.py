@@ -0,0 +1,173 @@
+"""
+Tests for Point Cloud Processor
+"""
+
+import pytest
+import numpy as np
+from src.core.point_cloud import PointCloud
+from src.core.point_cloud_processor import PointCloudProcessor
+
+
+INTRINSICS = {'fx': 525.0, 'fy': 525.0, 'cx': 319.5, 'cy': 239.5}
+
+
+class TestPointCloudProcessor:
+    def test_initialization(self):
+        """Test processor initialization."""
+        processor = PointCloudProcessor()
+        assert processor.config['max_depth'] == 10.0
+        assert processor.config['min_depth'] == 0.1
+    
+    def test_process_rgbd_frame_back_projection(self):
+        """Test that depth pixels are back-projected through the intrinsics."""
+        processor = PointCloudProcessor()
+        
+        depth = np.full((480, 640), 2.0, dtype=np.float32)
+        rgb = np.zeros((480, 640, 3), dtype=np.uint8)
+        rgb[240, 320] = [10, 20, 30]
+        
+        point_cloud = processor.process_rgbd_frame(rgb, depth, INTRINSICS)
+        
+        assert point_cloud['num_points'] == 480 * 640
+        assert point_cloud['points'].shape == (480 * 640, 3)
+        assert point_cloud['points'].dtype == np.float32
+        assert point_cloud['colors'].dtype == np.uint8
+        
+        index = 240 * 640 + 320
+        x, y, z = point_cloud['points'][index]
+        assert x == pytest.approx((320 - 319.5) / 525.0 * 2.0)
+        assert y == pytest.approx((240 - 239.5) / 525.0 * 2.0)
+        assert z == pytest.approx(2.0)
+        assert list(point_cloud['colors'][index]) == [10, 20, 30]
+    
+    def test_process_rgbd_frame_depth_range_mask(self):
+        """Test that depths outside [min_depth, max_depth] are dropped."""
+        processor = PointCloudProcessor()
+        
+        depth = np.full((4, 4), 5.0, dtype=np.float32)
+        depth[0, 0] = 0.0      # Invalid reading
+        depth[1, 1] = 50.0     # Beyond max depth
+        depth[2, 2] = np.nan   # Sensor dropout
+        
+        point_cloud = processor.process_rgbd_frame(np.zeros((4, 4, 3)), depth, INTRINSICS)
+        
+        assert point_cloud['num_points'] == 13
+        assert np.all(point_cloud['points'][:, 2] == 5.0)
+    
+    def test_process_rgbd_frame_integer_depth(self):
+        """Test that integer depth maps are scaled by depth_scale."""
+        processor = PointCloudProcessor()
+        
+        depth = np.full((2, 3), 1500, dtype=np.uint16)
+        point_cloud = processor.process_rgbd_frame([], depth, INTRINSICS)
+        
+        assert point_cloud['num_points'] == 6
+        assert np.allclose(point_cloud['points'][:, 2], 1.5)
+    
+    def test_ray_grid_is_cached_per_resolution(self):
+        """Test that ray grids are reused across frames of the same resolution."""
+        processor = PointCloudProcessor()
+        depth = np.ones((48, 64), dtype=np.float32)
+        
+        processor.process_rgbd_frame([], depth, INTRINSICS)
+        processor.process_rgbd_frame([], depth, INTRINSICS)
+        
+        assert len(processor._ray_grids) == 1
+    
+    def test_downsample_centroid(self):
+        """Test that points sharing a voxel are averaged."""
+        processor = PointCloudProcessor({
+            'max_depth': 10.0, 'min_depth': 0.1, 'voxel_size': 1.0, 'voxel_mode': 'centroid'
+        })
+        
+        xyz = np.array([[0.1, 0.1, 0.1], [0.3, 0.5, 0.1], [2.5, 0.5, 0.5]], dtype=np.float32)
+        rgb = np.array([[0, 0, 0], [100, 50, 10], [7, 7, 7]], dtype=np.uint8)
+        
+        downsampled = processor.downsample(PointCloud(xyz, rgb))
+        
+        assert downsampled.num_points == 2
+        order = np.argsort(downsampled.xyz[:, 0])
+        assert np.allclose(downsampled.xyz[order[0]], [0.2, 0.3, 0.1])
+        assert list(downsampled.rgb[order[0]]) == [50, 25, 5]
+        assert list(downsampled.rgb[order[1]]) == [7, 7, 7]
+    
+    def test_downsample_first_and_nearest(self):
+        """Test the first-point and nearest-to-center reduction modes."""
+        xyz = np.array([[0.05, 0.05, 0.05], [0.5, 0.5, 0.5], [0.9, 0.9, 0.9]],
+                       dtype=np.float32)
+        cloud = PointCloud(xyz)
+        
+        for mode, expected in (('first', [0.05, 0.05, 0.05]), ('nearest', [0.5, 0.5, 0.5])):
+            processor = PointCloudProcessor({
+                'max_depth': 10.0, 'min_depth': 0.1, 'voxel_size': 1.0, 'voxel_mode': mode
+            })
+            downsampled = processor.downsample(cloud)
+            
+            assert downsampled.num_points == 1
+            assert np.allclose(downsampled.xyz[0], expected)
+    
+    def test_downsample_reduces_dense_cloud(self):
+        """Test that a dense cloud collapses to one point per occupied voxel."""
+        processor = PointCloudProcessor({'max_depth': 10.0, 'min_depth': 0.1, 'voxel_size': 0.1})
+        
+        rng = np.random.default_rng(0)
+        xyz = rng.uniform(0.0, 1.0, size=(20000, 3))
+        downsampled = processor.downsample(PointCloud(xyz))
+        
+        assert downsampled.num_points == 1000
+    
+    def test_downsample_rejects_unknown_mode(self):
+        """Test that an unknown reduction mode is rejected."""
+        processor = PointCloudProcessor({
+            'max_depth': 10.0, 'min_depth': 0.1, 'voxel_size': 0.1, 'voxel_mode': 'median'
+        })
+        
+        with pytest.raises(ValueError):
+            processor.downsample(PointCloud(np.zeros((3, 3))))
+    
+    def _speckled_plane(self, seed=0):
+        """Dense planar patch plus sparse speckle far from the surface."""
+        rng = np.random.default_rng(seed)
+        plane = np.column_stack([
+            rng.uniform(0.0, 1.0, 5000),
+            rng.uniform(0.0, 1.0, 5000),
+            np.zeros(5000)
+        ])
+        speckle = rng.uniform(-3.0, 3.0, size=(50, 3)) + [0.0, 0.0, 5.0]
+        return PointCloud(np.vstack([plane, speckle]))
+    
+    def test_filter_outliers_statistical(self):
+        """Test statistical outlier removal drops isolated speckle."""
+        processor = PointCloudProcessor()
+        cloud = self._speckled_plane()
+        
+        filtered = processor.filter_outliers(cloud)
+        
+        assert np.all(filtered.xyz[:, 2] < 1.0)
+        assert filtered.num_points >= 4900
+    
+    def test_filter_outliers_radius(self):
+        """Test radius outlier removal drops points without neighbors."""
+        processor = PointCloudProcessor({
+            'max_depth': 10.0, 'min_depth': 0.1, 'voxel_size': 0.01,
+            'outlier_method': 'radius', 'outlier_radius': 0.05, 'outlier_min_neighbors': 3
+        })
+        cloud = self._speckled_plane()
+        
+        filtered = processor.filter_outliers(cloud)
+        
+        assert filtered.num_points == 5000
+        assert np.all(filtered.xyz[:, 2] == 0.0)
+    
+    def test_filter_outliers_reuses_kdtree(self):
+        """Test that the cloud's KD-tree is cached and kept when nothing is removed."""
+        processor = PointCloudProcessor({
+            'max_depth': 10.0, 'min_depth': 0.1, 'voxel_size': 0.01,
+            'outlier_method': 'radius', 'outlier_radius': 0.5, 'outlier_min_neighbors': 1
+        })
+        cloud = PointCloud(np.random.default_rng(1).uniform(0.0, 0.1, size=(100, 3)))
+        
+        filtered = processor.filter_outliers(cloud)
+        
+        assert filtered is cloud
+        assert filtered.kdtree() is cloud.kdtree()
@@ -0,0 +1,145 @@
+"""
+Tests for Point Cloud Stream
+"""
+
+import json
+
+import pytest
+import numpy as np
+from src.core.point_cloud import PointCloud
+from src.interface.point_cloud_stream import (
+    HEADER, RECORD_BYTES, decode_point_cloud_frame, encode_point_cloud_frame,
+    progressive_order
+)
+from src.interface.websocket_handler import WebSocketHandler
+
+
+def make_cloud(count: int = 5000) -> PointCloud:
+    """Random cloud spanning a barge-sized box."""
+    rng = np.random.default_rng(0)
+    xyz = (rng.random((count, 3)) * [60.0, 15.0, 10.0] - [30.0, 7.5, 2.0]).astype(np.float32)
+    rgb = rng.integers(0, 256, size=(count, 3), dtype=np.uint8)
+    return PointCloud(xyz, rgb)
+
+
+class RecordingConnection:
+    """Connection stub that keeps what it was sent."""
+    
+    def __init__(self):
+        self.messages = []
+    
+    def send(self, data):
+        self.messages.append(data)
+    
+    @property
+    def frames(self):
+        """Binary messages received."""
+        return [message for message in self.messages if not isinstance(message, str)]
+
+
+class TestPointCloudStream:
+    def test_progressive_order_is_permutation(self):
+        """Test that the progressive order visits every point once."""
+        for count in (0, 1, 2, 10, 1000, 4096):
+            order = progressive_order(count)
+            assert sorted(order.tolist()) == list(range(count))
+    
+    def test_round_trip_precision(self):
+        """Test that decoded positions are within half a quantization step."""
+        cloud = make_cloud()
+        frame = encode_point_cloud_frame(cloud.xyz, cloud.rgb, sequence=7)
+        assert frame.nbytes == HEADER.size + cloud.num_points * RECORD_BYTES
+        
+        decoded = decode_point_cloud_frame(frame.payload())
+        order = progressive_order(cloud.num_points)
+        step = np.array([60.0, 15.0, 10.0]) / 65534
+        assert decoded['sequence'] == 7
+        assert decoded['total_points'] == cloud.num_points
+        assert np.all(np.abs(decoded['points'] - cloud.xyz[order]) <= step * 0.51 + 1e-5)
+        assert np.abs(decoded['colors'].astype(int) - cloud.rgb[order]).max() < 8
+    
+    def test_level_of_detail_prefix_spans_cloud(self):
+        """Test that a truncated payload is an even sample of the whole cloud."""
+        cloud = make_cloud()
+        frame = encode_point_cloud_frame(cloud.xyz, cloud.rgb)
+        payload = frame.payload(500)
+        
+        assert isinstance(payload, memoryview)
+        assert payload.obj is frame.buffer
+        decoded = decode_point_cloud_frame(payload)
+        assert len(decoded['points']) == 500
+        assert decoded['total_points'] == cloud.num_points
+        assert np.all(decoded['points'].min(axis=0) < cloud.xyz.min(axis=0) + 1.0)
+        assert np.all(decoded['points'].max(axis=0) > cloud.xyz.max(axis=0) - 1.0)
+        assert len(frame.payload(10 ** 6)) == frame.nbytes
+    
+    def test_degenerate_and_empty_clouds(self):
+        """Test flat clouds, empty clouds and clouds without colors."""
+        flat = np.zeros((3, 3), dtype=np.float32)
+        flat[:, 0] = [1.0, 2.0, 3.0]
+        decoded = decode_point_cloud_frame(encode_point_cloud_frame(flat).payload())
+        np.testing.assert_allclose(np.sort(decoded['points'][:, 0]), [1.0, 2.0, 3.0], atol=1e-4)
+        assert np.all(decoded['points'][:, 1:] == 0.0)
+        assert decoded['colors'] is None
+        
+        empty = decode_point_cloud_frame(encode_point_cloud_frame(np.empty((0, 3))).payload())
+        assert empty['points'].shape == (0, 3)
+    
+    def test_decode_rejects_other_payloads(self):
+        """Test that non-frame payloads are rejected."""
+        with pytest.raises(ValueError):
+            decode_point_cloud_frame(b'{}')
+        with pytest.raises(ValueError):
+            decode_point_cloud_frame(b'X' * HEADER.size)
+
+
+class TestWebSocketPointCloudStreaming:
+    def test_clients_receive_their_level_of_detail(self):
+        """Test that each client gets a view of one shared encoding."""
+        handler = WebSocketHandler()
+        full = RecordingConnection()
+        light = RecordingConnection()
+        handler.register_connection(full)
+        handler.register_connection(light, max_points=100)
+        
+        cloud = make_cloud()
+        handler.send_point_cloud_update(cloud)
+        handler.flush(timeout=5)
+        handler.set_level_of_detail(full, 1000)
+        handler.send_point_cloud_update(cloud)
+        handler.flush(timeout=5)
+        handler.shutdown()
+        
+        assert full.frames[0].obj is light.frames[0].obj
+        sizes = [[decode_point_cloud_frame(m)['points'].shape[0] for m in c.frames]
+                 for c in (full, light)]
+        assert sizes == [[cloud.num_points, 1000], [100, 100]]
+        assert decode_point_cloud_frame(light.frames[1])['sequence'] == 2
+    
+    def test_legacy_dict_cloud(self):
+        """Test streaming a legacy dict cloud."""
+        handler = WebSocketHandler()
+        connection = RecordingConnection()
+        handler.register_connection(connection)
+        
+        handler.send_point_cloud_update({'points': np.ones((4, 3)), 'num_points': 4})
+        handler.flush(timeout=5)
+        handler.shutdown()
+        
+        assert decode_point_cloud_frame(connection.frames[0])['total_points'] == 4
+    
+    def test_failed_send_drops_connection(self):
+        """Test that a connection whose send raises is removed."""
+        handler = WebSocketHandler()
+        healthy = RecordingConnection()
+        broken = RecordingConnection()
+        broken.send = None
+        handler.register_connection(broken)
+        handler.register_connection(healthy)
+        
+        handler.send_alert('info', 'ready')
+        handler.flush(timeout=5)
+        
+        assert handler.connections == [healthy]
+        assert json.loads(healthy.messages[-1])['message'] == 'ready'
+        handler.shutdown()
@@ -0,0 +1,154 @@
+"""
+Tests for Point Cloud Workers
+"""
+
+import warnings
+
+import pytest
+import numpy as np
+from src.core.point_cloud_processor import PointCloudProcessor
+from src.core.point_cloud_workers import PointCloudWorkerPool, SharedRing
+
+
+INTRINSICS = {'fx': 525.0, 'fy': 525.0, 'cx': 31.5, 'cy': 23.5}
+
+CONFIG = {
+    'max_depth': 10.0,
+    'min_depth': 0.1,
+    'voxel_size': 0.05,
+    'depth_scale': 0.001,
+    'outlier_method': 'none',
+    'workers': 1
+}
+
+
+def make_frame(seed: int):
+    """Small synthetic RGB-D frame with uint16 millimeter depth."""
+    rng = np.random.default_rng(seed)
+    depth = rng.integers(500, 3000, size=(48, 64), dtype=np.uint16)
+    depth[0, :5] = 0
+    rgb = rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+    return rgb, depth
+
+
+@pytest.fixture(scope='module')
+def pool():
+    with PointCloudWorkerPool(CONFIG, workers=2, slots=3, max_pixels=64 * 48) as pool:
+        yield pool
+
+
+class TestSharedRing:
+    def test_views_share_memory_between_attachments(self):
+        """Test that a second attachment sees writes through the first."""
+        owner = SharedRing(2, 100)
+        reader = SharedRing(2, 100, owner.name)
+        assert owner.slot_bytes == 128
+        
+        owner.view(1, ('<f4', (4,), 16))[:] = [1.0, 2.0, 3.0, 4.0]
+        assert list(reader.view(1, ('<f4', (4,), 16))) == [1.0, 2.0, 3.0, 4.0]
+        assert not reader.view(0, ('<f4', (4,), 16)).any()
+        
+        reader.close()
+        owner.close()
+    
+    def test_view_outside_slot_raises(self):
+        """Test that regions overrunning a slot are rejected."""
+        ring = SharedRing(1, 64)
+        with pytest.raises(ValueError):
+            ring.view(0, ('<f8', (9,), 0))
+        with pytest.raises(ValueError):
+            ring.view(1, ('|u1', (1,), 0))
+        ring.close()
+
+
+class TestPointCloudWorkerPool:
+    def test_matches_in_process_processing(self, pool):
+        """Test that worker results equal the single-process pipeline."""
+        processor = PointCloudProcessor(CONFIG)
+        rgb, depth = make_frame(0)
+        expected = processor.downsample(processor.process_rgbd_frame(rgb, depth, INTRINSICS))
+        
+        with pool.submit(rgb, depth, INTRINSICS).result(timeout=60) as shared:
+            cloud = shared.point_cloud()
+            assert shared.num_points == expected.num_points
+            assert cloud.frame_shape == (48, 64)
+            np.testing.assert_allclose(cloud.xyz, expected.xyz, rtol=1e-6)
+            np.testing.assert_array_equal(cloud.rgb, expected.rgb)
+    
+    def test_result_views_shared_memory(self, pool):
+        """Test that results wrap the shared block and copies outlive release."""
+        rgb, depth = make_frame(1)
+        shared = pool.submit(rgb, depth, INTRINSICS).result(timeout=60)
+        view = shared.point_cloud()
+        copy = shared.point_cloud(copy=True)
+        assert not view.xyz.flags.owndata
+        assert copy.xyz.flags.owndata
+        
+        shared.release()
+        with pytest.raises(RuntimeError):
+            shared.point_cloud()
+        assert copy.num_points == shared.num_points
+    
+    def test_many_frames_recycle_slots(self, pool):
+        """Test that more frames than slots flow through as results are released."""
+        processor = PointCloudProcessor(CONFIG)
+        for seed in range(8):
+            rgb, depth = make_frame(seed)
+            cloud = pool.process(rgb, depth, INTRINSICS)
+            expected = processor.downsample(processor.process_rgbd_frame(rgb, depth, INTRINSICS))
+            assert cloud.num_points == expected.num_points
+        assert pool._free.qsize() == pool.slots
+    
+    def test_full_ring_applies_backpressure(self, pool):
+        """Test that submit times out while every slot holds a result."""
+        rgb, depth = make_frame(2)
+        held = [pool.submit(rgb, depth, INTRINSICS).result(timeout=60)
+                for _ in range(pool.slots)]
+        with pytest.raises(TimeoutError):
+            pool.submit(rgb, depth, INTRINSICS, timeout=0.05)
+        
+        held[0].release()
+        with pool.submit(rgb, depth, INTRINSICS, timeout=5).result(timeout=60):
+            pass
+        for shared in held[1:]:
+            shared.release()
+    
+    def test_float_depth_without_color(self, pool):
+        """Test float64 depth maps and frames without an image."""
+        depth = np.full((4, 4), 2.0)
+        depth[0, 0] = np.nan
+        cloud = pool.process(np.empty((0,)), depth, INTRINSICS)
+        assert cloud.num_points >= 1
+        assert not cloud.rgb.any()
+    
+    def test_invalid_frames_are_rejected(self, pool):
+        """Test frame validation and that failed frames free their slot."""
+        with pytest.raises(ValueError):
+            pool.submit(None, np.zeros((100, 100)), INTRINSICS)
+        with pytest.raises(ValueError):
+            pool.submit(None, np.zeros(10), INTRINSICS)
+        
+        future = pool.submit(np.empty((0,)), np.ones((4, 4)), {'fx': 1.0})
+        with pytest.raises(KeyError):
+            future.result(timeout=60)
+        assert pool._free.qsize() == pool.slots
+    
+    def test_unknown_stage_raises(self):
+        """Test that stages must be PointCloudProcessor methods."""
+        with pytest.raises(ValueError):
+            PointCloudWorkerPool(CONFIG, workers=1, stages=('sharpen',))
+    
+    def test_shutdown_frees_shared_memory(self):
+        """Test that shutdown unlinks both rings without leak warnings."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            pool = PointCloudWorkerPool(CONFIG, workers=1, slots=1, max_pixels=64 * 48,
+                                        start_method='fork')
+            rgb, depth = make_frame(3)
+            assert pool.process(rgb, depth, INTRINSICS).num_points > 0
+            names = (pool._frames.name, pool._results.name)
+            pool.shutdown()
+        
+        for name in names:
+            with pytest.raises(FileNotFoundError):
+                SharedRing(1, 1, name)
@@ -0,0 +1,94 @@
+"""
+Tests for RGB-D Frame
+"""
+
+import pytest
+import numpy as np
+from src.core.point_cloud_processor import PointCloudProcessor
+from src.interface.rgbd_frame import (
+    HEADER, decode_rgbd_frame, encode_rgbd_frame, iter_rgbd_frames, parse_rgbd_header
+)
+
+
+INTRINSICS = {'fx': 131.25, 'fy': 131.25, 'cx': 79.5, 'cy': 59.5}
+
+
+def make_images(seed: int = 0):
+    """uint16 millimeter depth and a random RGB image."""
+    rng = np.random.default_rng(seed)
+    depth = rng.integers(500, 12000, size=(120, 160), dtype=np.uint16)
+    rgb = rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+    return depth, rgb
+
+
+class TestRGBDFrame:
+    def test_raw_frame_decodes_in_place(self):
+        """Test that a raw frame round-trips as views of the upload buffer."""
+        depth, rgb = make_images()
+        data = encode_rgbd_frame(depth, INTRINSICS, rgb)
+        assert len(data) == HEADER.size + depth.nbytes + rgb.nbytes
+        
+        frame = decode_rgbd_frame(data)
+        
+        assert frame['depth'].dtype == np.uint16
+        np.testing.assert_array_equal(frame['depth'], depth)
+        np.testing.assert_array_equal(frame['rgb'], rgb)
+        assert np.shares_memory(frame['depth'], np.frombuffer(data, dtype=np.uint8))
+        assert np.shares_memory(frame['rgb'], np.frombuffer(data, dtype=np.uint8))
+        assert frame['camera_intrinsics']['depth_scale'] == pytest.approx(0.001)
+        assert frame['camera_intrinsics']['fx'] == pytest.approx(131.25)
+    
+    def test_compressed_frame_and_float_depth(self):
+        """Test zlib sections and quantization of metric float depth."""
+        depth = np.full((120, 160), 10.5, dtype=np.float32)
+        depth[0, 0] = np.nan
+        data = encode_rgbd_frame(depth, INTRINSICS, compress=True)
+        frame = decode_rgbd_frame(data)
+        
+        assert len(data) < 2000
+        assert 'rgb' not in frame
+        assert frame['depth'][0, 0] == 0
+        assert frame['depth'][1, 1] == 10500
+    
+    def test_multi_frame_buffer(self):
+        """Test decoding frames stored back to back."""
+        frames = [make_images(seed) for seed in range(3)]
+        data = b''.join(encode_rgbd_frame(depth, INTRINSICS, rgb, compress=seed == 1)
+                        for seed, (depth, rgb) in enumerate(frames))
+        decoded = list(iter_rgbd_frames(data))
+        
+        assert len(decoded) == 3
+        for frame, (depth, rgb) in zip(decoded, frames):
+            np.testing.assert_array_equal(frame['depth'], depth)
+            np.testing.assert_array_equal(frame['rgb'], rgb)
+        with pytest.raises(ValueError):
+            list(iter_rgbd_frames(data[:-1]))
+    
+    def test_malformed_frames_rejected(self):
+        """Test header and payload checks, including oversized compressed data."""
+        depth, _ = make_images()
+        data = encode_rgbd_frame(depth, INTRINSICS)
+        with pytest.raises(ValueError):
+            parse_rgbd_header(b'XXXX' + data[4:])
+        with pytest.raises(ValueError):
+            decode_rgbd_frame(data[:-2])
+        
+        # A compressed section that inflates beyond the frame size is refused
+        bomb = encode_rgbd_frame(np.zeros((240, 320), dtype=np.uint16), INTRINSICS,
+                                 compress=True)
+        header = bytearray(bomb[:HEADER.size])
+        header[8:12] = (160).to_bytes(2, 'little') + (120).to_bytes(2, 'little')
+        with pytest.raises(ValueError):
+            decode_rgbd_frame(bytes(header) + bomb[HEADER.size:])
+    
+    def test_processor_uses_frame_depth_scale(self):
+        """Test that integer depth is scaled by the scale sent with the frame."""
+        depth = np.full((120, 160), 1050, dtype=np.uint16)
+        frame = decode_rgbd_frame(encode_rgbd_frame(depth, INTRINSICS, depth_scale=0.01))
+        processor = PointCloudProcessor({'max_depth': 20.0, 'min_depth': 0.1})
+        
+        cloud = processor.process_rgbd_frame(frame.get('rgb', []), frame['depth'],
+                                             frame['camera_intrinsics'])
+        
+        assert cloud.num_points == 120 * 160
+        assert cloud.xyz[:, 2] == pytest.approx(10.5)
@@ -0,0 +1,287 @@
+"""
+Tests for FREQ Server
+"""
+
+import asyncio
+import base64
+import json
+import os
+import struct
+import time
+
+import numpy as np
+from src.interface.api import FreqAPI
+from src.interface.rgbd_frame import CONTENT_TYPE, encode_rgbd_frame
+from src.interface.server import FreqServer
+
+
+INTRINSICS = {'fx': 131.25, 'fy': 131.25, 'cx': 79.5, 'cy': 59.5}
+
+
+def make_frame(seed: int = 0):
+    """Small synthetic frame: water at 12 m with a barge deck 1.5 m above it."""
+    rng = np.random.default_rng(seed)
+    depth = np.full((120, 160), 12.0, dtype=np.float32)
+    depth[35:85, 30:130] = 10.5
+    depth += rng.normal(0.0, 0.005, depth.shape).astype(np.float32)
+    return {
+        'rgb': np.zeros((120, 160, 3), dtype=np.uint8).tolist(),
+        'depth': depth.tolist(),
+        'camera_intrinsics': INTRINSICS
+    }
+
+
+def make_binary_frame(seed: int = 0, compress: bool = False) -> bytes:
+    """The synthetic frame as a binary upload with millimeter depth."""
+    frame = make_frame(seed)
+    return encode_rgbd_frame(np.array(frame['depth'], dtype=np.float32), INTRINSICS,
+                             np.array(frame['rgb'], dtype=np.uint8), compress=compress)
+
+
+def make_server(**overrides):
+    api = FreqAPI({'processor': {'max_depth': 20.0, 'min_depth': 0.1, 'voxel_size': 0.1}})
+    config = {'host': '127.0.0.1', 'port': 0, 'prefix': '/api/v1', 'cycle_workers': 1,
+              'max_body_bytes': 1 << 24, 'job_history': 100, 'state_max_age': 0.5}
+    config.update(overrides)
+    return FreqServer(api, config)
+
+
+async def request(port, method, path, body=b'', headers=None):
+    """Loopback HTTP client: one request per connection."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", "Connection: close",
+             f"Content-Length: {len(body)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    
+    head = (await reader.readuntil(b'\r\n\r\n')).decode()
+    status = int(head.split(' ', 2)[1])
+    response_headers = dict(line.split(': ', 1) for line in head.split('\r\n')[1:] if line)
+    payload = await reader.readexactly(int(response_headers['Content-Length']))
+    writer.close()
+    if response_headers['Content-Type'] == 'application/json':
+        payload = json.loads(payload)
+    return status, payload
+
+
+async def chunked_request(port, path, pieces):
+    """Loopback HTTP client sending a chunked body, one chunk per piece."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+                  f"Content-Type: {CONTENT_TYPE}\r\nTransfer-Encoding: chunked\r\n\r\n").encode())
+    for piece in pieces:
+        writer.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+        await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+    
+    head = (await reader.readuntil(b'\r\n\r\n')).decode()
+    status = int(head.split(' ', 2)[1])
+    response_headers = dict(line.split(': ', 1) for line in head.split('\r\n')[1:] if line)
+    payload = await reader.readexactly(int(response_headers['Content-Length']))
+    writer.close()
+    return status, json.loads(payload)
+
+
+class WebSocketClient:
+    """Loopback WebSocket client with masked frames."""
+    
+    async def connect(self, port, path='/ws'):
+        self.reader, self.writer = await asyncio.open_connection('127.0.0.1', port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.writer.write((f"GET {path} HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+                           f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                           "Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        assert head.startswith(b'HTTP/1.1 101')
+        return self
+    
+    async def send(self, text):
+        payload = text.encode()
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.writer.write(struct.pack('!BB', 0x81, 0x80 | len(payload)) + mask + masked)
+        await self.writer.drain()
+    
+    async def receive(self):
+        head = await self.reader.readexactly(2)
+        length = head[1] & 0x7F
+        if length == 126:
+            length, = struct.unpack('!H', await self.reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack('!Q', await self.reader.readexactly(8))
+        payload = await self.reader.readexactly(length)
+        return json.loads(payload) if head[0] & 0x0F == 0x1 else payload
+    
+    async def receive_type(self, kind, timeout=10.0):
+        while True:
+            message = await asyncio.wait_for(self.receive(), timeout)
+            if isinstance(message, dict) and message['type'] == kind:
+                return message
+    
+    def close(self):
+        self.writer.close()
+
+
+def run_with_server(scenario, **overrides):
+    """Run ``scenario(server, port)`` against a started server."""
+    async def main():
+        server = make_server(**overrides)
+        _, port = await server.start()
+        try:
+            return await scenario(server, port)
+        finally:
+            await server.stop()
+    return asyncio.run(main())
+
+
+async def wait_for_job(port, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, job = await request(port, 'GET', f'/api/v1/jobs/{job_id}')
+        assert status == 200
+        if job['status'] in ('done', 'failed'):
+            return job
+        await asyncio.sleep(0.05)
+    raise TimeoutError(job_id)
+
+
+class TestFreqServer:
+    def test_health_and_state(self):
+        """Test the health and state endpoints."""
+        async def scenario(server, port):
+            health = await request(port, 'GET', '/api/v1/health')
+            state = await request(port, 'GET', '/api/v1/state')
+            missing = await request(port, 'GET', '/api/v1/nothing')
+            wrong_method = await request(port, 'POST', '/api/v1/health')
+            return health, state, missing, wrong_method
+        
+        health, state, missing, wrong_method = run_with_server(scenario)
+        assert health == (200, health[1]) and health[1]['status'] == 'healthy'
+        assert state[0] == 200
+        assert state[1]['status'] == 'initialized'
+        assert state[1]['jobs'] == {'queued': 0, 'running': 0}
+        assert missing[0] == 404
+        assert wrong_method[0] == 405
+    
+    def test_cycle_job_lifecycle(self):
+        """Test that a cycle returns a job id at once and its result can be polled."""
+        async def scenario(server, port):
+            body = json.dumps(make_frame()).encode()
+            status, job = await request(port, 'POST', '/api/v1/cycle/start', body)
+            assert status == 202 and job['status'] == 'queued'
+            finished = await wait_for_job(port, job['job_id'])
+            gcode = await request(port, 'GET',
+                                  f"/api/v1/cycle/{finished['result']['cycle_id']}/gcode")
+            bad = [await request(port, 'POST', '/api/v1/cycle/start', body)
+                   for body in (b'{"rgb": []}', b'{"depth": [[1], [2, 3]], '
+                                b'"camera_intrinsics": {}}', b'{"depth": ')]
+            state = await request(port, 'GET', '/api/v1/state')
+            return job, finished, gcode, bad, state
+        
+        job, finished, gcode, bad, state = run_with_server(scenario, state_max_age=0.0)
+        assert job['status_url'] == f"/api/v1/jobs/{job['job_id']}"
+        assert finished['status'] == 'done'
+        assert finished['result']['success'] is True
+        assert gcode[0] == 200 and 'G21' in gcode[1].decode()
+        # Malformed frames are refused up front instead of becoming failed jobs
+        assert [status for status, _ in bad] == [400, 400, 400]
+        assert 'depth' in bad[0][1]['error']
+        assert state[1]['cycles_completed'] == 1
+        assert state[1]['jobs'] == {'queued': 0, 'running': 0}
+    
+    def test_health_stays_fast_during_cycles(self):
+        """Test that health requests are answered while a cycle is running."""
+        async def scenario(server, port):
+            def slow_cycle(frame):
+                time.sleep(0.5)
+                return {'success': True, 'cycle_id': 1}
+            server.api.process_drafting_cycle = slow_cycle
+            
+            await request(port, 'POST', '/api/v1/cycle/start', b'{"depth": [[1]], '
+                          b'"camera_intrinsics": {}}')
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            status, _ = await request(port, 'GET', '/api/v1/health')
+            elapsed = time.perf_counter() - started
+            state = await request(port, 'GET', '/api/v1/state')
+            return status, elapsed, state
+        
+        status, elapsed, state = run_with_server(scenario)
+        assert status == 200
+        assert elapsed < 0.2
+        assert state[1]['jobs'] == {'queued': 0, 'running': 1}
+    
+    def test_websocket_pushes_job_updates(self):
+        """Test that WebSocket clients get a snapshot, job updates and state patches."""
+        async def scenario(server, port):
+            client = await WebSocketClient().connect(port, '/ws?max_points=1000')
+            snapshot = await client.receive_type('state_snapshot')
+            body = json.dumps(make_frame()).encode()
+            _, job = await request(port, 'POST', '/api/v1/cycle/start', body)
+            update = await client.receive_type('job_update')
+            patch = await client.receive_type('state_patch')
+            await client.send(json.dumps({'type': 'resync'}))
+            resync = await client.receive_type('state_snapshot')
+            client.close()
+            return job, snapshot, update, patch, resync
+        
+        job, snapshot, update, patch, resync = run_with_server(scenario)
+        assert snapshot['seq'] == 0
+        assert update['job_id'] == job['job_id'] and update['status'] == 'done'
+        assert patch['seq'] == 1 and patch['set']['cycles_completed'] == 1
+        assert resync['seq'] == 1 and resync['data']['cycles_completed'] == 1
+    
+    def test_oversized_body_rejected(self):
+        """Test that bodies over max_body_bytes are refused."""
+        async def scenario(server, port):
+            return await request(port, 'POST', '/api/v1/cycle/start', b'x' * 2048)
+        
+        status, body = run_with_server(scenario, max_body_bytes=1024)
+        assert status == 413
+    
+    def test_binary_frame_upload(self):
+        """Test a binary frame upload, raw and compressed, sized and chunked."""
+        async def scenario(server, port):
+            headers = {'Content-Type': CONTENT_TYPE}
+            raw = make_binary_frame()
+            _, job = await request(port, 'POST', '/api/v1/cycle/start', raw, headers)
+            # Chunk boundaries that split the header and the depth section
+            pieces = [raw[:10], raw[10:5000], raw[5000:]]
+            _, chunked = await chunked_request(port, '/api/v1/cycle/start', pieces)
+            compressed = make_binary_frame(compress=True)
+            _, small = await request(port, 'POST', '/api/v1/cycle/start', compressed, headers)
+            two = await request(port, 'POST', '/api/v1/cycle/start', raw + raw, headers)
+            bad = await request(port, 'POST', '/api/v1/cycle/start', b'FQRX' + raw[4:], headers)
+            jobs = [await wait_for_job(port, j['job_id']) for j in (job, chunked, small)]
+            return raw, compressed, jobs, two, bad
+        
+        raw, compressed, jobs, two, bad = run_with_server(scenario)
+        assert len(compressed) < len(raw) // 3
+        assert [job['status'] for job in jobs] == ['done'] * 3
+        assert jobs[0]['result']['geometry'] == jobs[2]['result']['geometry']
+        assert two[0] == 400 and '/cycle/stream' in two[1]['error']
+        assert bad[0] == 400
+    
+    def test_multi_frame_stream(self):
+        """Test that a chunked multi-frame upload queues one job per frame."""
+        async def scenario(server, port):
+            frames = [make_binary_frame(seed, compress=seed % 2 == 1) for seed in range(4)]
+            data = b''.join(frames)
+            # Chunks of a fixed size, unrelated to the frame boundaries
+            pieces = [data[i:i + 16384] for i in range(0, len(data), 16384)]
+            status, body = await chunked_request(port, '/api/v1/cycle/stream', pieces)
+            jobs = [await wait_for_job(port, job['job_id']) for job in body['jobs']]
+            truncated = await chunked_request(port, '/api/v1/cycle/stream',
+                                              [frames[0], frames[1][:100]])
+            not_binary = await request(port, 'POST', '/api/v1/cycle/stream', b'{}')
+            return status, body, jobs, truncated, not_binary
+        
+        status, body, jobs, truncated, not_binary = run_with_server(scenario,
+                                                                    stream_max_pending=1)
+        assert status == 202 and body['frames'] == 4
+        assert [job['status'] for job in jobs] == ['done'] * 4
+        assert len({job['result']['cycle_id'] for job in jobs}) == 4
+        assert truncated[0] == 400 and truncated[1]['frames'] == 1
+        assert not_binary[0] == 415
@@ -0,0 +1,141 @@
+"""
+Tests for the drafting session scheduler
+"""
+
+import threading
+import time
+import pytest
+from src.core.session_scheduler import SessionScheduler
+
+
+def blocking_runner(gate: threading.Event, order: list):
+    """Runner that records its session and waits for the gate to open."""
+    def run(session, input_data):
+        gate.wait(5.0)
+        order.append(session.session_id)
+        return input_data.get('value')
+    return run
+
+
+class TestSessionScheduler:
+    def test_cycle_records(self):
+        """Test that cycles resolve with per-session records and history."""
+        scheduler = SessionScheduler(lambda session, data: data['value'] * 2, max_workers=2)
+        scheduler.create_session('crane-1')
+        
+        first = scheduler.submit('crane-1', {'value': 1}).result(5.0)
+        second = scheduler.submit('crane-1', {'value': 2}).result(5.0)
+        
+        assert first['results'] == 2 and second['results'] == 4
+        assert (first['cycle_id'], second['cycle_id']) == (1, 2)
+        assert first['session_id'] == 'crane-1'
+        state = scheduler.get_session('crane-1').snapshot()
+        assert state['cycles_completed'] == 2
+        assert [record['cycle_id'] for record in state['history']] == [1, 2]
+        scheduler.shutdown()
+    
+    def test_sessions_run_in_order(self):
+        """Test that one session never runs two cycles at once."""
+        active = []
+        overlaps = []
+        
+        def run(session, data):
+            if session.session_id in active:
+                overlaps.append(session.session_id)
+            active.append(session.session_id)
+            time.sleep(0.005)
+            active.remove(session.session_id)
+            return data['value']
+        
+        scheduler = SessionScheduler(run, max_workers=4)
+        scheduler.create_session('a')
+        futures = [scheduler.submit('a', {'value': i}) for i in range(10)]
+        
+        assert [future.result(5.0)['results'] for future in futures] == list(range(10))
+        assert overlaps == []
+        scheduler.shutdown()
+    
+    def test_priority_share(self):
+        """Test that busy sessions share the pool in proportion to priority."""
+        gate = threading.Event()
+        order = []
+        scheduler = SessionScheduler(blocking_runner(gate, order), max_workers=1)
+        scheduler.create_session('high', priority=3.0)
+        scheduler.create_session('low', priority=1.0)
+        
+        futures = [scheduler.submit(name, {}) for _ in range(8) for name in ('low', 'high')]
+        gate.set()
+        for future in futures:
+            future.result(5.0)
+        
+        # The first cycle started before 'high' queued any work
+        assert order[0] == 'low'
+        # 3:1 share while both are busy, up to tie-breaking
+        assert order[1:].index('low') in (3, 4)
+        assert order[1:9].count('high') in (6, 7)
+        assert order.count('low') == order.count('high') == 8
+        scheduler.shutdown()
+    
+    def test_idle_session_does_not_bank_credit(self):
+        """Test that a late session restarts at the current virtual time."""
+        gate = threading.Event()
+        order = []
+        scheduler = SessionScheduler(blocking_runner(gate, order), max_workers=1)
+        scheduler.create_session('busy')
+        scheduler.create_session('late')
+        gate.set()
+        for _ in range(20):
+            scheduler.submit('busy', {}).result(5.0)
+        
+        gate.clear()
+        futures = [scheduler.submit(name, {}) for _ in range(4) for name in ('busy', 'late')]
+        gate.set()
+        for future in futures:
+            future.result(5.0)
+        
+        # Without the reset 'late' would run four cycles in a row
+        assert order[20:22].count('late') == 1
+        assert order[20:].count('late') == 4
+        scheduler.shutdown()
+    
+    def test_errors_and_close(self):
+        """Test failure bookkeeping and cancellation of queued cycles."""
+        gate = threading.Event()
+        
+        def run(session, data):
+            gate.wait(5.0)
+            raise RuntimeError('sensor dropout')
+        
+        scheduler = SessionScheduler(run, max_workers=1)
+        scheduler.create_session('a')
+        failing = scheduler.submit('a', {})
+        queued = scheduler.submit('a', {})
+        scheduler.close_session('a')
+        gate.set()
+        
+        with pytest.raises(RuntimeError):
+            failing.result(5.0)
+        assert queued.cancelled()
+        with pytest.raises(KeyError):
+            scheduler.submit('a', {})
+        with pytest.raises(ValueError):
+            scheduler.create_session('b', priority=0.0)
+        scheduler.shutdown()
+        with pytest.raises(RuntimeError):
+            scheduler.submit('b', {})
+    
+    def test_failing_completion_hook(self):
+        """Test that an exception in on_complete still resolves the cycle."""
+        def on_complete(session, record):
+            raise RuntimeError('dashboard unavailable')
+        
+        scheduler = SessionScheduler(lambda session, data: data['value'], max_workers=1,
+                                     on_complete=on_complete)
+        scheduler.create_session('a')
+        
+        first = scheduler.submit('a', {'value': 1}).result(5.0)
+        second = scheduler.submit('a', {'value': 2}).result(5.0)
+        
+        assert (first['results'], second['results']) == (1, 2)
+        assert scheduler.get_session('a').snapshot()['cycles_completed'] == 2
+        scheduler.shutdown()
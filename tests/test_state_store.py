@@ -0,0 +1,147 @@
+"""
+Tests for State Store
+"""
+
+import copy
+import json
+import time
+
+from src.interface.state_store import StateStore, apply_patch, diff_state
+from src.interface.websocket_handler import WebSocketHandler
+
+
+class RecordingConnection:
+    """Connection stub that decodes the JSON messages it is sent."""
+    
+    def __init__(self):
+        self.messages = []
+    
+    def send(self, data):
+        self.messages.append(json.loads(data))
+    
+    def of_type(self, kind):
+        return [message for message in self.messages if message['type'] == kind]
+
+
+STATE = {
+    'status': 'ready',
+    'cycles_completed': 3,
+    'barges': {
+        'B-1': {'draft': 2.1, 'stages': {'downsample': 11.2, 'filtering': 4.0}},
+        'B-2': {'draft': 1.8, 'stages': {'downsample': 10.9}}
+    },
+    'frame_shape': (480, 640)
+}
+
+
+class TestStateStore:
+    def test_patch_contains_only_changes(self):
+        """Test that nested changes and removals are the whole patch."""
+        new = copy.deepcopy(STATE)
+        new['barges']['B-1']['stages']['filtering'] = 4.5
+        new['barges']['B-3'] = {'draft': 0.9}
+        del new['barges']['B-2']['stages']['downsample']
+        del new['status']
+        
+        merged, changed, removed = diff_state(STATE, new)
+        
+        assert changed == {'barges': {'B-1': {'stages': {'filtering': 4.5}},
+                                      'B-3': {'draft': 0.9}}}
+        assert sorted(removed) == [['barges', 'B-2', 'stages', 'downsample'], ['status']]
+        assert merged['barges']['B-2']['draft'] == 1.8
+        assert STATE['barges']['B-1']['stages']['filtering'] == 4.0
+    
+    def test_patches_rebuild_state(self):
+        """Test that applying patches in order reproduces the store."""
+        store = StateStore()
+        client = {}
+        states = [STATE, dict(STATE, status='processing'), dict(STATE, cycles_completed=4)]
+        for state in states:
+            patch = store.update(state)
+            apply_patch(client, patch)
+        assert store.version == 3
+        assert client == json.loads(json.dumps(store.state))
+        assert client['status'] == 'ready' and client['cycles_completed'] == 4
+    
+    def test_unchanged_state_yields_no_patch(self):
+        """Test that repeated and in-place-mutated states are tracked correctly."""
+        store = StateStore()
+        state = copy.deepcopy(STATE)
+        store.update(state)
+        assert store.update(copy.deepcopy(STATE)) is None
+        
+        state['barges']['B-1']['draft'] = 2.3
+        patch = store.update(state)
+        assert patch == {'seq': 2, 'set': {'barges': {'B-1': {'draft': 2.3}}}, 'unset': []}
+    
+    def test_partial_update_merges(self):
+        """Test that partial updates keep keys they do not mention."""
+        store = StateStore()
+        store.update(STATE)
+        patch = store.update({'barges': {'B-2': {'draft': 1.7}}}, partial=True)
+        assert patch['unset'] == []
+        assert store.state['barges']['B-1'] == STATE['barges']['B-1']
+        assert store.state['barges']['B-2']['draft'] == 1.7
+
+
+class TestWebSocketStateSync:
+    def test_snapshot_on_connect_then_patches(self):
+        """Test that a client gets a snapshot and then sequential patches."""
+        handler = WebSocketHandler()
+        handler.send_state_update(STATE)
+        client = RecordingConnection()
+        handler.register_connection(client)
+        
+        handler.send_state_update(dict(STATE, status='processing'))
+        handler.send_state_update(dict(STATE, status='processing'))
+        handler.send_state_update(STATE)
+        handler.flush(timeout=5)
+        handler.shutdown()
+        
+        snapshot, = client.of_type('state_snapshot')
+        patches = client.of_type('state_patch')
+        assert snapshot['seq'] == 1
+        assert [patch['seq'] for patch in patches] == [2, 3]
+        assert patches[0]['set'] == {'status': 'processing'}
+        
+        state = snapshot['data']
+        for patch in patches:
+            apply_patch(state, patch)
+        assert state == json.loads(json.dumps(STATE))
+    
+    def test_resync_request(self):
+        """Test that a resync message sends a fresh snapshot to that client."""
+        handler = WebSocketHandler()
+        client = RecordingConnection()
+        other = RecordingConnection()
+        handler.register_connection(client)
+        handler.register_connection(other)
+        handler.send_state_update({'status': 'ready'})
+        
+        handler.handle_client_message(client, json.dumps({'type': 'resync'}))
+        handler.handle_client_message(client, 'not json')
+        handler.flush(timeout=5)
+        handler.shutdown()
+        
+        assert [s['seq'] for s in client.of_type('state_snapshot')] == [0, 1]
+        assert client.of_type('state_snapshot')[1]['data'] == {'status': 'ready'}
+        assert len(other.of_type('state_snapshot')) == 1
+    
+    def test_progress_coalesced_to_max_rate(self):
+        """Test that bursts of progress updates are throttled but end exact."""
+        handler = WebSocketHandler(dict(WebSocketHandler().config, progress_max_rate=20.0))
+        client = RecordingConnection()
+        handler.register_connection(client)
+        
+        for step in range(50):
+            handler.send_progress_update(7, float(step))
+        time.sleep(0.15)
+        handler.flush(timeout=5)
+        throttled = [m['progress'] for m in client.of_type('progress_update')]
+        handler.send_progress_update(7, 100.0)
+        handler.flush(timeout=5)
+        handler.shutdown()
+        
+        assert throttled[0] == 0.0 and throttled[-1] == 49.0
+        assert len(throttled) < 10
+        assert client.of_type('progress_update')[-1]['progress'] == 100.0
@@ -0,0 +1,129 @@
+"""
+Tests for trajectory planning
+"""
+
+import numpy as np
+import pytest
+from src.core.trajectory import plan_trajectory, ramp_time
+
+
+LIMITS = {'max_velocity': [0.5, 0.5, 0.3], 'max_acceleration': [0.25, 0.25, 0.2]}
+
+
+class TestTrajectory:
+    def test_ramp_time(self):
+        """Test ramp durations with and without reaching full acceleration."""
+        assert ramp_time(1.0, 0.5) == pytest.approx(2.0)
+        assert ramp_time(1.0, 0.5, 1.0) == pytest.approx(2.5)
+        assert ramp_time(0.01, 0.5, 1.0) == pytest.approx(0.2)
+    
+    def test_straight_segment(self):
+        """Test trapezoidal and S-curve times for a single long move."""
+        path = [[0.0, 0.0, 0.0], [10.0, 0.0, 0.0]]
+        
+        # Ramps of 1 s over 0.5 m each, cruise 9 m at 1 m/s
+        assert plan_trajectory(path, 1.0, 1.0)['duration'] == pytest.approx(11.0)
+        # Jerk-limited ramps take 2 s over 1 m each
+        assert plan_trajectory(path, 1.0, 1.0, 1.0)['duration'] == pytest.approx(12.0)
+    
+    def test_short_segment_peak(self):
+        """Test that short moves peak below the velocity limit."""
+        trajectory = plan_trajectory([[0.0, 0.0, 0.0], [0.5, 0.0, 0.0]], 1.0, 1.0)
+        
+        assert trajectory['feed'][0] == pytest.approx(np.sqrt(0.5))
+        assert trajectory['duration'] == pytest.approx(2.0 * np.sqrt(0.5))
+    
+    def test_axis_limits(self):
+        """Test that the slowest axis sets the path speed."""
+        trajectory = plan_trajectory([[0.0, 0.0, 0.0], [0.0, 0.0, 20.0]], **LIMITS)
+        diagonal = plan_trajectory([[0.0, 0.0, 0.0], [20.0, 20.0, 0.0]], **LIMITS)
+        
+        assert trajectory['feed'][0] == pytest.approx(0.3)
+        assert diagonal['feed'][0] == pytest.approx(0.5 * np.sqrt(2.0))
+    
+    def test_corner_blending(self):
+        """Test corner speeds for straight, right-angle and reversing junctions."""
+        path = [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0],
+                [2.0, 1.0, 0.0], [2.0, 0.0, 0.0]]
+        
+        velocity = plan_trajectory(path, **LIMITS, blend_tolerance=0.05)['velocity']
+        
+        assert velocity[0] == velocity[-1] == 0.0
+        assert velocity[1] == pytest.approx(0.5)
+        assert 0.0 < velocity[2] < 0.5
+        assert velocity[3] == 0.0
+        
+        exact = plan_trajectory(path, **LIMITS, blend_tolerance=0.0)['velocity']
+        assert exact[1] == pytest.approx(0.5)
+        assert exact[2] == 0.0
+    
+    def test_profiles_fit_segments(self):
+        """Test that every segment's ramps fit within its length."""
+        rng = np.random.default_rng(0)
+        path = np.cumsum(rng.normal(0.0, 0.5, (200, 3)), axis=0)
+        lengths = np.linalg.norm(np.diff(path, axis=0), axis=1)
+        
+        for jerk in (None, 0.8):
+            trajectory = plan_trajectory(path, **LIMITS, max_jerk=jerk)
+            entry, exit = trajectory['velocity'][:-1], trajectory['velocity'][1:]
+            peak = trajectory['feed']
+            
+            assert np.all(peak >= np.maximum(entry, exit) - 1e-9)
+            assert np.all(trajectory['segment_time'] > 0.0)
+            assert np.all(trajectory['segment_time'] * peak >= lengths - 1e-6)
+            assert trajectory['duration'] == pytest.approx(trajectory['segment_time'].sum())
+            assert np.all(peak <= 0.5 * np.sqrt(3.0) + 1e-9)
+    
+    def test_duplicate_waypoints(self):
+        """Test that zero-length moves take no time and keep the previous feed."""
+        path = [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0]]
+        
+        trajectory = plan_trajectory(path, **LIMITS)
+        
+        assert trajectory['segment_time'][1] == 0.0
+        assert trajectory['feed'][1] == trajectory['feed'][0]
+        assert len(plan_trajectory(np.empty((0, 3)), 1.0, 1.0)['time']) == 0
+    
+    def test_duplicate_and_reversing_waypoints(self):
+        """Test feeds and junction speeds on repeated and back-and-forth waypoints."""
+        path = [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [2.0, 0.0, 0.0],
+                [0.5, 0.0, 0.0], [3.0, 0.0, 0.0], [3.0, 0.0, 0.0], [3.0, 0.0, 0.0]]
+        
+        for jerk in (None, 0.8):
+            trajectory = plan_trajectory(path, **LIMITS, max_jerk=jerk, blend_tolerance=0.05)
+            velocity, feed = trajectory['velocity'], trajectory['feed']
+            
+            assert np.all(np.isfinite(feed)) and np.all(feed > 0.0)
+            assert np.all(np.isfinite(velocity))
+            # Reversals and both ends stop; duplicates share their waypoint's speed
+            assert np.all(velocity == 0.0)
+            assert np.all(trajectory['segment_time'][[0, 2, 5, 6]] == 0.0)
+            assert feed[2] == feed[1] and feed[5] == feed[6] == feed[4]
+            assert np.all(feed[[1, 3, 4]] <= 0.5 + 1e-9)
+        
+        still = plan_trajectory([[1.0, 2.0, 3.0]] * 4, **LIMITS)
+        assert np.all(np.isfinite(still['feed'])) and len(still['feed']) == 3
+        assert np.all(still['velocity'] == 0.0)
+        assert still['duration'] == 0.0
+    
+    def test_junction_speeds_reachable(self):
+        """Test that junction speeds can be reached from both neighbours on a long path."""
+        rng = np.random.default_rng(1)
+        steps = rng.choice([0.0, 0.05, 0.4, 2.0], 2000) * rng.choice([-1.0, 1.0, 1.0], 2000)
+        path = np.zeros((2000, 3))
+        path[:, 0] = np.cumsum(steps) + 1000.0
+        
+        trajectory = plan_trajectory(path, 0.5, 0.25, blend_tolerance=0.05)
+        velocity = trajectory['velocity']
+        lengths = np.linalg.norm(np.diff(path, axis=0), axis=1)
+        
+        growth = 2.0 * 0.25 * lengths + 1e-9
+        assert np.all(velocity[1:] ** 2 <= velocity[:-1] ** 2 + growth)
+        assert np.all(velocity[:-1] ** 2 <= velocity[1:] ** 2 + growth)
+        assert np.all(velocity <= 0.5 + 1e-9)
+        assert np.any(velocity == 0.5) and np.sum((velocity > 0.0) & (velocity < 0.5)) > 100
+    
+    def test_invalid_limits(self):
+        """Test that non-positive limits are rejected."""
+        with pytest.raises(ValueError):
+            plan_trajectory([[0.0, 0.0, 0.0]], [1.0, 0.0, 1.0], 1.0)
@@ -0,0 +1,96 @@
+"""
+Tests for TSDF multi-frame fusion
+"""
+
+import pytest
+import numpy as np
+from src.core.point_cloud import PointCloud
+from src.core.tsdf_fusion import TSDFVolume
+
+
+def make_plane_frame(depth=5.0, noise=0.0, seed=0):
+    """Dense fronto-parallel plane patch in camera coordinates."""
+    rng = np.random.default_rng(seed)
+    u, v = np.meshgrid(np.linspace(-1.0, 1.0, 80), np.linspace(-1.0, 1.0, 80))
+    z = depth + rng.normal(0.0, noise, u.size)
+    return PointCloud(np.column_stack([u.ravel(), v.ravel(), z]),
+                      np.full((u.size, 3), 200, dtype=np.uint8))
+
+
+class TestTSDFVolume:
+    def test_initialization(self):
+        """Test volume initialization."""
+        volume = TSDFVolume()
+        assert volume.voxel_size == 0.05
+        assert volume.num_blocks == 0
+    
+    def test_integrate_allocates_only_surface_blocks(self):
+        """Test that memory follows the observed surface, not the bounding box."""
+        volume = TSDFVolume()
+        
+        updated = volume.integrate(make_plane_frame())
+        
+        assert updated > 0
+        # A 2 x 2 m patch at 5 cm voxels spans ~5 x 5 blocks, 1-2 blocks thick
+        assert 0 < volume.num_blocks <= 72
+    
+    def test_query_signed_distance(self):
+        """Test that the fused distance is positive in front of the surface."""
+        volume = TSDFVolume()
+        volume.integrate(make_plane_frame(depth=5.0))
+        
+        sdf, weight = volume.query(np.array([[0.01, 0.01, 4.9], [0.01, 0.01, 5.1],
+                                             [50.0, 50.0, 50.0]]))
+        
+        assert sdf[0] > 0.0
+        assert sdf[1] < 0.0
+        assert np.isnan(sdf[2])
+        assert weight[2] == 0.0
+    
+    def test_fusion_averages_noise(self):
+        """Test that fusing noisy frames yields a surface near the true depth."""
+        volume = TSDFVolume()
+        for seed in range(5):
+            volume.integrate(make_plane_frame(depth=5.0, noise=0.02, seed=seed))
+        
+        surface = volume.extract_point_cloud(min_weight=2.0)
+        
+        assert surface.num_points > 0
+        assert np.median(surface.xyz[:, 2]) == pytest.approx(5.0, abs=0.05)
+        assert np.all(surface.rgb == 200)
+    
+    def test_integrate_with_pose(self):
+        """Test that a camera pose moves the fused surface into the world frame."""
+        volume = TSDFVolume()
+        pose = np.eye(4)
+        pose[:3, 3] = [10.0, 0.0, 0.0]
+        
+        volume.integrate(make_plane_frame(), pose=pose)
+        surface = volume.extract_point_cloud()
+        
+        assert np.mean(surface.xyz[:, 0]) == pytest.approx(10.0, abs=0.1)
+    
+    def test_extract_blocks_of_last_frame(self):
+        """Test that extraction can be limited to the blocks the last frame touched."""
+        volume = TSDFVolume()
+        pose = np.eye(4)
+        for x in (0.0, 10.0, 20.0):
+            pose[:3, 3] = [x, 0.0, 0.0]
+            volume.integrate(make_plane_frame(), pose=pose)
+        
+        latest = volume.extract_point_cloud(blocks=volume.last_blocks)
+        everything = volume.extract_point_cloud()
+        
+        assert np.mean(latest.xyz[:, 0]) == pytest.approx(20.0, abs=0.1)
+        assert latest.num_points == np.count_nonzero(everything.xyz[:, 0] > 15.0)
+        assert volume.last_blocks.size < volume.num_blocks / 2
+    
+    def test_reset(self):
+        """Test that reset discards fused data."""
+        volume = TSDFVolume()
+        volume.integrate(make_plane_frame())
+        volume.reset()
+        
+        assert volume.num_blocks == 0
+        assert volume.last_blocks.size == 0
+        assert volume.extract_point_cloud().num_points == 0
@@ -124,3 +124,14 @@ class TestValidatorAgent:
         is_valid, message = agent.validate_safety_constraints(gcode)
         
         assert is_valid
+    
+    def test_validate_safety_constraints_ignores_comments(self):
+        """Test that commands mentioned only in comments do not pass validation."""
+        agent = ValidatorAgent()
+        
+        gcode = "G21\nG90  ; G28 skipped\nG1 X10 Y10\n; M2"
+        
+        is_valid, message = agent.validate_safety_constraints(gcode)
+        
+        assert not is_valid
+        assert message == "Line 3: Motion before home command (G28)"
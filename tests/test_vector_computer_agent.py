@@ -2,8 +2,10 @@
 Tests for Vector Computer Agent
 """
 
+import numpy as np
 import pytest
 from src.agents.vector_computer_agent import VectorComputerAgent
+from src.core.point_cloud import PointCloud
 
 
 class TestVectorComputerAgent:
@@ -86,3 +88,70 @@ class TestVectorComputerAgent:
         distance = agent.calculate_distance(v1, v2)
         
         assert distance == 5.0  # 3-4-5 triangle
+    
+    def test_optimize_path_feeds(self):
+        """Test that optimized waypoints carry feeds within the axis limits."""
+        agent = VectorComputerAgent({'max_velocity': [0.5, 0.5, 0.3]})
+        vectors = [
+            {'x': 0.0, 'y': 0.0, 'z': 2.0},
+            {'x': 1.0, 'y': 0.0, 'z': 2.0},
+            {'x': 1.0, 'y': 0.0, 'z': 0.5}
+        ]
+        
+        optimized = agent.optimize_path(vectors)
+        
+        assert [v['z'] for v in optimized] == [2.0, 2.0, 0.5]
+        assert 0.0 < optimized[1]['feed'] <= 0.5
+        assert 0.0 < optimized[2]['feed'] <= 0.3
+        assert optimized[0]['time'] == 0.0
+        assert optimized[1]['time'] < optimized[2]['time']
+        assert 'feed' not in vectors[0]
+    
+    def test_motion_profiles(self):
+        """Test that S-curve profiles take longer than trapezoidal ones."""
+        vectors = [{'x': 0.0, 'y': 0.0, 'z': 0.0}, {'x': 3.0, 'y': 0.0, 'z': 0.0}]
+        
+        s_curve = VectorComputerAgent({'motion_profile': 's_curve'}).plan_trajectory(vectors)
+        trapezoidal = VectorComputerAgent({'motion_profile': 'trapezoidal'})
+        trapezoidal = trapezoidal.plan_trajectory(vectors)
+        
+        assert s_curve['duration'] > trapezoidal['duration'] > 0.0
+        with pytest.raises(ValueError):
+            VectorComputerAgent({'motion_profile': 'cubic'}).plan_trajectory(vectors)
+    
+    def test_avoid_obstacles(self):
+        """Test that moves through an obstacle gain detour waypoints."""
+        agent = VectorComputerAgent({'clearance': 0.3, 'grid_resolution': 0.1})
+        xyz = np.array([[x, y, z] for x in np.arange(-0.5, 0.51, 0.05)
+                        for y in np.arange(-0.5, 0.51, 0.05) for z in (0.0, 0.5)])
+        cloud = PointCloud(xyz)
+        vectors = [{'x': -2.0, 'y': 0.0, 'z': 0.25, 'tag': 'start'},
+                   {'x': 2.0, 'y': 0.0, 'z': 0.25}]
+        
+        routed = agent.avoid_obstacles(vectors, cloud)
+        
+        assert routed[0] == vectors[0] and routed[-1] == vectors[-1]
+        assert len(routed) > 2
+        planner = agent._planner
+        agent.avoid_obstacles(vectors, cloud)
+        assert agent._planner is planner
+    
+    def test_array_waypoint_math(self):
+        """Test that array inputs match the per-dict results."""
+        agent = VectorComputerAgent()
+        positions = np.random.default_rng(0).uniform(-5.0, 5.0, (50, 3))
+        vectors = [{'x': x, 'y': y, 'z': z} for x, y, z in positions.tolist()]
+        
+        safe = agent.apply_safety_margins(positions)
+        
+        assert isinstance(safe, np.ndarray)
+        assert safe.tolist() == [[v['x'], v['y'], v['z']]
+                                 for v in agent.apply_safety_margins(vectors)]
+        
+        distance = agent.calculate_distance(positions[:-1], positions[1:])
+        assert distance == pytest.approx([agent.calculate_distance(a, b)
+                                          for a, b in zip(vectors[:-1], vectors[1:])])
+        assert agent.path_length(vectors) == pytest.approx(distance.sum())
+        
+        compensated = agent.compensate_positions(vectors, {'heel': 0.0, 'trim': 0.0})
+        assert compensated == pytest.approx(positions)
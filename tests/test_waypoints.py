@@ -0,0 +1,74 @@
+"""
+Tests for batched waypoint math
+"""
+
+import numpy as np
+import pytest
+from src.core.waypoints import (
+    apply_margin, as_positions, attitude_rotation, compensate, distances,
+    pairwise_distances, path_length, segment_lengths, to_vectors
+)
+
+
+class TestWaypoints:
+    def test_conversion_round_trip(self):
+        """Test dict and array conversions keep extra keys."""
+        vectors = [{'x': 1.0, 'y': 2.0, 'z': 3.0, 'feed': 0.5}, {'z': 1.0}]
+        
+        positions = as_positions(vectors)
+        
+        assert positions.tolist() == [[1.0, 2.0, 3.0], [0.0, 0.0, 1.0]]
+        assert to_vectors(positions + 1.0, vectors)[0] == {
+            'x': 2.0, 'y': 3.0, 'z': 4.0, 'feed': 0.5
+        }
+        assert to_vectors(positions)[1] == {'x': 0.0, 'y': 0.0, 'z': 1.0}
+        assert as_positions({'x': 1.0}).shape == (1, 3)
+    
+    def test_distances(self):
+        """Test row-wise, pairwise and path distances."""
+        positions = np.array([[0.0, 0.0, 0.0], [3.0, 4.0, 0.0], [3.0, 4.0, 12.0]])
+        
+        assert distances(positions[:-1], positions[1:]).tolist() == [5.0, 12.0]
+        assert distances(positions, {'x': 0.0}).tolist() == [0.0, 5.0, 13.0]
+        assert segment_lengths(positions).tolist() == [5.0, 12.0]
+        assert path_length(positions) == 17.0
+        assert path_length(positions[:1]) == 0.0
+        
+        matrix = pairwise_distances(positions)
+        assert matrix.shape == (3, 3)
+        assert matrix[0, 2] == matrix[2, 0] == 13.0
+        assert pairwise_distances(positions, positions[:1]).ravel().tolist() == [0.0, 5.0, 13.0]
+    
+    def test_attitude_rotation(self):
+        """Test that heel rolls about x and trim pitches about y."""
+        rotation = attitude_rotation(90.0, 0.0)
+        assert rotation @ np.array([0.0, 1.0, 0.0]) == pytest.approx([0.0, 0.0, 1.0])
+        
+        rotation = attitude_rotation(0.0, 90.0)
+        assert rotation @ np.array([0.0, 0.0, 1.0]) == pytest.approx([1.0, 0.0, 0.0])
+        
+        rotation = attitude_rotation(3.0, -1.5)
+        assert rotation @ rotation.T == pytest.approx(np.eye(3))
+    
+    def test_compensate(self):
+        """Test batched compensation against per-point rotation."""
+        rng = np.random.default_rng(0)
+        positions = rng.uniform(-10.0, 10.0, (1000, 3))
+        pivot = np.array([5.0, 2.0, -1.0])
+        
+        compensated = compensate(positions, 2.0, -1.0, pivot)
+        
+        rotation = attitude_rotation(2.0, -1.0)
+        expected = np.array([rotation @ (p - pivot) + pivot for p in positions])
+        assert compensated == pytest.approx(expected)
+        assert compensate(positions, 0.0, 0.0) == pytest.approx(positions)
+        # Rotations preserve the path length
+        assert path_length(compensated) == pytest.approx(path_length(positions))
+    
+    def test_apply_margin(self):
+        """Test scalar, per-axis and per-waypoint margins."""
+        positions = np.zeros((2, 3))
+        
+        assert apply_margin(positions, 0.2).tolist() == [[0.0, 0.0, 0.2]] * 2
+        assert apply_margin(positions, [0.1, 0.0, 0.3]).tolist() == [[0.1, 0.0, 0.3]] * 2
+        assert apply_margin(positions, np.eye(3)[:2]).tolist() == np.eye(3)[:2].tolist()